@@ -0,0 +1,520 @@
+"""
+Constrained Carrier Assignment Solver
+
+Assigns every (packagetype, shipping_zip_code, weight_bracket) group to one
+carrier, minimizing total cost subject to:
+- Volume minimums: shipments assigned to a carrier >= its commitment
+- FedEx threshold: undiscounted FedEx spend >= the earned discount tier
+
+As an LP (x[g, c] = share of group g sent to carrier c):
+
+    minimize    sum_gc cost_total[g, c] * x[g, c]
+    subject to  sum_c x[g, c] = 1                          for each group
+                sum_g shipment_count[g] * x[g, c] >= min_c  for each minimum
+                sum_g undiscounted[g] * x[g, FEDEX] >= threshold
+
+Only a handful of constraints couple the groups, so the solver works on
+the Lagrangian dual: for multipliers (dual prices) on the coupling
+constraints, each group independently picks its cheapest carrier after
+pricing, which is one vectorized argmin over the cost matrix. The dual is
+maximized with a stabilized cutting-plane method whose small master LP is
+solved by a dense simplex in this module; no external solver is needed.
+
+Groups are assigned whole, which the LP does not guarantee, so the
+assignment is settled by branch-and-bound. Any whole-group assignment that
+meets the constraints costs at least the dual value plus, per group, its
+penalty: how much more its carrier costs than its cheapest one at the
+dual prices. The search starts from the cheaper of two repaired
+assignments (the priced argmin and the plain cheapest, with shortfalls
+closed by shifting the cheapest groups and overshoot then moved back).
+Every carrier whose penalty alone exceeds the gap to it is ruled out, so
+only the groups near the boundary keep a choice, and those are searched
+exhaustively. If the search hits MAX_NODES (typical with tens of
+thousands of groups, where the gap is already a few dollars), the best
+assignment found so far is returned with result.exact False.
+
+Dual prices read as the marginal cost of each constraint: $ per shipment
+of a volume minimum, and $ per $ of undiscounted FedEx spend. If the
+constraints cannot all be met, the prices stop at their bounds and no
+feasible assignment is found: result.feasible is False (proven when
+result.exact), result.shortfalls lists what the returned assignment
+misses and there is no lower bound.
+
+Usage:
+    result = solve_assignment(
+        df_agg, ["ONTRAC", "USPS", "FEDEX"],
+        minimums={"ONTRAC": 279_080, "USPS": 140_000},
+        fedex_threshold=4_500_000,
+    )
+    result.df["assigned_carrier"], result.dual_prices["ONTRAC"]
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import polars as pl
+
+from analysis.US_2026_tenders.optimization.fedex_adjustment import compute_undiscounted
+
+
+# Key of the FedEx threshold in AssignmentResult.dual_prices
+FEDEX_THRESHOLD = "FEDEX_THRESHOLD"
+
+# Relative duality gap at which the dual is considered maximized
+DUAL_TOLERANCE = 1e-9
+
+# Cutting-plane iterations before giving up on closing the gap
+MAX_ITERATIONS = 500
+
+# Constraint shortfalls up to this much count as met
+TIE_TOLERANCE = 1e-6
+
+# Branch-and-bound nodes explored before settling for the best assignment found
+MAX_NODES = 200_000
+
+
+@dataclass
+class AssignmentResult:
+    """Solution of a constrained assignment."""
+    df: pl.DataFrame                 # Input groups with assigned_carrier
+    total_cost: float                # Cost of the (whole-group) assignment
+    lower_bound: float               # LP optimum (no assignment costs less); nan if infeasible
+    dual_prices: dict[str, float]    # Carrier (or FEDEX_THRESHOLD) -> price
+    feasible: bool                   # Every constraint is met
+    iterations: int                  # Cutting-plane iterations
+    exact: bool                      # Search finished: no cheaper (or, if infeasible, no feasible) assignment
+    shortfalls: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def gap(self) -> float:
+        """Cost above the LP lower bound."""
+        return self.total_cost - self.lower_bound
+
+
+# =============================================================================
+# DENSE SIMPLEX (master problem)
+# =============================================================================
+
+def _simplex_max(c: np.ndarray, A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Maximize c @ x subject to A @ x <= b, x >= 0, for b >= 0.
+
+    Tableau simplex started from the slack basis (feasible since b >= 0),
+    with Bland's rule so degenerate pivots cannot cycle. Meant for the
+    cutting-plane master: a few columns, at most a few hundred rows.
+    """
+    m, n = A.shape
+    tableau = np.zeros((m + 1, n + m + 1))
+    tableau[:m, :n] = A
+    tableau[:m, n:n + m] = np.eye(m)
+    tableau[:m, -1] = b
+    tableau[m, :n] = -c
+    basis = list(range(n, n + m))
+
+    eps = 1e-12
+    while True:
+        entering = np.flatnonzero(tableau[m, :-1] < -eps)
+        if len(entering) == 0:
+            break
+        col = entering[0]
+        column = tableau[:m, col]
+        positive = column > eps
+        if not positive.any():
+            raise ValueError("Master LP is unbounded")
+        ratios = np.full(m, np.inf)
+        ratios[positive] = tableau[:m, -1][positive] / column[positive]
+        # Bland: lowest basis index among the tied minimum ratios
+        tied = np.flatnonzero(ratios <= ratios.min() + eps)
+        row = min(tied, key=lambda r: basis[r])
+
+        tableau[row] /= tableau[row, col]
+        others = np.arange(m + 1) != row
+        tableau[others] -= np.outer(tableau[others, col], tableau[row])
+        basis[row] = col
+
+    x = np.zeros(n + m)
+    x[basis] = tableau[:m, -1]
+    return x[:n]
+
+
+# =============================================================================
+# LAGRANGIAN DUAL
+# =============================================================================
+
+class _Problem:
+    """Cost matrix and coupling constraints in array form."""
+
+    def __init__(self, costs: np.ndarray, allowed: np.ndarray, rows: list[tuple[str, int, np.ndarray, float]]):
+        self.costs = np.where(allowed, costs, np.inf)
+        self.names = [name for name, _, _, _ in rows]
+        self.carrier_of = np.array([j for _, j, _, _ in rows], dtype=np.int64)
+        self.coefficients = np.array([a for _, _, a, _ in rows]).reshape(len(rows), len(costs))
+        self.rhs = np.array([b for _, _, _, b in rows], dtype=float)
+
+        # contribution[g, c, k]: coefficient of group g in constraint k if sent to carrier c
+        self.contribution = np.zeros(self.costs.shape + (len(rows),))
+        for k, j in enumerate(self.carrier_of):
+            self.contribution[:, j, k] = self.coefficients[k]
+
+    def priced_costs(self, prices: np.ndarray) -> np.ndarray:
+        """Costs less each constraint's price times the group's coefficient."""
+        priced = self.costs.copy()
+        for k, j in enumerate(self.carrier_of):
+            priced[:, j] -= prices[k] * self.coefficients[k]
+        return priced
+
+    def lhs(self, choice: np.ndarray) -> np.ndarray:
+        """Left-hand side of each constraint for an assignment."""
+        return np.array([
+            self.coefficients[k][choice == j].sum() for k, j in enumerate(self.carrier_of)
+        ])
+
+    def evaluate(self, prices: np.ndarray) -> tuple[float, np.ndarray, np.ndarray]:
+        """Dual value, a subgradient, and the priced argmin assignment."""
+        priced = self.priced_costs(prices)
+        choice = priced.argmin(axis=1)
+        value = float(priced[np.arange(len(choice)), choice].sum() + prices @ self.rhs)
+        return value, self.rhs - self.lhs(choice), choice
+
+    def price_bounds(self) -> np.ndarray:
+        """
+        Upper bounds on useful prices.
+
+        Past the largest cost difference per unit of coefficient, every group
+        that can move to the constrained carrier already prefers it; the
+        bound is widened so several constraints competing for the same groups
+        can still settle.
+        """
+        finite = np.isfinite(self.costs)
+        spread = np.where(finite, self.costs, -np.inf).max(axis=1) - np.where(finite, self.costs, np.inf).min(axis=1)
+        bounds = []
+        for k in range(len(self.rhs)):
+            a = self.coefficients[k]
+            useful = a > 0
+            per_unit = (spread[useful] / a[useful]).max() if useful.any() else 0.0
+            bounds.append(4 * len(self.rhs) * (per_unit + 1.0))
+        return np.array(bounds)
+
+
+def _maximize_dual(problem: _Problem) -> tuple[np.ndarray, float, int]:
+    """
+    Maximize the Lagrangian dual with a stabilized (in-out) cutting-plane method.
+
+    Returns (prices, dual value, iterations).
+    """
+    k = len(problem.rhs)
+    upper = problem.price_bounds()
+
+    cut_values, cut_subgradients, cut_points = [], [], []
+    best_prices = np.zeros(k)
+    best_value, subgradient, _ = problem.evaluate(best_prices)
+    cut_values.append(best_value)
+    cut_subgradients.append(subgradient)
+    cut_points.append(best_prices)
+
+    alpha = 0.5
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        # Master: max z s.t. z <= value_i + s_i @ (prices - point_i), 0 <= prices <= upper,
+        # with z = z0 + z_plus - z_minus so the slack basis is feasible
+        S = np.array(cut_subgradients)
+        offsets = np.array(cut_values) - np.einsum("ij,ij->i", S, np.array(cut_points))
+        z0 = offsets.min()
+        A = np.vstack([
+            np.hstack([-S, np.ones((len(S), 1)), -np.ones((len(S), 1))]),
+            np.hstack([np.eye(k), np.zeros((k, 2))]),
+        ])
+        b = np.concatenate([offsets - z0, upper])
+        c = np.concatenate([np.zeros(k), [1.0, -1.0]])
+        solution = _simplex_max(c, A, b)
+        master_prices = solution[:k]
+        master_bound = z0 + solution[k] - solution[k + 1]
+
+        if master_bound - best_value <= DUAL_TOLERANCE * max(1.0, abs(best_value)):
+            return best_prices, best_value, iteration
+
+        # In-out stabilization: query between the best point and the master solution
+        query = alpha * best_prices + (1 - alpha) * master_prices
+        value, subgradient, _ = problem.evaluate(query)
+        cut_values.append(value)
+        cut_subgradients.append(subgradient)
+        cut_points.append(query)
+
+        if value > best_value:
+            best_prices, best_value = query, value
+        elif alpha > 0:
+            # No progress toward the master point: fall back to plain Kelley steps
+            alpha = 0.0
+
+    return best_prices, best_value, MAX_ITERATIONS
+
+
+def _repair(problem: _Problem, prices: np.ndarray, choice: np.ndarray) -> np.ndarray:
+    """
+    Close constraint shortfalls by shifting the cheapest groups (at the priced costs).
+
+    A group is never taken from a carrier if that breaks a constraint that
+    is met; constraints still short may lose groups and are repaired on a
+    later pass. Used for a first feasible assignment, which need not be
+    cheapest.
+    """
+    choice = choice.copy()
+    priced = problem.priced_costs(prices)
+
+    for _ in range(2 * len(problem.rhs)):
+        before = choice.copy()
+        for k, j in enumerate(problem.carrier_of):
+            shortfall = problem.rhs[k] - problem.lhs(choice)[k]
+            if shortfall <= 0:
+                continue
+
+            a = problem.coefficients[k]
+            movable = (choice != j) & np.isfinite(problem.costs[:, j]) & (a > 0)
+            candidates = np.flatnonzero(movable)
+            penalty = (priced[candidates, j] - priced[candidates, choice[candidates]]) / a[candidates]
+            order = candidates[np.argsort(penalty, kind="stable")]
+
+            surplus = problem.lhs(choice) - problem.rhs
+            for g in order:
+                source = choice[g]
+                # Constraints on the source carrier lose this group's coefficient
+                losses = np.where(problem.carrier_of == source, problem.coefficients[:, g], 0.0)
+                if np.any((losses > 0) & (surplus >= 0) & (surplus - losses < 0)):
+                    continue
+                choice[g] = j
+                surplus -= losses
+                surplus[problem.carrier_of == j] += problem.coefficients[problem.carrier_of == j, g]
+                shortfall -= a[g]
+                if shortfall <= 0:
+                    break
+
+        if _feasible(problem, choice) or np.array_equal(choice, before):
+            break
+
+    return choice
+
+
+def _cost(problem: _Problem, choice: np.ndarray) -> float:
+    """Total cost of an assignment."""
+    return float(problem.costs[np.arange(len(choice)), choice].sum())
+
+
+def _feasible(problem: _Problem, choice: np.ndarray) -> bool:
+    """Every constraint is met by an assignment."""
+    return bool(np.all(problem.lhs(choice) >= problem.rhs - TIE_TOLERANCE))
+
+
+def _improve(problem: _Problem, choice: np.ndarray) -> np.ndarray:
+    """
+    Move single groups to cheaper carriers while every constraint stays met.
+
+    Mostly undoes overshoot: groups a repair moved beyond what a minimum
+    needed go back to their cheapest carrier.
+    """
+    choice = choice.copy()
+    groups = np.arange(len(choice))
+    while True:
+        surplus = problem.lhs(choice) - problem.rhs
+        saving = problem.costs[groups, choice][:, None] - problem.costs
+        delta = problem.contribution - problem.contribution[groups, choice][:, None, :]
+        allowed = (saving > TIE_TOLERANCE) & np.all(surplus + delta >= -TIE_TOLERANCE, axis=2)
+        saving = np.where(allowed, saving, -np.inf)
+        target = saving.argmax(axis=1)
+        candidates = np.flatnonzero(np.isfinite(saving[groups, target]))
+        if len(candidates) == 0:
+            return choice
+
+        moved = False
+        for g in candidates[np.argsort(-saving[candidates, target[candidates]], kind="stable")]:
+            change = delta[g, target[g]]
+            if np.all(surplus + change >= -TIE_TOLERANCE):
+                choice[g] = target[g]
+                surplus += change
+                moved = True
+        if not moved:
+            return choice
+
+
+def _branch_and_bound(
+    problem: _Problem, prices: np.ndarray, dual_value: float, incumbent: np.ndarray | None,
+) -> tuple[np.ndarray | None, bool]:
+    """
+    Cheapest whole-group assignment meeting every constraint.
+
+    For prices >= 0 and any feasible assignment x,
+        cost(x) = dual_value + sum_g penalty[g, x_g] + prices @ (lhs(x) - rhs)
+    with every term of the last sum >= 0. Carriers whose penalty alone
+    exceeds the gap to the incumbent are dropped; partial assignments are
+    pruned on their penalties plus the overshoot they already force, or
+    when the remaining groups cannot close a shortfall.
+
+    Returns (best assignment or None, whether the search finished).
+    """
+    n_constraints = len(problem.rhs)
+    priced = problem.priced_costs(prices)
+    penalty = priced - priced.min(axis=1, keepdims=True)
+
+    best = incumbent
+    if incumbent is not None:
+        upper = _cost(problem, incumbent)
+    else:
+        # No feasible assignment costs more than every group on its dearest carrier
+        upper = float(np.where(np.isfinite(problem.costs), problem.costs, -np.inf).max(axis=1).sum()) + 1.0
+    slack = 1e-9 * max(1.0, abs(upper))
+    options = np.isfinite(penalty) & (penalty <= max(upper - dual_value, 0.0) + slack)
+
+    fixed = options.sum(axis=1) == 1
+    choice = np.where(fixed, options.argmax(axis=1), 0)
+    fixed_groups = np.flatnonzero(fixed)
+    fixed_lhs = problem.contribution[fixed_groups, choice[fixed_groups]].sum(axis=0)
+    fixed_penalty = float(penalty[fixed_groups, choice[fixed_groups]].sum())
+    needed = problem.rhs - TIE_TOLERANCE
+
+    free = np.flatnonzero(~fixed)
+    if len(free) == 0:
+        return (choice if np.all(fixed_lhs >= needed) else best), True
+
+    # Decide the groups with the largest penalties first; try each group's carriers cheapest first
+    free = free[np.argsort(-np.where(options[free], penalty[free], 0.0).max(axis=1), kind="stable")]
+    free_penalty = np.where(options[free], penalty[free], np.inf)
+    order = np.argsort(free_penalty, axis=1, kind="stable")
+    n_options = options[free].sum(axis=1)
+
+    # Least and most each undecided suffix of groups can still add to each constraint
+    free_contribution = problem.contribution[free]
+    least = np.where(options[free][:, :, None], free_contribution, np.inf).min(axis=1)
+    most = np.where(options[free][:, :, None], free_contribution, -np.inf).max(axis=1)
+    zero = np.zeros((1, n_constraints))
+    least_after = np.vstack([np.cumsum(least[::-1], axis=0)[::-1], zero])[1:]
+    most_after = np.vstack([np.cumsum(most[::-1], axis=0)[::-1], zero])[1:]
+    if np.any(fixed_lhs + most_after[0] + most[0] < needed):
+        return best, True
+
+    # Iterative depth-first search; level d decides group free[d]
+    depth_penalty = np.zeros(len(free) + 1)
+    depth_lhs = np.zeros((len(free) + 1, n_constraints))
+    depth_penalty[0], depth_lhs[0] = fixed_penalty, fixed_lhs
+    tried = np.full(len(free), -1)
+    nodes, d = 0, 0
+    while d >= 0:
+        tried[d] += 1
+        if tried[d] >= n_options[d]:
+            tried[d] = -1
+            d -= 1
+            continue
+        nodes += 1
+        if nodes > MAX_NODES:
+            return best, False
+
+        c = order[d, tried[d]]
+        bound = depth_penalty[d] + free_penalty[d, c]
+        if dual_value + bound >= upper - slack:
+            tried[d] = n_options[d]  # Later carriers of this group have larger penalties
+            continue
+        lhs = depth_lhs[d] + free_contribution[d, c]
+        if np.any(lhs + most_after[d] < needed):
+            continue
+        overshoot = prices @ np.maximum(lhs + least_after[d] - problem.rhs, 0.0)
+        if dual_value + bound + overshoot >= upper - slack:
+            continue
+
+        choice[free[d]] = c
+        if d + 1 == len(free):
+            # The identity above gives the leaf's cost without summing every group
+            if dual_value + bound + prices @ (lhs - problem.rhs) < upper - slack:
+                best = choice.copy()
+                upper = _cost(problem, best)
+                slack = 1e-9 * max(1.0, abs(upper))
+            continue
+        depth_penalty[d + 1], depth_lhs[d + 1] = bound, lhs
+        d += 1
+
+    return best, True
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+
+def solve_assignment(
+    df: pl.DataFrame,
+    carriers: list[str],
+    minimums: dict[str, int] | None = None,
+    fedex_threshold: float | None = None,
+) -> AssignmentResult:
+    """
+    Cheapest whole-group carrier assignment under volume minimums and the FedEx threshold.
+
+    Args:
+        df: Aggregated groups with shipment_count and, per carrier,
+            {carrier}_cost_total / {carrier}_cost_avg (null avg = not serviceable).
+            The threshold also needs fedex_hd_base_rate_total and
+            fedex_sp_base_rate_total (see fedex_adjustment.adjust_and_aggregate)
+        carriers: Carriers groups may be assigned to (e.g. ["ONTRAC", "USPS", "FEDEX"])
+        minimums: Carrier -> minimum shipments
+        fedex_threshold: Minimum FedEx undiscounted spend, optional
+
+    Returns:
+        AssignmentResult; result.df is df with an assigned_carrier column.
+        Groups no available carrier can service go to FedEx (or the last
+        carrier), as in the greedy scenarios.
+    """
+    minimums = minimums or {}
+    counts = df["shipment_count"].cast(pl.Float64).to_numpy()
+
+    # Cost matrix; a group can go to a carrier that has a cost for it
+    allowed = np.column_stack([
+        df[f"{c.lower()}_cost_avg"].is_not_null().to_numpy() for c in carriers
+    ])
+    costs = np.column_stack([
+        df[f"{c.lower()}_cost_total"].fill_null(0.0).cast(pl.Float64).to_numpy() for c in carriers
+    ])
+
+    # Unserviceable groups fall back to FedEx, at no cost (matching the greedy scenarios)
+    fallback = carriers.index("FEDEX") if "FEDEX" in carriers else len(carriers) - 1
+    unserviceable = ~allowed.any(axis=1)
+    allowed[unserviceable, fallback] = True
+    costs[unserviceable] = 0.0
+
+    rows = []
+    for carrier, minimum in minimums.items():
+        rows.append((carrier, carriers.index(carrier), counts, float(minimum)))
+    if fedex_threshold is not None and "FEDEX" in carriers:
+        undiscounted = df.select(
+            compute_undiscounted(pl.col("fedex_hd_base_rate_total"), pl.col("fedex_sp_base_rate_total"))
+            .fill_null(0.0)
+        ).to_series().cast(pl.Float64).to_numpy()
+        rows.append((FEDEX_THRESHOLD, fallback, undiscounted, float(fedex_threshold)))
+
+    problem = _Problem(costs, allowed, rows)
+
+    if rows:
+        prices, lower_bound, iterations = _maximize_dual(problem)
+        _, _, choice = problem.evaluate(prices)
+        # Start from the cheaper feasible of the repaired priced and plain argmins
+        candidates = [
+            _improve(problem, _repair(problem, prices, choice)),
+            _improve(problem, _repair(problem, np.zeros(len(rows)), problem.costs.argmin(axis=1))),
+        ]
+        feasible = [c for c in candidates if _feasible(problem, c)]
+        incumbent = min(feasible, key=lambda c: _cost(problem, c)) if feasible else None
+        best, exact = _branch_and_bound(problem, prices, lower_bound, incumbent)
+        choice = best if best is not None else candidates[0]
+    else:
+        prices, iterations, exact = np.zeros(0), 0, True
+        choice = problem.costs.argmin(axis=1)
+        lower_bound = _cost(problem, choice)
+
+    total_cost = float(costs[np.arange(len(choice)), choice].sum())
+    remaining = problem.rhs - problem.lhs(choice)
+    shortfalls = {name: float(s) for name, s in zip(problem.names, remaining) if s > TIE_TOLERANCE}
+
+    return AssignmentResult(
+        df=df.with_columns(pl.Series("assigned_carrier", np.array(carriers)[choice], dtype=pl.Utf8)),
+        total_cost=total_cost,
+        lower_bound=lower_bound if not shortfalls else float("nan"),
+        dual_prices={name: float(p) for name, p in zip(problem.names, prices)},
+        feasible=not shortfalls,
+        iterations=iterations,
+        exact=exact,
+        shortfalls=shortfalls,
+    )
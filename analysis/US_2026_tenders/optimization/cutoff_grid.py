@@ -0,0 +1,168 @@
+"""
+Cutoff Grid Search for Group Routing Rules
+
+Scenarios 11 and 15 route each package type group by two weight cutoffs:
+
+    primary zone AND weight_bracket <= primary_cut              -> primary carrier
+    other zone AND secondary available AND bracket <= second_cut -> secondary carrier
+    otherwise                                                   -> FedEx
+
+Every shipment falls in exactly one zone class (primary, secondary, neither),
+and within a class the carrier only depends on whether its weight bracket is
+at or below that class's cutoff. So a group's totals separate per class:
+
+    cost(p, u) = primary(p) + secondary(u) + fedex_only
+
+where primary(p) = cost of primary-zone shipments up to bracket p on the
+primary carrier plus the rest on FedEx, a prefix sum over a per-bracket
+table. The FedEx HD/SP base rates separate the same way. A whole
+(primary_cut, secondary_cut) grid is one outer sum of two cumulative tables
+instead of one pass over the shipments per cutoff pair.
+
+The best cutoffs for two groups are found by broadcasting their grids
+against each other, with the FedEx undiscounted spend threshold applied as
+a mask; ties resolve to the first combination in (light, medium) order.
+
+Usage:
+    light = cutoff_grid(df_light, pl.col("p2p_us_available"), pl.col("p2p_us2_available"),
+                        "p2p_cost_total", "p2p_us2_cost_total", 30, 10)
+    best_con, best_unc = find_best_cutoffs(light, medium, heavy_cost, heavy_hd, heavy_sp, 5_100_000)
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import polars as pl
+
+from analysis.US_2026_tenders.optimization.fedex_adjustment import compute_undiscounted
+
+
+# Zone classes of a shipment within a group
+PRIMARY, SECONDARY, FEDEX_ONLY = 0, 1, 2
+
+
+@dataclass
+class CutoffGrid:
+    """Group totals for every cutoff pair, indexed [primary_cut, secondary_cut]."""
+    cost: np.ndarray       # Total cost
+    hd_base: np.ndarray    # FedEx Home Delivery base rate of shipments left on FedEx
+    sp_base: np.ndarray    # FedEx SmartPost base rate of shipments left on FedEx
+
+    def __len__(self) -> int:
+        return self.cost.size
+
+
+def _bracket_tables(sums: pl.DataFrame, zone: int, columns: list[str], n_brackets: int) -> np.ndarray:
+    """Per-bracket sums of columns for one zone class, shape (len(columns), n_brackets)."""
+    rows = sums.filter(pl.col("zone") == zone)
+    brackets = rows["bracket"].to_numpy()
+    return np.stack([
+        np.bincount(brackets, weights=rows[c].to_numpy(), minlength=n_brackets)
+        for c in columns
+    ])
+
+
+def cutoff_grid(
+    df_group: pl.DataFrame,
+    primary_available: pl.Expr,
+    secondary_available: pl.Expr,
+    primary_cost: str,
+    secondary_cost: str,
+    max_primary: int,
+    max_secondary: int,
+) -> CutoffGrid:
+    """Totals of a group for all cutoffs 0..max_primary x 0..max_secondary.
+
+    Args:
+        df_group: Shipments with weight_bracket, fedex_cost_total,
+            fedex_cost_base_rate and fedex_service_selected
+        primary_available: Shipment is in the primary carrier's zone
+        secondary_available: Shipment may go to the secondary carrier
+            (only applies outside the primary zone)
+        primary_cost, secondary_cost: Cost columns of the two carriers
+        max_primary, max_secondary: Largest cutoff searched for each
+
+    Null costs and base rates count as zero (as in a polars sum); a null
+    weight bracket is never within a cutoff.
+    """
+    # Brackets above the largest cutoff never switch carrier; pool them in one bin
+    overflow = max(max_primary, max_secondary) + 1
+    is_sp = (pl.col("fedex_service_selected") == "FXSP").fill_null(False)
+    is_hd = (pl.col("fedex_service_selected") != "FXSP").fill_null(False)
+    base_rate = pl.col("fedex_cost_base_rate").fill_null(0.0)
+
+    sums = (
+        df_group.lazy()
+        .select(
+            pl.when(primary_available.fill_null(False)).then(pl.lit(PRIMARY))
+            .when(secondary_available.fill_null(False)).then(pl.lit(SECONDARY))
+            .otherwise(pl.lit(FEDEX_ONLY))
+            .alias("zone"),
+            pl.col("weight_bracket").clip(0, overflow).fill_null(overflow).cast(pl.Int64).alias("bracket"),
+            pl.col(primary_cost).fill_null(0.0).alias("primary"),
+            pl.col(secondary_cost).fill_null(0.0).alias("secondary"),
+            pl.col("fedex_cost_total").fill_null(0.0).alias("fedex"),
+            pl.when(is_hd).then(base_rate).otherwise(0.0).alias("hd_base"),
+            pl.when(is_sp).then(base_rate).otherwise(0.0).alias("sp_base"),
+        )
+        .group_by("zone", "bracket")
+        .agg(pl.col("primary", "secondary", "fedex", "hd_base", "sp_base").sum())
+        .collect()
+    )
+
+    def on_cutoff(zone: int, carrier: str, max_cut: int) -> tuple[np.ndarray, ...]:
+        """(cost, hd_base, sp_base) of a zone class for cutoffs 0..max_cut."""
+        tables = _bracket_tables(sums, zone, [carrier, "fedex", "hd_base", "sp_base"], overflow + 1)
+        # Brackets up to the cutoff move to the carrier; the rest stay on FedEx
+        moved = np.cumsum(tables, axis=1)[:, : max_cut + 1]
+        on_fedex = tables.sum(axis=1, keepdims=True) - moved
+        return moved[0] + on_fedex[1], on_fedex[2], on_fedex[3]
+
+    primary = on_cutoff(PRIMARY, "primary", max_primary)
+    secondary = on_cutoff(SECONDARY, "secondary", max_secondary)
+    fedex_only = _bracket_tables(sums, FEDEX_ONLY, ["fedex", "hd_base", "sp_base"], overflow + 1).sum(axis=1)
+
+    cost, hd_base, sp_base = (
+        p[:, None] + s[None, :] + f for p, s, f in zip(primary, secondary, fedex_only)
+    )
+    return CutoffGrid(cost=cost, hd_base=hd_base, sp_base=sp_base)
+
+
+def find_best_cutoffs(
+    light: CutoffGrid, medium: CutoffGrid,
+    heavy_cost: float, heavy_hd_base: float, heavy_sp_base: float,
+    threshold: float,
+) -> tuple[Optional[dict], dict]:
+    """Best cutoffs for the Light and Medium groups, with and without the FedEx threshold.
+
+    The threshold is on undiscounted FedEx spend (compute_undiscounted of
+    the HD and SP base rates across all three groups).
+
+    Returns (best_constrained, best_unconstrained), each a dict of lp, lu,
+    mp, mu (primary/secondary cutoffs of Light and Medium), total_cost,
+    hd_base, sp_base and undiscounted; best_constrained is None if no
+    combination meets the threshold.
+    """
+    # Axes: light primary, light secondary, medium primary, medium secondary
+    total_cost = light.cost[:, :, None, None] + medium.cost[None, None] + heavy_cost
+    hd_base = light.hd_base[:, :, None, None] + medium.hd_base[None, None] + heavy_hd_base
+    sp_base = light.sp_base[:, :, None, None] + medium.sp_base[None, None] + heavy_sp_base
+    undiscounted = compute_undiscounted(hd_base, sp_base)
+
+    def best(index: int) -> dict:
+        lp, lu, mp, mu = np.unravel_index(index, total_cost.shape)
+        return dict(
+            lp=int(lp), lu=int(lu), mp=int(mp), mu=int(mu),
+            total_cost=float(total_cost.flat[index]),
+            hd_base=float(hd_base.flat[index]), sp_base=float(sp_base.flat[index]),
+            undiscounted=float(undiscounted.flat[index]),
+        )
+
+    best_unc = best(int(np.argmin(total_cost)))
+
+    feasible = undiscounted >= threshold
+    if not feasible.any():
+        return None, best_unc
+    best_con = best(int(np.argmin(np.where(feasible, total_cost, np.inf))))
+    return best_con, best_unc
@@ -13,8 +13,9 @@ Group assignments are derived from S10's per-packagetype cutoffs:
   - Medium: S10 P2P cutoff 8-30 (mid packages where P2P wins up to high weights)
   - Heavy:  S10 P2P cutoff 0 AND USPS cutoff ≤ 1 (oversized, FedEx always cheapest)
 
-The 3 group cutoffs are found via brute-force search over all (P2P, USPS) combinations
-per group, subject to the FedEx 16% earned discount threshold constraint.
+The 3 group cutoffs are found via exhaustive search over all (P2P, USPS) combinations
+per group, subject to the FedEx 16% earned discount threshold constraint. Each
+group's grid is built from cumulative cost tables by weight bracket (cutoff_grid.py).
 """
 
 import polars as pl
@@ -24,6 +25,7 @@ from pathlib import Path
 from analysis.US_2026_tenders.optimization.fedex_adjustment import (
     adjust_fedex_costs, BAKED_FACTOR_HD, BAKED_FACTOR_SP, compute_undiscounted,
 )
+from analysis.US_2026_tenders.optimization.cutoff_grid import CutoffGrid, cutoff_grid, find_best_cutoffs
 
 sys.stdout.reconfigure(encoding="utf-8")
 
@@ -85,84 +87,22 @@ def define_groups() -> tuple[list[str], list[str], list[str]]:
     return light_pkgs, medium_pkgs, heavy_pkgs
 
 
-def compute_group_costs(
-    df_group: pl.DataFrame, p2p_cut: int, usps_cut: int
-) -> tuple[float, float, float]:
-    """Compute total cost and FedEx HD/SP base rates for a group with given cutoffs.
-
-    Returns (total_cost, fedex_hd_base, fedex_sp_base).
-    """
-    is_fedex = (
-        ~(pl.col("p2p_available") & (pl.col("weight_bracket") <= p2p_cut))
-        & ~((~pl.col("p2p_available")) & (pl.col("weight_bracket") <= usps_cut))
-    )
-    carrier = (
-        pl.when(pl.col("p2p_available") & (pl.col("weight_bracket") <= p2p_cut))
-        .then(pl.lit("P2P"))
-        .when((~pl.col("p2p_available")) & (pl.col("weight_bracket") <= usps_cut))
-        .then(pl.lit("USPS"))
-        .otherwise(pl.lit("FEDEX"))
-    )
-    cost = (
-        pl.when(carrier == "P2P").then(pl.col("p2p_cost_total"))
-        .when(carrier == "USPS").then(pl.col("usps_cost_total"))
-        .otherwise(pl.col("fedex_cost_total"))
-    )
-    is_sp = pl.col("fedex_service_selected") == "FXSP"
-    fedex_hd_base = (
-        pl.when(is_fedex & ~is_sp).then(pl.col("fedex_cost_base_rate"))
-        .otherwise(pl.lit(0.0))
-    )
-    fedex_sp_base = (
-        pl.when(is_fedex & is_sp).then(pl.col("fedex_cost_base_rate"))
-        .otherwise(pl.lit(0.0))
-    )
-    row = df_group.select(
-        cost.sum().alias("total_cost"),
-        fedex_hd_base.sum().alias("fedex_hd_base"),
-        fedex_sp_base.sum().alias("fedex_sp_base"),
-    ).row(0)
-    return row[0], row[1], row[2]
-
-
 def precompute_group_grid(
     df_group: pl.DataFrame, max_p2p: int, max_usps: int
-) -> dict[tuple[int, int], tuple[float, float, float]]:
-    """Precompute (total_cost, fedex_hd_base, fedex_sp_base) for all cutoff combinations."""
-    grid = {}
-    for p in range(0, max_p2p + 1):
-        for u in range(0, max_usps + 1):
-            grid[(p, u)] = compute_group_costs(df_group, p, u)
-    return grid
-
-
-def find_best_cutoffs(
-    light_grid: dict, medium_grid: dict,
-    heavy_cost: float, heavy_hd_base: float, heavy_sp_base: float,
-    threshold: float,
-) -> tuple[dict, dict]:
-    """Find best (p2p, usps) cutoffs per group, with and without FedEx threshold.
-
-    Threshold is on undiscounted spend (HD base / 0.37 + SP base / 0.505).
-    Returns (best_constrained, best_unconstrained).
-    """
-    best_unc = None
-    best_con = None
-
-    for (lp, lu), (lc, l_hd, l_sp) in light_grid.items():
-        for (mp, mu), (mc, m_hd, m_sp) in medium_grid.items():
-            tc = lc + mc + heavy_cost
-            total_hd = l_hd + m_hd + heavy_hd_base
-            total_sp = l_sp + m_sp + heavy_sp_base
-            undiscounted = compute_undiscounted(total_hd, total_sp)
-
-            if best_unc is None or tc < best_unc["total_cost"]:
-                best_unc = dict(lp=lp, lu=lu, mp=mp, mu=mu, total_cost=tc, undiscounted=undiscounted)
+) -> CutoffGrid:
+    """Precompute total cost and FedEx HD/SP base rates for all cutoff combinations.
 
-            if undiscounted >= threshold and (best_con is None or tc < best_con["total_cost"]):
-                best_con = dict(lp=lp, lu=lu, mp=mp, mu=mu, total_cost=tc, undiscounted=undiscounted)
+    Routing logic:
+      - P2P zone AND weight <= p2p_cut -> P2P
+      - Non-P2P zone AND weight <= usps_cut -> USPS
+      - Otherwise -> FedEx
 
-    return best_con, best_unc
+    Grid arrays are indexed [p2p_cut, usps_cut].
+    """
+    return cutoff_grid(
+        df_group, pl.col("p2p_available"), pl.lit(True),
+        "p2p_cost_total", "usps_cost_total", max_p2p, max_usps,
+    )
 
 
 def apply_group_rules(
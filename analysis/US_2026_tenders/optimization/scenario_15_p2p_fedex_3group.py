@@ -11,8 +11,9 @@ Only 2 carrier relationships (P2P + FedEx). FedEx at 16% earned discount,
 constrained to >= $5.1M undiscounted (safely above $5M penalty threshold).
 
 Group definitions reuse S10's package type classification (Light/Medium/Heavy).
-Cutoffs found by brute-force search over all (P2P US, P2P US2) combinations
-subject to the FedEx undiscounted spend constraint.
+Cutoffs found by exhaustive search over all (P2P US, P2P US2) combinations
+subject to the FedEx undiscounted spend constraint. Each group's grid is built
+from cumulative cost tables by weight bracket (cutoff_grid.py).
 """
 
 import polars as pl
@@ -22,6 +23,7 @@ from pathlib import Path
 from analysis.US_2026_tenders.optimization.fedex_adjustment import (
     adjust_fedex_costs, PP_DISCOUNT, BAKED_FACTOR_HD, BAKED_FACTOR_SP, compute_undiscounted,
 )
+from analysis.US_2026_tenders.optimization.cutoff_grid import CutoffGrid, cutoff_grid, find_best_cutoffs
 from analysis.US_2026_tenders.optimization.baseline import apply_s1_adjustments, compute_s1_baseline
 
 sys.stdout.reconfigure(encoding="utf-8")
@@ -87,105 +89,22 @@ def define_groups() -> tuple[list[str], list[str], list[str]]:
     return light_pkgs, medium_pkgs, heavy_pkgs
 
 
-def compute_group_costs(
-    df_group: pl.DataFrame, p2p_us_cut: int, p2p_us2_cut: int
-) -> tuple[float, float, float]:
-    """Compute total cost and FedEx HD/SP base rates for a group with given cutoffs.
+def precompute_group_grid(
+    df_group: pl.DataFrame, max_p2p_us: int, max_p2p_us2: int
+) -> CutoffGrid:
+    """Precompute total cost and FedEx HD/SP base rates for all cutoff combinations.
 
     Routing logic:
       - P2P US zone AND weight <= p2p_us_cut -> P2P US
       - Non-P2P US zone AND P2P US2 available AND weight <= p2p_us2_cut -> P2P US2
       - Otherwise -> FedEx
 
-    Returns (total_cost, fedex_hd_base, fedex_sp_base).
+    Grid arrays are indexed [p2p_us_cut, p2p_us2_cut].
     """
-    is_fedex = (
-        ~(pl.col("p2p_us_available") & (pl.col("weight_bracket") <= p2p_us_cut))
-        & ~(
-            (~pl.col("p2p_us_available"))
-            & pl.col("p2p_us2_available")
-            & (pl.col("weight_bracket") <= p2p_us2_cut)
-        )
-    )
-    carrier = (
-        pl.when(pl.col("p2p_us_available") & (pl.col("weight_bracket") <= p2p_us_cut))
-        .then(pl.lit("P2P_US"))
-        .when(
-            (~pl.col("p2p_us_available"))
-            & pl.col("p2p_us2_available")
-            & (pl.col("weight_bracket") <= p2p_us2_cut)
-        )
-        .then(pl.lit("P2P_US2"))
-        .otherwise(pl.lit("FEDEX"))
-    )
-    cost = (
-        pl.when(carrier == "P2P_US").then(pl.col("p2p_cost_total"))
-        .when(carrier == "P2P_US2").then(pl.col("p2p_us2_cost_total"))
-        .otherwise(pl.col("fedex_cost_total"))
-    )
-    is_sp = pl.col("fedex_service_selected") == "FXSP"
-    fedex_hd_base = (
-        pl.when(is_fedex & ~is_sp).then(pl.col("fedex_cost_base_rate"))
-        .otherwise(pl.lit(0.0))
-    )
-    fedex_sp_base = (
-        pl.when(is_fedex & is_sp).then(pl.col("fedex_cost_base_rate"))
-        .otherwise(pl.lit(0.0))
+    return cutoff_grid(
+        df_group, pl.col("p2p_us_available"), pl.col("p2p_us2_available"),
+        "p2p_cost_total", "p2p_us2_cost_total", max_p2p_us, max_p2p_us2,
     )
-    row = df_group.select(
-        cost.sum().alias("total_cost"),
-        fedex_hd_base.sum().alias("fedex_hd_base"),
-        fedex_sp_base.sum().alias("fedex_sp_base"),
-    ).row(0)
-    return row[0], row[1], row[2]
-
-
-def precompute_group_grid(
-    df_group: pl.DataFrame, max_p2p_us: int, max_p2p_us2: int
-) -> dict[tuple[int, int], tuple[float, float, float]]:
-    """Precompute (total_cost, fedex_hd_base, fedex_sp_base) for all cutoff combinations."""
-    grid = {}
-    for p in range(0, max_p2p_us + 1):
-        for u in range(0, max_p2p_us2 + 1):
-            grid[(p, u)] = compute_group_costs(df_group, p, u)
-    return grid
-
-
-def find_best_cutoffs(
-    light_grid: dict, medium_grid: dict,
-    heavy_cost: float, heavy_hd_base: float, heavy_sp_base: float,
-    threshold: float,
-) -> tuple[dict, dict]:
-    """Find best (p2p_us, p2p_us2) cutoffs per group, with and without FedEx threshold.
-
-    Threshold is on undiscounted spend, computed from HD base / 0.37 + SP base / 0.505.
-    Returns (best_constrained, best_unconstrained).
-    """
-    best_unc = None
-    best_con = None
-
-    for (lp, lu), (lc, l_hd, l_sp) in light_grid.items():
-        for (mp, mu), (mc, m_hd, m_sp) in medium_grid.items():
-            tc = lc + mc + heavy_cost
-            total_hd_base = l_hd + m_hd + heavy_hd_base
-            total_sp_base = l_sp + m_sp + heavy_sp_base
-            undiscounted = compute_undiscounted(total_hd_base, total_sp_base)
-
-            if best_unc is None or tc < best_unc["total_cost"]:
-                best_unc = dict(
-                    lp=lp, lu=lu, mp=mp, mu=mu, total_cost=tc,
-                    hd_base=total_hd_base, sp_base=total_sp_base,
-                    undiscounted=undiscounted,
-                )
-
-            if undiscounted >= threshold and (best_con is None or tc < best_con["total_cost"]):
-                best_con = dict(
-                    lp=lp, lu=lu, mp=mp, mu=mu, total_cost=tc,
-                    hd_base=total_hd_base, sp_base=total_sp_base,
-                    undiscounted=undiscounted,
-                )
-
-    return best_con, best_unc
 
 
 def apply_group_rules(
@@ -10,10 +10,11 @@ Tests all constraint combinations to find optimal carrier mix:
 When a carrier commitment is dropped, the carrier is removed entirely
 from routing - without meeting minimums, contract rates wouldn't apply.
 
-Algorithm: Greedy + Adjustment
-1. For each group, assign to cheapest available carrier
-2. Check if enforced minimums are met
-3. If not, shift lowest-cost-penalty groups to underutilized carrier
+Algorithm: Constrained assignment (see assignment_solver)
+1. Assign whole groups to minimize total cost subject to the enforced
+   minimums (LP dual prices, then branch-and-bound on the boundary groups)
+2. Report the gap to the LP lower bound and the dual price of each
+   minimum: the marginal cost per shipment of the commitment
 
 FedEx rates adjusted: earned discount removed (18% -> 0%).
 When optimization reduces FedEx spend below $4.5M threshold, the earned
@@ -25,6 +26,7 @@ import polars as pl
 import sys
 from pathlib import Path
 
+from analysis.US_2026_tenders.optimization.assignment_solver import solve_assignment
 from analysis.US_2026_tenders.optimization.fedex_adjustment import adjust_and_aggregate
 
 sys.stdout.reconfigure(encoding='utf-8')
@@ -66,157 +68,12 @@ def load_data() -> tuple[pl.DataFrame, float]:
     return adjust_and_aggregate()
 
 
-def greedy_assignment(df: pl.DataFrame, available_carriers: list[str]) -> pl.DataFrame:
-    """Assign each group to the cheapest available carrier.
-
-    Only considers carriers in available_carriers. Null costs are ignored
-    (carrier can't service that group). FedEx is fallback if available.
-    """
-    cost_cols = [f"{c.lower()}_cost_avg" for c in available_carriers]
-
-    df = df.with_columns([
-        pl.min_horizontal(*cost_cols).alias("min_cost_avg"),
-    ])
-
-    # Build when/then chain: check each carrier except the fallback
-    fallback = "FEDEX" if "FEDEX" in available_carriers else available_carriers[-1]
-    non_fallback = [c for c in available_carriers if c != fallback]
-
-    if not non_fallback:
-        # Only one carrier available
-        df = df.with_columns([pl.lit(fallback).alias("assigned_carrier")])
-    else:
-        # Start the chain with the first non-fallback carrier
-        first = non_fallback[0]
-        chain = pl.when(
-            (pl.col(f"{first.lower()}_cost_avg") == pl.col("min_cost_avg")) &
-            (pl.col(f"{first.lower()}_cost_avg").is_not_null())
-        ).then(pl.lit(first))
-
-        for carrier in non_fallback[1:]:
-            cost_col = f"{carrier.lower()}_cost_avg"
-            chain = chain.when(
-                (pl.col(cost_col) == pl.col("min_cost_avg")) &
-                (pl.col(cost_col).is_not_null())
-            ).then(pl.lit(carrier))
-
-        df = df.with_columns([chain.otherwise(pl.lit(fallback)).alias("assigned_carrier")])
-
-    return df
-
-
 def get_carrier_volume(df: pl.DataFrame, carrier: str) -> int:
     """Get total shipment count assigned to a carrier."""
     vol = df.filter(pl.col("assigned_carrier") == carrier)["shipment_count"].sum()
     return int(vol) if vol else 0
 
 
-def adjust_for_constraints(
-    df: pl.DataFrame,
-    available_carriers: list[str],
-    enforced_minimums: dict[str, int],
-) -> tuple[pl.DataFrame, list[dict]]:
-    """Shift groups to meet enforced minimums.
-
-    Priority: OnTrac first (contractual), then USPS.
-    Only shifts from available carriers. Locks shifted groups to prevent
-    them from being taken away by subsequent adjustments.
-    """
-    if not enforced_minimums:
-        return df, []
-
-    shift_log = []
-    df = df.with_row_index("_row_idx")
-    df = df.with_columns([pl.lit(False).alias("locked")])
-
-    # Process in priority order
-    for carrier in ["ONTRAC", "USPS"]:
-        if carrier not in enforced_minimums:
-            continue
-        min_required = enforced_minimums[carrier]
-        volume = get_carrier_volume(df, carrier)
-        shortfall = max(0, min_required - volume)
-
-        if shortfall <= 0:
-            df = df.with_columns([
-                pl.when(pl.col("assigned_carrier") == carrier)
-                  .then(pl.lit(True))
-                  .otherwise(pl.col("locked"))
-                  .alias("locked")
-            ])
-            continue
-
-        print(f"\n  {carrier} has shortfall of {shortfall:,} shipments")
-
-        cost_col_to = f"{carrier.lower()}_cost_avg"
-        other_carriers = [c for c in available_carriers if c != carrier]
-
-        all_penalties = []
-        for from_carrier in other_carriers:
-            cost_col_from = f"{from_carrier.lower()}_cost_avg"
-            available = df.filter(
-                (pl.col("assigned_carrier") == from_carrier) &
-                (~pl.col("locked")) &
-                (pl.col(cost_col_to).is_not_null())
-            )
-            if available.shape[0] > 0:
-                penalties = available.with_columns([
-                    ((pl.col(cost_col_to) - pl.col(cost_col_from)) * pl.col("shipment_count")).alias("shift_penalty"),
-                ])
-                all_penalties.append(penalties)
-
-        if not all_penalties:
-            print(f"    No groups available to shift to {carrier}")
-            continue
-
-        combined = pl.concat(all_penalties).sort("shift_penalty")
-        combined = combined.with_columns([
-            pl.col("shipment_count").cum_sum().alias("cumulative_shipments")
-        ])
-
-        groups_needed = combined.filter(pl.col("cumulative_shipments") >= shortfall)
-        if groups_needed.shape[0] > 0:
-            cutoff_idx = combined.shape[0] - groups_needed.shape[0] + 1
-        else:
-            cutoff_idx = combined.shape[0]
-
-        groups_to_shift = combined.head(cutoff_idx)
-        shift_indices = groups_to_shift["_row_idx"].to_list()
-        shifted_volume = int(groups_to_shift["shipment_count"].sum())
-        shifted_cost = float(groups_to_shift["shift_penalty"].sum())
-
-        print(f"    Shifting {len(shift_indices):,} groups ({shifted_volume:,} shipments) to {carrier}")
-        print(f"    Cost penalty: ${shifted_cost:,.2f}")
-
-        df = df.with_columns([
-            pl.when(pl.col("_row_idx").is_in(shift_indices))
-              .then(pl.lit(carrier))
-              .otherwise(pl.col("assigned_carrier"))
-              .alias("assigned_carrier"),
-            pl.when(pl.col("_row_idx").is_in(shift_indices))
-              .then(pl.lit(True))
-              .otherwise(pl.col("locked"))
-              .alias("locked"),
-        ])
-
-        df = df.with_columns([
-            pl.when(pl.col("assigned_carrier") == carrier)
-              .then(pl.lit(True))
-              .otherwise(pl.col("locked"))
-              .alias("locked")
-        ])
-
-        shift_log.append({
-            "carrier": carrier,
-            "groups_shifted": len(shift_indices),
-            "shipments_shifted": shifted_volume,
-            "cost_penalty": shifted_cost,
-        })
-
-    df = df.drop(["_row_idx", "locked"])
-    return df, shift_log
-
-
 def calculate_costs(df: pl.DataFrame, available_carriers: list[str]) -> dict:
     """Calculate total costs by carrier based on assignments."""
     results = {}
@@ -237,7 +94,7 @@ def run_variant(df: pl.DataFrame, variant: dict) -> dict:
     """Run a complete optimization variant.
 
     Args:
-        df: Original aggregated data (will be cloned)
+        df: Original aggregated data
         variant: Dict with name, short, available, minimums
     """
     name = variant["name"]
@@ -253,18 +110,24 @@ def run_variant(df: pl.DataFrame, variant: dict) -> dict:
         print(f"  Minimums: none")
     print(f"{'=' * 70}")
 
-    # Greedy assignment
-    df_result = greedy_assignment(df.clone(), available)
+    # Cheapest whole-group assignment under the minimums
+    result = solve_assignment(df, available, minimums)
+    df_result = result.df
 
-    # Print initial assignment
     for carrier in available:
         vol = get_carrier_volume(df_result, carrier)
         min_req = minimums.get(carrier, 0)
         status = "OK" if vol >= min_req else f"SHORT: {min_req - vol:,}"
         print(f"    {carrier}: {vol:,} (min: {min_req:,}) - {status}")
-
-    # Adjust for constraints
-    df_result, shift_log = adjust_for_constraints(df_result, available, minimums)
+    search = "complete" if result.exact else "stopped at node limit"
+    if result.feasible:
+        print(f"    LP lower bound: ${result.lower_bound:,.2f} (gap ${result.gap:,.2f}, search {search})")
+    elif result.exact:
+        print(f"    INFEASIBLE: constraints cannot all be met (shortfalls: {result.shortfalls})")
+    else:
+        print(f"    NO FEASIBLE ASSIGNMENT FOUND (search {search}; shortfalls: {result.shortfalls})")
+    for carrier, price in result.dual_prices.items():
+        print(f"    Dual price {carrier}: ${price:,.4f}/shipment")
 
     # Calculate costs
     costs = calculate_costs(df_result, available)
@@ -293,7 +156,8 @@ def run_variant(df: pl.DataFrame, variant: dict) -> dict:
         "costs": costs,
         "total_shipments": total_shipments,
         "total_cost": total_cost,
-        "shift_log": shift_log,
+        "lower_bound": result.lower_bound,
+        "dual_prices": result.dual_prices,
     }
 
 
@@ -413,13 +277,14 @@ def main():
         print(f"  Home Delivery: {fedex_hd_count:>12,} ({fedex_hd_count/fedex_total_assigned*100:.1f}%)")
         print(f"  SmartPost:     {fedex_sp_count:>12,} ({fedex_sp_count/fedex_total_assigned*100:.1f}%)")
 
-    # Shift details
-    print("\n### Shifts to Meet Constraints")
-    if recommended["shift_log"]:
-        for shift in recommended["shift_log"]:
-            print(f"  To {shift['carrier']}: {shift['groups_shifted']:,} groups ({shift['shipments_shifted']:,} shipments), penalty ${shift['cost_penalty']:,.2f}")
+    # Dual prices
+    print("\n### Marginal Cost of Minimums (dual prices)")
+    if recommended["dual_prices"]:
+        for carrier, price in recommended["dual_prices"].items():
+            min_req = recommended["minimums"][carrier]
+            print(f"  {carrier} >= {min_req:,}: ${price:,.4f} per shipment of commitment")
     else:
-        print("  No shifts required")
+        print("  No minimums")
 
     # Comparison to baseline
     savings = SCENARIO_1_BASELINE - recommended["total_cost"]
@@ -6,7 +6,9 @@ FedEx costs at 16% earned discount (like S6), with the constraint that
 FedEx must maintain enough volume for the 16% tier ($4.5M undiscounted).
 
 Dual-method approach (same concept as S5):
-  Method A: Greedy with all carriers + constraint adjustment + FedEx threshold
+  Method A: Whole-group assignment with all carriers under the volume
+            minimums and FedEx threshold (assignment_solver; reports the
+            gap to the LP lower bound)
   Method B: Take S6's solution and improve by switching to P2P where cheaper
 
 Method B respects both volume minimums and FedEx threshold:
@@ -19,6 +21,7 @@ import polars as pl
 import sys
 from pathlib import Path
 
+from analysis.US_2026_tenders.optimization.assignment_solver import FEDEX_THRESHOLD, solve_assignment
 from analysis.US_2026_tenders.optimization.fedex_adjustment import (
     adjust_and_aggregate, compute_undiscounted,
 )
@@ -375,18 +378,26 @@ def run_variant_s6(df: pl.DataFrame, variant: dict) -> dict:
     }
 
 
-def method_a_greedy(df: pl.DataFrame, variant: dict) -> dict:
-    """Method A: Greedy assignment with all carriers (including P2P) + constraints."""
+def method_a_solver(df: pl.DataFrame, variant: dict) -> dict:
+    """Method A: Constrained assignment with all carriers (including P2P) under all constraints."""
     available = variant["available"]
     minimums = variant["minimums"]
 
-    df_result = greedy_assignment(df.clone(), available)
-    df_result, vol_log = adjust_for_volume_constraints(df_result, available, minimums)
-    df_result, thresh_log = adjust_for_fedex_threshold(df_result, available, minimums, threshold=FEDEX_UNDISCOUNTED_THRESHOLD)
+    result = solve_assignment(df, available, minimums, fedex_threshold=FEDEX_UNDISCOUNTED_THRESHOLD)
+    df_result = result.df
 
-    all_carriers = list(set(
-        [c for c in available if get_carrier_volume(df_result, c) > 0]
-    ))
+    search = "complete" if result.exact else "stopped at node limit"
+    if result.feasible:
+        print(f"      LP lower bound: ${result.lower_bound:,.2f} (gap ${result.gap:,.2f}, search {search})")
+    elif result.exact:
+        print(f"      INFEASIBLE: constraints cannot all be met (shortfalls: {result.shortfalls})")
+    else:
+        print(f"      NO FEASIBLE ASSIGNMENT FOUND (search {search}; shortfalls: {result.shortfalls})")
+    for name, price in result.dual_prices.items():
+        unit = "per $ undiscounted" if name == FEDEX_THRESHOLD else "per shipment"
+        print(f"      Dual price {name}: ${price:,.4f} {unit}")
+
+    all_carriers = [c for c in available if get_carrier_volume(df_result, c) > 0]
     costs = calculate_costs(df_result, all_carriers)
 
     total_shipments = sum(c["shipments"] for c in costs.values())
@@ -400,7 +411,8 @@ def method_a_greedy(df: pl.DataFrame, variant: dict) -> dict:
         "costs": costs,
         "total_shipments": total_shipments,
         "total_cost": total_cost,
-        "shift_log": vol_log + thresh_log,
+        "shift_log": [],
+        "dual_prices": result.dual_prices,
         "fedex_undiscounted": fedex_undiscounted,
         "fedex_threshold_met": fedex_undiscounted >= FEDEX_UNDISCOUNTED_THRESHOLD,
     }
@@ -553,9 +565,9 @@ def run_s7_variant(df: pl.DataFrame, s7_variant: dict, s6_variant: dict) -> dict
     s6_tier = "MET" if s6_result["fedex_threshold_met"] else "NOT MET"
     print(f"    S6 baseline: ${s6_result['total_cost']:,.2f} (FedEx tier: {s6_tier})")
 
-    # Method A: Greedy with P2P
-    print(f"\n    Method A: Greedy with P2P...")
-    result_a = method_a_greedy(df, s7_variant)
+    # Method A: Constrained assignment with P2P
+    print(f"\n    Method A: Constrained assignment with P2P...")
+    result_a = method_a_solver(df, s7_variant)
     a_tier = "MET" if result_a["fedex_threshold_met"] else "NOT MET"
     print(f"    Method A: ${result_a['total_cost']:,.2f} (FedEx tier: {a_tier})")
 
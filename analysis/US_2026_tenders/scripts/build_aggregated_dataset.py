@@ -2,83 +2,131 @@
 Build aggregated dataset grouped by (packagetype, shipping_zip_code, weight_bracket).
 
 Creates totals and averages for optimization calculations.
+
+The aggregate is maintained as partial sums and counts per ship week in
+shipments_aggregated_partials.parquet. Sums and counts merge by addition,
+so a refresh recomputes only the weeks of a date range from the unified
+dataset and replaces those weeks' partials; everything else is reused.
+Averages and the cheapest-carrier columns are derived from the merged
+partials when shipments_aggregated.parquet is written.
+
+Usage:
+    # Full rebuild from shipments_unified.parquet:
+    python -m analysis.US_2026_tenders.scripts.build_aggregated_dataset
+
+    # Refresh the weeks of a re-rated or newly appended date range:
+    python -m analysis.US_2026_tenders.scripts.build_aggregated_dataset --start-date 2026-01-05 --end-date 2026-01-11
 """
 
+import argparse
+import os
+from datetime import date, timedelta
+
 import polars as pl
 from pathlib import Path
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 COMBINED_DATASETS = PROJECT_ROOT / "analysis" / "US_2026_tenders" / "combined_datasets"
+INPUT_PATH = COMBINED_DATASETS / "shipments_unified.parquet"
+PARTIALS_PATH = COMBINED_DATASETS / "shipments_aggregated_partials.parquet"
+OUTPUT_PATH = COMBINED_DATASETS / "shipments_aggregated.parquet"
 
+# Group by dimensions
+GROUP_COLS = ["packagetype", "shipping_zip_code", "weight_bracket"]
 
-def main():
-    # Load unified dataset
-    input_path = COMBINED_DATASETS / "shipments_unified.parquet"
-    print(f"Loading: {input_path}")
-    df = pl.read_parquet(input_path)
-    print(f"  {df.shape[0]:,} rows loaded")
-
-    # Add weight bracket (1 lb increments, ceiling)
-    print("\nAdding weight bracket...")
+# Partials are kept per ship week (Monday of the pcs_created week)
+PARTITION_COL = "ship_week"
+
+# Averaged costs: (unified column, total column, average column)
+COSTS = [
+    # Current carrier costs
+    ("cost_current_carrier", "cost_current_carrier_total", "cost_current_carrier_avg"),
+    # OnTrac
+    ("ontrac_cost_total", "ontrac_cost_total", "ontrac_cost_avg"),
+    # USPS
+    ("usps_cost_total", "usps_cost_total", "usps_cost_avg"),
+    # FedEx (best of HD vs SP), then the HD vs SP breakdown
+    ("fedex_cost_total", "fedex_cost_total", "fedex_cost_avg"),
+    ("fedex_hd_cost_total", "fedex_hd_cost_total", "fedex_hd_cost_avg"),
+    ("fedex_sp_cost_total", "fedex_sp_cost_total", "fedex_sp_cost_avg"),
+    # P2P
+    ("p2p_cost_total", "p2p_cost_total", "p2p_cost_avg"),
+    # P2P US2 (best of PFA/PFS per group)
+    ("p2p_us2_cost_total", "p2p_us2_cost_total", "p2p_us2_cost_avg"),
+    ("p2p_us2_pfa_cost_total", "p2p_us2_pfa_cost_total", "p2p_us2_pfa_cost_avg"),
+    ("p2p_us2_pfs_cost_total", "p2p_us2_pfs_cost_total", "p2p_us2_pfs_cost_avg"),
+    # Maersk
+    ("maersk_cost_total", "maersk_cost_total", "maersk_cost_avg"),
+]
+
+# Shipments per selected service, listed after the cost total they follow:
+# total column -> [(count column, unified column, service)]
+SERVICE_COUNTS = {
+    "fedex_sp_cost_total": [
+        ("fedex_sp_shipment_count", "fedex_service_selected", "FXSP"),
+        ("fedex_hd_shipment_count", "fedex_service_selected", "FXEHD"),
+    ],
+    "p2p_us2_pfs_cost_total": [
+        ("p2p_us2_pfa_shipment_count", "p2p_us2_service_selected", "PFA"),
+        ("p2p_us2_pfs_shipment_count", "p2p_us2_service_selected", "PFS"),
+    ],
+}
+
+
+# =============================================================================
+# PARTIAL SUMS
+# =============================================================================
+
+def _count_column(total: str) -> str:
+    """Partial column counting the non-null values summed into a total."""
+    return f"{total}_count"
+
+
+def partial_sums(df: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Mergeable partial aggregates of unified shipments, per ship week and group.
+
+    Every column is a sum or a count, so partials of disjoint shipments
+    combine by addition (see merge_partials).
+    """
     df = df.with_columns(
-        pl.col("weight_lbs").ceil().cast(pl.Int32).alias("weight_bracket")
+        # Weight bracket (1 lb increments, ceiling)
+        pl.col("weight_lbs").ceil().cast(pl.Int32).alias("weight_bracket"),
+        pl.col("pcs_created").cast(pl.Date).dt.truncate("1w").alias(PARTITION_COL),
+    )
+
+    agg_exprs = [pl.len().alias("shipment_count")]
+    for source, total, _ in COSTS:
+        agg_exprs.append(pl.col(source).sum().alias(total))
+        # Averages skip nulls, so they divide by the non-null count
+        agg_exprs.append(pl.col(source).count().alias(_count_column(total)))
+        for count_col, service_col, service in SERVICE_COUNTS.get(total, []):
+            agg_exprs.append((pl.col(service_col) == service).sum().alias(count_col))
+
+    return df.group_by([PARTITION_COL] + GROUP_COLS).agg(agg_exprs)
+
+
+def merge_partials(partials: pl.LazyFrame) -> pl.LazyFrame:
+    """Add up partials across ship weeks: one row of totals per group."""
+    return (
+        partials
+        .drop(PARTITION_COL)
+        .group_by(GROUP_COLS)
+        .agg(pl.all().sum())
     )
 
-    # Group by dimensions
-    group_cols = ["packagetype", "shipping_zip_code", "weight_bracket"]
-
-    print(f"Aggregating by: {group_cols}")
-
-    # Define aggregations
-    agg_exprs = [
-        pl.len().alias("shipment_count"),
-
-        # Current carrier costs
-        pl.col("cost_current_carrier").sum().alias("cost_current_carrier_total"),
-        pl.col("cost_current_carrier").mean().alias("cost_current_carrier_avg"),
-
-        # OnTrac
-        pl.col("ontrac_cost_total").sum().alias("ontrac_cost_total"),
-        pl.col("ontrac_cost_total").mean().alias("ontrac_cost_avg"),
-
-        # USPS
-        pl.col("usps_cost_total").sum().alias("usps_cost_total"),
-        pl.col("usps_cost_total").mean().alias("usps_cost_avg"),
-
-        # FedEx (best of HD vs SP)
-        pl.col("fedex_cost_total").sum().alias("fedex_cost_total"),
-        pl.col("fedex_cost_total").mean().alias("fedex_cost_avg"),
-
-        # FedEx HD vs SP breakdown
-        pl.col("fedex_hd_cost_total").sum().alias("fedex_hd_cost_total"),
-        pl.col("fedex_hd_cost_total").mean().alias("fedex_hd_cost_avg"),
-        pl.col("fedex_sp_cost_total").sum().alias("fedex_sp_cost_total"),
-        pl.col("fedex_sp_cost_total").mean().alias("fedex_sp_cost_avg"),
-        (pl.col("fedex_service_selected") == "FXSP").sum().alias("fedex_sp_shipment_count"),
-        (pl.col("fedex_service_selected") == "FXEHD").sum().alias("fedex_hd_shipment_count"),
-
-        # P2P
-        pl.col("p2p_cost_total").sum().alias("p2p_cost_total"),
-        pl.col("p2p_cost_total").mean().alias("p2p_cost_avg"),
-
-        # P2P US2 (best of PFA/PFS per group)
-        pl.col("p2p_us2_cost_total").sum().alias("p2p_us2_cost_total"),
-        pl.col("p2p_us2_cost_total").mean().alias("p2p_us2_cost_avg"),
-        pl.col("p2p_us2_pfa_cost_total").sum().alias("p2p_us2_pfa_cost_total"),
-        pl.col("p2p_us2_pfa_cost_total").mean().alias("p2p_us2_pfa_cost_avg"),
-        pl.col("p2p_us2_pfs_cost_total").sum().alias("p2p_us2_pfs_cost_total"),
-        pl.col("p2p_us2_pfs_cost_total").mean().alias("p2p_us2_pfs_cost_avg"),
-        (pl.col("p2p_us2_service_selected") == "PFA").sum().alias("p2p_us2_pfa_shipment_count"),
-        (pl.col("p2p_us2_service_selected") == "PFS").sum().alias("p2p_us2_pfs_shipment_count"),
-
-        # Maersk
-        pl.col("maersk_cost_total").sum().alias("maersk_cost_total"),
-        pl.col("maersk_cost_total").mean().alias("maersk_cost_avg"),
-    ]
-
-    # Perform aggregation
-    df_agg = df.group_by(group_cols).agg(agg_exprs).sort(group_cols)
+
+def derive_aggregates(totals: pl.LazyFrame) -> pl.LazyFrame:
+    """Averages and cheapest carrier columns from merged partials."""
+    columns = ["shipment_count"]
+    avg_exprs = []
+    for _, total, avg in COSTS:
+        count = pl.col(_count_column(total))
+        avg_exprs.append(pl.when(count > 0).then(pl.col(total) / count).alias(avg))
+        columns += [total, avg] + [c for c, _, _ in SERVICE_COUNTS.get(total, [])]
+
+    df_agg = totals.with_columns(avg_exprs).select(GROUP_COLS + columns).sort(GROUP_COLS)
 
     # Add cheapest carrier column (among current carriers: OnTrac, USPS, FedEx)
     df_agg = df_agg.with_columns(
@@ -86,7 +134,7 @@ def main():
     )
 
     # Determine which carrier is cheapest
-    df_agg = df_agg.with_columns(
+    return df_agg.with_columns(
         pl.when(pl.col("ontrac_cost_avg") == pl.col("cheapest_current_cost_avg"))
         .then(pl.lit("ONTRAC"))
         .when(pl.col("usps_cost_avg") == pl.col("cheapest_current_cost_avg"))
@@ -97,6 +145,85 @@ def main():
         .alias("cheapest_current_carrier")
     )
 
+
+def load_aggregated() -> pl.DataFrame:
+    """Aggregated dataset derived from the stored partials."""
+    return derive_aggregates(merge_partials(pl.scan_parquet(PARTIALS_PATH))).collect()
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+def _week_start(day: str) -> date:
+    """Monday of the week containing a YYYY-MM-DD date."""
+    d = date.fromisoformat(day)
+    return d - timedelta(days=d.weekday())
+
+
+def refresh_partials(start_date: str | None = None, end_date: str | None = None) -> None:
+    """
+    Recompute the stored partials for the weeks of a date range.
+
+    Partials of the weeks overlapping [start_date, end_date] are retracted
+    and replaced by partials of those weeks' current unified shipments;
+    other weeks are kept as stored. Without start_date (or without a
+    store), all partials are rebuilt.
+    """
+    unified = pl.scan_parquet(INPUT_PATH)
+
+    if start_date is None or not PARTIALS_PATH.exists():
+        print(f"Rebuilding partials from: {INPUT_PATH}")
+        partials = partial_sums(unified)
+    else:
+        # Whole weeks, so each refreshed week is recomputed from all its shipments
+        first_week = _week_start(start_date)
+        last_week = _week_start(end_date) if end_date else None
+        print(f"Refreshing partials for weeks {first_week} to {last_week or 'latest'}")
+
+        created_week = pl.col("pcs_created").cast(pl.Date).dt.truncate("1w")
+        stored_week = pl.col(PARTITION_COL)
+        in_range = created_week >= first_week
+        stored_in_range = stored_week >= first_week
+        if last_week:
+            in_range = in_range & (created_week <= last_week)
+            stored_in_range = stored_in_range & (stored_week <= last_week)
+
+        # Null weeks (shipments without pcs_created) are never in a range; keep them
+        kept = pl.scan_parquet(PARTIALS_PATH).filter(~stored_in_range.fill_null(False))
+        partials = pl.concat([kept, partial_sums(unified.filter(in_range))], how="vertical_relaxed")
+
+    # Written to a temp file first: the kept partials are read from the store
+    tmp_path = PARTIALS_PATH.with_name(PARTIALS_PATH.name + ".tmp")
+    partials.sink_parquet(tmp_path)
+    os.replace(tmp_path, PARTIALS_PATH)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the aggregated dataset from the unified shipment dataset",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        help="Refresh only the weeks from this date (YYYY-MM-DD); default: full rebuild"
+    )
+    parser.add_argument(
+        "--end-date",
+        type=str,
+        help="Last date of the refreshed weeks (YYYY-MM-DD), defaults to all later weeks"
+    )
+    args = parser.parse_args()
+
+    refresh_partials(args.start_date, args.end_date)
+
+    print(f"\nAggregating by: {GROUP_COLS}")
+    df_agg = load_aggregated()
+
     # Summary stats
     print(f"\nAggregated dataset:")
     print(f"  Groups: {df_agg.shape[0]:,}")
@@ -153,9 +280,8 @@ def main():
     print(f"    Optimal (no constraints): ${optimal_cost:,.2f} ({diff_pct:+.1f}%)")
 
     # Save
-    output_path = COMBINED_DATASETS / "shipments_aggregated.parquet"
-    df_agg.write_parquet(output_path)
-    print(f"\nSaved to: {output_path}")
+    df_agg.write_parquet(OUTPUT_PATH)
+    print(f"\nSaved to: {OUTPUT_PATH}")
     print("Done.")
 
 
@@ -3,23 +3,72 @@ Build unified shipment dataset by joining all carrier parquet files.
 
 Joins on pcs_orderid and creates a single dataset with costs from all carriers.
 Also pulls actual invoice costs from Redshift for comparison.
+
+The build is one lazy plan: the carrier files are scanned (only the columns
+used are read), joined, filtered and streamed into the output file with
+sink_parquet, so the full joined dataset is never held in memory.
+
+Usage:
+    # Rebuild from the latest carrier datasets:
+    python -m analysis.US_2026_tenders.scripts.build_shipment_dataset
+
+    # Append a newly rated date range to the existing unified dataset
+    # (rows already in that range are replaced):
+    python -m analysis.US_2026_tenders.scripts.build_shipment_dataset --start-date 2026-01-01 --end-date 2026-01-31 --append
 """
 
-import polars as pl
+import argparse
+import os
+from datetime import datetime
 from pathlib import Path
 
-from shared.database import pull_data
+import polars as pl
+
+from shared.database import pull_data, pull_many
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 CARRIER_DATASETS = PROJECT_ROOT / "analysis" / "US_2026_tenders" / "carrier_datasets"
 OUTPUT_DIR = PROJECT_ROOT / "analysis" / "US_2026_tenders" / "combined_datasets"
+OUTPUT_PATH = OUTPUT_DIR / "shipments_unified.parquet"
+
+# Estimated DHL eCommerce cost per shipment (no DHL invoices or calculator)
+DHL_ESTIMATED_COST = 6.00
+
+
+def carrier_path(carrier: str, start_date: str | None = None, end_date: str | None = None) -> Path:
+    """
+    Carrier dataset file for a date range.
+
+    With start_date, the file rated for exactly that range
+    ({carrier}_all_us_{start}_{end}.parquet, end defaulting to today);
+    otherwise the most recently written file for the carrier.
+    """
+    if start_date:
+        end_str = end_date or datetime.now().strftime("%Y-%m-%d")
+        path = CARRIER_DATASETS / f"{carrier}_all_us_{start_date}_{end_str}.parquet"
+        if not path.exists():
+            raise FileNotFoundError(f"No {carrier} dataset for {start_date} to {end_str}: {path}")
+        return path
+
+    paths = list(CARRIER_DATASETS.glob(f"{carrier}_all_us_*.parquet"))
+    if not paths:
+        raise FileNotFoundError(f"No {carrier} dataset in {CARRIER_DATASETS}")
+    return max(paths, key=lambda p: p.stat().st_mtime)
+
 
+def in_date_range(start_date: str, end_date: str | None = None) -> pl.Expr:
+    """Shipments created in [start_date, end_date] (open-ended without end_date)."""
+    created = pl.col("pcs_created").cast(pl.Date)
+    condition = created >= pl.lit(start_date).str.to_date("%Y-%m-%d")
+    if end_date:
+        condition = condition & (created <= pl.lit(end_date).str.to_date("%Y-%m-%d"))
+    return condition
 
-def load_ontrac() -> pl.DataFrame:
-    """Load OnTrac data with renamed columns."""
-    path = list(CARRIER_DATASETS.glob("ontrac_all_us_*.parquet"))[0]
-    df = pl.read_parquet(path)
+
+def scan_ontrac(start_date: str | None = None, end_date: str | None = None) -> pl.LazyFrame:
+    """Scan OnTrac data with renamed columns."""
+    df = pl.scan_parquet(carrier_path("ontrac", start_date, end_date))
 
     # Select and rename columns
     return df.select([
@@ -42,10 +91,9 @@ def load_ontrac() -> pl.DataFrame:
     ])
 
 
-def load_usps() -> pl.DataFrame:
-    """Load USPS data with renamed columns."""
-    path = list(CARRIER_DATASETS.glob("usps_all_us_*.parquet"))[0]
-    df = pl.read_parquet(path)
+def scan_usps(start_date: str | None = None, end_date: str | None = None) -> pl.LazyFrame:
+    """Scan USPS data with renamed columns."""
+    df = pl.scan_parquet(carrier_path("usps", start_date, end_date))
 
     return df.select([
         "pcs_orderid",
@@ -60,10 +108,9 @@ def load_usps() -> pl.DataFrame:
     ])
 
 
-def load_fedex() -> pl.DataFrame:
-    """Load FedEx data with renamed columns."""
-    path = list(CARRIER_DATASETS.glob("fedex_all_us_*.parquet"))[0]
-    df = pl.read_parquet(path)
+def scan_fedex(start_date: str | None = None, end_date: str | None = None) -> pl.LazyFrame:
+    """Scan FedEx data with renamed columns."""
+    df = pl.scan_parquet(carrier_path("fedex", start_date, end_date))
 
     return df.select([
         "pcs_orderid",
@@ -89,10 +136,9 @@ def load_fedex() -> pl.DataFrame:
     ])
 
 
-def load_p2p() -> pl.DataFrame:
-    """Load P2P data with renamed columns."""
-    path = list(CARRIER_DATASETS.glob("p2p_us_all_us_*.parquet"))[0]
-    df = pl.read_parquet(path)
+def scan_p2p(start_date: str | None = None, end_date: str | None = None) -> pl.LazyFrame:
+    """Scan P2P data with renamed columns."""
+    df = pl.scan_parquet(carrier_path("p2p_us", start_date, end_date))
 
     return df.select([
         "pcs_orderid",
@@ -105,13 +151,12 @@ def load_p2p() -> pl.DataFrame:
     ])
 
 
-def load_p2p_us2() -> pl.DataFrame:
-    """Load P2P US2 data with renamed columns.
+def scan_p2p_us2(start_date: str | None = None, end_date: str | None = None) -> pl.LazyFrame:
+    """Scan P2P US2 data with renamed columns.
 
     Includes both PFA and PFS costs, the selected service, and the final cost_total.
     """
-    path = list(CARRIER_DATASETS.glob("p2p_us2_all_us_*.parquet"))[0]
-    df = pl.read_parquet(path)
+    df = pl.scan_parquet(carrier_path("p2p_us2", start_date, end_date))
 
     return df.select([
         "pcs_orderid",
@@ -124,10 +169,9 @@ def load_p2p_us2() -> pl.DataFrame:
     ])
 
 
-def load_maersk() -> pl.DataFrame:
-    """Load Maersk data with base columns and renamed cost columns."""
-    path = list(CARRIER_DATASETS.glob("maersk_us_all_us_*.parquet"))[0]
-    df = pl.read_parquet(path)
+def scan_maersk(start_date: str | None = None, end_date: str | None = None) -> pl.LazyFrame:
+    """Scan Maersk data with base columns and renamed cost columns."""
+    df = pl.scan_parquet(carrier_path("maersk_us", start_date, end_date))
 
     # Maersk has the most complete base columns, so we use it as the base
     base_cols = [
@@ -210,18 +254,12 @@ def load_actuals() -> pl.DataFrame:
         )
     """
 
-    # Pull from Redshift
-    print("    Pulling OnTrac actuals...")
-    df_ontrac = pull_data(ontrac_sql)
-    print(f"      {df_ontrac.shape[0]:,} single-shipment orders")
-
-    print("    Pulling USPS actuals...")
-    df_usps = pull_data(usps_sql)
-    print(f"      {df_usps.shape[0]:,} single-shipment orders")
-
-    print("    Pulling FedEx actuals...")
-    df_fedex = pull_data(fedex_sql)
-    print(f"      {df_fedex.shape[0]:,} single-shipment orders")
+    # Pull from Redshift (concurrently)
+    print("    Pulling OnTrac, USPS and FedEx actuals...")
+    df_ontrac, df_usps, df_fedex = pull_many([ontrac_sql, usps_sql, fedex_sql])
+    print(f"      OnTrac: {df_ontrac.shape[0]:,} single-shipment orders")
+    print(f"      USPS:   {df_usps.shape[0]:,} single-shipment orders")
+    print(f"      FedEx:  {df_fedex.shape[0]:,} single-shipment orders")
 
     # Combine all actuals
     df_actuals = pl.concat([df_ontrac, df_usps, df_fedex])
@@ -232,15 +270,13 @@ def load_actuals() -> pl.DataFrame:
     return df_actuals
 
 
-def determine_current_carrier_cost(df: pl.DataFrame) -> pl.DataFrame:
+def determine_current_carrier_cost(df: pl.LazyFrame) -> pl.LazyFrame:
     """Add cost_current_carrier based on pcs_shipping_provider mapping.
 
     Imputation:
     - DHL: $6.00/shipment (estimated based on typical DHL eCommerce rates)
     - OnTrac nulls (non-serviceable ZIPs that were actually shipped): packagetype average
     """
-    DHL_ESTIMATED_COST = 6.00
-
     # Initial assignment
     df = df.with_columns(
         pl.when(pl.col("pcs_shipping_provider") == "ONTRAC")
@@ -256,71 +292,48 @@ def determine_current_carrier_cost(df: pl.DataFrame) -> pl.DataFrame:
     )
 
     # Impute OnTrac null costs (shipments to non-serviceable ZIPs that were actually shipped)
-    # Use average OnTrac cost by packagetype
-    ontrac_null_count = df.filter(
+    # Use average OnTrac cost by packagetype, over the shipments being built
+    ontrac_avg_by_pkg = df.filter(
         (pl.col("pcs_shipping_provider") == "ONTRAC") &
-        (pl.col("cost_current_carrier").is_null())
-    ).height
+        (pl.col("cost_current_carrier").is_not_null())
+    ).group_by("packagetype").agg(
+        pl.col("cost_current_carrier").mean().alias("_ontrac_avg_cost")
+    )
 
-    if ontrac_null_count > 0:
-        print(f"    Imputing {ontrac_null_count:,} OnTrac null costs with packagetype average...")
-        # Calculate average OnTrac cost by packagetype (excluding nulls)
-        ontrac_avg_by_pkg = df.filter(
+    # Join and fill nulls
+    df = df.join(ontrac_avg_by_pkg, on="packagetype", how="left")
+    return df.with_columns(
+        pl.when(
             (pl.col("pcs_shipping_provider") == "ONTRAC") &
-            (pl.col("cost_current_carrier").is_not_null())
-        ).group_by("packagetype").agg(
-            pl.col("cost_current_carrier").mean().alias("_ontrac_avg_cost")
+            (pl.col("cost_current_carrier").is_null())
         )
+        .then(pl.col("_ontrac_avg_cost"))
+        .otherwise(pl.col("cost_current_carrier"))
+        .alias("cost_current_carrier")
+    ).drop("_ontrac_avg_cost")
 
-        # Join and fill nulls
-        df = df.join(ontrac_avg_by_pkg, on="packagetype", how="left")
-        df = df.with_columns(
-            pl.when(
-                (pl.col("pcs_shipping_provider") == "ONTRAC") &
-                (pl.col("cost_current_carrier").is_null())
-            )
-            .then(pl.col("_ontrac_avg_cost"))
-            .otherwise(pl.col("cost_current_carrier"))
-            .alias("cost_current_carrier")
-        ).drop("_ontrac_avg_cost")
-
-    return df
-
-
-def main():
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-    print("Loading carrier datasets...")
-
-    # Load Maersk first (has base columns)
-    print("  Loading Maersk (base)...")
-    df = load_maersk()
-    print(f"    {df.shape[0]:,} rows")
-
-    # Join other carriers
-    print("  Loading and joining OnTrac...")
-    df = df.join(load_ontrac(), on="pcs_orderid", how="left")
-
-    print("  Loading and joining USPS...")
-    df = df.join(load_usps(), on="pcs_orderid", how="left")
 
-    print("  Loading and joining FedEx...")
-    df = df.join(load_fedex(), on="pcs_orderid", how="left")
+def build_unified(start_date: str | None = None, end_date: str | None = None) -> pl.LazyFrame:
+    """
+    Lazy plan of the unified dataset for one set of carrier files.
 
-    print("  Loading and joining P2P...")
-    df = df.join(load_p2p(), on="pcs_orderid", how="left")
+    Args:
+        start_date: Date range the carrier files were rated for (see carrier_path);
+            the latest file per carrier without it
+        end_date: End of that range (default: today)
+    """
+    print("Scanning carrier datasets...")
 
-    print("  Loading and joining P2P US2...")
-    df = df.join(load_p2p_us2(), on="pcs_orderid", how="left")
+    # Maersk is the base (has the most complete base columns)
+    df = scan_maersk(start_date, end_date)
+    for scan in [scan_ontrac, scan_usps, scan_fedex, scan_p2p, scan_p2p_us2]:
+        df = df.join(scan(start_date, end_date), on="pcs_orderid", how="left")
 
     # Add current carrier cost
-    print("  Calculating cost_current_carrier...")
     df = determine_current_carrier_cost(df)
 
-    # Load and join actuals
-    DHL_ESTIMATED_COST = 6.00
-    df_actuals = load_actuals()
-    df = df.join(df_actuals, on="pcs_orderid", how="left")
+    # Join actuals
+    df = df.join(load_actuals().lazy(), on="pcs_orderid", how="left")
 
     # For DHL shipments, set cost_actual to estimated cost
     df = df.with_columns(
@@ -331,16 +344,12 @@ def main():
     )
 
     # Keep only shipments with matched actuals (invoice-matched or DHL estimate)
-    before_filter = df.shape[0]
     df = df.filter(pl.col("cost_actual").is_not_null())
-    dropped = before_filter - df.shape[0]
-    print(f"\n  Filtering to matched-actuals only: dropped {dropped:,} unmatched shipments")
-    print(f"    Remaining: {df.shape[0]:,}")
 
     # Exclude OnTrac OML/LPS shipments from entire dataset
     # These are outlier shipments with over-max-limits or large package surcharges
     # that we cannot predict (expected cost is always 0 for these)
-    print("\n  Excluding OnTrac OML/LPS shipments...")
+    print("  Loading OnTrac OML/LPS shipments to exclude...")
     oml_lps_orderids = pull_data("""
         SELECT DISTINCT pcs_orderid
         FROM shipping_costs.actual_shipping_costs_ontrac
@@ -349,63 +358,101 @@ def main():
            OR COALESCE(actual_dem_oml, 0) > 0
            OR COALESCE(actual_dem_lps, 0) > 0
     """)
+    print(f"    {len(oml_lps_orderids):,} orders with OML/LPS surcharges")
     if len(oml_lps_orderids) > 0:
-        exclude_ids = oml_lps_orderids["pcs_orderid"].to_list()
-        before = df.shape[0]
-        df = df.filter(~pl.col("pcs_orderid").is_in(exclude_ids))
-        excluded = before - df.shape[0]
-        print(f"    Excluded {excluded:,} shipments with OML/LPS surcharges")
-    else:
-        print("    No OML/LPS shipments found")
-
-    # Summary stats
+        df = df.join(oml_lps_orderids.lazy(), on="pcs_orderid", how="anti")
+
+    return df
+
+
+def append_unified(
+    df: pl.LazyFrame, existing_path: Path, start_date: str, end_date: str | None = None,
+) -> pl.LazyFrame:
+    """
+    Existing unified rows outside [start_date, end_date], then the new range.
+
+    Existing rows without a pcs_created are not in any range and are kept.
+    """
+    existing = pl.scan_parquet(existing_path).filter(
+        ~in_date_range(start_date, end_date).fill_null(False)
+    )
+    return pl.concat([existing, df], how="diagonal_relaxed")
+
+
+def write_unified(df: pl.LazyFrame, output_path: Path) -> None:
+    """Stream a plan into output_path, replacing the file only once it is complete."""
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    df.sink_parquet(tmp_path)
+    os.replace(tmp_path, output_path)
+
+
+def print_summary(output_path: Path) -> None:
+    """Summary statistics of the written dataset, from lazy aggregations over the file."""
+    df = pl.scan_parquet(output_path)
+    carriers = ["ontrac", "usps", "fedex", "p2p", "p2p_us2", "maersk"]
+
+    totals, carrier_counts, actuals_by_carrier = pl.collect_all([
+        df.select(
+            pl.len().alias("rows"),
+            pl.col("cost_actual").is_not_null().sum().alias("has_actual"),
+            pl.col("cost_current_carrier").sum(),
+            pl.col("cost_actual").sum().alias("actual_total"),
+            pl.col("cost_current_carrier").filter(pl.col("cost_actual").is_not_null()).sum().alias("calculated_total"),
+            *[pl.col(f"{carrier}_cost_total").sum() for carrier in carriers],
+        ),
+        df.group_by("pcs_shipping_provider").agg(pl.len().alias("count")).sort("count", descending=True),
+        df.group_by("pcs_shipping_provider").agg(
+            pl.len().alias("total"),
+            pl.col("cost_actual").is_not_null().sum().alias("has_actual"),
+        ),
+    ])
+    totals = totals.row(0, named=True)
+    total_shipments = totals["rows"]
+
     print("\nDataset summary:")
-    print(f"  Total rows: {df.shape[0]:,}")
-    print(f"  Total columns: {df.shape[1]}")
+    print(f"  Total rows: {total_shipments:,}")
+    print(f"  Total columns: {len(df.collect_schema())}")
+
+    if total_shipments == 0:
+        return
 
     # Current carrier distribution
     print("\n  Current carrier distribution:")
-    carrier_counts = df.group_by("pcs_shipping_provider").agg(pl.len().alias("count")).sort("count", descending=True)
-    for row in carrier_counts.iter_rows():
-        provider, count = row
-        pct = count / df.shape[0] * 100
+    for provider, count in carrier_counts.iter_rows():
+        pct = count / total_shipments * 100
         print(f"    {provider}: {count:,} ({pct:.1f}%)")
 
     # Cost totals
     print("\n  Cost totals (current carrier mix):")
-    current_total = df["cost_current_carrier"].sum()
+    current_total = totals["cost_current_carrier"]
     print(f"    Current carrier total: ${current_total:,.2f}")
 
     print("\n  Cost totals (100% single carrier):")
-    for carrier in ["ontrac", "usps", "fedex", "p2p", "p2p_us2", "maersk"]:
-        col = f"{carrier}_cost_total"
-        total = df[col].sum()
+    for carrier in carriers:
+        total = totals[f"{carrier}_cost_total"]
         diff_pct = (total - current_total) / current_total * 100
         print(f"    {carrier.upper():8}: ${total:,.2f} ({diff_pct:+.1f}%)")
 
     # Actuals matching stats
     print("\n  Actuals matching:")
-    total_shipments = df.shape[0]
-    has_actual = df.filter(pl.col("cost_actual").is_not_null()).shape[0]
+    has_actual = totals["has_actual"]
     no_actual = total_shipments - has_actual
     print(f"    With actuals:    {has_actual:,} ({has_actual/total_shipments*100:.1f}%)")
     print(f"    Without actuals: {no_actual:,} ({no_actual/total_shipments*100:.1f}%)")
 
     # Actuals by carrier
     print("\n  Actuals by carrier:")
+    by_carrier = {row[0]: row[1:] for row in actuals_by_carrier.iter_rows()}
     for carrier in ["ONTRAC", "USPS", "FEDEX", "DHL ECOMMERCE AMERICA"]:
-        carrier_df = df.filter(pl.col("pcs_shipping_provider") == carrier)
-        carrier_total = carrier_df.shape[0]
-        carrier_has_actual = carrier_df.filter(pl.col("cost_actual").is_not_null()).shape[0]
+        carrier_total, carrier_has_actual = by_carrier.get(carrier, (0, 0))
         if carrier_total > 0:
             match_pct = carrier_has_actual / carrier_total * 100
             print(f"    {carrier:25}: {carrier_has_actual:,} / {carrier_total:,} ({match_pct:.1f}%)")
 
     # Cost comparison (actuals vs calculated)
-    df_matched = df.filter(pl.col("cost_actual").is_not_null())
-    if df_matched.shape[0] > 0:
-        actual_total = df_matched["cost_actual"].sum()
-        calculated_total = df_matched["cost_current_carrier"].sum()
+    if has_actual > 0:
+        actual_total = totals["actual_total"]
+        calculated_total = totals["calculated_total"]
         diff = calculated_total - actual_total
         diff_pct = diff / actual_total * 100
         print("\n  Actuals vs Calculated (matched shipments only):")
@@ -413,10 +460,46 @@ def main():
         print(f"    2026 Calculated total: ${calculated_total:,.2f}")
         print(f"    Difference:            ${diff:+,.2f} ({diff_pct:+.1f}%)")
 
-    # Save
-    output_path = OUTPUT_DIR / "shipments_unified.parquet"
-    df.write_parquet(output_path)
-    print(f"\nSaved to: {output_path}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the unified shipment dataset from the carrier datasets",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        help="Use the carrier files rated for this range (YYYY-MM-DD); default: latest files"
+    )
+    parser.add_argument(
+        "--end-date",
+        type=str,
+        help="End of the rated range (YYYY-MM-DD), defaults to today"
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Add the range to the existing unified dataset, replacing its rows in that range"
+    )
+    args = parser.parse_args()
+
+    if args.append and not args.start_date:
+        parser.error("--append needs --start-date")
+    if args.append and not OUTPUT_PATH.exists():
+        parser.error(f"--append needs an existing unified dataset: {OUTPUT_PATH}")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    df = build_unified(args.start_date, args.end_date)
+
+    if args.append:
+        print(f"\n  Appending {args.start_date} to {args.end_date or 'today'} to {OUTPUT_PATH.name}...")
+        df = append_unified(df, OUTPUT_PATH, args.start_date, args.end_date)
+
+    print("\nWriting unified dataset...")
+    write_unified(df, OUTPUT_PATH)
+    print_summary(OUTPUT_PATH)
+
+    print(f"\nSaved to: {OUTPUT_PATH}")
     print("Done.")
 
 
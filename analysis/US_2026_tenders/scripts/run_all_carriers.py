@@ -1,26 +1,48 @@
 """
-Run all 5 carrier calculators and build combined dataset.
+Run all carrier calculators and build combined dataset.
 
 This script:
-1. Runs each carrier's upload_expected_all_us script with --parquet output
-2. Copies the outputs to carrier_datasets/
-3. Builds the unified shipments dataset
+1. Loads the PCS shipments once (from --parquet-data or the database) and
+   adds the shared dimension columns, so no carrier recomputes them
+2. Rates the shipments with every carrier's rate_shipments() concurrently,
+   in threads sharing the one (read-only) frame
+3. Writes each carrier's output straight to carrier_datasets/
+4. Builds the unified shipments dataset
+
+Polars releases the GIL while it computes, so the carriers rate in
+parallel and a full run takes about as long as the slowest carrier.
 
 Usage:
     # Using pre-exported PCS data (recommended for faster iteration):
     python -m shared.scripts.export_pcs_shipments --start-date 2025-01-01 --end-date 2025-12-31
     python -m analysis.US_2026_tenders.scripts.run_all_carriers --parquet-data shared/data/pcs_shipments_all_us_2025-01-01_2025-12-31.parquet --start-date 2025-01-01 --end-date 2025-12-31
 
-    # Or let each script query the database directly:
-    python -m analysis.US_2026_tenders.scripts.run_all_carriers --start-date 2025-01-01 --end-date 2025-12-31
+    # Or query the database directly (once, shared by all carriers):
+    python -m analysis.US_2026_tenders.scripts.run_all_carriers --start-date 2025-01-01 --end-date 2025-12-31 --partitions 12
+
+    # Rate only a new month and append it to the combined dataset:
+    python -m analysis.US_2026_tenders.scripts.run_all_carriers --start-date 2026-01-01 --end-date 2026-01-31 --append
+
+    # Cache query results on disk across reruns:
+    python -m analysis.US_2026_tenders.scripts.run_all_carriers --start-date 2025-01-01 --end-date 2025-12-31 --query-cache
 """
 
 import argparse
-import shutil
+import importlib
+import os
 import subprocess
 import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
+import polars as pl
+
+from shared.database.cache import CACHE_ENV_VAR
+from shared.rating import add_dimensions, scan_shipments
+
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 CARRIER_DATASETS = PROJECT_ROOT / "analysis" / "US_2026_tenders" / "carrier_datasets"
@@ -36,72 +58,122 @@ CARRIERS = [
 ]
 
 
-def run_carrier_calculator(
-    carrier_name: str,
-    module_name: str,
+def load_shipments(
     start_date: str,
     end_date: str | None = None,
     parquet_data: str | None = None,
-) -> Path | None:
+    partitions: int = 1,
+) -> pl.DataFrame:
     """
-    Run a carrier's upload_expected_all_us script with --parquet output.
+    Load the PCS shipments for the date range once, with dimension columns.
 
-    Returns the path to the output parquet file, or None if failed.
+    Each calculator detects the dimension columns and skips its own
+    dimension stage.
     """
-    print(f"\n{'='*60}")
-    print(f"Running {carrier_name.upper()} calculator")
-    print("="*60)
-
-    # Build command
-    cmd = [
-        sys.executable, "-m", module_name,
-        "--full", "--parquet",
-        "--start-date", start_date,
-    ]
+    if parquet_data:
+        print(f"Loading ALL US shipments from parquet: {parquet_data}...")
+        df = add_dimensions(scan_shipments(parquet_data, start_date, end_date)).collect(engine="streaming")
+    else:
+        # Every carrier's all-US loader runs the same PCS query
+        from carriers.fedex.data import load_pcs_shipments_all_us
 
-    if end_date:
-        cmd.extend(["--end-date", end_date])
+        print(f"Loading ALL US shipments from {start_date} to {end_date or 'today'}...")
+        df = add_dimensions(load_pcs_shipments_all_us(
+            start_date=start_date,
+            end_date=end_date,
+            partitions=partitions,
+        ))
+    print(f"Loaded {len(df):,} shipments")
+    return df
 
-    if parquet_data:
-        cmd.extend(["--parquet-data", parquet_data])
 
-    print(f"Command: {' '.join(cmd)}")
-    print()
+def rate_carrier(
+    carrier_name: str,
+    module,
+    shipments: pl.DataFrame,
+    output_path: Path,
+) -> int:
+    """
+    Rate the shared shipments with a carrier's rate_shipments() and write the result.
 
-    # Run the command
-    result = subprocess.run(cmd, cwd=PROJECT_ROOT)
+    Returns the number of rows written (0 if nothing was rated).
+    """
+    started = time.perf_counter()
+    print(f"[{carrier_name}] Rating {len(shipments):,} shipments...")
+    df = module.rate_shipments(shipments)
 
-    if result.returncode != 0:
-        print(f"ERROR: {carrier_name} calculator failed with return code {result.returncode}")
-        return None
+    if len(df) == 0:
+        print(f"[{carrier_name}] No shipments rated")
+        return 0
 
-    # Find the output file
-    output_dir = PROJECT_ROOT / "carriers" / carrier_name / "scripts" / "output" / "all_us"
-    parquet_files = list(output_dir.glob("*.parquet"))
+    df.write_parquet(output_path)
+    print(f"[{carrier_name}] Saved {len(df):,} rows to {output_path} ({time.perf_counter() - started:.0f}s)")
+    return len(df)
 
-    if not parquet_files:
-        print(f"ERROR: No parquet files found in {output_dir}")
-        return None
 
-    # Return the most recently modified file
-    return max(parquet_files, key=lambda p: p.stat().st_mtime)
+def rate_all_carriers(
+    shipments: pl.DataFrame,
+    start_date: str,
+    end_date: str | None = None,
+    max_workers: int | None = None,
+) -> tuple[list[str], list[str]]:
+    """
+    Rate every carrier concurrently and write their carrier datasets.
 
+    The shipments frame is shared by all carriers; polars frames are never
+    modified in place, so each carrier's steps build new frames from it.
 
-def copy_to_carrier_datasets(source_path: Path, carrier_name: str) -> Path:
-    """Copy the parquet file to the carrier_datasets directory."""
+    Returns:
+        (successful, failed) carrier names
+    """
     CARRIER_DATASETS.mkdir(parents=True, exist_ok=True)
-    dest_path = CARRIER_DATASETS / source_path.name
-    shutil.copy2(source_path, dest_path)
-    return dest_path
+    end_str = end_date or datetime.now().strftime("%Y-%m-%d")
+
+    # Import up front, so the threads only rate
+    modules = {carrier_name: importlib.import_module(module_name) for carrier_name, module_name in CARRIERS}
 
+    def run(carrier_name: str, module) -> bool:
+        output_path = CARRIER_DATASETS / f"{carrier_name}_all_us_{start_date}_{end_str}.parquet"
+        try:
+            return rate_carrier(carrier_name, module, shipments, output_path) > 0
+        except Exception:
+            print(f"ERROR: {carrier_name} calculator failed:\n{traceback.format_exc()}")
+            return False
 
-def build_combined_dataset():
-    """Run the build_shipment_dataset script to create unified dataset."""
+    with ThreadPoolExecutor(max_workers=max_workers or len(CARRIERS)) as executor:
+        futures = {
+            carrier_name: executor.submit(run, carrier_name, module)
+            for carrier_name, module in modules.items()
+        }
+        results = {carrier_name: future.result() for carrier_name, future in futures.items()}
+
+    successful = [name for name, ok in results.items() if ok]
+    failed = [name for name, ok in results.items() if not ok]
+    return successful, failed
+
+
+def build_combined_dataset(
+    start_date: str | None = None,
+    end_date: str | None = None,
+    append: bool = False,
+) -> bool:
+    """
+    Run the build_shipment_dataset script to create unified dataset.
+
+    With start_date, builds from the carrier files rated for that range;
+    append adds the range to the existing unified dataset.
+    """
     print(f"\n{'='*60}")
     print("Building combined dataset")
     print("="*60)
 
     cmd = [sys.executable, "-m", "analysis.US_2026_tenders.scripts.build_shipment_dataset"]
+    if start_date:
+        cmd.extend(["--start-date", start_date])
+        if end_date:
+            cmd.extend(["--end-date", end_date])
+    if append:
+        cmd.append("--append")
     print(f"Command: {' '.join(cmd)}")
     print()
 
@@ -148,11 +220,34 @@ Examples:
         metavar="PATH",
         help="Load PCS shipments from parquet file instead of database"
     )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Split the PCS database query into N date ranges run concurrently"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        metavar="N",
+        help="Carriers rated at once (default: all)"
+    )
+    parser.add_argument(
+        "--query-cache",
+        action="store_true",
+        help="Cache query results on disk, shared by all carrier scripts and reruns"
+    )
     parser.add_argument(
         "--skip-calculation",
         action="store_true",
         help="Skip carrier calculations, only build combined dataset from existing files"
     )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Append the date range to the existing combined dataset instead of rebuilding it"
+    )
 
     args = parser.parse_args()
 
@@ -166,26 +261,33 @@ Examples:
     else:
         print("Data source: database")
 
+    if args.query_cache:
+        # Read by shared.database (see shared.database.cache)
+        os.environ.setdefault(CACHE_ENV_VAR, "1")
+        print(f"Query cache: {CACHE_ENV_VAR}={os.environ[CACHE_ENV_VAR]}")
+
     if not args.skip_calculation:
-        # Run each carrier calculator
-        successful = []
-        failed = []
-
-        for carrier_name, module_name in CARRIERS:
-            output_path = run_carrier_calculator(
-                carrier_name=carrier_name,
-                module_name=module_name,
-                start_date=args.start_date,
-                end_date=args.end_date,
-                parquet_data=args.parquet_data,
-            )
-
-            if output_path:
-                dest_path = copy_to_carrier_datasets(output_path, carrier_name)
-                print(f"  Copied to: {dest_path}")
-                successful.append(carrier_name)
-            else:
-                failed.append(carrier_name)
+        print(f"\n{'='*60}")
+        print("Loading shipments")
+        print("="*60)
+        shipments = load_shipments(
+            start_date=args.start_date,
+            end_date=args.end_date,
+            parquet_data=args.parquet_data,
+            partitions=args.partitions,
+        )
+
+        print(f"\n{'='*60}")
+        print(f"Rating {len(CARRIERS)} carriers")
+        print("="*60)
+        started = time.perf_counter()
+        successful, failed = rate_all_carriers(
+            shipments,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            max_workers=args.max_workers,
+        )
+        print(f"Rated all carriers in {time.perf_counter() - started:.0f}s")
 
         # Summary
         print(f"\n{'='*60}")
@@ -199,7 +301,13 @@ Examples:
             print("\nWARNING: Some carriers failed. Combined dataset may be incomplete.")
 
     # Build combined dataset
-    if build_combined_dataset():
+    # Build from this run's carrier files (the latest files with --skip-calculation)
+    rated_range = not args.skip_calculation or args.append
+    if build_combined_dataset(
+        start_date=args.start_date if rated_range else None,
+        end_date=args.end_date,
+        append=args.append,
+    ):
         print(f"\n{'='*60}")
         print("SUCCESS - All tasks completed")
         print("="*60)
@@ -0,0 +1,128 @@
+"""
+Tests for the constrained carrier assignment solver.
+
+Run with: pytest analysis/US_2026_tenders/tests/ -v
+"""
+
+import itertools
+import math
+
+import numpy as np
+import polars as pl
+import pytest
+
+from analysis.US_2026_tenders.optimization.assignment_solver import FEDEX_THRESHOLD, solve_assignment
+from analysis.US_2026_tenders.optimization.fedex_adjustment import compute_undiscounted
+
+
+CARRIERS = ["ONTRAC", "USPS", "FEDEX", "P2P"]
+
+
+def groups(counts: list[int], avg_costs: dict[str, list], hd_base: list[float] | None = None) -> pl.DataFrame:
+    """Aggregated groups from per-shipment costs (None = carrier cannot service the group)."""
+    df = pl.DataFrame({"shipment_count": counts})
+    for carrier, avgs in avg_costs.items():
+        avg = pl.Series(avgs, dtype=pl.Float64)
+        df = df.with_columns(
+            avg.alias(f"{carrier.lower()}_cost_avg"),
+            (avg * pl.col("shipment_count")).alias(f"{carrier.lower()}_cost_total"),
+        )
+    if hd_base is not None:
+        df = df.with_columns(
+            pl.Series("fedex_hd_base_rate_total", hd_base),
+            pl.lit(0.0).alias("fedex_sp_base_rate_total"),
+        )
+    return df
+
+
+def random_instance(rng: np.random.Generator) -> tuple[pl.DataFrame, dict, float]:
+    """A few groups with OnTrac/USPS minimums and a FedEx threshold."""
+    n = int(rng.integers(4, 8))
+    counts = rng.integers(1, 60, n)
+    avg_costs = {}
+    for carrier in CARRIERS:
+        avg = rng.uniform(4, 12, n)
+        serviceable = (rng.random(n) > 0.25) | (carrier == "FEDEX")
+        avg_costs[carrier] = [float(v) if ok else None for v, ok in zip(avg, serviceable)]
+    hd_base = (np.array(avg_costs["FEDEX"]) * counts * rng.uniform(0.2, 0.6, n)).tolist()
+    minimums = {"ONTRAC": int(counts.sum() * rng.uniform(0.1, 0.35)), "USPS": int(counts.sum() * rng.uniform(0.1, 0.3))}
+    threshold = float(compute_undiscounted(np.array(hd_base), 0.0).sum() * rng.uniform(0.15, 0.5))
+    return groups(counts.tolist(), avg_costs, hd_base), minimums, threshold
+
+
+def brute_force(df: pl.DataFrame, minimums: dict, threshold: float) -> float | None:
+    """Cheapest feasible assignment cost by enumeration, or None if infeasible."""
+    rows = df.to_dicts()
+    undiscounted = [compute_undiscounted(r["fedex_hd_base_rate_total"], 0.0) for r in rows]
+    options = [[c for c in CARRIERS if r[f"{c.lower()}_cost_avg"] is not None] for r in rows]
+    best = None
+    for assignment in itertools.product(*options):
+        volume = {c: sum(r["shipment_count"] for r, a in zip(rows, assignment) if a == c) for c in CARRIERS}
+        fedex = sum(u for u, a in zip(undiscounted, assignment) if a == "FEDEX")
+        if all(volume[c] >= m for c, m in minimums.items()) and fedex >= threshold - 1e-6:
+            cost = sum(r[f"{a.lower()}_cost_total"] for r, a in zip(rows, assignment))
+            best = cost if best is None else min(best, cost)
+    return best
+
+
+class TestSolveAssignment:
+    """Tests for solve_assignment."""
+
+    def test_matches_brute_force(self):
+        """Small instances with minimums and a FedEx threshold solve to the enumerated optimum."""
+        rng = np.random.default_rng(0)
+        for _ in range(40):
+            df, minimums, threshold = random_instance(rng)
+            optimum = brute_force(df, minimums, threshold)
+
+            result = solve_assignment(df, CARRIERS, minimums, fedex_threshold=threshold)
+
+            assert result.exact
+            assert result.feasible == (optimum is not None)
+            if optimum is not None:
+                assert result.total_cost == pytest.approx(optimum)
+                assert result.lower_bound <= result.total_cost + 1e-6
+
+    def test_dual_price_is_marginal_cost(self):
+        """The price of a minimum is the per-shipment premium of the marginal group."""
+        df = groups([10, 10, 10], {"USPS": [5.0, 5.0, 5.0], "FEDEX": [4.0, 3.0, 2.0]})
+
+        result = solve_assignment(df, ["USPS", "FEDEX"], {"USPS": 15})
+
+        # LP: all of group 1 (+$1/shipment) and half of group 2 (+$2/shipment) move to USPS
+        assert result.dual_prices["USPS"] == pytest.approx(2.0, abs=1e-6)
+        assert result.lower_bound == pytest.approx(90 + 10 + 10)
+        assert result.df["assigned_carrier"].to_list() == ["USPS", "USPS", "FEDEX"]
+        assert result.total_cost == pytest.approx(90 + 10 + 20)
+        assert result.feasible and result.exact
+
+    def test_threshold_price(self):
+        """A binding FedEx threshold gets a price per $ of undiscounted spend."""
+        df = groups([10, 10], {"USPS": [3.0, 3.0], "FEDEX": [4.0, 5.0]}, hd_base=[37.0, 37.0])
+
+        result = solve_assignment(df, ["USPS", "FEDEX"], fedex_threshold=150.0)
+
+        # LP: group 1 (+$10 per $100 undiscounted) and half of group 2 (+$20 per $100)
+        assert result.dual_prices[FEDEX_THRESHOLD] == pytest.approx(0.2, abs=1e-6)
+        assert result.lower_bound == pytest.approx(60 + 10 + 10)
+        assert result.df["assigned_carrier"].to_list() == ["FEDEX", "FEDEX"]
+        assert result.total_cost == pytest.approx(90)
+
+    def test_infeasible_minimum(self):
+        """A minimum above the serviceable volume is reported, with no lower bound."""
+        df = groups([10, 10, 10], {"ONTRAC": [5.0, None, None], "FEDEX": [6.0, 6.0, 6.0]})
+
+        result = solve_assignment(df, ["ONTRAC", "FEDEX"], {"ONTRAC": 15})
+
+        assert not result.feasible and result.exact
+        assert result.shortfalls == {"ONTRAC": 5.0}
+        assert math.isnan(result.lower_bound)
+
+    def test_unconstrained_is_cheapest(self):
+        """Without constraints each group takes its cheapest carrier; unserviceable ones FedEx."""
+        df = groups([5, 5, 5], {"USPS": [3.0, 8.0, None], "FEDEX": [4.0, 6.0, None]})
+
+        result = solve_assignment(df, ["USPS", "FEDEX"])
+
+        assert result.df["assigned_carrier"].to_list() == ["USPS", "FEDEX", "FEDEX"]
+        assert result.total_cost == result.lower_bound == pytest.approx(15 + 30)
@@ -0,0 +1,77 @@
+"""
+Tests for the incrementally maintained aggregated dataset.
+
+Run with: pytest analysis/US_2026_tenders/tests/ -v
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+import analysis.US_2026_tenders.scripts.build_aggregated_dataset as build
+
+
+def unified(seed: int, n: int = 400) -> pl.DataFrame:
+    """Unified shipments over six weeks; some without pcs_created or costs."""
+    rng = np.random.default_rng(seed)
+    created = [date(2026, 1, 1) + timedelta(days=int(d)) for d in rng.integers(0, 42, n)]
+    costs = {
+        source: [None if rng.random() < 0.1 else round(float(v), 2) for v in rng.uniform(3, 30, n)]
+        for source, _, _ in build.COSTS
+    }
+    return pl.DataFrame({
+        "packagetype": rng.choice(["A", "B", "C"], n).tolist(),
+        "shipping_zip_code": rng.choice(["10001", "60601"], n).tolist(),
+        "weight_lbs": rng.uniform(0.1, 5, n).tolist(),
+        "pcs_created": [None if i % 50 == 0 else d for i, d in enumerate(created)],
+        "fedex_service_selected": rng.choice(["FXEHD", "FXSP"], n).tolist(),
+        "p2p_us2_service_selected": rng.choice(["PFA", "PFS"], n).tolist(),
+        **costs,
+    })
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point the builder at a temporary unified dataset and partials store."""
+    monkeypatch.setattr(build, "INPUT_PATH", tmp_path / "unified.parquet")
+    monkeypatch.setattr(build, "PARTIALS_PATH", tmp_path / "partials.parquet")
+    return tmp_path
+
+
+class TestRefreshPartials:
+    """Tests for refresh_partials."""
+
+    def test_refresh_equals_full_rebuild(self, store):
+        """Re-rating a week and refreshing it matches rebuilding from scratch."""
+        before = unified(seed=1)
+        before.write_parquet(build.INPUT_PATH)
+        build.refresh_partials()
+
+        # Re-rate the week of 2026-01-12
+        week = (pl.col("pcs_created") >= date(2026, 1, 12)) & (pl.col("pcs_created") <= date(2026, 1, 18))
+        after = before.with_columns(
+            pl.when(week).then(pl.col("usps_cost_total") + 1).otherwise(pl.col("usps_cost_total"))
+        )
+        after.write_parquet(build.INPUT_PATH)
+        build.refresh_partials("2026-01-14", "2026-01-14")
+        refreshed = build.load_aggregated()
+
+        build.refresh_partials()
+        rebuilt = build.load_aggregated()
+
+        assert refreshed["shipment_count"].sum() == after.height
+        assert_frame_equal(refreshed, rebuilt, check_exact=False)
+
+    def test_open_ended_refresh_keeps_null_weeks(self, store):
+        """A refresh without an end date still keeps shipments without a ship week."""
+        unified(seed=2).write_parquet(build.INPUT_PATH)
+        build.refresh_partials()
+
+        build.refresh_partials("2026-01-20")
+        partials = pl.read_parquet(build.PARTIALS_PATH)
+
+        assert partials.filter(pl.col(build.PARTITION_COL).is_null())["shipment_count"].sum() == 8
+        assert partials["shipment_count"].sum() == 400
@@ -0,0 +1,35 @@
+"""
+Tests for appending a date range to the unified shipment dataset.
+
+Run with: pytest analysis/US_2026_tenders/tests/ -v
+"""
+
+from datetime import datetime
+
+import polars as pl
+
+import analysis.US_2026_tenders.scripts.build_shipment_dataset as build
+
+
+class TestAppendUnified:
+    """Tests for append_unified."""
+
+    def test_keeps_rows_outside_the_range(self, tmp_path):
+        """Out-of-range rows and rows without a created date survive; in-range rows are replaced."""
+        existing_path = tmp_path / "unified.parquet"
+        pl.DataFrame({
+            "pcs_orderid": [1, 2, 3, 4],
+            "pcs_created": [datetime(2026, 1, 5, 9), datetime(2026, 2, 3, 10), None, datetime(2026, 2, 20, 8)],
+            "cost_actual": [5.0, 6.0, 7.0, 8.0],
+        }).write_parquet(existing_path)
+        new = pl.LazyFrame({
+            "pcs_orderid": [2, 5],
+            "pcs_created": [datetime(2026, 2, 3, 10), datetime(2026, 2, 9, 12)],
+            "cost_actual": [6.5, 9.0],
+        })
+
+        result = build.append_unified(new, existing_path, "2026-02-01", "2026-02-14").collect()
+
+        assert sorted(zip(result["pcs_orderid"], result["cost_actual"])) == [
+            (1, 5.0), (2, 6.5), (3, 7.0), (4, 8.0), (5, 9.0),
+        ]
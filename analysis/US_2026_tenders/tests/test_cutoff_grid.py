@@ -0,0 +1,126 @@
+"""
+Tests for the vectorized cutoff grid search.
+
+Run with: pytest analysis/US_2026_tenders/tests/ -v
+"""
+
+import itertools
+
+import numpy as np
+import polars as pl
+import pytest
+
+from analysis.US_2026_tenders.optimization.cutoff_grid import cutoff_grid, find_best_cutoffs
+from analysis.US_2026_tenders.optimization.fedex_adjustment import compute_undiscounted
+
+
+PRIMARY = pl.col("p2p_available")
+SECONDARY = pl.col("usps_available")
+
+
+def shipments(seed: int, n: int = 300) -> pl.DataFrame:
+    """One group of shipments; some with null brackets, availability, costs or service."""
+    rng = np.random.default_rng(seed)
+
+    def with_nulls(values, share=0.05):
+        return [None if rng.random() < share else v for v in values]
+
+    return pl.DataFrame({
+        "weight_bracket": with_nulls(rng.integers(1, 9, n).tolist()),
+        "p2p_available": with_nulls((rng.random(n) < 0.5).tolist()),
+        "usps_available": with_nulls((rng.random(n) < 0.7).tolist()),
+        "p2p_cost_total": with_nulls(rng.uniform(3, 15, n).round(2).tolist()),
+        "usps_cost_total": with_nulls(rng.uniform(3, 15, n).round(2).tolist()),
+        "fedex_cost_total": with_nulls(rng.uniform(3, 15, n).round(2).tolist()),
+        "fedex_cost_base_rate": with_nulls(rng.uniform(2, 12, n).round(2).tolist()),
+        "fedex_service_selected": with_nulls(rng.choice(["FXEHD", "FXSP"], n).tolist()),
+    }, schema_overrides={"weight_bracket": pl.Int64})
+
+
+def direct(df: pl.DataFrame, primary_cut: int, secondary_cut: int) -> tuple[float, float, float]:
+    """(cost, hd_base, sp_base) of one cutoff pair, routed shipment by shipment."""
+    primary = PRIMARY.fill_null(False)
+    carrier = (
+        pl.when(primary & (pl.col("weight_bracket") <= primary_cut)).then(pl.lit("P2P"))
+        .when(~primary & SECONDARY.fill_null(False) & (pl.col("weight_bracket") <= secondary_cut))
+        .then(pl.lit("USPS"))
+        .otherwise(pl.lit("FEDEX"))
+    )
+    on_fedex = carrier == "FEDEX"
+    service = pl.col("fedex_service_selected")
+    row = df.select(
+        pl.when(carrier == "P2P").then(pl.col("p2p_cost_total"))
+        .when(carrier == "USPS").then(pl.col("usps_cost_total"))
+        .otherwise(pl.col("fedex_cost_total")).sum().alias("cost"),
+        pl.when(on_fedex & (service != "FXSP")).then(pl.col("fedex_cost_base_rate")).sum().alias("hd_base"),
+        pl.when(on_fedex & (service == "FXSP")).then(pl.col("fedex_cost_base_rate")).sum().alias("sp_base"),
+    ).row(0)
+    return tuple(float(v) for v in row)
+
+
+def grid(df: pl.DataFrame, max_primary: int, max_secondary: int):
+    return cutoff_grid(df, PRIMARY, SECONDARY, "p2p_cost_total", "usps_cost_total", max_primary, max_secondary)
+
+
+class TestCutoffGrid:
+    """Tests for cutoff_grid."""
+
+    def test_matches_direct_routing(self):
+        """Every cell equals routing the shipments for that cutoff pair, null brackets on FedEx."""
+        df = shipments(seed=0)
+        assert df["weight_bracket"].null_count() > 0
+
+        result = grid(df, 10, 6)
+
+        assert result.cost.shape == (11, 7)
+        for p, u in itertools.product(range(11), range(7)):
+            cost, hd_base, sp_base = direct(df, p, u)
+            assert result.cost[p, u] == pytest.approx(cost)
+            assert result.hd_base[p, u] == pytest.approx(hd_base)
+            assert result.sp_base[p, u] == pytest.approx(sp_base)
+
+
+class TestFindBestCutoffs:
+    """Tests for find_best_cutoffs."""
+
+    def test_matches_exhaustive_search(self):
+        """Both searches pick the cutoffs a loop over direct routings picks, under a binding threshold."""
+        light, medium = shipments(seed=1), shipments(seed=2)
+        shape = {"light": (5, 4), "medium": (4, 3)}
+        direct_light = {(p, u): direct(light, p, u) for p, u in np.ndindex(*shape["light"])}
+        direct_medium = {(p, u): direct(medium, p, u) for p, u in np.ndindex(*shape["medium"])}
+        heavy_cost, heavy_hd, heavy_sp = 1000.0, 300.0, 100.0
+
+        combos = []
+        for (lp, lu), (mp, mu) in itertools.product(direct_light, direct_medium):
+            (lc, lh, ls), (mc, mh, ms) = direct_light[lp, lu], direct_medium[mp, mu]
+            undiscounted = compute_undiscounted(lh + mh + heavy_hd, ls + ms + heavy_sp)
+            combos.append(((lp, lu, mp, mu), lc + mc + heavy_cost, undiscounted))
+
+        # First strict minimum in (light, medium) order, as the search resolves ties
+        unconstrained = min(combos, key=lambda c: c[1])
+        most = max(c[2] for c in combos)
+        assert most > unconstrained[2]
+        threshold = (unconstrained[2] + most) / 2
+        constrained = min((c for c in combos if c[2] >= threshold), key=lambda c: c[1])
+
+        best_con, best_unc = find_best_cutoffs(
+            grid(light, *(n - 1 for n in shape["light"])),
+            grid(medium, *(n - 1 for n in shape["medium"])),
+            heavy_cost, heavy_hd, heavy_sp, threshold,
+        )
+
+        for best, expected in [(best_unc, unconstrained), (best_con, constrained)]:
+            assert (best["lp"], best["lu"], best["mp"], best["mu"]) == expected[0]
+            assert best["total_cost"] == pytest.approx(expected[1])
+            assert best["undiscounted"] == pytest.approx(expected[2])
+        assert best_con["undiscounted"] >= threshold
+
+    def test_unreachable_threshold(self):
+        """No combination meeting the threshold gives no constrained result."""
+        df = shipments(seed=3)
+
+        best_con, best_unc = find_best_cutoffs(grid(df, 2, 2), grid(df, 2, 2), 0.0, 0.0, 0.0, 1e12)
+
+        assert best_con is None
+        assert best_unc["total_cost"] == pytest.approx(grid(df, 2, 2).cost.min() * 2)
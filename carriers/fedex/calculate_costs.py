@@ -5,6 +5,10 @@ DataFrame in, DataFrame out. The input can come from any source (PCS database,
 CSV, manual creation) as long as it contains the required columns. The output
 is the same DataFrame with calculation columns and costs appended.
 
+A pl.LazyFrame is accepted as well and returns a LazyFrame: the calculation
+is then added to the caller's query plan (e.g. on top of pl.scan_parquet)
+and runs when collected, optionally with collect(engine="streaming").
+
 REQUIRED INPUT COLUMNS
 ----------------------
     ship_date           - Date for demand period checks
@@ -33,6 +37,12 @@ OUTPUT COLUMNS ADDED
         - cost_fuel, cost_total
         - calculator_version
 
+MULTI-SERVICE
+-------------
+    calculate_services() rates every shipment as both Home Delivery and
+    SmartPost in one pass (shared dimensions and zones), adding hd_* and
+    sp_* columns, service_selected, and the selected service's costs.
+
 USAGE
 -----
     from carriers.fedex.calculate_costs import calculate_costs
@@ -41,32 +51,81 @@ USAGE
 
 import polars as pl
 
+from shared.rating import (
+    Frame,
+    column_names,
+    add_dimensions,
+    canonical_zip,
+    rate_unique,
+    rate_services,
+    cheapest_service,
+    selected_columns,
+)
+from shared.reference import ZipIndex
+from shared.surcharges import apply_surcharges, period_flags
+
 from .data import (
-    load_zones,
-    load_das_zones,
+    load_zone_index,
+    load_das_index,
+    build_zone_index,
+    build_das_index,
     DIM_FACTOR_HOME_DELIVERY,
     DIM_FACTOR_GROUND_ECONOMY,
     FUEL_RATE,
     SERVICE_MAPPING,
 )
-from .data.reference import (
-    load_undiscounted_rates,
-    load_performance_pricing,
-    load_earned_discount,
-    load_grace_discount,
-)
-from .surcharges import ALL, BASE, DEPENDENT, get_exclusivity_group, get_unique_exclusivity_groups
+from .data.reference import load_rate_cube, RATE_TABLES
+from .surcharges import ALL, BASE, DEPENDENT
 from .version import VERSION
 
 
+# Output column for each rate cube layer
+RATE_COLUMNS = {
+    "undiscounted_rates": "cost_base_rate",
+    "performance_pricing": "cost_performance_pricing",
+    "earned_discount": "cost_earned_discount",
+    "grace_discount": "cost_grace_discount",
+}
+
+
+# Cost-determining inputs, canonicalized, for calculate_costs(dedup=True).
+# The ship date enters only through the seasonal windows the calculator checks.
+RATING_KEY = [
+    pl.col("production_site"),
+    pl.col("shipping_region"),
+    pl.col("pcs_shipping_provider"),
+    canonical_zip(5),
+    pl.col("length_in"),
+    pl.col("width_in"),
+    pl.col("height_in"),
+    pl.col("weight_lbs"),
+]
+RATING_DATE_FLAGS = period_flags(ALL)
+
+# calculate_services() rates every service regardless of pcs_shipping_provider
+SERVICES_RATING_KEY = [k for k in RATING_KEY if k.meta.output_name() != "pcs_shipping_provider"]
+
+
+# Services rated by calculate_services(): PCS service code -> column prefix.
+# The first one is the default when no other service is cheaper.
+SERVICES = {
+    "FXEHD": "hd",
+    "FXSP": "sp",
+}
+
+# SmartPost is only selected up to this actual weight
+SMARTPOST_MAX_WEIGHT_LBS = 70
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
 def calculate_costs(
-    df: pl.DataFrame,
-    zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+    df: Frame,
+    zones: pl.DataFrame | None = None,
+    dedup: bool = False,
+) -> Frame:
     """
     Calculate shipping costs for a shipment DataFrame.
 
@@ -74,26 +133,118 @@ def calculate_costs(
     the same DataFrame with all calculation columns and costs appended.
 
     Args:
-        df: Raw shipment DataFrame with required columns (see module docstring)
+        df: Raw shipment DataFrame or LazyFrame with required columns (see module docstring)
         zones: Zone mapping DataFrame (loaded from zones.csv if not provided)
+        dedup: Rate each unique RATING_KEY once and join the results back
+            (see shared.rating.dedup)
 
     Returns:
-        DataFrame with supplemented data, surcharge flags, and costs
+        DataFrame (LazyFrame for lazy input) with supplemented data,
+        surcharge flags, and costs
     """
+    if dedup:
+        df, _ = rate_unique(
+            df, lambda keys: calculate_costs(keys, zones), RATING_KEY, RATING_DATE_FLAGS
+        )
+        return df
+
     df = supplement_shipments(df, zones)
     df = calculate(df)
     return df
 
 
+def calculate_services(
+    df: Frame,
+    zones: pl.DataFrame | None = None,
+    dedup: bool = False,
+) -> Frame:
+    """
+    Rate every shipment under each of SERVICES in one pass and select the cheaper.
+
+    Dimensions and zones are computed once. Only the service-dependent
+    stages (SmartPost limits, DAS, billable weight, surcharges, rates) run
+    per service. pcs_shipping_provider is ignored.
+
+    Args:
+        df: Raw shipment DataFrame or LazyFrame with required columns (see module docstring)
+        zones: Zone mapping DataFrame (loaded from zones.csv if not provided)
+        dedup: Rate each unique SERVICES_RATING_KEY once and join the results
+            back (see shared.rating.dedup)
+
+    Returns:
+        DataFrame (LazyFrame for lazy input) with:
+            - cubic_in, longest_side_in, second_longest_in, length_plus_girth
+            - shipping_zone
+            - hd_* and sp_* - every column calculate_costs() adds per service
+              (rate_service, das_zone, billable weights, surcharges, costs)
+            - service_selected - SmartPost if eligible and cheaper, else Home Delivery
+            - the selected service's columns, unprefixed (cost_total, ...)
+            - calculator_version
+    """
+    if dedup:
+        df, _ = rate_unique(
+            df, lambda keys: calculate_services(keys, zones), SERVICES_RATING_KEY, RATING_DATE_FLAGS
+        )
+        return df
+
+    zone_index = load_zone_index() if zones is None else build_zone_index(zones)
+    das_index = load_das_index()
+
+    df = _add_calculated_dimensions(df)
+    df = _lookup_zones(df, zone_index)
+
+    df = rate_services(df, [
+        lambda shared, code=code, prefix=prefix: _rate_service(shared, code, prefix, das_index)
+        for code, prefix in SERVICES.items()
+    ])
+
+    # SmartPost only if eligible by weight and strictly cheaper
+    df = df.with_columns(
+        cheapest_service({
+            "FXEHD": pl.col("hd_cost_total"),
+            "FXSP": pl.when(pl.col("weight_lbs") <= SMARTPOST_MAX_WEIGHT_LBS)
+                .then(pl.col("sp_cost_total")),
+        }).alias("service_selected")
+    )
+
+    service_columns = [c.removeprefix("hd_") for c in column_names(df) if c.startswith("hd_")]
+    df = df.with_columns(selected_columns("service_selected", SERVICES, service_columns))
+
+    return _stamp_version(df)
+
+
+def _rate_service(
+    df: Frame,
+    code: str,
+    prefix: str,
+    das_index: ZipIndex,
+) -> Frame:
+    """Rate df as PCS service `code`; returns only the added columns, prefixed."""
+    inputs = column_names(df) + ["pcs_shipping_provider", "calculator_version"]
+
+    df = df.with_columns(pl.lit(code).alias("pcs_shipping_provider"))
+    df = _add_service_type(df)
+    df = _enforce_smartpost_limits(df)
+    df = _lookup_das_zones(df, das_index)
+    df = _add_billable_weight(df)
+    df = calculate(df)
+
+    return df.select([
+        pl.col(c).alias(f"{prefix}_{c}")
+        for c in column_names(df)
+        if c not in inputs
+    ])
+
+
 # =============================================================================
 # SUPPLEMENT SHIPMENTS
 # =============================================================================
 
 def supplement_shipments(
-    df: pl.DataFrame,
+    df: Frame,
     zones: pl.DataFrame | None = None,
     das_zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+) -> Frame:
     """
     Supplement shipment data with zone and weight calculations.
 
@@ -111,22 +262,20 @@ def supplement_shipments(
             - das_zone (DAS tier or null)
             - dim_weight_lbs, uses_dim_weight, billable_weight_lbs
     """
-    if zones is None:
-        zones = load_zones()
-    if das_zones is None:
-        das_zones = load_das_zones()
+    zone_index = load_zone_index() if zones is None else build_zone_index(zones)
+    das_index = load_das_index() if das_zones is None else build_das_index(das_zones)
 
     df = _add_service_type(df)
     df = _add_calculated_dimensions(df)
     df = _enforce_smartpost_limits(df)
-    df = _lookup_zones(df, zones)
-    df = _lookup_das_zones(df, das_zones)
+    df = _lookup_zones(df, zone_index)
+    df = _lookup_das_zones(df, das_index)
     df = _add_billable_weight(df)
 
     return df
 
 
-def _add_service_type(df: pl.DataFrame) -> pl.DataFrame:
+def _add_service_type(df: Frame) -> Frame:
     """
     Add rate_service column based on PCS service code (pcs_shipping_provider).
 
@@ -145,42 +294,17 @@ def _add_service_type(df: pl.DataFrame) -> pl.DataFrame:
     return df.with_columns(expr.alias("rate_service"))
 
 
-def _add_calculated_dimensions(df: pl.DataFrame) -> pl.DataFrame:
-    """Add calculated dimensional columns.
+def _add_calculated_dimensions(df: Frame) -> Frame:
+    """
+    Add calculated dimensional columns.
 
-    Note: Dimensions are rounded to 1 decimal place to avoid floating point
-    precision issues when comparing against surcharge thresholds.
+    Uses the shared dimension stage (rounded to 1 decimal, see
+    shared.rating.dimensions); columns already present are kept as-is.
     """
-    return df.with_columns([
-        # Cubic inches (rounded to whole number)
-        (pl.col("length_in") * pl.col("width_in") * pl.col("height_in"))
-        .round(0)
-        .alias("cubic_in"),
-
-        # Longest dimension (rounded to 1 decimal)
-        pl.max_horizontal("length_in", "width_in", "height_in")
-        .round(1)
-        .alias("longest_side_in"),
-
-        # Second longest dimension (rounded to 1 decimal)
-        pl.concat_list(["length_in", "width_in", "height_in"])
-        .list.sort(descending=True)
-        .list.get(1)
-        .round(1)
-        .alias("second_longest_in"),
-
-        # Length + Girth (longest + 2 * sum of other two, rounded to 1 decimal)
-        (
-            pl.max_horizontal("length_in", "width_in", "height_in") +
-            2 * (
-                pl.col("length_in") + pl.col("width_in") + pl.col("height_in") -
-                pl.max_horizontal("length_in", "width_in", "height_in")
-            )
-        ).round(1).alias("length_plus_girth"),
-    ])
+    return add_dimensions(df, ["cubic_in", "longest_side_in", "second_longest_in", "length_plus_girth"])
 
 
-def _enforce_smartpost_limits(df: pl.DataFrame) -> pl.DataFrame:
+def _enforce_smartpost_limits(df: Frame) -> Frame:
     """
     Override Ground Economy (SmartPost) to Home Delivery for packages exceeding
     SmartPost size/weight limits.
@@ -210,7 +334,7 @@ def _enforce_smartpost_limits(df: pl.DataFrame) -> pl.DataFrame:
     )
 
 
-def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
+def _lookup_zones(df: Frame, zone_index: ZipIndex) -> Frame:
     """
     Add zone data to shipments based on shipping ZIP code and origin.
 
@@ -225,71 +349,25 @@ def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
     1. Exact ZIP code match from zones.csv
     2. State-level mode (most common zone for that state)
     3. Default zone 5 (mid-range, minimizes worst-case pricing error)
-    """
-    # Normalize ZIP code to 5 digits with leading zeros
-    df = df.with_columns(
-        pl.col("shipping_zip_code")
-        .cast(pl.Utf8)
-        .str.slice(0, 5)
-        .str.zfill(5)
-        .alias("_zip_normalized")
-    )
-
-    # Ensure zones zip_code is also normalized
-    zones = zones.with_columns(
-        pl.col("zip_code")
-        .cast(pl.Utf8)
-        .str.zfill(5)
-        .alias("zip_code")
-    )
-
-    zones_subset = zones.select(["zip_code", "state", "phx_zone", "cmh_zone"])
 
-    # State-level fallback (mode zone per state)
-    state_zones = (
-        zones
-        .group_by("state")
-        .agg([
-            pl.col("phx_zone").mode().first().alias("_state_phx_zone"),
-            pl.col("cmh_zone").mode().first().alias("_state_cmh_zone"),
-        ])
-    )
-
-    # Join on ZIP code
-    df = df.join(zones_subset, left_on="_zip_normalized", right_on="zip_code", how="left")
-
-    # Join state fallback
-    df = df.join(state_zones, left_on="shipping_region", right_on="state", how="left")
-
-    # Coalesce: ZIP zone -> state zone -> default zone 5
-    df = df.with_columns([
-        pl.coalesce(["phx_zone", "_state_phx_zone", pl.lit(5)]).alias("_phx_zone_final"),
-        pl.coalesce(["cmh_zone", "_state_cmh_zone", pl.lit(5)]).alias("_cmh_zone_final"),
-    ])
+    Both fallbacks are precomputed in the ZIP index (see build_zone_index).
+    """
+    df = df.with_columns(zone_index.slot())
 
     # Select zone based on production site
     df = df.with_columns(
         pl.when(pl.col("production_site") == "Phoenix")
-        .then(pl.col("_phx_zone_final"))
+        .then(zone_index.lookup("phx_zone"))
         .when(pl.col("production_site") == "Columbus")
-        .then(pl.col("_cmh_zone_final"))
+        .then(zone_index.lookup("cmh_zone"))
         .otherwise(pl.lit(5))
         .alias("shipping_zone")
     )
 
-    # Drop intermediate columns
-    df = df.drop([
-        "_zip_normalized",
-        "phx_zone", "cmh_zone",
-        "_state_phx_zone", "_state_cmh_zone",
-        "_phx_zone_final", "_cmh_zone_final",
-        "state",
-    ])
-
-    return df
+    return df.drop(zone_index.slot_column)
 
 
-def _lookup_das_zones(df: pl.DataFrame, das_zones: pl.DataFrame) -> pl.DataFrame:
+def _lookup_das_zones(df: Frame, das_index: ZipIndex) -> Frame:
     """
     Add DAS zone to shipments based on shipping ZIP code and service type.
 
@@ -299,51 +377,25 @@ def _lookup_das_zones(df: pl.DataFrame, das_zones: pl.DataFrame) -> pl.DataFrame
 
     Args:
         df: DataFrame with shipping_zip_code and rate_service columns
-        das_zones: DAS zone mapping with zip_code, das_type_hd, das_type_sp
+        das_index: ZIP index over das_type_hd, das_type_sp
 
     Returns:
         DataFrame with das_zone column added (DAS tier or null)
     """
-    # Normalize ZIP code to 5 digits
-    df = df.with_columns(
-        pl.col("shipping_zip_code")
-        .cast(pl.Utf8)
-        .str.slice(0, 5)
-        .str.zfill(5)
-        .alias("_das_zip")
-    )
-
-    # Ensure das_zones zip_code is normalized
-    das_zones = das_zones.with_columns(
-        pl.col("zip_code")
-        .cast(pl.Utf8)
-        .str.zfill(5)
-        .alias("zip_code")
-    )
-
-    # Join to get DAS zone data
-    df = df.join(
-        das_zones,
-        left_on="_das_zip",
-        right_on="zip_code",
-        how="left"
-    )
+    df = df.with_columns(das_index.slot())
 
     # Select the appropriate DAS type based on service
     df = df.with_columns(
         pl.when(pl.col("rate_service") == "Home Delivery")
-        .then(pl.col("das_type_hd"))
-        .otherwise(pl.col("das_type_sp"))
+        .then(das_index.get("das_type_hd"))
+        .otherwise(das_index.get("das_type_sp"))
         .alias("das_zone")
     )
 
-    # Drop intermediate columns
-    df = df.drop(["_das_zip", "das_type_hd", "das_type_sp"])
-
-    return df
+    return df.drop(das_index.slot_column)
 
 
-def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
+def _add_billable_weight(df: Frame) -> Frame:
     """
     Calculate dimensional weight and billable weight.
 
@@ -376,7 +428,7 @@ def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
 # CALCULATE COSTS
 # =============================================================================
 
-def calculate(df: pl.DataFrame) -> pl.DataFrame:
+def calculate(df: Frame) -> Frame:
     """
     Calculate shipping costs for supplemented shipments.
 
@@ -391,10 +443,10 @@ def calculate(df: pl.DataFrame) -> pl.DataFrame:
         2. DEPENDENT surcharges - reference flags from phase 1 (via depends_on)
     """
     # Phase 1: Apply base surcharges (don't reference other surcharge flags)
-    df = _apply_surcharges(df, BASE)
+    df = apply_surcharges(df, BASE)
 
     # Phase 2: Apply dependent surcharges (reference flags from phase 1)
-    df = _apply_surcharges(df, DEPENDENT)
+    df = apply_surcharges(df, DEPENDENT)
 
     # Phase 3: Adjust billable weights based on triggered surcharges
     df = _apply_min_billable_weights(df)
@@ -413,83 +465,7 @@ def calculate(df: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
-def _apply_surcharges(df: pl.DataFrame, surcharges: list) -> pl.DataFrame:
-    """
-    Apply surcharges, handling mutual exclusivity within exclusivity groups.
-
-    Surcharges with the same exclusivity_group compete - only highest priority wins.
-    Surcharges without exclusivity_group are applied independently.
-    """
-    # Separate standalone vs exclusive surcharges
-    standalone = [s for s in surcharges if s.exclusivity_group is None]
-    exclusive = [s for s in surcharges if s.exclusivity_group is not None]
-
-    # Apply standalone surcharges (no competition)
-    for s in standalone:
-        df = _apply_single_surcharge(df, s)
-
-    # Apply exclusive surcharges by group
-    for group_name in get_unique_exclusivity_groups(exclusive):
-        df = _apply_exclusive_group(df, group_name)
-
-    return df
-
-
-def _apply_single_surcharge(df: pl.DataFrame, surcharge) -> pl.DataFrame:
-    """Apply a single surcharge without competition."""
-    flag_col = f"surcharge_{surcharge.name.lower()}"
-    cost_col = f"cost_{surcharge.name.lower()}"
-
-    # cost() may return float or pl.Expr (for conditional costs)
-    cost_value = surcharge.cost()
-    cost_expr = cost_value if isinstance(cost_value, pl.Expr) else pl.lit(cost_value)
-
-    df = df.with_columns(surcharge.conditions().alias(flag_col))
-    df = df.with_columns(
-        pl.when(pl.col(flag_col))
-        .then(cost_expr)
-        .otherwise(pl.lit(0.0))
-        .alias(cost_col)
-    )
-
-    return df
-
-
-def _apply_exclusive_group(df: pl.DataFrame, group_name: str) -> pl.DataFrame:
-    """
-    Apply mutually exclusive surcharges within a group.
-
-    Only the highest priority surcharge (lowest number) that matches wins.
-    """
-    group = get_exclusivity_group(group_name)
-    exclusion_mask = pl.lit(False)
-
-    for surcharge in group:
-        flag_col = f"surcharge_{surcharge.name.lower()}"
-        cost_col = f"cost_{surcharge.name.lower()}"
-
-        # cost() may return float or pl.Expr (for conditional costs)
-        cost_value = surcharge.cost()
-        cost_expr = cost_value if isinstance(cost_value, pl.Expr) else pl.lit(cost_value)
-
-        # Applies only if: conditions met AND no higher priority already matched
-        applies = surcharge.conditions() & ~exclusion_mask
-
-        df = df.with_columns(applies.alias(flag_col))
-        df = df.with_columns(
-            pl.when(pl.col(flag_col))
-            .then(cost_expr)
-            .otherwise(pl.lit(0.0))
-            .alias(cost_col)
-        )
-
-        # Update exclusion mask: if this one matched, exclude the rest
-        exclusion_mask = exclusion_mask | pl.col(flag_col)
-
-    return df
-
-
-def _apply_min_billable_weights(df: pl.DataFrame) -> pl.DataFrame:
+def _apply_min_billable_weights(df: Frame) -> Frame:
     """
     Apply minimum billable weights from triggered surcharges.
 
@@ -516,7 +492,7 @@ def _apply_min_billable_weights(df: pl.DataFrame) -> pl.DataFrame:
     return df.with_columns(expr.alias("billable_weight_lbs"))
 
 
-def _lookup_base_rate(df: pl.DataFrame) -> pl.DataFrame:
+def _lookup_base_rate(df: Frame) -> Frame:
     """
     Look up base shipping rate and discount components by service, zone, and weight.
 
@@ -532,23 +508,16 @@ def _lookup_base_rate(df: pl.DataFrame) -> pl.DataFrame:
     - Null/missing zone → zone 5 (mid-range default)
     - Letter zones (A, H, M, P) → zone 9 (Hawaii rate)
     - Unknown numeric zones → zone 5
+
+    RATE CUBE
+    ---------
+    All eight rate tables are held as one dense [layer, service, zone, weight]
+    array (see load_rate_cube). Each shipment maps to a single flat index into
+    it, from which the four components are gathered. Combinations missing from
+    the rate tables come back null, as a left join would.
     """
-    # Load rate tables for both services
-    hd_undiscounted = load_undiscounted_rates("Home Delivery")
-    hd_performance = load_performance_pricing("Home Delivery")
-    hd_earned = load_earned_discount("Home Delivery")
-    hd_grace = load_grace_discount("Home Delivery")
-
-    sp_undiscounted = load_undiscounted_rates("SmartPost")
-    sp_performance = load_performance_pricing("SmartPost")
-    sp_earned = load_earned_discount("SmartPost")
-    sp_grace = load_grace_discount("SmartPost")
-
-    # Add service column to rate tables
-    for rates_df in [hd_undiscounted, hd_performance, hd_earned, hd_grace]:
-        rates_df = rates_df.with_columns(pl.lit("Home Delivery").alias("service"))
-    for rates_df in [sp_undiscounted, sp_performance, sp_earned, sp_grace]:
-        rates_df = rates_df.with_columns(pl.lit("Ground Economy").alias("service"))
+    cube = load_rate_cube()
+    n_zones = len(cube.zones)
 
     # Cap weights at max for each service (150 for HD, 71 for SmartPost)
     df = df.with_columns(
@@ -582,62 +551,35 @@ def _lookup_base_rate(df: pl.DataFrame) -> pl.DataFrame:
         .alias("_rate_zone")
     )
 
-    # Combine rate tables by service
-    hd_undiscounted_svc = hd_undiscounted.with_columns(pl.lit("Home Delivery").alias("service"))
-    sp_undiscounted_svc = sp_undiscounted.with_columns(pl.lit("Ground Economy").alias("service"))
-    all_undiscounted = pl.concat([hd_undiscounted_svc, sp_undiscounted_svc])
-
-    hd_performance_svc = hd_performance.with_columns(pl.lit("Home Delivery").alias("service"))
-    sp_performance_svc = sp_performance.with_columns(pl.lit("Ground Economy").alias("service"))
-    all_performance = pl.concat([hd_performance_svc, sp_performance_svc])
-
-    hd_earned_svc = hd_earned.with_columns(pl.lit("Home Delivery").alias("service"))
-    sp_earned_svc = sp_earned.with_columns(pl.lit("Ground Economy").alias("service"))
-    all_earned = pl.concat([hd_earned_svc, sp_earned_svc])
-
-    hd_grace_svc = hd_grace.with_columns(pl.lit("Home Delivery").alias("service"))
-    sp_grace_svc = sp_grace.with_columns(pl.lit("Ground Economy").alias("service"))
-    all_grace = pl.concat([hd_grace_svc, sp_grace_svc])
-
-    # Join to get undiscounted rate
-    df = df.join(
-        all_undiscounted,
-        left_on=["rate_service", "_weight_bracket", "_rate_zone"],
-        right_on=["service", "weight_lbs", "zone"],
-        how="left"
-    ).rename({"rate": "cost_base_rate"})
-
-    # Join to get performance pricing discount
-    df = df.join(
-        all_performance,
-        left_on=["rate_service", "_weight_bracket", "_rate_zone"],
-        right_on=["service", "weight_lbs", "zone"],
-        how="left"
-    ).rename({"rate": "cost_performance_pricing"})
-
-    # Join to get earned discount
-    df = df.join(
-        all_earned,
-        left_on=["rate_service", "_weight_bracket", "_rate_zone"],
-        right_on=["service", "weight_lbs", "zone"],
-        how="left"
-    ).rename({"rate": "cost_earned_discount"})
-
-    # Join to get grace discount
-    df = df.join(
-        all_grace,
-        left_on=["rate_service", "_weight_bracket", "_rate_zone"],
-        right_on=["service", "weight_lbs", "zone"],
-        how="left"
-    ).rename({"rate": "cost_grace_discount"})
+    # Flat index into the cube's [service, zone, weight] plane (null = no rate)
+    service_idx = pl.col("rate_service").replace_strict(
+        {service: i for i, service in enumerate(cube.services)},
+        default=None, return_dtype=pl.Int64,
+    )
+    zone_idx = pl.col("_rate_zone").replace_strict(
+        {zone: i for i, zone in enumerate(cube.zones)},
+        default=None, return_dtype=pl.Int64,
+    )
+    flat_idx = (
+        pl.when(pl.col("_weight_bracket") <= cube.max_weight)
+        .then((service_idx * n_zones + zone_idx) * cube.max_weight + pl.col("_weight_bracket") - 1)
+    )
+    layers = cube.values.reshape(len(RATE_TABLES), -1)
+
+    df = df.with_columns(flat_idx.alias("_rate_idx"))
+    df = df.with_columns([
+        pl.lit(pl.Series(layers[layer])).gather(pl.col("_rate_idx")).fill_nan(None)
+        .alias(RATE_COLUMNS[table_name])
+        for layer, table_name in enumerate(RATE_TABLES)
+    ])
 
     # Clean up intermediate columns
-    df = df.drop(["_capped_weight", "_weight_bracket", "_rate_zone"])
+    df = df.drop(["_capped_weight", "_weight_bracket", "_rate_zone", "_rate_idx"])
 
     return df
 
 
-def _calculate_subtotal(df: pl.DataFrame) -> pl.DataFrame:
+def _calculate_subtotal(df: Frame) -> Frame:
     """Calculate cost_subtotal as sum of base rate, discounts, and surcharges.
 
     cost_subtotal = cost_base_rate + cost_performance_pricing + cost_earned_discount
@@ -656,11 +598,12 @@ def _calculate_subtotal(df: pl.DataFrame) -> pl.DataFrame:
     surcharge_cols = [f"cost_{s.name.lower()}" for s in ALL]
     # Combine and filter to only existing columns
     all_cost_cols = rate_cols + surcharge_cols
-    existing_cols = [c for c in all_cost_cols if c in df.columns]
+    existing = column_names(df)
+    existing_cols = [c for c in all_cost_cols if c in existing]
     return df.with_columns(pl.sum_horizontal(existing_cols).round(2).alias("cost_subtotal"))
 
 
-def _apply_fuel(df: pl.DataFrame) -> pl.DataFrame:
+def _apply_fuel(df: Frame) -> Frame:
     """Apply fuel surcharge as percentage of base rate after discounts.
 
     Rate configured in data/reference/fuel.py.
@@ -670,20 +613,21 @@ def _apply_fuel(df: pl.DataFrame) -> pl.DataFrame:
     )
 
 
-def _calculate_total(df: pl.DataFrame) -> pl.DataFrame:
+def _calculate_total(df: Frame) -> Frame:
     """Calculate cost_total as subtotal plus fuel."""
     return df.with_columns(
         (pl.col("cost_subtotal") + pl.col("cost_fuel")).alias("cost_total")
     )
 
 
-def _stamp_version(df: pl.DataFrame) -> pl.DataFrame:
+def _stamp_version(df: Frame) -> Frame:
     """Stamp calculator version on output."""
     return df.with_columns(pl.lit(VERSION).alias("calculator_version"))
 
 
 __all__ = [
     "calculate_costs",
+    "calculate_services",
     "supplement_shipments",
     "calculate",
 ]
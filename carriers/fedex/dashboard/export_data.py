@@ -12,7 +12,6 @@ Usage:
 import json
 from pathlib import Path
 
-import polars as pl
 from shared.database import pull_data
 
 SQL_DIR = Path(__file__).parent / "sql"
@@ -28,9 +27,8 @@ def main():
     # --- 1. Export comparison dataset ---
     print("Loading comparison data from Redshift...")
     query = (SQL_DIR / "comparison.sql").read_text()
-    # Use pandas first to handle Decimal types, then convert to Polars
-    df = pull_data(query, as_polars=False)
-    df = pl.from_pandas(df)
+    # NUMERIC columns arrive as Float64 (typed columnar fetch)
+    df = pull_data(query)
     print(f"  Loaded {len(df):,} rows, {len(df.columns)} columns")
 
     parquet_path = DATA_DIR / "comparison.parquet"
@@ -139,8 +137,8 @@ def main():
         WHERE e.pcs_orderid IS NULL
     """
 
-    unmatched_expected = pl.from_pandas(pull_data(unmatched_expected_query, as_polars=False))
-    unmatched_actual = pl.from_pandas(pull_data(unmatched_actual_query, as_polars=False))
+    unmatched_expected = pull_data(unmatched_expected_query)
+    unmatched_actual = pull_data(unmatched_actual_query)
 
     unmatched_expected_path = DATA_DIR / "unmatched_expected.parquet"
     unmatched_actual_path = DATA_DIR / "unmatched_actual.parquet"
@@ -8,10 +8,17 @@ Structure:
     - loaders/: Dynamic data loaders (PCS database)
 """
 
-from .loaders import load_pcs_shipments, load_pcs_shipments_all_us
+from .loaders import load_pcs_shipments, load_pcs_shipments_all_us, stream_pcs_shipments_all_us
 from .reference import (
+    BUNDLE,
     load_zones,
+    load_state_zones,
+    state_zone_modes,
     load_das_zones,
+    load_zone_index,
+    load_das_index,
+    build_zone_index,
+    build_das_index,
     load_undiscounted_rates,
     load_performance_pricing,
     load_earned_discount,
@@ -30,9 +37,17 @@ __all__ = [
     # PCS data loaders
     "load_pcs_shipments",
     "load_pcs_shipments_all_us",
+    "stream_pcs_shipments_all_us",
     # Reference data loaders
+    "BUNDLE",
     "load_zones",
+    "load_state_zones",
+    "state_zone_modes",
     "load_das_zones",
+    "load_zone_index",
+    "load_das_index",
+    "build_zone_index",
+    "build_das_index",
     "load_undiscounted_rates",
     "load_performance_pricing",
     "load_earned_discount",
@@ -1,6 +1,6 @@
 """FedEx data loaders."""
 
 from carriers.fedex.data.loaders.pcs import load_pcs_shipments
-from carriers.fedex.data.loaders.pcs_all_us import load_pcs_shipments_all_us
+from carriers.fedex.data.loaders.pcs_all_us import load_pcs_shipments_all_us, stream_pcs_shipments_all_us
 
-__all__ = ["load_pcs_shipments", "load_pcs_shipments_all_us"]
+__all__ = ["load_pcs_shipments", "load_pcs_shipments_all_us", "stream_pcs_shipments_all_us"]
@@ -2,40 +2,139 @@
 FedEx Reference Data
 
 Static reference data for rates, zones, and configuration.
+
+Tables are served from the prebuilt reference bundle when it is current
+(see shared/reference/bundle.py), otherwise built from the CSVs.
 """
 
 from pathlib import Path
+from typing import NamedTuple
 
+import numpy as np
 import polars as pl
 
+from shared.reference import (
+    REFERENCE_CACHE,
+    ReferenceBundle,
+    ZipIndex,
+    cached_zip_index,
+    read_reference_csv,
+)
+
+from ...version import VERSION
 from .billable_weight import DIM_FACTOR, DIM_FACTOR_HOME_DELIVERY, DIM_FACTOR_GROUND_ECONOMY
 from .fuel import RATE as FUEL_RATE
 
 REFERENCE_DIR = Path(__file__).parent
 
+BUNDLE = ReferenceBundle(REFERENCE_DIR, VERSION)
+
+SERVICE_DIRS = {"Home Delivery": "home_delivery", "SmartPost": "smartpost"}
+RATE_TABLES = ["undiscounted_rates", "performance_pricing", "earned_discount", "grace_discount"]
+
 
 def load_zones() -> pl.DataFrame:
-    """Load zone mappings from zones.csv."""
-    return pl.read_csv(REFERENCE_DIR / "zones.csv")
+    """Load zone mappings from zones.csv (zip_code zero-padded to 5 digits)."""
+    return BUNDLE.load("zones")
+
+
+def load_state_zones() -> pl.DataFrame:
+    """
+    Load state-level zone fallbacks (mode zone per state).
+
+    Returns:
+        DataFrame with columns: state, _state_phx_zone, _state_cmh_zone
+    """
+    return BUNDLE.load("state_zones")
 
 
 def load_das_zones() -> pl.DataFrame:
-    """Load DAS zone mappings from das_zones.csv."""
-    return pl.read_csv(REFERENCE_DIR / "das_zones.csv")
+    """Load DAS zone mappings from das_zones.csv (zip_code zero-padded to 5 digits)."""
+    return BUNDLE.load("das_zones")
+
+
+def load_zone_index() -> ZipIndex:
+    """Dense ZIP -> phx/cmh zone index over zones.csv (see build_zone_index)."""
+    return cached_zip_index("fedex.zones", (load_zones(), load_state_zones()), build_zone_index)
+
+
+def load_das_index() -> ZipIndex:
+    """Dense ZIP -> DAS tier index over das_zones.csv (see build_das_index)."""
+    return cached_zip_index("fedex.das_zones", (load_das_zones(),), build_das_index)
+
+
+def build_zone_index(zones: pl.DataFrame, state_zones: pl.DataFrame | None = None) -> ZipIndex:
+    """
+    Index phx_zone/cmh_zone by ZIP, falling back to the state mode, then zone 5.
+
+    state_zones is derived from zones when not given (custom zone tables).
+    """
+    zones = _normalize_zip_code(zones)
+    if state_zones is None:
+        state_zones = state_zone_modes(zones)
+    return ZipIndex.from_table(
+        zones,
+        "zip_code",
+        ["phx_zone", "cmh_zone"],
+        states=state_zones,
+        state_column="state",
+        state_columns={"phx_zone": "_state_phx_zone", "cmh_zone": "_state_cmh_zone"},
+        defaults={"phx_zone": 5, "cmh_zone": 5},
+    )
+
+
+def build_das_index(das_zones: pl.DataFrame) -> ZipIndex:
+    """Index das_type_hd/das_type_sp by ZIP (no fallback: null = not a DAS ZIP)."""
+    return ZipIndex.from_table(
+        _normalize_zip_code(das_zones), "zip_code", ["das_type_hd", "das_type_sp"]
+    )
 
 
 # =============================================================================
-# RATE TABLE LOADERS (for calculator)
+# TABLE BUILDERS (CSV -> normalized frame)
 # =============================================================================
 
-def _load_rate_table(service: str, table_name: str) -> pl.DataFrame:
-    """Load a rate table and convert to long format for lookups."""
-    service_dir = "home_delivery" if service == "Home Delivery" else "smartpost"
-    df = pl.read_csv(REFERENCE_DIR / service_dir / f"{table_name}.csv")
+def _normalize_zip_code(df: pl.DataFrame) -> pl.DataFrame:
+    """Zero-pad zip_code to 5 digits (zones.csv stores it as an integer)."""
+    return df.with_columns(pl.col("zip_code").cast(pl.Utf8).str.zfill(5))
+
+
+def _build_zones() -> pl.DataFrame:
+    return read_reference_csv(REFERENCE_DIR / "zones.csv", transform=_normalize_zip_code)
+
+
+def _build_das_zones() -> pl.DataFrame:
+    return read_reference_csv(REFERENCE_DIR / "das_zones.csv", transform=_normalize_zip_code)
 
-    # Convert from wide to long format
+
+def state_zone_modes(zones: pl.DataFrame) -> pl.DataFrame:
+    """Most common phx/cmh zone per state, used as the ZIP lookup fallback."""
+    return (
+        zones
+        .group_by("state")
+        .agg([
+            pl.col("phx_zone").mode().first().alias("_state_phx_zone"),
+            pl.col("cmh_zone").mode().first().alias("_state_cmh_zone"),
+        ])
+    )
+
+
+def _build_state_zones() -> pl.DataFrame:
+    return REFERENCE_CACHE.get(
+        REFERENCE_DIR / "zones.csv",
+        lambda: state_zone_modes(_build_zones()),
+        key=("state_zones",),
+    )
+
+
+# =============================================================================
+# RATE TABLE LOADERS (for calculator)
+# =============================================================================
+
+def _rates_to_long(df: pl.DataFrame) -> pl.DataFrame:
+    """Convert a wide rate table (zone_2, zone_3, ...) to long format."""
     zone_cols = [c for c in df.columns if c.startswith("zone_")]
-    df_long = df.unpivot(
+    return df.unpivot(
         index="weight_lbs",
         on=zone_cols,
         variable_name="zone_col",
@@ -44,7 +143,18 @@ def _load_rate_table(service: str, table_name: str) -> pl.DataFrame:
         pl.col("zone_col").str.replace("zone_", "").cast(pl.Int64).alias("zone")
     ).select(["weight_lbs", "zone", "rate"])
 
-    return df_long
+
+def _build_rate_table(service_dir: str, table_name: str) -> pl.DataFrame:
+    return read_reference_csv(
+        REFERENCE_DIR / service_dir / f"{table_name}.csv",
+        transform=_rates_to_long,
+    )
+
+
+def _load_rate_table(service: str, table_name: str) -> pl.DataFrame:
+    """Load a rate table in long format for lookups."""
+    service_dir = "home_delivery" if service == "Home Delivery" else "smartpost"
+    return BUNDLE.load(f"{service_dir}_{table_name}")
 
 
 def load_undiscounted_rates(service: str) -> pl.DataFrame:
@@ -67,13 +177,99 @@ def load_grace_discount(service: str) -> pl.DataFrame:
     return _load_rate_table(service, "grace_discount")
 
 
+# =============================================================================
+# RATE CUBE (dense lookup array for calculator)
+# =============================================================================
+
+# Services on the cube's service axis, as they appear in rate_service
+CUBE_SERVICES = ["Home Delivery", "Ground Economy"]
+
+
+class RateCube(NamedTuple):
+    """
+    All rate components as one dense array.
+
+    values is indexed [layer, service, zone, weight_lbs - 1], with layers in
+    RATE_TABLES order and services in CUBE_SERVICES order. Service/zone/weight
+    combinations missing from the rate tables are NaN.
+    """
+    values: np.ndarray
+    services: list[str]
+    zones: list[int]
+    max_weight: int
+
+
+_rate_cube: tuple[list[pl.DataFrame], RateCube] | None = None
+
+
+def _build_rate_cube(tables: list[pl.DataFrame]) -> RateCube:
+    """Scatter the long rate tables (CUBE_SERVICES x RATE_TABLES order) into a cube."""
+    zones = sorted({z for t in tables for z in t["zone"].to_list()})
+    zone_pos = {z: i for i, z in enumerate(zones)}
+    max_weight = max(t["weight_lbs"].max() for t in tables)
+
+    values = np.full(
+        (len(RATE_TABLES), len(CUBE_SERVICES), len(zones), max_weight), np.nan
+    )
+    for i, table in enumerate(tables):
+        service_idx, layer = divmod(i, len(RATE_TABLES))
+        zone_idx = table["zone"].replace_strict(zone_pos, return_dtype=pl.Int64).to_numpy()
+        weight_idx = table["weight_lbs"].to_numpy() - 1
+        values[layer, service_idx, zone_idx, weight_idx] = table["rate"].to_numpy()
+
+    return RateCube(values, list(CUBE_SERVICES), zones, max_weight)
+
+
+def load_rate_cube() -> RateCube:
+    """
+    Load all FedEx rate components as a dense [layer, service, zone, weight] cube.
+
+    Rebuilt only when one of the underlying rate tables is reloaded.
+    """
+    global _rate_cube
+    tables = [
+        _load_rate_table(service, table_name)
+        for service in CUBE_SERVICES
+        for table_name in RATE_TABLES
+    ]
+    if _rate_cube is None or any(a is not b for a, b in zip(_rate_cube[0], tables)):
+        _rate_cube = (tables, _build_rate_cube(tables))
+    return _rate_cube[1]
+
+
+# =============================================================================
+# BUNDLE REGISTRATION
+# =============================================================================
+
+BUNDLE.register("zones", _build_zones, sources=["zones.csv"])
+BUNDLE.register("state_zones", _build_state_zones, sources=["zones.csv"])
+BUNDLE.register("das_zones", _build_das_zones, sources=["das_zones.csv"])
+for _service_dir in SERVICE_DIRS.values():
+    for _table_name in RATE_TABLES:
+        BUNDLE.register(
+            f"{_service_dir}_{_table_name}",
+            lambda d=_service_dir, t=_table_name: _build_rate_table(d, t),
+            sources=[f"{_service_dir}/{_table_name}.csv"],
+        )
+
+
 __all__ = [
+    "BUNDLE",
     "load_zones",
+    "load_state_zones",
+    "state_zone_modes",
     "load_das_zones",
+    "load_zone_index",
+    "load_das_index",
+    "build_zone_index",
+    "build_das_index",
     "load_undiscounted_rates",
     "load_performance_pricing",
     "load_earned_discount",
     "load_grace_discount",
+    "load_rate_cube",
+    "RateCube",
+    "RATE_TABLES",
     "DIM_FACTOR",
     "DIM_FACTOR_HOME_DELIVERY",
     "DIM_FACTOR_GROUND_ECONOMY",
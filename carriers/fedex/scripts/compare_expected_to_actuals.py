@@ -17,7 +17,7 @@ from datetime import datetime
 
 import polars as pl
 
-from shared.database import pull_data
+from shared.database import pull_data, pull_many
 
 
 # =============================================================================
@@ -81,9 +81,8 @@ def load_comparison_data(
         date_to_filter=date_to_filter,
     )
 
-    # Use Pandas as intermediate to handle Redshift decimal types
-    df_pandas = pull_data(query, as_polars=False)
-    df = pl.from_pandas(df_pandas)
+    # NUMERIC columns arrive as Float64 (typed columnar fetch)
+    df = pull_data(query)
 
     # Cast cost columns to Float64 (they may come as strings or objects)
     cost_cols = [
@@ -149,10 +148,11 @@ def get_match_rate_data(
     # Total expected in same date range
     total_expected_query = f"SELECT COUNT(*) as cnt FROM {EXPECTED_TABLE}"
 
-    # Use Pandas as intermediate to handle Redshift decimal types
-    actual_count = int(pull_data(actual_orderids_query, as_polars=False)["cnt"].iloc[0])
-    matched_count = int(pull_data(matched_query, as_polars=False)["cnt"].iloc[0])
-    total_expected = int(pull_data(total_expected_query, as_polars=False)["cnt"].iloc[0])
+    # The three counts are independent: run them concurrently
+    actual_count, matched_count, total_expected = (
+        int(result["cnt"][0])
+        for result in pull_many([actual_orderids_query, matched_query, total_expected_query])
+    )
 
     return {
         "actual_orderids": actual_count,
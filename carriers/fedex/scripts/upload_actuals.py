@@ -7,7 +7,7 @@ Loads FedEx invoice data and uploads actual costs to the database.
 Modes:
     --full          Full refresh - delete all actuals and repull from invoices
     --incremental   Only process orders without actuals (insert only)
-    --days N        Delete and repull actuals for last N days
+    --days N        Repull actuals for last N days and merge changes
 
 Usage:
     python -m carriers.fedex.scripts.upload_actuals --full
@@ -15,6 +15,8 @@ Usage:
     python -m carriers.fedex.scripts.upload_actuals --incremental --limit 1000
     python -m carriers.fedex.scripts.upload_actuals --days 30
     python -m carriers.fedex.scripts.upload_actuals --full --dry-run
+    python -m carriers.fedex.scripts.upload_actuals --full --run-id full-2025-06-01
+    python -m carriers.fedex.scripts.upload_actuals --full --chunk-rows 500000
 """
 
 import argparse
@@ -24,7 +26,7 @@ from pathlib import Path
 
 import polars as pl
 
-from shared.database import pull_data, execute_query, push_data
+from shared.database import MergeCounts, UploadCheckpoint, pull_data, pull_by_keys, execute_query, push_data, stream_data
 from carriers.fedex.data.reference.charge_mapping import (
     CHARGE_MAPPING,
     DEFAULT_COLUMN,
@@ -42,6 +44,15 @@ DATE_WINDOW_DAYS = 120  # Match invoice to shipment within this window
 
 SQL_DIR = Path(__file__).parent / "sql"
 
+# Invoice columns identifying one shipment's charges (one pivoted row each)
+CHARGE_GROUP_COLUMNS = [
+    "trackingnumber", "original_customer_reference",
+    "invoice_number", "invoice_date", "shipment_date",
+    "service_type", "ground_service", "shipping_zone",
+    "actual_weight", "actual_weight_units", "rated_weight", "rated_weight_units",
+    "net_charge_usd", "transportation_charge_usd",
+]
+
 # Columns to upload (matches DDL order)
 UPLOAD_COLUMNS = [
     # Identification
@@ -96,30 +107,23 @@ def get_orderids_from_expected(start_date: str | None = None) -> list[int]:
     return result["pcs_orderid"].to_list() if len(result) > 0 else []
 
 
+def _orderid_keys(orderids: list[int]) -> pl.DataFrame:
+    """Key frame for pull_by_keys()."""
+    return pl.DataFrame({"pcs_orderid": orderids}, schema={"pcs_orderid": pl.Int64})
+
+
 def get_tracking_numbers(orderids: list[int]) -> pl.DataFrame:
     """Get tracking numbers for given orderids from PCS."""
     if not orderids:
         return pl.DataFrame()
 
-    # Batch to avoid query size limits
-    all_results = []
-    batch_size = 5000
-    for i in range(0, len(orderids), batch_size):
-        batch = orderids[i:i + batch_size]
-        ids_str = ", ".join(str(oid) for oid in batch)
-        query = f"""
-            SELECT orderid AS pcs_orderid, trackingnumber
-            FROM bi_stage_dev_dbo.pcsu_sentparcels
-            WHERE orderid IN ({ids_str})
-        """
-        result = pull_data(query)
-        if len(result) > 0:
-            all_results.append(result)
-
-    if not all_results:
-        return pl.DataFrame()
-
-    return pl.concat(all_results)
+    # Orderids are joined from a temporary key table (see pull_by_keys)
+    query = """
+        SELECT s.orderid AS pcs_orderid, s.trackingnumber
+        FROM bi_stage_dev_dbo.pcsu_sentparcels s
+        JOIN {keys} k ON s.orderid = k.pcs_orderid
+    """
+    return pull_by_keys(query, _orderid_keys(orderids))
 
 
 def get_ship_dates(orderids: list[int]) -> pl.DataFrame:
@@ -127,24 +131,12 @@ def get_ship_dates(orderids: list[int]) -> pl.DataFrame:
     if not orderids:
         return pl.DataFrame()
 
-    batch_size = 5000
-    all_results = []
-    for i in range(0, len(orderids), batch_size):
-        batch = orderids[i:i + batch_size]
-        ids_str = ", ".join(str(oid) for oid in batch)
-        query = f"""
-            SELECT pcs_orderid, ship_date
-            FROM {EXPECTED_TABLE}
-            WHERE pcs_orderid IN ({ids_str})
-        """
-        result = pull_data(query)
-        if len(result) > 0:
-            all_results.append(result)
-
-    if not all_results:
-        return pl.DataFrame()
-
-    return pl.concat(all_results).unique(subset=["pcs_orderid"])
+    query = f"""
+        SELECT e.pcs_orderid, e.ship_date
+        FROM {EXPECTED_TABLE} e
+        JOIN {{keys}} k ON e.pcs_orderid = k.pcs_orderid
+    """
+    return pull_by_keys(query, _orderid_keys(orderids)).unique(subset=["pcs_orderid"])
 
 
 def get_row_count() -> int:
@@ -162,18 +154,16 @@ def get_row_count_for_orderids(orderids: list[int]) -> int:
     if not orderids:
         return 0
 
-    batch_size = 5000
-    total = 0
-    for i in range(0, len(orderids), batch_size):
-        batch = orderids[i:i + batch_size]
-        ids_str = ", ".join(str(oid) for oid in batch)
-        query = f"SELECT COUNT(*) as cnt FROM {TABLE_NAME} WHERE pcs_orderid IN ({ids_str})"
-        try:
-            result = pull_data(query)
-            total += int(result["cnt"][0])
-        except Exception:
-            pass
-    return total
+    query = f"""
+        SELECT COUNT(*) as cnt
+        FROM {TABLE_NAME} a
+        JOIN {{keys}} k ON a.pcs_orderid = k.pcs_orderid
+    """
+    try:
+        result = pull_by_keys(query, _orderid_keys(orderids))
+        return int(result["cnt"][0])
+    except Exception:
+        return 0
 
 
 def delete_all(dry_run: bool = False) -> int:
@@ -192,29 +182,26 @@ def delete_all(dry_run: bool = False) -> int:
     return count
 
 
-def delete_for_orderids(orderids: list[int], dry_run: bool = False) -> int:
-    """Delete rows for specific orderids."""
-    if not orderids:
-        return 0
-
-    count = get_row_count_for_orderids(orderids)
-
-    if count == 0:
-        return 0
-
-    if dry_run:
-        print(f"  [DRY RUN] Would delete {count:,} rows for {len(orderids):,} orders")
-        return count
-
-    # Batch deletions
-    batch_size = 5000
-    for i in range(0, len(orderids), batch_size):
-        batch = orderids[i:i + batch_size]
-        ids_str = ", ".join(str(oid) for oid in batch)
-        execute_query(f"DELETE FROM {TABLE_NAME} WHERE pcs_orderid IN ({ids_str})", commit=True)
+def merge_for_orders_from_date(df: pl.DataFrame, start_date: str, batch_size: int) -> MergeCounts:
+    """
+    Refresh actuals of the orders created from a start date onwards, merging
+    on pcs_orderid.
 
-    print(f"  Deleted {count:,} rows for {len(orderids):,} orders")
-    return count
+    Orders whose actuals did not change are left as they are; actuals of orders
+    in the range that are not in df are deleted.
+    """
+    return push_data(
+        df,
+        TABLE_NAME,
+        if_exists="merge",
+        batch_size=batch_size,
+        keys=["pcs_orderid"],
+        ignore_columns=["dw_timestamp"],
+        scope=(
+            f"pcs_orderid IN (SELECT pcs_orderid FROM {EXPECTED_TABLE} "
+            f"WHERE pcs_created::date >= '{start_date}'::date)"
+        ),
+    )
 
 
 # =============================================================================
@@ -223,45 +210,59 @@ def delete_for_orderids(orderids: list[int], dry_run: bool = False) -> int:
 
 def load_all_invoice_data(min_date: str | None = None) -> pl.DataFrame:
     """Load all invoice data in a single query, optionally filtered by date."""
+    return pull_data(_invoice_query(min_date))
+
+
+def load_invoice_charge_sums(min_date: str | None, chunk_rows: int) -> pl.DataFrame:
+    """
+    Stream all invoice data and reduce it to charge sums as it arrives.
+
+    Each chunk of unpivoted charges is mapped and summed per shipment and
+    actual column; partial sums of a shipment split across chunks are added
+    up at the end. Only one chunk of raw charge rows is held at a time.
+
+    Returns the input of _pivot_charges() (see map_and_pivot_charges).
+    """
+    partials = [_sum_charges(chunk) for chunk in stream_data(_invoice_query(min_date), chunk_rows)]
+    if not partials:
+        return pl.DataFrame()
+
+    return (
+        pl.concat(partials)
+        .group_by(CHARGE_GROUP_COLUMNS + ["actual_column"])
+        .agg(pl.col("amount").sum())
+    )
+
+
+def _invoice_query(min_date: str | None) -> str:
+    """Invoice charges query, optionally filtered by date."""
     sql_template = (SQL_DIR / "get_invoice_actuals.sql").read_text()
 
     date_filter = ""
     if min_date:
         date_filter = f"AND invoice_date::date >= '{min_date}'::date"
 
-    query = sql_template.format(
+    return sql_template.format(
         date_filter=date_filter,
         custref_filter="",
         tracking_numbers_filter="",
     )
 
-    return pull_data(query)
-
 
 def get_order_references(orderids: list[int]) -> pl.DataFrame:
     """Get ordernumber and shopreferencenumber1 for given orderids from PCS."""
     if not orderids:
         return pl.DataFrame()
 
-    all_results = []
-    batch_size = 5000
-    for i in range(0, len(orderids), batch_size):
-        batch = orderids[i:i + batch_size]
-        ids_str = ", ".join(str(oid) for oid in batch)
-        query = f"""
-            SELECT id AS pcs_orderid, ordernumber, shopreferencenumber1
-            FROM bi_stage_dev_dbo.pcsu_orders
-            WHERE id IN ({ids_str})
-        """
-        result = pull_data(query)
-        if len(result) > 0:
-            all_results.append(result)
-
-    if not all_results:
+    query = """
+        SELECT o.id AS pcs_orderid, o.ordernumber, o.shopreferencenumber1
+        FROM bi_stage_dev_dbo.pcsu_orders o
+        JOIN {keys} k ON o.id = k.pcs_orderid
+    """
+    df = pull_by_keys(query, _orderid_keys(orderids))
+    if len(df) == 0:
         return pl.DataFrame()
 
-    df = pl.concat(all_results)
-
     # Clean shopreferencenumber1: strip ':XX' suffix for matching
     df = df.with_columns(
         pl.col("shopreferencenumber1").str.split(":").list.first().alias("shopref1_clean")
@@ -335,6 +336,11 @@ def map_and_pivot_charges(invoice_df: pl.DataFrame) -> pl.DataFrame:
     if len(invoice_df) == 0:
         return pl.DataFrame()
 
+    return _pivot_charges(_sum_charges(invoice_df))
+
+
+def _sum_charges(invoice_df: pl.DataFrame) -> pl.DataFrame:
+    """Map charge_description to actual column and sum amounts per shipment and column."""
     # Map charge_description to actual column
     invoice_df = invoice_df.with_columns(
         pl.col("charge_description")
@@ -342,25 +348,20 @@ def map_and_pivot_charges(invoice_df: pl.DataFrame) -> pl.DataFrame:
         .alias("actual_column")
     )
 
-    # Group by tracking number and shipment info, pivot charges to columns
-    group_cols = [
-        "trackingnumber", "original_customer_reference",
-        "invoice_number", "invoice_date", "shipment_date",
-        "service_type", "ground_service", "shipping_zone",
-        "actual_weight", "actual_weight_units", "rated_weight", "rated_weight_units",
-        "net_charge_usd", "transportation_charge_usd",
-    ]
-
-    # Pivot: sum charges by actual_column
-    pivoted = (
+    return (
         invoice_df
-        .group_by(group_cols + ["actual_column"])
+        .group_by(CHARGE_GROUP_COLUMNS + ["actual_column"])
         .agg(pl.col("charge_amount").sum().alias("amount"))
-        .pivot(
-            on="actual_column",
-            index=group_cols,
-            values="amount",
-        )
+    )
+
+
+def _pivot_charges(charge_sums: pl.DataFrame) -> pl.DataFrame:
+    """Pivot summed charges (see _sum_charges) to one row per shipment."""
+    # Pivot: one column per actual_column
+    pivoted = charge_sums.pivot(
+        on="actual_column",
+        index=CHARGE_GROUP_COLUMNS,
+        values="amount",
     )
 
     # Ensure all actual columns exist (fill missing with 0)
@@ -450,6 +451,7 @@ def join_with_pcs(
 def run_pipeline(
     orderids: list[int],
     start_date: str | None = None,
+    chunk_rows: int | None = None,
 ) -> pl.DataFrame:
     """
     Run the full actuals pipeline for given orderids.
@@ -458,6 +460,10 @@ def run_pipeline(
     1. Home Delivery etc. matched via tracking number
     2. SmartPost matched via original_customer_reference (ordernumber / shopreferencenumber1)
 
+    With chunk_rows, invoice charges are streamed and summed chunk by chunk
+    instead (see load_invoice_charge_sums), so the raw charge rows are never
+    all in memory.
+
     Returns DataFrame ready for upload with UPLOAD_COLUMNS.
     """
     if not orderids:
@@ -476,19 +482,31 @@ def run_pipeline(
     print("  Getting ship dates...")
     ship_dates_df = get_ship_dates(orderids)
 
-    # Step 3: Load ALL invoice data in a single query
+    # Step 3: Load ALL invoice data in a single query (or stream it)
     min_ship = ship_dates_df["ship_date"].min() if len(ship_dates_df) > 0 else None
     invoice_start = (min_ship - timedelta(days=30)).strftime("%Y-%m-%d") if min_ship else start_date
-    print(f"  Loading all invoice data from {invoice_start} (single query)...")
-    invoice_df = load_all_invoice_data(invoice_start)
-    if len(invoice_df) == 0:
-        print("  No invoice data found")
-        return pl.DataFrame()
-    print(f"  Found {len(invoice_df):,} charge records")
-
-    # Step 4: Map charges and pivot to one row per shipment
-    print("  Mapping charges and pivoting...")
-    pivoted_df = map_and_pivot_charges(invoice_df)
+    if chunk_rows:
+        print(f"  Streaming all invoice data from {invoice_start} ({chunk_rows:,} rows per chunk)...")
+        charge_sums = load_invoice_charge_sums(invoice_start, chunk_rows)
+        if len(charge_sums) == 0:
+            print("  No invoice data found")
+            return pl.DataFrame()
+        print(f"  Summed to {len(charge_sums):,} shipment charges")
+
+        # Step 4: Pivot to one row per shipment (charges already mapped)
+        print("  Pivoting...")
+        pivoted_df = _pivot_charges(charge_sums)
+    else:
+        print(f"  Loading all invoice data from {invoice_start} (single query)...")
+        invoice_df = load_all_invoice_data(invoice_start)
+        if len(invoice_df) == 0:
+            print("  No invoice data found")
+            return pl.DataFrame()
+        print(f"  Found {len(invoice_df):,} charge records")
+
+        # Step 4: Map charges and pivot to one row per shipment
+        print("  Mapping charges and pivoting...")
+        pivoted_df = map_and_pivot_charges(invoice_df)
     if len(pivoted_df) == 0:
         print("  No data after pivot")
         return pl.DataFrame()
@@ -544,7 +562,12 @@ def run_pipeline(
 # MODE HANDLERS
 # =============================================================================
 
-def run_full_mode(batch_size: int, dry_run: bool) -> int:
+def run_full_mode(
+    batch_size: int,
+    dry_run: bool,
+    chunk_rows: int | None = None,
+    run_id: str | None = None,
+) -> int:
     """Full mode: Delete all actuals, repull from invoices."""
     print("=" * 60)
     print("FULL MODE - ACTUAL COSTS")
@@ -558,11 +581,15 @@ def run_full_mode(batch_size: int, dry_run: bool) -> int:
         print("\nNo orders found in expected table.")
         return 0
 
-    print("\nStep 2: Deleting all existing actuals...")
-    deleted = delete_all(dry_run=dry_run)
+    if run_id and UploadCheckpoint(TABLE_NAME, run_id).exists():
+        print(f"\nStep 2: Resuming upload {run_id!r}, keeping actuals already uploaded...")
+        deleted = 0
+    else:
+        print("\nStep 2: Deleting all existing actuals...")
+        deleted = delete_all(dry_run=dry_run)
 
     print("\nStep 3: Processing invoice data...")
-    df = run_pipeline(orderids)
+    df = run_pipeline(orderids, chunk_rows=chunk_rows)
 
     if len(df) == 0:
         print("\nNo invoice data found.")
@@ -582,12 +609,17 @@ def run_full_mode(batch_size: int, dry_run: bool) -> int:
 
     # Upload
     print(f"\nStep 4: Uploading to {TABLE_NAME}...")
-    push_data(df, TABLE_NAME, batch_size=batch_size)
+    push_data(df, TABLE_NAME, batch_size=batch_size, keys=["pcs_orderid"], run_id=run_id)
 
     return len(df)
 
 
-def run_incremental_mode(limit: int | None, batch_size: int, dry_run: bool) -> int:
+def run_incremental_mode(
+    limit: int | None,
+    batch_size: int,
+    dry_run: bool,
+    chunk_rows: int | None = None,
+) -> int:
     """Incremental mode: Only process orders without actuals."""
     print("=" * 60)
     print("INCREMENTAL MODE - ACTUAL COSTS")
@@ -602,7 +634,7 @@ def run_incremental_mode(limit: int | None, batch_size: int, dry_run: bool) -> i
         return 0
 
     print("\nStep 2: Processing invoice data...")
-    df = run_pipeline(orderids)
+    df = run_pipeline(orderids, chunk_rows=chunk_rows)
 
     if len(df) == 0:
         print("\nNo invoice data found for these orders.")
@@ -627,8 +659,8 @@ def run_incremental_mode(limit: int | None, batch_size: int, dry_run: bool) -> i
     return len(df)
 
 
-def run_days_mode(days: int, batch_size: int, dry_run: bool) -> int:
-    """Days mode: Delete and repull actuals for last N days."""
+def run_days_mode(days: int, batch_size: int, dry_run: bool, chunk_rows: int | None = None) -> int:
+    """Days mode: Repull actuals for last N days, merge changes."""
     print("=" * 60)
     print(f"DAYS MODE ({days} days) - ACTUAL COSTS")
     print("=" * 60)
@@ -643,11 +675,12 @@ def run_days_mode(days: int, batch_size: int, dry_run: bool) -> int:
         print("\nNo orders found for this date range.")
         return 0
 
-    print(f"\nStep 2: Deleting existing actuals for these orders...")
-    deleted = delete_for_orderids(orderids, dry_run=dry_run)
+    print(f"\nStep 2: Counting existing actuals for these orders...")
+    existing = get_row_count_for_orderids(orderids)
+    print(f"  {existing:,} existing rows")
 
     print(f"\nStep 3: Processing invoice data...")
-    df = run_pipeline(orderids, start_date=start_date)
+    df = run_pipeline(orderids, start_date=start_date, chunk_rows=chunk_rows)
 
     if len(df) == 0:
         print("\nNo invoice data found.")
@@ -657,19 +690,19 @@ def run_days_mode(days: int, batch_size: int, dry_run: bool) -> int:
     print("\n" + "=" * 60)
     print("UPLOAD SUMMARY")
     print("=" * 60)
-    print(f"Rows deleted: {deleted:,}")
-    print(f"New rows to upload: {len(df):,}")
-    print(f"Net change: {len(df) - deleted:+,}")
+    print(f"Existing rows: {existing:,}")
+    print(f"Repulled rows: {len(df):,}")
+    print(f"Net change: {len(df) - existing:+,}")
     print(f"Date range: {start_date} to today ({days} days)")
     print(f"Total actual cost: ${df['actual_net_charge'].sum():,.2f}")
 
     if dry_run:
-        print(f"\n[DRY RUN] Would upload to: {TABLE_NAME}")
+        print(f"\n[DRY RUN] Would merge into: {TABLE_NAME}")
         return len(df)
 
-    # Upload
-    print(f"\nStep 4: Uploading to {TABLE_NAME}...")
-    push_data(df, TABLE_NAME, batch_size=batch_size)
+    # Merge: only new and changed orders are written
+    print(f"\nStep 4: Merging into {TABLE_NAME}...")
+    merge_for_orders_from_date(df, start_date, batch_size)
 
     return len(df)
 
@@ -686,7 +719,7 @@ def main():
 Modes:
   --full          Full refresh - delete all actuals and repull from invoices
   --incremental   Only process orders without actuals (insert only)
-  --days N        Delete and repull actuals for last N days
+  --days N        Repull actuals for last N days and merge changes
 
 Examples:
   python -m carriers.fedex.scripts.upload_actuals --full
@@ -694,6 +727,7 @@ Examples:
   python -m carriers.fedex.scripts.upload_actuals --incremental --limit 1000
   python -m carriers.fedex.scripts.upload_actuals --days 30
   python -m carriers.fedex.scripts.upload_actuals --full --dry-run
+  python -m carriers.fedex.scripts.upload_actuals --full --chunk-rows 500000
         """
     )
 
@@ -713,7 +747,7 @@ Examples:
         "--days",
         type=int,
         metavar="N",
-        help="Delete and repull actuals for last N days"
+        help="Repull actuals for last N days and merge changes"
     )
 
     # Common options
@@ -729,11 +763,24 @@ Examples:
         default=5000,
         help="Number of rows per INSERT batch (default: 5000)"
     )
+    parser.add_argument(
+        "--run-id",
+        type=str,
+        default=None,
+        help="Full mode: commit in groups and checkpoint progress under this id; "
+             "rerun with the same id to resume a failed upload"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Don't modify database, just show what would happen"
     )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        metavar="N",
+        help="Stream invoice charges N rows at a time instead of one query"
+    )
 
     args = parser.parse_args()
 
@@ -743,18 +790,22 @@ Examples:
             rows = run_full_mode(
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                chunk_rows=args.chunk_rows,
+                run_id=args.run_id,
             )
         elif args.incremental:
             rows = run_incremental_mode(
                 limit=args.limit,
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                chunk_rows=args.chunk_rows,
             )
         else:  # args.days
             rows = run_days_mode(
                 days=args.days,
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                chunk_rows=args.chunk_rows,
             )
 
         # Final summary
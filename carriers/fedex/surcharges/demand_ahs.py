@@ -55,6 +55,11 @@ class DEM_AHS(Surcharge):
         in_demand_period = in_period(cls.period_start, cls.period_end)
         return has_ahs & in_demand_period
 
+    @classmethod
+    def periods(cls) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """Demand period and its phase 2 (cost() checks both)."""
+        return [(cls.period_start, cls.period_end), (cls.PHASE_2_START, cls.PHASE_2_END)]
+
     @classmethod
     def cost(cls) -> pl.Expr:
         """
@@ -54,6 +54,11 @@ class DEM_Base(Surcharge):
         in_demand_period = in_period(cls.period_start, cls.period_end)
         return is_home_delivery & in_demand_period
 
+    @classmethod
+    def periods(cls) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """Demand period and its phase 2 (cost() checks both)."""
+        return [(cls.period_start, cls.period_end), (cls.PHASE_2_START, cls.PHASE_2_END)]
+
     @classmethod
     def cost(cls) -> pl.Expr:
         """
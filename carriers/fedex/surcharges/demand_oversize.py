@@ -48,6 +48,11 @@ class DEM_Oversize(Surcharge):
         """Triggers when Oversize flag is set and within demand period."""
         return pl.col("surcharge_oversize") & in_period(cls.period_start, cls.period_end)
 
+    @classmethod
+    def periods(cls) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """Demand period and its phase 2 (cost() checks both)."""
+        return [(cls.period_start, cls.period_end), (cls.PHASE_2_START, cls.PHASE_2_END)]
+
     @classmethod
     def cost(cls) -> pl.Expr:
         """
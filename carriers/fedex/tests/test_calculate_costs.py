@@ -10,9 +10,16 @@ from datetime import date
 
 from carriers.fedex.calculate_costs import (
     calculate_costs,
+    calculate_services,
     supplement_shipments,
     calculate,
 )
+from carriers.fedex.data.reference import (
+    load_rate_cube,
+    load_undiscounted_rates,
+    RATE_TABLES,
+    _load_rate_table,
+)
 
 
 # =============================================================================
@@ -168,6 +175,68 @@ class TestCalculateCosts:
         for col in base_shipment.columns:
             assert col in df.columns
 
+    def test_lazy_matches_eager(self, base_shipment, large_shipment):
+        """A LazyFrame input returns a LazyFrame that collects to the eager result."""
+        shipments = pl.concat([base_shipment, large_shipment])
+
+        result = calculate_costs(shipments.lazy())
+
+        assert isinstance(result, pl.LazyFrame)
+        assert result.collect(engine="streaming").equals(calculate_costs(shipments))
+
+    def test_dedup_matches_direct(self, base_shipment, large_shipment):
+        """Deduplicated rating broadcasts the same costs to repeated shipments."""
+        repeated = base_shipment.with_columns(pl.lit(date(2025, 6, 20)).alias("ship_date"))
+        peak = base_shipment.with_columns(pl.lit(date(2025, 12, 1)).alias("ship_date"))
+        shipments = pl.concat([base_shipment, large_shipment, repeated, peak])
+
+        assert calculate_costs(shipments, dedup=True).equals(calculate_costs(shipments))
+
+    def test_services_match_single_service_runs(self, base_shipment, large_shipment):
+        """hd_*/sp_* columns equal separate runs per service, and the cheaper is selected."""
+        shipments = pl.concat([base_shipment, large_shipment])
+        hd = calculate_costs(shipments.with_columns(pl.lit("FXEHD").alias("pcs_shipping_provider")))
+        sp = calculate_costs(shipments.with_columns(pl.lit("FXSP").alias("pcs_shipping_provider")))
+
+        result = calculate_services(shipments)
+
+        for col in ["rate_service", "das_zone", "billable_weight_lbs", "cost_base_rate", "cost_total"]:
+            assert result[f"hd_{col}"].equals(hd[col])
+            assert result[f"sp_{col}"].equals(sp[col])
+        # 5 lb package: SmartPost cheaper; 75 lb package: over the SmartPost max
+        assert result["service_selected"].to_list() == ["FXSP", "FXEHD"]
+        assert result["cost_total"].to_list() == [sp["cost_total"][0], hd["cost_total"][1]]
+
+
+# =============================================================================
+# TESTS: RATE CUBE
+# =============================================================================
+
+class TestRateCube:
+    """Tests for the dense base-rate lookup."""
+
+    def test_cube_matches_rate_tables(self):
+        """Every cell of every long rate table is present in the cube."""
+        cube = load_rate_cube()
+
+        for service_idx, service in enumerate(cube.services):
+            for layer, table_name in enumerate(RATE_TABLES):
+                table = _load_rate_table(service, table_name)
+                zone_idx = [cube.zones.index(z) for z in table["zone"].to_list()]
+                weight_idx = (table["weight_lbs"] - 1).to_list()
+                cells = cube.values[layer, service_idx, zone_idx, weight_idx]
+                assert cells.tolist() == table["rate"].to_list()
+
+    def test_base_rate_matches_table(self, base_shipment):
+        """Looked-up base rate equals the rate table entry for zone and weight."""
+        result = calculate_costs(base_shipment)
+        row = result.row(0, named=True)
+
+        expected = load_undiscounted_rates("Home Delivery").filter(
+            (pl.col("weight_lbs") == 5) & (pl.col("zone") == int(row["shipping_zone"]))
+        )["rate"].item()
+        assert row["cost_base_rate"] == expected
+
 
 # =============================================================================
 # TESTS: DAS SURCHARGE
@@ -5,6 +5,10 @@ DataFrame in, DataFrame out. The input can come from any source (PCS database,
 CSV, manual creation) as long as it contains the required columns. The output
 is the same DataFrame with calculation columns and costs appended.
 
+A pl.LazyFrame is accepted as well and returns a LazyFrame: the calculation
+is then added to the caller's query plan (e.g. on top of pl.scan_parquet)
+and runs when collected, optionally with collect(engine="streaming").
+
 REQUIRED INPUT COLUMNS
 ----------------------
     ship_date           - Date for rate lookups
@@ -36,10 +40,15 @@ USAGE
 
 import polars as pl
 
+from shared.rating import Frame, add_dimensions, require_not_null, lookup_brackets, canonical_zip, rate_unique
+from shared.reference import ZipIndex
+from shared.surcharges import apply_surcharges
+
 from .version import VERSION
 from .data import (
     load_rates,
-    load_zones,
+    load_zone_index,
+    build_zone_index,
     DIM_FACTOR,
     DIM_THRESHOLD,
     THRESHOLD_FIELD,
@@ -49,19 +58,30 @@ from .surcharges import (
     ALL,
     BASE,
     DEPENDENT,
-    get_exclusivity_group,
-    get_unique_exclusivity_groups,
 )
 
 
+# Cost-determining inputs, canonicalized, for calculate_costs(dedup=True).
+# The ship date enters only through the seasonal windows the calculator checks.
+RATING_KEY = [
+    canonical_zip(3),
+    pl.col("length_in"),
+    pl.col("width_in"),
+    pl.col("height_in"),
+    pl.col("weight_lbs"),
+]
+RATING_DATE_FLAGS = []
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
 def calculate_costs(
-    df: pl.DataFrame,
-    zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+    df: Frame,
+    zones: pl.DataFrame | None = None,
+    dedup: bool = False,
+) -> Frame:
     """
     Calculate shipping costs for a shipment DataFrame.
 
@@ -69,12 +89,21 @@ def calculate_costs(
     the same DataFrame with all calculation columns and costs appended.
 
     Args:
-        df: Raw shipment DataFrame with required columns (see module docstring)
+        df: Raw shipment DataFrame or LazyFrame with required columns (see module docstring)
         zones: Zone mapping DataFrame (loaded from zones.csv if not provided)
+        dedup: Rate each unique RATING_KEY once and join the results back
+            (see shared.rating.dedup)
 
     Returns:
-        DataFrame with supplemented data, surcharge flags, and costs
+        DataFrame (LazyFrame for lazy input) with supplemented data,
+        surcharge flags, and costs
     """
+    if dedup:
+        df, _ = rate_unique(
+            df, lambda keys: calculate_costs(keys, zones), RATING_KEY, RATING_DATE_FLAGS
+        )
+        return df
+
     df = supplement_shipments(df, zones)
     df = calculate(df)
     return df
@@ -85,9 +114,9 @@ def calculate_costs(
 # =============================================================================
 
 def supplement_shipments(
-    df: pl.DataFrame,
+    df: Frame,
     zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+) -> Frame:
     """
     Supplement shipment data with zone and weight calculations.
 
@@ -101,43 +130,26 @@ def supplement_shipments(
             - shipping_zone
             - dim_weight_lbs, uses_dim_weight, billable_weight_lbs
     """
-    if zones is None:
-        zones = load_zones()
+    zone_index = load_zone_index() if zones is None else build_zone_index(zones)
 
     df = _add_calculated_dimensions(df)
-    df = _lookup_zones(df, zones)
+    df = _lookup_zones(df, zone_index)
     df = _add_billable_weight(df)
 
     return df
 
 
-def _add_calculated_dimensions(df: pl.DataFrame) -> pl.DataFrame:
-    """Add calculated dimensional columns.
+def _add_calculated_dimensions(df: Frame) -> Frame:
+    """
+    Add calculated dimensional columns.
 
-    Note: Dimensions are rounded to 1 decimal place to avoid floating point
-    precision issues when comparing against surcharge thresholds.
+    Uses the shared dimension stage (rounded to 1 decimal, see
+    shared.rating.dimensions); columns already present are kept as-is.
     """
-    return df.with_columns([
-        # Cubic inches (rounded to whole number)
-        (pl.col("length_in") * pl.col("width_in") * pl.col("height_in"))
-        .round(0)
-        .alias("cubic_in"),
-
-        # Longest dimension (rounded to 1 decimal)
-        pl.max_horizontal("length_in", "width_in", "height_in")
-        .round(1)
-        .alias("longest_side_in"),
-
-        # Second longest dimension (rounded to 1 decimal)
-        pl.concat_list(["length_in", "width_in", "height_in"])
-        .list.sort(descending=True)
-        .list.get(1)
-        .round(1)
-        .alias("second_longest_in"),
-    ])
+    return add_dimensions(df, ["cubic_in", "longest_side_in", "second_longest_in"])
 
 
-def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
+def _lookup_zones(df: Frame, zone_index: ZipIndex) -> Frame:
     """
     Add zone data to shipments based on 3-digit ZIP prefix.
 
@@ -149,39 +161,17 @@ def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
     1. Exact 3-digit ZIP prefix match from zones.csv
     2. Mode zone across all entries (most common zone)
     3. Default zone 5 (mid-range, minimizes worst-case pricing error)
-    """
-    # Extract 3-digit ZIP prefix
-    df = df.with_columns(
-        pl.col("shipping_zip_code")
-        .cast(pl.Utf8)
-        .str.slice(0, 3)
-        .str.zfill(3)
-        .alias("_zip_prefix")
-    )
 
-    # Calculate mode zone for fallback
-    mode_zone = (
-        zones
-        .select(pl.col("zone").mode().first())
-        .item()
-    )
-
-    # Join on ZIP prefix
-    df = df.join(zones, left_on="_zip_prefix", right_on="zip_prefix", how="left")
-
-    # Apply fallback: use mode zone if no match, then default to 5
-    df = df.with_columns(
-        pl.coalesce([pl.col("zone"), pl.lit(mode_zone), pl.lit(5)])
-        .alias("shipping_zone")
-    )
+    Both fallbacks are precomputed in the ZIP index (see build_zone_index).
+    """
+    df = df.with_columns(zone_index.slot())
 
-    # Drop intermediate columns
-    df = df.drop(["_zip_prefix", "zone"])
+    df = df.with_columns(zone_index.lookup("zone").alias("shipping_zone"))
 
-    return df
+    return df.drop(zone_index.slot_column)
 
 
-def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
+def _add_billable_weight(df: Frame) -> Frame:
     """
     Calculate dimensional weight and billable weight.
 
@@ -214,7 +204,7 @@ def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
 # CALCULATE COSTS
 # =============================================================================
 
-def calculate(df: pl.DataFrame) -> pl.DataFrame:
+def calculate(df: Frame) -> Frame:
     """
     Calculate shipping costs for supplemented shipments.
 
@@ -231,11 +221,11 @@ def calculate(df: pl.DataFrame) -> pl.DataFrame:
         4. Totals               - sum up all costs
     """
     # Phase 1: Apply base surcharges (don't reference other surcharge flags)
-    df = _apply_surcharges(df, BASE)
+    df = apply_surcharges(df, BASE)
 
     # Phase 2: Apply dependent surcharges (reference flags from phase 1)
     # Note: Maersk US has no dependent surcharges currently
-    df = _apply_surcharges(df, DEPENDENT)
+    df = apply_surcharges(df, DEPENDENT)
 
     # Phase 3: Look up base shipping rate
     df = _lookup_base_rate(df)
@@ -250,143 +240,46 @@ def calculate(df: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
-def _apply_surcharges(df: pl.DataFrame, surcharges: list) -> pl.DataFrame:
-    """
-    Apply surcharges, handling mutual exclusivity within exclusivity groups.
-
-    Surcharges with the same exclusivity_group compete - only highest priority wins.
-    Surcharges without exclusivity_group are applied independently.
-    """
-    # Separate standalone vs exclusive surcharges
-    standalone = [s for s in surcharges if s.exclusivity_group is None]
-    exclusive = [s for s in surcharges if s.exclusivity_group is not None]
-
-    # Apply standalone surcharges (no competition)
-    for s in standalone:
-        df = _apply_single_surcharge(df, s)
-
-    # Apply exclusive surcharges by group
-    for group_name in get_unique_exclusivity_groups(exclusive):
-        df = _apply_exclusive_group(df, group_name)
-
-    return df
-
-
-def _apply_single_surcharge(df: pl.DataFrame, surcharge) -> pl.DataFrame:
-    """Apply a single surcharge without competition."""
-    flag_col = f"surcharge_{surcharge.name.lower()}"
-    cost_col = f"cost_{surcharge.name.lower()}"
-
-    df = df.with_columns(surcharge.conditions().alias(flag_col))
-
-    # Handle both fixed cost and expression-based cost (like PICKUP)
-    cost_expr = surcharge.cost()
-    if isinstance(cost_expr, pl.Expr):
-        df = df.with_columns(
-            pl.when(pl.col(flag_col))
-            .then(cost_expr)
-            .otherwise(pl.lit(0.0))
-            .alias(cost_col)
-        )
-    else:
-        df = df.with_columns(
-            pl.when(pl.col(flag_col))
-            .then(pl.lit(cost_expr))
-            .otherwise(pl.lit(0.0))
-            .alias(cost_col)
-        )
-
-    return df
-
-
-def _apply_exclusive_group(df: pl.DataFrame, group_name: str) -> pl.DataFrame:
-    """
-    Apply mutually exclusive surcharges within a group.
-
-    Only the highest priority surcharge (lowest number) that matches wins.
-    """
-    group = get_exclusivity_group(group_name)
-    exclusion_mask = pl.lit(False)
-
-    for surcharge in group:
-        flag_col = f"surcharge_{surcharge.name.lower()}"
-        cost_col = f"cost_{surcharge.name.lower()}"
-
-        # Applies only if: conditions met AND no higher priority already matched
-        applies = surcharge.conditions() & ~exclusion_mask
-
-        df = df.with_columns(applies.alias(flag_col))
-
-        # Handle both fixed cost and expression-based cost
-        cost_expr = surcharge.cost()
-        if isinstance(cost_expr, pl.Expr):
-            df = df.with_columns(
-                pl.when(pl.col(flag_col))
-                .then(cost_expr)
-                .otherwise(pl.lit(0.0))
-                .alias(cost_col)
-            )
-        else:
-            df = df.with_columns(
-                pl.when(pl.col(flag_col))
-                .then(pl.lit(cost_expr))
-                .otherwise(pl.lit(0.0))
-                .alias(cost_col)
-            )
-
-        # Update exclusion mask: if this one matched, exclude the rest
-        exclusion_mask = exclusion_mask | pl.col(flag_col)
-
-    return df
-
-
-def _lookup_base_rate(df: pl.DataFrame) -> pl.DataFrame:
+def _lookup_base_rate(df: Frame) -> Frame:
     """Look up base shipping rate by zone and weight bracket."""
-    input_count = len(df)
     rates = load_rates()
 
     df = df.with_columns(pl.col("shipping_zone").cast(pl.Int64))
-    df = df.with_row_index("_row_id")
-
-    df = (
-        df
-        .join(rates, left_on="shipping_zone", right_on="zone", how="left")
-        .filter(
-            (pl.col("billable_weight_lbs") > pl.col("weight_lbs_lower")) &
-            (pl.col("billable_weight_lbs") <= pl.col("weight_lbs_upper"))
-        )
-        .rename({"rate": "cost_base"})
-    )
 
-    output_count = len(df)
-    if output_count < input_count:
-        missing_count = input_count - output_count
-        raise ValueError(
-            f"{missing_count} shipment(s) have no matching rate bracket. "
-            f"Check shipping_zone and billable_weight_lbs values. "
-            f"Maersk US max weight is 70 lbs."
-        )
+    df = lookup_brackets(
+        df,
+        rates,
+        on=("shipping_zone", "zone"),
+        value="billable_weight_lbs",
+        columns={"rate": "cost_base"},
+    )
 
-    df = df.drop(["weight_lbs_lower", "weight_lbs_upper"])
-    df = df.sort("_row_id").drop("_row_id")
+    df = require_not_null(
+        df,
+        "cost_base",
+        "{missing_count} row(s) have no matching rate bracket "
+        "(shipments, or unique rating keys under dedup). "
+        "Check shipping_zone and billable_weight_lbs values. "
+        "Maersk US max weight is 70 lbs.",
+    )
 
     return df
 
 
-def _calculate_subtotal(df: pl.DataFrame) -> pl.DataFrame:
+def _calculate_subtotal(df: Frame) -> Frame:
     """Calculate cost_subtotal as sum of base rate and surcharges."""
     cost_cols = ["cost_base"] + [f"cost_{s.name.lower()}" for s in ALL]
     return df.with_columns(pl.sum_horizontal(cost_cols).alias("cost_subtotal"))
 
 
-def _calculate_total(df: pl.DataFrame) -> pl.DataFrame:
+def _calculate_total(df: Frame) -> Frame:
     """Calculate cost_total (same as subtotal for Maersk US - no fuel surcharge)."""
     return df.with_columns(
         pl.col("cost_subtotal").alias("cost_total")
     )
 
 
-def _stamp_version(df: pl.DataFrame) -> pl.DataFrame:
+def _stamp_version(df: Frame) -> Frame:
     """Stamp calculator version on output."""
     return df.with_columns(pl.lit(VERSION).alias("calculator_version"))
 
@@ -5,6 +5,10 @@ DataFrame in, DataFrame out. The input can come from any source (PCS database,
 CSV, manual creation) as long as it contains the required columns. The output
 is the same DataFrame with calculation columns and costs appended.
 
+A pl.LazyFrame is accepted as well and returns a LazyFrame: the calculation
+is then added to the caller's query plan (e.g. on top of pl.scan_parquet)
+and runs when collected, optionally with collect(engine="streaming").
+
 REQUIRED INPUT COLUMNS
 ----------------------
     ship_date           - Date for demand period checks
@@ -36,9 +40,14 @@ USAGE
 
 import polars as pl
 
+from shared.rating import Frame, add_dimensions, require_not_null, lookup_brackets, canonical_zip, rate_unique
+from shared.reference import ZipIndex
+from shared.surcharges import apply_surcharges, period_flags
+
 from .data import (
     load_rates,
-    load_zones,
+    load_zone_index,
+    build_zone_index,
     FUEL_RATE,
     DIM_FACTOR,
     DIM_THRESHOLD,
@@ -49,20 +58,33 @@ from .surcharges import (
     ALL,
     BASE,
     DEPENDENT,
-    get_exclusivity_group,
-    get_unique_exclusivity_groups,
 )
 from .version import VERSION
 
 
+# Cost-determining inputs, canonicalized, for calculate_costs(dedup=True).
+# The ship date enters only through the seasonal windows the calculator checks.
+RATING_KEY = [
+    pl.col("production_site"),
+    pl.col("shipping_region"),
+    canonical_zip(5),
+    pl.col("length_in"),
+    pl.col("width_in"),
+    pl.col("height_in"),
+    pl.col("weight_lbs"),
+]
+RATING_DATE_FLAGS = period_flags(ALL)
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
 def calculate_costs(
-    df: pl.DataFrame,
-    zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+    df: Frame,
+    zones: pl.DataFrame | None = None,
+    dedup: bool = False,
+) -> Frame:
     """
     Calculate shipping costs for a shipment DataFrame.
 
@@ -70,12 +92,21 @@ def calculate_costs(
     the same DataFrame with all calculation columns and costs appended.
 
     Args:
-        df: Raw shipment DataFrame with required columns (see module docstring)
+        df: Raw shipment DataFrame or LazyFrame with required columns (see module docstring)
         zones: Zone mapping DataFrame (loaded from zones.csv if not provided)
+        dedup: Rate each unique RATING_KEY once and join the results back
+            (see shared.rating.dedup)
 
     Returns:
-        DataFrame with supplemented data, surcharge flags, and costs
+        DataFrame (LazyFrame for lazy input) with supplemented data,
+        surcharge flags, and costs
     """
+    if dedup:
+        df, _ = rate_unique(
+            df, lambda keys: calculate_costs(keys, zones), RATING_KEY, RATING_DATE_FLAGS
+        )
+        return df
+
     df = supplement_shipments(df, zones)
     df = calculate(df)
     return df
@@ -86,9 +117,9 @@ def calculate_costs(
 # =============================================================================
 
 def supplement_shipments(
-    df: pl.DataFrame,
+    df: Frame,
     zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+) -> Frame:
     """
     Supplement shipment data with zone and weight calculations.
 
@@ -102,54 +133,26 @@ def supplement_shipments(
             - shipping_zone, das_zone
             - dim_weight_lbs, uses_dim_weight, billable_weight_lbs
     """
-    if zones is None:
-        zones = load_zones()
+    zone_index = load_zone_index() if zones is None else build_zone_index(zones)
 
     df = _add_calculated_dimensions(df)
-    df = _lookup_zones(df, zones)
+    df = _lookup_zones(df, zone_index)
     df = _add_billable_weight(df)
 
     return df
 
 
-def _add_calculated_dimensions(df: pl.DataFrame) -> pl.DataFrame:
-    """Add calculated dimensional columns.
+def _add_calculated_dimensions(df: Frame) -> Frame:
+    """
+    Add calculated dimensional columns.
 
-    Note: Dimensions are rounded to 1 decimal place to avoid floating point
-    precision issues when comparing against surcharge thresholds. For example,
-    762mm converts to 30.0000001980" which would incorrectly trigger the
-    AHS threshold of >30" without rounding.
+    Uses the shared dimension stage (rounded to 1 decimal, see
+    shared.rating.dimensions); columns already present are kept as-is.
     """
-    return df.with_columns([
-        # Cubic inches (rounded to whole number)
-        (pl.col("length_in") * pl.col("width_in") * pl.col("height_in"))
-        .round(0)
-        .alias("cubic_in"),
-
-        # Longest dimension (rounded to 1 decimal)
-        pl.max_horizontal("length_in", "width_in", "height_in")
-        .round(1)
-        .alias("longest_side_in"),
-
-        # Second longest dimension (rounded to 1 decimal)
-        pl.concat_list(["length_in", "width_in", "height_in"])
-        .list.sort(descending=True)
-        .list.get(1)
-        .round(1)
-        .alias("second_longest_in"),
-
-        # Length + Girth (longest + 2 * sum of other two, rounded to 1 decimal)
-        (
-            pl.max_horizontal("length_in", "width_in", "height_in") +
-            2 * (
-                pl.col("length_in") + pl.col("width_in") + pl.col("height_in") -
-                pl.max_horizontal("length_in", "width_in", "height_in")
-            )
-        ).round(1).alias("length_plus_girth"),
-    ])
+    return add_dimensions(df, ["cubic_in", "longest_side_in", "second_longest_in", "length_plus_girth"])
 
 
-def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
+def _lookup_zones(df: Frame, zone_index: ZipIndex) -> Frame:
     """
     Add zone data to shipments based on shipping ZIP code.
 
@@ -164,65 +167,29 @@ def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
     1. Exact ZIP code match from zones.csv
     2. State-level mode (most common zone for that state)
     3. Default zone 5 (mid-range, minimizes worst-case pricing error)
-    """
-    # Normalize ZIP code to 5 digits with leading zeros
-    df = df.with_columns(
-        pl.col("shipping_zip_code")
-        .cast(pl.Utf8)
-        .str.slice(0, 5)
-        .str.zfill(5)
-        .alias("_zip_normalized")
-    )
-
-    zones_subset = zones.select(["zip_code", "das", "shipping_state", "phx_zone", "cmh_zone"])
-
-    # State-level fallback (mode zone per state)
-    state_zones = (
-        zones
-        .group_by("shipping_state")
-        .agg([
-            pl.col("phx_zone").mode().first().alias("_state_phx_zone"),
-            pl.col("cmh_zone").mode().first().alias("_state_cmh_zone"),
-            pl.lit("NO").alias("_state_das"),
-        ])
-    )
-
-    # Join on ZIP code
-    df = df.join(zones_subset, left_on="_zip_normalized", right_on="zip_code", how="left")
 
-    # Join state fallback
-    df = df.join(state_zones, left_on="shipping_region", right_on="shipping_state", how="left")
+    Both fallbacks are precomputed in the ZIP index (see build_zone_index).
+    """
+    df = df.with_columns(zone_index.slot())
 
-    # Coalesce: ZIP zone -> state zone -> default zone 5
     df = df.with_columns([
-        pl.coalesce(["phx_zone", "_state_phx_zone", pl.lit(5)]).alias("_phx_zone_final"),
-        pl.coalesce(["cmh_zone", "_state_cmh_zone", pl.lit(5)]).alias("_cmh_zone_final"),
-        pl.coalesce(["das", "_state_das"]).alias("das_zone"),
-    ])
+        # Raw DAS tier from zones.csv, and with the state fallback applied
+        zone_index.get("das").alias("das"),
+        zone_index.lookup("das").alias("das_zone"),
 
-    # Select zone based on production site
-    df = df.with_columns(
+        # Select zone based on production site
         pl.when(pl.col("production_site") == "Phoenix")
-        .then(pl.col("_phx_zone_final"))
+        .then(zone_index.lookup("phx_zone"))
         .when(pl.col("production_site") == "Columbus")
-        .then(pl.col("_cmh_zone_final"))
+        .then(zone_index.lookup("cmh_zone"))
         .otherwise(pl.lit(5))
-        .alias("shipping_zone")
-    )
-
-    # Drop intermediate columns
-    df = df.drop([
-        "_zip_normalized",
-        "phx_zone", "cmh_zone",
-        "_state_phx_zone", "_state_cmh_zone", "_state_das",
-        "_phx_zone_final", "_cmh_zone_final",
-        "shipping_state",
+        .alias("shipping_zone"),
     ])
 
-    return df
+    return df.drop(zone_index.slot_column)
 
 
-def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
+def _add_billable_weight(df: Frame) -> Frame:
     """
     Calculate dimensional weight and billable weight.
 
@@ -254,7 +221,7 @@ def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
 # CALCULATE COSTS
 # =============================================================================
 
-def calculate(df: pl.DataFrame) -> pl.DataFrame:
+def calculate(df: Frame) -> Frame:
     """
     Calculate shipping costs for supplemented shipments.
 
@@ -269,10 +236,10 @@ def calculate(df: pl.DataFrame) -> pl.DataFrame:
         2. DEPENDENT surcharges - reference flags from phase 1 (via depends_on)
     """
     # Phase 1: Apply base surcharges (don't reference other surcharge flags)
-    df = _apply_surcharges(df, BASE)
+    df = apply_surcharges(df, BASE)
 
     # Phase 2: Apply dependent surcharges (reference flags from phase 1)
-    df = _apply_surcharges(df, DEPENDENT)
+    df = apply_surcharges(df, DEPENDENT)
 
     # Phase 3: Adjust billable weights based on triggered surcharges
     df = _apply_min_billable_weights(df)
@@ -291,83 +258,7 @@ def calculate(df: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
-def _apply_surcharges(df: pl.DataFrame, surcharges: list) -> pl.DataFrame:
-    """
-    Apply surcharges, handling mutual exclusivity within exclusivity groups.
-
-    Surcharges with the same exclusivity_group compete - only highest priority wins.
-    Surcharges without exclusivity_group are applied independently.
-    """
-    # Separate standalone vs exclusive surcharges
-    standalone = [s for s in surcharges if s.exclusivity_group is None]
-    exclusive = [s for s in surcharges if s.exclusivity_group is not None]
-
-    # Apply standalone surcharges (no competition)
-    for s in standalone:
-        df = _apply_single_surcharge(df, s)
-
-    # Apply exclusive surcharges by group
-    for group_name in get_unique_exclusivity_groups(exclusive):
-        df = _apply_exclusive_group(df, group_name)
-
-    return df
-
-
-def _apply_single_surcharge(df: pl.DataFrame, surcharge) -> pl.DataFrame:
-    """Apply a single surcharge without competition."""
-    flag_col = f"surcharge_{surcharge.name.lower()}"
-    cost_col = f"cost_{surcharge.name.lower()}"
-
-    # cost() may return float or pl.Expr (for conditional costs like AHS borderline)
-    cost_value = surcharge.cost()
-    cost_expr = cost_value if isinstance(cost_value, pl.Expr) else pl.lit(cost_value)
-
-    df = df.with_columns(surcharge.conditions().alias(flag_col))
-    df = df.with_columns(
-        pl.when(pl.col(flag_col))
-        .then(cost_expr)
-        .otherwise(pl.lit(0.0))
-        .alias(cost_col)
-    )
-
-    return df
-
-
-def _apply_exclusive_group(df: pl.DataFrame, group_name: str) -> pl.DataFrame:
-    """
-    Apply mutually exclusive surcharges within a group.
-
-    Only the highest priority surcharge (lowest number) that matches wins.
-    """
-    group = get_exclusivity_group(group_name)
-    exclusion_mask = pl.lit(False)
-
-    for surcharge in group:
-        flag_col = f"surcharge_{surcharge.name.lower()}"
-        cost_col = f"cost_{surcharge.name.lower()}"
-
-        # cost() may return float or pl.Expr (for conditional costs like AHS borderline)
-        cost_value = surcharge.cost()
-        cost_expr = cost_value if isinstance(cost_value, pl.Expr) else pl.lit(cost_value)
-
-        # Applies only if: conditions met AND no higher priority already matched
-        applies = surcharge.conditions() & ~exclusion_mask
-
-        df = df.with_columns(applies.alias(flag_col))
-        df = df.with_columns(
-            pl.when(pl.col(flag_col))
-            .then(cost_expr)
-            .otherwise(pl.lit(0.0))
-            .alias(cost_col)
-        )
-
-        # Update exclusion mask: if this one matched, exclude the rest
-        exclusion_mask = exclusion_mask | pl.col(flag_col)
-
-    return df
-
-
-def _apply_min_billable_weights(df: pl.DataFrame) -> pl.DataFrame:
+def _apply_min_billable_weights(df: Frame) -> Frame:
     """
     Apply minimum billable weights from triggered surcharges.
 
@@ -394,59 +285,52 @@ def _apply_min_billable_weights(df: pl.DataFrame) -> pl.DataFrame:
     return df.with_columns(expr.alias("billable_weight_lbs"))
 
 
-def _lookup_base_rate(df: pl.DataFrame) -> pl.DataFrame:
+def _lookup_base_rate(df: Frame) -> Frame:
     """Look up base shipping rate by zone and weight bracket."""
-    input_count = len(df)
     rates = load_rates()
 
     df = df.with_columns(pl.col("shipping_zone").cast(pl.Int64))
-    df = df.with_row_index("_row_id")
-
-    df = (
-        df
-        .join(rates, left_on="shipping_zone", right_on="zone", how="left")
-        .filter(
-            (pl.col("billable_weight_lbs") > pl.col("weight_lbs_lower")) &
-            (pl.col("billable_weight_lbs") <= pl.col("weight_lbs_upper"))
-        )
-        .rename({"rate": "cost_base"})
-    )
 
-    output_count = len(df)
-    if output_count < input_count:
-        missing_count = input_count - output_count
-        raise ValueError(
-            f"{missing_count} shipment(s) have no matching rate bracket. "
-            f"Check shipping_zone and billable_weight_lbs values."
-        )
+    df = lookup_brackets(
+        df,
+        rates,
+        on=("shipping_zone", "zone"),
+        value="billable_weight_lbs",
+        columns={"rate": "cost_base"},
+    )
 
-    df = df.drop(["weight_lbs_lower", "weight_lbs_upper"])
-    df = df.sort("_row_id").drop("_row_id")
+    df = require_not_null(
+        df,
+        "cost_base",
+        "{missing_count} row(s) have no matching rate bracket "
+        "(shipments, or unique rating keys under dedup). "
+        "Check shipping_zone and billable_weight_lbs values.",
+    )
 
     return df
 
 
-def _calculate_subtotal(df: pl.DataFrame) -> pl.DataFrame:
+def _calculate_subtotal(df: Frame) -> Frame:
     """Calculate cost_subtotal as sum of base rate and all surcharge costs."""
     cost_cols = ["cost_base"] + [f"cost_{s.name.lower()}" for s in ALL]
     return df.with_columns(pl.sum_horizontal(cost_cols).alias("cost_subtotal"))
 
 
-def _apply_fuel(df: pl.DataFrame) -> pl.DataFrame:
+def _apply_fuel(df: Frame) -> Frame:
     """Apply fuel surcharge as percentage of subtotal."""
     return df.with_columns(
         (pl.col("cost_subtotal") * pl.lit(FUEL_RATE)).alias("cost_fuel")
     )
 
 
-def _calculate_total(df: pl.DataFrame) -> pl.DataFrame:
+def _calculate_total(df: Frame) -> Frame:
     """Calculate cost_total as subtotal plus fuel."""
     return df.with_columns(
         (pl.col("cost_subtotal") + pl.col("cost_fuel")).alias("cost_total")
     )
 
 
-def _stamp_version(df: pl.DataFrame) -> pl.DataFrame:
+def _stamp_version(df: Frame) -> Frame:
     """Stamp calculator version on output."""
     return df.with_columns(pl.lit(VERSION).alias("calculator_version"))
 
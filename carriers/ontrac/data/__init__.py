@@ -6,11 +6,23 @@ Reference data and loaders for rates, zones, and configuration.
 Structure:
     - reference/: Static reference data (zones, rates, config)
     - loaders/: Dynamic data loaders (PCS database)
+
+Reference tables are served from the prebuilt reference bundle when it is
+current (see shared/reference/bundle.py), otherwise built from the CSVs.
 """
 
 import polars as pl
 from pathlib import Path
 
+from shared.reference import (
+    REFERENCE_CACHE,
+    ReferenceBundle,
+    ZipIndex,
+    cached_zip_index,
+    read_reference_csv,
+)
+
+from ..version import VERSION
 from .reference.billable_weight import DIM_FACTOR, DIM_THRESHOLD, THRESHOLD_FIELD, FACTOR_FIELD
 from .reference.fuel import LIST_RATE, DISCOUNT, RATE, APPLICATION
 
@@ -18,6 +30,7 @@ from .reference.fuel import LIST_RATE, DISCOUNT, RATE, APPLICATION
 from .loaders import (
     load_pcs_shipments,
     load_pcs_shipments_all_us,
+    stream_pcs_shipments_all_us,
     DEFAULT_CARRIER,
     DEFAULT_PRODUCTION_SITES,
     DEFAULT_START_DATE,
@@ -26,21 +39,11 @@ from .loaders import (
 
 REFERENCE_DIR = Path(__file__).parent / "reference"
 
+BUNDLE = ReferenceBundle(REFERENCE_DIR, VERSION)
 
-def load_rates() -> pl.DataFrame:
-    """
-    Load base rates in long format, ready for joining.
-
-    Transforms wide CSV format (zone_2, zone_3, ...) to long format.
 
-    Returns:
-        DataFrame with columns:
-            - weight_lbs_lower: Lower bound of weight bracket (exclusive)
-            - weight_lbs_upper: Upper bound of weight bracket (inclusive)
-            - zone: Shipping zone (2-8)
-            - rate: Base rate for this zone/weight combination
-    """
-    rates = pl.read_csv(REFERENCE_DIR / "base_rates.csv")
+def _rates_to_long(rates: pl.DataFrame) -> pl.DataFrame:
+    """Transform wide rate table (zone_2, zone_3, ...) to long format."""
     zone_cols = [c for c in rates.columns if c.startswith("zone_")]
 
     return (
@@ -58,6 +61,22 @@ def load_rates() -> pl.DataFrame:
     )
 
 
+def load_rates() -> pl.DataFrame:
+    """
+    Load base rates in long format, ready for joining.
+
+    Transforms wide CSV format (zone_2, zone_3, ...) to long format.
+
+    Returns:
+        DataFrame with columns:
+            - weight_lbs_lower: Lower bound of weight bracket (exclusive)
+            - weight_lbs_upper: Upper bound of weight bracket (inclusive)
+            - zone: Shipping zone (2-8)
+            - rate: Base rate for this zone/weight combination
+    """
+    return BUNDLE.load("rates")
+
+
 def load_zones() -> pl.DataFrame:
     """
     Load zone mappings from CSV.
@@ -65,9 +84,57 @@ def load_zones() -> pl.DataFrame:
     Returns:
         DataFrame with columns: zip_code, shipping_state, phx_zone, cmh_zone, das
     """
-    return pl.read_csv(
-        REFERENCE_DIR / "zones.csv",
-        schema_overrides={"zip_code": pl.Utf8}  # Keep zip codes as strings (leading zeros)
+    return BUNDLE.load("zones")
+
+
+def load_state_zones() -> pl.DataFrame:
+    """
+    Load state-level zone fallbacks (mode zone per state).
+
+    Returns:
+        DataFrame with columns: shipping_state, _state_phx_zone, _state_cmh_zone, _state_das
+    """
+    return BUNDLE.load("state_zones")
+
+
+def state_zone_modes(zones: pl.DataFrame) -> pl.DataFrame:
+    """Most common phx/cmh zone per state, used as the ZIP lookup fallback."""
+    return (
+        zones
+        .group_by("shipping_state")
+        .agg([
+            pl.col("phx_zone").mode().first().alias("_state_phx_zone"),
+            pl.col("cmh_zone").mode().first().alias("_state_cmh_zone"),
+            pl.lit("NO").alias("_state_das"),
+        ])
+    )
+
+
+def load_zone_index() -> ZipIndex:
+    """Dense ZIP -> phx/cmh zone and DAS index over zones.csv (see build_zone_index)."""
+    return cached_zip_index("ontrac.zones", (load_zones(), load_state_zones()), build_zone_index)
+
+
+def build_zone_index(zones: pl.DataFrame, state_zones: pl.DataFrame | None = None) -> ZipIndex:
+    """
+    Index phx_zone/cmh_zone/das by ZIP with state fallbacks (zone 5 default).
+
+    state_zones is derived from zones when not given (custom zone tables).
+    """
+    if state_zones is None:
+        state_zones = state_zone_modes(zones)
+    return ZipIndex.from_table(
+        zones,
+        "zip_code",
+        ["das", "phx_zone", "cmh_zone"],
+        states=state_zones,
+        state_column="shipping_state",
+        state_columns={
+            "das": "_state_das",
+            "phx_zone": "_state_phx_zone",
+            "cmh_zone": "_state_cmh_zone",
+        },
+        defaults={"phx_zone": 5, "cmh_zone": 5},
     )
 
 
@@ -78,11 +145,51 @@ def load_serviceable_zips() -> set[str]:
     Returns:
         Set of 5-digit zip code strings (with leading zeros)
     """
-    df = pl.read_csv(
+    df = BUNDLE.load("serviceable_zips")
+    return set(df["zip_code"].to_list())
+
+
+# =============================================================================
+# TABLE BUILDERS (CSV -> normalized frame)
+# =============================================================================
+
+def _build_zones() -> pl.DataFrame:
+    return read_reference_csv(
+        REFERENCE_DIR / "zones.csv",
+        schema_overrides={"zip_code": pl.Utf8}  # Keep zip codes as strings (leading zeros)
+    )
+
+
+def _build_state_zones() -> pl.DataFrame:
+    return REFERENCE_CACHE.get(
+        REFERENCE_DIR / "zones.csv",
+        lambda: state_zone_modes(_build_zones()),
+        key=("state_zones",),
+    )
+
+
+# =============================================================================
+# BUNDLE REGISTRATION
+# =============================================================================
+
+BUNDLE.register(
+    "rates",
+    lambda: read_reference_csv(REFERENCE_DIR / "base_rates.csv", transform=_rates_to_long),
+    sources=["base_rates.csv"],
+)
+
+BUNDLE.register("zones", _build_zones, sources=["zones.csv"])
+
+BUNDLE.register("state_zones", _build_state_zones, sources=["zones.csv"])
+
+BUNDLE.register(
+    "serviceable_zips",
+    lambda: read_reference_csv(
         REFERENCE_DIR / "serviceable_zips.csv",
         schema_overrides={"zip_code": pl.Utf8}
-    )
-    return set(df["zip_code"].to_list())
+    ),
+    sources=["serviceable_zips.csv"],
+)
 
 
 # Re-export fuel rate for convenience
@@ -92,11 +199,17 @@ __all__ = [
     # Reference data loaders
     "load_rates",
     "load_zones",
+    "load_state_zones",
+    "state_zone_modes",
+    "load_zone_index",
+    "build_zone_index",
     "load_serviceable_zips",
     "REFERENCE_DIR",
+    "BUNDLE",
     # PCS data loaders
     "load_pcs_shipments",
     "load_pcs_shipments_all_us",
+    "stream_pcs_shipments_all_us",
     "DEFAULT_CARRIER",
     "DEFAULT_PRODUCTION_SITES",
     "DEFAULT_START_DATE",
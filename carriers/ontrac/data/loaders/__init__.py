@@ -13,11 +13,13 @@ from .pcs import (
 
 from .pcs_all_us import (
     load_pcs_shipments_all_us,
+    stream_pcs_shipments_all_us,
 )
 
 __all__ = [
     "load_pcs_shipments",
     "load_pcs_shipments_all_us",
+    "stream_pcs_shipments_all_us",
     "DEFAULT_CARRIER",
     "DEFAULT_PRODUCTION_SITES",
     "DEFAULT_START_DATE",
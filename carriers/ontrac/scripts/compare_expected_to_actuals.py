@@ -23,7 +23,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import polars as pl
 
-from shared.database import pull_data
+from shared.database import pull_data, pull_many
 
 
 # =============================================================================
@@ -128,9 +128,11 @@ def get_match_rate_data(
     # Total expected in same date range (use pcs_created if no date filters)
     total_expected_query = f"SELECT COUNT(*) as cnt FROM {EXPECTED_TABLE}"
 
-    actual_count = int(pull_data(actual_orderids_query)["cnt"][0])
-    matched_count = int(pull_data(matched_query)["cnt"][0])
-    total_expected = int(pull_data(total_expected_query)["cnt"][0])
+    # The three counts are independent: run them concurrently
+    actual_count, matched_count, total_expected = (
+        int(result["cnt"][0])
+        for result in pull_many([actual_orderids_query, matched_query, total_expected_query])
+    )
 
     return {
         "actual_orderids": actual_count,
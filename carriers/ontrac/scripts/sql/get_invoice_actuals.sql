@@ -1,5 +1,5 @@
 -- Get actual costs from OnTrac invoices
--- Parameter: {tracking_numbers} - comma-separated list of tracking numbers (quoted)
+-- Parameter: {keys} - key table with a trackingnumber column (see shared.database.pull_by_keys)
 
 SELECT
     tracking_number as trackingnumber,
@@ -24,5 +24,5 @@ SELECT
     SUM(unresolved_address_surcharge) as actual_unresolved_address,
     SUM(address_correction_surcharge) as actual_address_correction
 FROM poc_landing.ontrac
-WHERE tracking_number IN ({tracking_numbers})
+JOIN {keys} k ON tracking_number = k.trackingnumber
 GROUP BY tracking_number, invoice_number, billing_date, zone, billed_weight_lbs, return_to_sender
@@ -7,7 +7,7 @@ Pulls actual invoice costs from OnTrac invoices and uploads them to the database
 Modes:
     --full          Full refresh - delete all actuals and repull from invoices
     --incremental   Only process orders without actuals (insert only, no delete)
-    --days N        Delete actuals for last N days and repull (by expected pcs_created)
+    --days N        Repull actuals for last N days (by expected pcs_created) and merge changes
 
 Usage:
     python -m ontrac.scripts.upload_actuals --full
@@ -15,6 +15,7 @@ Usage:
     python -m ontrac.scripts.upload_actuals --incremental --limit 1000
     python -m ontrac.scripts.upload_actuals --days 7
     python -m ontrac.scripts.upload_actuals --full --dry-run
+    python -m ontrac.scripts.upload_actuals --full --run-id full-2025-06-01
 """
 
 import argparse
@@ -25,7 +26,7 @@ from datetime import datetime, timedelta
 import polars as pl
 
 import shared
-from shared.database import pull_data, execute_query, push_data, get_connection
+from shared.database import MergeCounts, UploadCheckpoint, pull_data, pull_by_keys, execute_query, push_data
 
 
 # =============================================================================
@@ -88,13 +89,12 @@ def get_actual_count_for_orderids(orderids: list[int]) -> int:
     """Get count of actuals for specific orderids."""
     if not orderids:
         return 0
-    orderids_str = ", ".join(str(x) for x in orderids)
     query = f"""
-        SELECT COUNT(*) as cnt FROM {ACTUAL_TABLE}
-        WHERE pcs_orderid IN ({orderids_str})
+        SELECT COUNT(*) as cnt FROM {ACTUAL_TABLE} a
+        JOIN {{keys}} k ON a.pcs_orderid = k.pcs_orderid
     """
     try:
-        result = pull_data(query)
+        result = pull_by_keys(query, pl.DataFrame({"pcs_orderid": orderids}, schema={"pcs_orderid": pl.Int64}))
         return int(result["cnt"][0])
     except Exception:
         return 0
@@ -117,30 +117,26 @@ def delete_all_actuals(dry_run: bool = False) -> int:
     return count
 
 
-def delete_actuals_for_orderids(orderids: list[int], dry_run: bool = False) -> int:
-    """Delete actuals for specific orderids."""
-    if not orderids:
-        return 0
-
-    count = get_actual_count_for_orderids(orderids)
-
-    if count == 0:
-        return 0
-
-    if dry_run:
-        print(f"  [DRY RUN] Would delete {count:,} rows for {len(orderids):,} orderids")
-        return count
-
-    # Delete in batches to avoid query size limits
-    batch_size = 5000
-    for i in range(0, len(orderids), batch_size):
-        batch = orderids[i:i+batch_size]
-        batch_str = ", ".join(str(x) for x in batch)
-        delete_query = f"DELETE FROM {ACTUAL_TABLE} WHERE pcs_orderid IN ({batch_str})"
-        execute_query(delete_query, commit=True)
+def merge_for_orders_from_date(df: pl.DataFrame, start_date: str, batch_size: int) -> MergeCounts:
+    """
+    Refresh actuals of the orders created from a start date onwards, merging
+    on pcs_orderid.
 
-    print(f"  Deleted {count:,} rows for {len(orderids):,} orderids")
-    return count
+    Orders whose actuals did not change are left as they are; actuals of orders
+    in the range that are not in df are deleted.
+    """
+    return push_data(
+        df,
+        ACTUAL_TABLE,
+        if_exists="merge",
+        batch_size=batch_size,
+        keys=["pcs_orderid"],
+        ignore_columns=["dw_timestamp"],
+        scope=(
+            f"pcs_orderid IN (SELECT pcs_orderid FROM {EXPECTED_TABLE} "
+            f"WHERE pcs_created::date >= '{start_date}'::date)"
+        ),
+    )
 
 
 # =============================================================================
@@ -173,44 +169,24 @@ def get_tracking_numbers(pcs_orderids: list[int]) -> pl.DataFrame:
     if not pcs_orderids:
         return pl.DataFrame({"pcs_orderid": [], "trackingnumber": []})
 
-    query_template = (SHARED_SQL_DIR / "get_tracking_numbers.sql").read_text()
-    pcs_orderids_str = ", ".join(str(x) for x in pcs_orderids)
-    query = query_template.format(pcs_orderids=pcs_orderids_str)
+    # Orderids are joined from a temporary key table (see pull_by_keys)
+    query = (SHARED_SQL_DIR / "get_tracking_numbers.sql").read_text()
+    keys = pl.DataFrame({"pcs_orderid": pcs_orderids}, schema={"pcs_orderid": pl.Int64})
 
-    return pull_data(query)
+    return pull_by_keys(query, keys)
 
 
 def get_invoice_data(tracking_numbers: list[str]) -> pl.DataFrame:
-    """Pull actual costs from OnTrac invoices for given tracking numbers."""
+    """Pull actual costs from OnTrac invoices for given tracking numbers, in one query."""
     if not tracking_numbers:
         return pl.DataFrame()
 
-    query_template = (ONTRAC_SQL_DIR / "get_invoice_actuals.sql").read_text()
-    tracking_numbers_str = ", ".join(f"'{tn}'" for tn in tracking_numbers)
-    query = query_template.format(tracking_numbers=tracking_numbers_str)
-
-    return pull_data(query)
-
-
-def get_invoice_data_batched(tracking_numbers: list[str], batch_size: int = 5000) -> pl.DataFrame:
-    """Pull invoice data in batches to avoid query size limits."""
-    if not tracking_numbers:
-        return pl.DataFrame()
+    query = (ONTRAC_SQL_DIR / "get_invoice_actuals.sql").read_text()
+    keys = pl.DataFrame({"trackingnumber": tracking_numbers}, schema={"trackingnumber": pl.Utf8})
+    print(f"    Joining {len(tracking_numbers):,} tracking numbers...")
 
-    all_results = []
-    total = len(tracking_numbers)
-
-    for i in range(0, total, batch_size):
-        batch = tracking_numbers[i:i+batch_size]
-        print(f"    Fetching invoice batch {i//batch_size + 1}/{(total + batch_size - 1)//batch_size}...")
-        df = get_invoice_data(batch)
-        if len(df) > 0:
-            all_results.append(df)
-
-    if not all_results:
-        return pl.DataFrame()
-
-    return pl.concat(all_results)
+    # Column types come from the result schema, not the first rows
+    return pull_by_keys(query, keys)
 
 
 def join_tracking_with_invoices(
@@ -290,7 +266,7 @@ def _fetch_and_join_invoice_data(
     # Get invoice data
     print(f"\nStep {invoice_step}: Pulling invoice data...")
     tracking_numbers = tracking_df["trackingnumber"].to_list()
-    invoice_df = get_invoice_data_batched(tracking_numbers)
+    invoice_df = get_invoice_data(tracking_numbers)
     print(f"  Found {len(invoice_df):,} invoice records")
 
     if len(invoice_df) == 0:
@@ -322,6 +298,8 @@ def _print_summary_and_upload(
     dry_run: bool,
     upload_step: int,
     summary_lines: list[str],
+    merge_from: str | None = None,
+    run_id: str | None = None,
 ) -> int:
     """
     Print summary and upload data.
@@ -334,6 +312,9 @@ def _print_summary_and_upload(
         dry_run: If True, don't upload
         upload_step: Step number for upload
         summary_lines: Additional lines to print before standard stats
+        merge_from: If set, merge into the actuals of orders created from this
+            date onwards instead of appending
+        run_id: Upload resumably under this id (see push_data)
 
     Returns:
         Number of rows uploaded
@@ -355,16 +336,21 @@ def _print_summary_and_upload(
     print(f"\nStep {upload_step}: Uploading to database...")
 
     if dry_run:
-        print(f"  [DRY RUN] Would insert {len(merged_df):,} rows into {ACTUAL_TABLE}")
+        action = "merge" if merge_from else "insert"
+        print(f"  [DRY RUN] Would {action} {len(merged_df):,} rows into {ACTUAL_TABLE}")
         return len(merged_df)
 
-    push_data(merged_df, ACTUAL_TABLE, batch_size=batch_size)
+    if merge_from:
+        merge_for_orders_from_date(merged_df, merge_from, batch_size)
+    else:
+        push_data(merged_df, ACTUAL_TABLE, batch_size=batch_size, keys=["pcs_orderid"], run_id=run_id)
     return len(merged_df)
 
 
 def run_full_mode(
     batch_size: int,
     dry_run: bool,
+    run_id: str | None = None,
 ) -> int:
     """Full mode: Delete all actuals, repull from invoices."""
     print("=" * 60)
@@ -388,7 +374,10 @@ def run_full_mode(
 
     # Step 5: Delete existing and upload
     print("\nStep 5: Refreshing actual costs table...")
-    delete_all_actuals(dry_run=dry_run)
+    if run_id and UploadCheckpoint(ACTUAL_TABLE, run_id).exists():
+        print(f"  Resuming upload {run_id!r}, keeping actuals already uploaded")
+    else:
+        delete_all_actuals(dry_run=dry_run)
 
     return _print_summary_and_upload(
         merged_df=merged_df,
@@ -398,6 +387,7 @@ def run_full_mode(
         dry_run=dry_run,
         upload_step=6,
         summary_lines=[f"Orderids in expected costs: {len(orderids_df):,}"],
+        run_id=run_id,
     )
 
 
@@ -442,7 +432,7 @@ def run_days_mode(
     batch_size: int,
     dry_run: bool,
 ) -> int:
-    """Days mode: Delete and repull actuals for last N days."""
+    """Days mode: Repull actuals for last N days, merge changes."""
     print("=" * 60)
     print(f"DAYS MODE ({days} days) - ACTUAL COSTS")
     print("=" * 60)
@@ -460,9 +450,10 @@ def run_days_mode(
 
     pcs_orderids = orderids_df["pcs_orderid"].to_list()
 
-    # Step 2: Delete existing actuals for these orderids
-    print(f"\nStep 2: Deleting existing actuals for {len(pcs_orderids):,} orderids...")
-    deleted = delete_actuals_for_orderids(pcs_orderids, dry_run=dry_run)
+    # Step 2: Count existing actuals for these orderids
+    print(f"\nStep 2: Counting existing actuals for {len(pcs_orderids):,} orderids...")
+    existing = get_actual_count_for_orderids(pcs_orderids)
+    print(f"  {existing:,} existing rows")
 
     # Steps 3-5: Fetch and join data
     result = _fetch_and_join_invoice_data(
@@ -485,8 +476,9 @@ def run_days_mode(
         summary_lines=[
             f"Date range: {start_date} to today ({days} days)",
             f"Orderids in range: {len(orderids_df):,}",
-            f"Rows deleted: {deleted:,}",
+            f"Existing rows: {existing:,}",
         ],
+        merge_from=start_date,
     )
 
 
@@ -502,7 +494,7 @@ def main():
 Modes:
   --full          Full refresh - delete all actuals and repull from invoices
   --incremental   Only process orders without actuals (insert only)
-  --days N        Delete actuals for last N days and repull (by expected pcs_created)
+  --days N        Repull actuals for last N days (by expected pcs_created) and merge changes
 
 Examples:
   python -m ontrac.scripts.upload_actuals --full
@@ -529,7 +521,7 @@ Examples:
         "--days",
         type=int,
         metavar="N",
-        help="Delete actuals for last N days and repull (by expected pcs_created)"
+        help="Repull actuals for last N days (by expected pcs_created) and merge changes"
     )
 
     # Common options
@@ -539,6 +531,13 @@ Examples:
         default=5000,
         help="Number of rows per INSERT statement (default: 5000)"
     )
+    parser.add_argument(
+        "--run-id",
+        type=str,
+        default=None,
+        help="Full mode: commit in groups and checkpoint progress under this id; "
+             "rerun with the same id to resume a failed upload"
+    )
     parser.add_argument(
         "--limit",
         type=int,
@@ -559,6 +558,7 @@ Examples:
             rows = run_full_mode(
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                run_id=args.run_id,
             )
         elif args.incremental:
             rows = run_incremental_mode(
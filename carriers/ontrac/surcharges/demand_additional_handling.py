@@ -22,6 +22,7 @@ class DEM_AHS(Surcharge):
     depends_on = "AHS"
     period_start = (9, 27)   # Sept 27
     period_end = (1, 16)     # Jan 16
+    billing_lag_days = 5     # Billed ~5 days after ship date
 
     # Borderline allocation (same as AHS)
     # Import thresholds from AHS to stay in sync
@@ -30,7 +31,7 @@ class DEM_AHS(Surcharge):
     @classmethod
     def conditions(cls) -> pl.Expr:
         return pl.col("surcharge_ahs") & in_period(
-            cls.period_start, cls.period_end, billing_lag_days=5
+            cls.period_start, cls.period_end, billing_lag_days=cls.billing_lag_days
         )
 
     @classmethod
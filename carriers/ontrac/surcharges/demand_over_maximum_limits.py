@@ -22,9 +22,10 @@ class DEM_OML(Surcharge):
     depends_on = "OML"
     period_start = (9, 27)   # Sept 27
     period_end = (1, 16)     # Jan 16
+    billing_lag_days = 5     # Billed ~5 days after ship date
 
     @classmethod
     def conditions(cls) -> pl.Expr:
         return pl.col("surcharge_oml") & in_period(
-            cls.period_start, cls.period_end, billing_lag_days=5
+            cls.period_start, cls.period_end, billing_lag_days=cls.billing_lag_days
         )
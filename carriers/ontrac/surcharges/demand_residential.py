@@ -24,9 +24,10 @@ class DEM_RES(Surcharge):
     depends_on = "RES"
     period_start = (10, 25)  # Oct 25
     period_end = (1, 16)     # Jan 16
+    billing_lag_days = 5     # Billed ~5 days after ship date
 
     @classmethod
     def conditions(cls) -> pl.Expr:
         return pl.col("surcharge_res") & in_period(
-            cls.period_start, cls.period_end, billing_lag_days=5
+            cls.period_start, cls.period_end, billing_lag_days=cls.billing_lag_days
         )
@@ -6,17 +6,25 @@ Reference data and loaders for rates, zones, and configuration.
 Structure:
     - reference/: Static reference data (zones, rates, config)
     - loaders/: Dynamic data loaders (PCS database)
+
+Reference tables are served from the prebuilt reference bundle when it is
+current (see shared/reference/bundle.py), otherwise built from the CSVs.
 """
 
 import polars as pl
 from pathlib import Path
 
+from shared.reference import ReferenceBundle, ZipIndex, cached_zip_index, read_reference_csv
+
+from ..version import VERSION
+
 from .reference.billable_weight import DIM_FACTOR, DIM_THRESHOLD, THRESHOLD_FIELD, FACTOR_FIELD
 
 # Re-export loaders for convenience
 from .loaders import (
     load_pcs_shipments,
     load_pcs_shipments_all_us,
+    stream_pcs_shipments_all_us,
     DEFAULT_CARRIER,
     DEFAULT_PRODUCTION_SITES,
     DEFAULT_COUNTRY,
@@ -26,6 +34,8 @@ from .loaders import (
 
 REFERENCE_DIR = Path(__file__).parent / "reference"
 
+BUNDLE = ReferenceBundle(REFERENCE_DIR, VERSION)
+
 
 def load_rates() -> pl.DataFrame:
     """
@@ -38,7 +48,7 @@ def load_rates() -> pl.DataFrame:
             - zone: Shipping zone (1-8)
             - rate: Base rate for this zone/weight combination
     """
-    return pl.read_csv(REFERENCE_DIR / "base_rates.csv")
+    return BUNDLE.load("rates")
 
 
 def load_zones() -> pl.DataFrame:
@@ -50,23 +60,70 @@ def load_zones() -> pl.DataFrame:
     Returns:
         DataFrame with columns: zip, zone
     """
-    return pl.read_csv(
+    return BUNDLE.load("zones")
+
+
+def load_zone_index() -> ZipIndex:
+    """Dense ZIP -> zone index over zones.csv (see build_zone_index)."""
+    return cached_zip_index("p2p_us.zones", (load_zones(),), build_zone_index)
+
+
+def build_zone_index(zones: pl.DataFrame) -> ZipIndex:
+    """
+    Index zone by 5-digit ZIP.
+
+    Unmatched ZIPs fall back to the most common zone, then zone 5.
+    """
+    return ZipIndex.from_table(
+        zones,
+        "zip",
+        ["zone"],
+        digits=5,
+        defaults={"zone": _mode_zone(zones)},
+    )
+
+
+def _mode_zone(zones: pl.DataFrame) -> int:
+    """Most common zone (5 if the table is empty)."""
+    mode = zones.select(pl.col("zone").mode().first()).item()
+    return 5 if mode is None else mode
+
+
+# =============================================================================
+# BUNDLE REGISTRATION
+# =============================================================================
+
+BUNDLE.register(
+    "rates",
+    lambda: read_reference_csv(REFERENCE_DIR / "base_rates.csv"),
+    sources=["base_rates.csv"],
+)
+
+BUNDLE.register(
+    "zones",
+    lambda: read_reference_csv(
         REFERENCE_DIR / "zones.csv",
         schema_overrides={
             "zip": pl.Utf8,  # Keep ZIPs as strings (leading zeros)
             "zone": pl.Int64,
         }
-    )
+    ),
+    sources=["zones.csv"],
+)
 
 
 __all__ = [
     # Reference data loaders
     "load_rates",
     "load_zones",
+    "load_zone_index",
+    "build_zone_index",
     "REFERENCE_DIR",
+    "BUNDLE",
     # PCS data loaders
     "load_pcs_shipments",
     "load_pcs_shipments_all_us",
+    "stream_pcs_shipments_all_us",
     "DEFAULT_CARRIER",
     "DEFAULT_PRODUCTION_SITES",
     "DEFAULT_COUNTRY",
@@ -4,6 +4,9 @@ P2P US2 Shipping Cost Calculator
 Dual-service calculator outputting BOTH PFA and PFS costs per shipment.
 Service selection happens at the group level in the upload script, not here.
 
+Accepts a pl.DataFrame or pl.LazyFrame and returns the same kind; lazy input
+adds the calculation to the caller's query plan.
+
 REQUIRED INPUT COLUMNS
 ----------------------
     ship_date           - Date for rate lookups
@@ -41,11 +44,16 @@ USAGE
 
 import polars as pl
 
+from shared.rating import Frame, add_dimensions, lookup_brackets, canonical_zip, rate_unique, rate_services
+from shared.reference import ZipIndex
+from shared.surcharges import apply_surcharges
+
 from .version import VERSION
 from .data import (
     load_pfa_rates,
     load_pfs_rates,
-    load_zones,
+    load_zone_index,
+    build_zone_index,
     PFA_DIM_FACTOR,
     PFA_DIM_THRESHOLD,
     PFA_DIM_WEIGHT_THRESHOLD,
@@ -56,14 +64,27 @@ from .surcharges import PFA_ALL, PFS_ALL
 from .surcharges.peak import peak_season_condition, peak_surcharge_amount
 
 
+# Cost-determining inputs, canonicalized, for calculate_costs(dedup=True).
+# The ship date enters only through the seasonal windows the calculator checks.
+RATING_KEY = [
+    canonical_zip(5),
+    pl.col("length_in"),
+    pl.col("width_in"),
+    pl.col("height_in"),
+    pl.col("weight_lbs"),
+]
+RATING_DATE_FLAGS = [peak_season_condition()]
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
 def calculate_costs(
-    df: pl.DataFrame,
-    zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+    df: Frame,
+    zones: pl.DataFrame | None = None,
+    dedup: bool = False,
+) -> Frame:
     """
     Calculate PFA and PFS shipping costs for a shipment DataFrame.
 
@@ -71,15 +92,25 @@ def calculate_costs(
     Null values indicate the shipment is ineligible for that service.
 
     Args:
-        df: Raw shipment DataFrame with required columns
+        df: Raw shipment DataFrame or LazyFrame with required columns
         zones: Zone mapping DataFrame (loaded from zones.csv if not provided)
+        dedup: Rate each unique RATING_KEY once and join the results back
+            (see shared.rating.dedup)
 
     Returns:
-        DataFrame with supplemented data and both PFA + PFS costs
+        DataFrame (LazyFrame for lazy input) with supplemented data and
+        both PFA + PFS costs
     """
+    if dedup:
+        df, _ = rate_unique(
+            df, lambda keys: calculate_costs(keys, zones), RATING_KEY, RATING_DATE_FLAGS
+        )
+        return df
+
+    # PFA and PFS only read the supplemented columns: rate them as two
+    # branches over the shared supplement stage (see shared.rating.services)
     df = supplement_shipments(df, zones)
-    df = calculate_pfa(df)
-    df = calculate_pfs(df)
+    df = rate_services(df, [calculate_pfa, calculate_pfs])
     df = _stamp_version(df)
     return df
 
@@ -89,52 +120,34 @@ def calculate_costs(
 # =============================================================================
 
 def supplement_shipments(
-    df: pl.DataFrame,
+    df: Frame,
     zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+) -> Frame:
     """
     Supplement shipment data with zone and weight calculations.
 
     Adds dimensions, zones (with is_remote), and billable weights for both services.
     """
-    if zones is None:
-        zones = load_zones()
+    zone_index = load_zone_index() if zones is None else build_zone_index(zones)
 
     df = _add_calculated_dimensions(df)
-    df = _lookup_zones(df, zones)
+    df = _lookup_zones(df, zone_index)
     df = _add_billable_weight(df)
 
     return df
 
 
-def _add_calculated_dimensions(df: pl.DataFrame) -> pl.DataFrame:
-    """Add calculated dimensional columns including shortest_side_in for PFA oversize."""
-    return df.with_columns([
-        # Cubic inches (rounded to whole number)
-        (pl.col("length_in") * pl.col("width_in") * pl.col("height_in"))
-        .round(0)
-        .alias("cubic_in"),
-
-        # Longest dimension (rounded to 1 decimal)
-        pl.max_horizontal("length_in", "width_in", "height_in")
-        .round(1)
-        .alias("longest_side_in"),
-
-        # Second longest dimension (rounded to 1 decimal)
-        pl.concat_list(["length_in", "width_in", "height_in"])
-        .list.sort(descending=True)
-        .list.get(1)
-        .round(1)
-        .alias("second_longest_in"),
-
-        # Shortest dimension (rounded to 1 decimal) — needed for PFA oversize check
-        pl.min_horizontal("length_in", "width_in", "height_in")
-        .round(1)
-        .alias("shortest_side_in"),
-    ])
+def _add_calculated_dimensions(df: Frame) -> Frame:
+    """
+    Add calculated dimensional columns including shortest_side_in for PFA oversize.
+
+    Uses the shared dimension stage (rounded to 1 decimal, see
+    shared.rating.dimensions); columns already present are kept as-is.
+    """
+    return add_dimensions(df, ["cubic_in", "longest_side_in", "second_longest_in", "shortest_side_in"])
 
 
-def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
+def _lookup_zones(df: Frame, zone_index: ZipIndex) -> Frame:
     """
     Add zone data to shipments based on 5-digit ZIP.
 
@@ -145,46 +158,22 @@ def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
     1. Exact 5-digit ZIP match from zones.csv
     2. Mode zone across all entries (most common zone)
     3. Default zone 5 (mid-range, minimizes worst-case pricing error)
-    """
-    # Normalize ZIP to 5-digit string
-    df = df.with_columns(
-        pl.col("shipping_zip_code")
-        .cast(pl.Utf8)
-        .str.slice(0, 5)
-        .str.zfill(5)
-        .alias("_zip_5digit")
-    )
-
-    # Calculate mode zone for fallback
-    mode_zone = (
-        zones
-        .select(pl.col("zone").mode().first())
-        .item()
-    )
-
-    # Join on 5-digit ZIP
-    df = df.join(zones, left_on="_zip_5digit", right_on="zip", how="left")
 
-    # Flag whether ZIP was found in zones file (for coverage tracking)
-    df = df.with_columns(
-        pl.col("zone").is_not_null().alias("zone_covered")
-    )
+    Both fallbacks are precomputed in the ZIP index (see build_zone_index).
+    """
+    df = df.with_columns(zone_index.slot())
 
-    # Apply fallback: use mode zone if no match, then default to 5
     df = df.with_columns([
-        pl.coalesce([pl.col("zone"), pl.lit(mode_zone), pl.lit(5)])
-        .alias("shipping_zone"),
-        pl.coalesce([pl.col("is_remote"), pl.lit(False)])
-        .alias("is_remote"),
+        zone_index.lookup("is_remote").alias("is_remote"),
+        # Flag whether ZIP was found in zones file (for coverage tracking)
+        zone_index.get("zone").is_not_null().alias("zone_covered"),
+        zone_index.lookup("zone").alias("shipping_zone"),
     ])
 
-    # Drop intermediate columns
-    df = df.drop(["_zip_5digit", "zone"])
-
-    return df
+    return df.drop(zone_index.slot_column)
 
 
-def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
+def _add_billable_weight(df: Frame) -> Frame:
     """
     Calculate billable weight for both PFA and PFS services.
 
@@ -229,13 +218,12 @@ PFA_MAX_WEIGHT = 30
 PFA_MAX_ZONE = 8
 
 
-def calculate_pfa(df: pl.DataFrame) -> pl.DataFrame:
+def calculate_pfa(df: Frame) -> Frame:
     """
     Calculate PFA costs. Null where ineligible (zone > 8 or weight > 30 lbs).
     """
     # Apply PFA surcharges
-    for s in PFA_ALL:
-        df = _apply_surcharge(df, s, prefix="pfa")
+    df = apply_surcharges(df, PFA_ALL)
 
     # Rate lookup
     df = _lookup_rate(df, load_pfa_rates(), "pfa")
@@ -287,13 +275,12 @@ PFS_MAX_WEIGHT = 70
 PFS_MAX_ZONE = 9
 
 
-def calculate_pfs(df: pl.DataFrame) -> pl.DataFrame:
+def calculate_pfs(df: Frame) -> Frame:
     """
     Calculate PFS costs. Null where ineligible (weight > 70 lbs).
     """
     # Apply PFS surcharges
-    for s in PFS_ALL:
-        df = _apply_surcharge(df, s, prefix="pfs")
+    df = apply_surcharges(df, PFS_ALL)
 
     # Rate lookup
     df = _lookup_rate(df, load_pfs_rates(), "pfs")
@@ -338,37 +325,11 @@ def calculate_pfs(df: pl.DataFrame) -> pl.DataFrame:
 # SHARED HELPERS
 # =============================================================================
 
-def _apply_surcharge(df: pl.DataFrame, surcharge, prefix: str) -> pl.DataFrame:
-    """Apply a single surcharge (no competition — all standalone)."""
-    flag_col = f"surcharge_{surcharge.name.lower()}"
-    cost_col = f"cost_{surcharge.name.lower()}"
-
-    df = df.with_columns(surcharge.conditions().alias(flag_col))
-
-    cost_expr = surcharge.cost()
-    if isinstance(cost_expr, pl.Expr):
-        df = df.with_columns(
-            pl.when(pl.col(flag_col))
-            .then(cost_expr)
-            .otherwise(pl.lit(0.0))
-            .alias(cost_col)
-        )
-    else:
-        df = df.with_columns(
-            pl.when(pl.col(flag_col))
-            .then(pl.lit(cost_expr))
-            .otherwise(pl.lit(0.0))
-            .alias(cost_col)
-        )
-
-    return df
-
-
 def _lookup_rate(
-    df: pl.DataFrame,
+    df: Frame,
     rates: pl.DataFrame,
     prefix: str,
-) -> pl.DataFrame:
+) -> Frame:
     """
     Look up base rate by zone and weight bracket for a service.
 
@@ -379,29 +340,17 @@ def _lookup_rate(
     cost_col = f"{prefix}_cost_base"
 
     df = df.with_columns(pl.col("shipping_zone").cast(pl.Int64))
-    df = df.with_row_index("_row_id")
-
-    # Find matching rate for each shipment via join + filter
-    matched = (
-        df
-        .select(["_row_id", "shipping_zone", weight_col])
-        .join(rates, left_on="shipping_zone", right_on="zone", how="left")
-        .filter(
-            (pl.col(weight_col) > pl.col("weight_lbs_lower")) &
-            (pl.col(weight_col) <= pl.col("weight_lbs_upper"))
-        )
-        .select(["_row_id", "rate"])
-        .rename({"rate": cost_col})
-    )
-
-    # Left join matched rates back to preserve all original rows
-    df = df.join(matched, on="_row_id", how="left")
-    df = df.drop("_row_id")
 
-    return df
+    return lookup_brackets(
+        df,
+        rates,
+        on=("shipping_zone", "zone"),
+        value=weight_col,
+        columns={"rate": cost_col},
+    )
 
 
-def _stamp_version(df: pl.DataFrame) -> pl.DataFrame:
+def _stamp_version(df: Frame) -> Frame:
     """Stamp calculator version on output."""
     return df.with_columns(pl.lit(VERSION).alias("calculator_version"))
 
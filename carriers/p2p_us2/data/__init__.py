@@ -6,11 +6,18 @@ Reference data and loaders for rates, zones, and configuration.
 Structure:
     - reference/: Static reference data (zones, rates, config)
     - loaders/: Dynamic data loaders (PCS database)
+
+Reference tables are served from the prebuilt reference bundle when it is
+current (see shared/reference/bundle.py), otherwise built from the CSVs.
 """
 
 import polars as pl
 from pathlib import Path
 
+from shared.reference import ReferenceBundle, ZipIndex, cached_zip_index, read_reference_csv
+
+from ..version import VERSION
+
 from .reference.billable_weight import (
     PFA_DIM_FACTOR,
     PFA_DIM_THRESHOLD,
@@ -21,6 +28,7 @@ from .reference.billable_weight import (
 
 from .loaders import (
     load_pcs_shipments_all_us,
+    stream_pcs_shipments_all_us,
     DEFAULT_COUNTRY,
     DEFAULT_START_DATE,
 )
@@ -28,6 +36,8 @@ from .loaders import (
 
 REFERENCE_DIR = Path(__file__).parent / "reference"
 
+BUNDLE = ReferenceBundle(REFERENCE_DIR, VERSION)
+
 
 def load_pfa_rates() -> pl.DataFrame:
     """
@@ -40,7 +50,7 @@ def load_pfa_rates() -> pl.DataFrame:
             - zone: Shipping zone (1-8)
             - rate: Base rate for this zone/weight combination
     """
-    return pl.read_csv(REFERENCE_DIR / "base_rates_pfa.csv")
+    return BUNDLE.load("pfa_rates")
 
 
 def load_pfs_rates() -> pl.DataFrame:
@@ -54,7 +64,7 @@ def load_pfs_rates() -> pl.DataFrame:
             - zone: Shipping zone (1-9)
             - rate: Base rate for this zone/weight combination
     """
-    return pl.read_csv(REFERENCE_DIR / "base_rates_pfs.csv")
+    return BUNDLE.load("pfs_rates")
 
 
 def load_zones() -> pl.DataFrame:
@@ -67,22 +77,75 @@ def load_zones() -> pl.DataFrame:
     Returns:
         DataFrame with columns: zip, zone, is_remote
     """
-    return pl.read_csv(
+    return BUNDLE.load("zones")
+
+
+def load_zone_index() -> ZipIndex:
+    """Dense ZIP -> zone index over zones.csv (see build_zone_index)."""
+    return cached_zip_index("p2p_us2.zones", (load_zones(),), build_zone_index)
+
+
+def build_zone_index(zones: pl.DataFrame) -> ZipIndex:
+    """
+    Index zone and is_remote by 5-digit ZIP.
+
+    Unmatched ZIPs fall back to the most common zone, then zone 5.
+    """
+    return ZipIndex.from_table(
+        zones,
+        "zip",
+        ["zone", "is_remote"],
+        digits=5,
+        defaults={"zone": _mode_zone(zones), "is_remote": False},
+    )
+
+
+def _mode_zone(zones: pl.DataFrame) -> int:
+    """Most common zone (5 if the table is empty)."""
+    mode = zones.select(pl.col("zone").mode().first()).item()
+    return 5 if mode is None else mode
+
+
+# =============================================================================
+# BUNDLE REGISTRATION
+# =============================================================================
+
+BUNDLE.register(
+    "pfa_rates",
+    lambda: read_reference_csv(REFERENCE_DIR / "base_rates_pfa.csv"),
+    sources=["base_rates_pfa.csv"],
+)
+
+BUNDLE.register(
+    "pfs_rates",
+    lambda: read_reference_csv(REFERENCE_DIR / "base_rates_pfs.csv"),
+    sources=["base_rates_pfs.csv"],
+)
+
+BUNDLE.register(
+    "zones",
+    lambda: read_reference_csv(
         REFERENCE_DIR / "zones.csv",
         schema_overrides={
             "zip": pl.Utf8,
             "zone": pl.Int64,
             "is_remote": pl.Boolean,
         }
-    )
+    ),
+    sources=["zones.csv"],
+)
 
 
 __all__ = [
     "load_pfa_rates",
     "load_pfs_rates",
     "load_zones",
+    "load_zone_index",
+    "build_zone_index",
     "REFERENCE_DIR",
+    "BUNDLE",
     "load_pcs_shipments_all_us",
+    "stream_pcs_shipments_all_us",
     "DEFAULT_COUNTRY",
     "DEFAULT_START_DATE",
     "PFA_DIM_FACTOR",
@@ -6,12 +6,14 @@ Dynamic data loaders for PCS database.
 
 from .pcs_all_us import (
     load_pcs_shipments_all_us,
+    stream_pcs_shipments_all_us,
     DEFAULT_COUNTRY,
     DEFAULT_START_DATE,
 )
 
 __all__ = [
     "load_pcs_shipments_all_us",
+    "stream_pcs_shipments_all_us",
     "DEFAULT_COUNTRY",
     "DEFAULT_START_DATE",
 ]
@@ -14,12 +14,14 @@ Service selection logic:
 
 Modes:
     --full          Full calculation since 2025-01-01, delete existing and reupload
-    --incremental   Find max date, delete that day's data, recalculate from there
-    --days N        Delete and recalculate last N days (by pcs_created)
+    --incremental   Find max date, recalculate from that day and merge changes
+    --days N        Recalculate last N days (by pcs_created) and merge changes
     --parquet       Save to parquet file instead of database
 
 Usage:
     python -m carriers.p2p_us2.scripts.upload_expected_all_us --parquet --start-date 2025-01-01 --end-date 2025-12-31
+    python -m carriers.p2p_us2.scripts.upload_expected_all_us --full --partitions 12
+    python -m carriers.p2p_us2.scripts.upload_expected_all_us --full --run-id full-2025-06-01
     python -m carriers.p2p_us2.scripts.upload_expected_all_us --parquet --parquet-data shared/data/pcs_shipments_all_us_2025-01-01_2025-12-31.parquet --start-date 2025-01-01 --end-date 2025-12-31
 """
 
@@ -31,9 +33,10 @@ from pathlib import Path
 
 import polars as pl
 
-from shared.database import pull_data, execute_query, push_data
+from shared.database import MergeCounts, UploadCheckpoint, pull_data, execute_query, push_data
+from shared.rating import scan_shipments, rate_unique
 from carriers.p2p_us2.data import load_pcs_shipments_all_us, DEFAULT_START_DATE
-from carriers.p2p_us2.calculate_costs import calculate_costs
+from carriers.p2p_us2.calculate_costs import RATING_DATE_FLAGS, RATING_KEY, calculate_costs
 
 
 # =============================================================================
@@ -42,6 +45,11 @@ from carriers.p2p_us2.calculate_costs import calculate_costs
 
 TABLE_NAME = "shipping_costs.expected_shipping_costs_p2p_us2_all_us"
 
+# Rows are identified by order (merges, resumable uploads); dw_timestamp
+# changes on every run
+ORDER_KEYS = ["pcs_orderid"]
+MERGE_IGNORE_COLUMNS = ["dw_timestamp"]
+
 PARQUET_OUTPUT_DIR = Path(__file__).parent / "output" / "all_us"
 
 # PFS weight limit (PFA is 30, PFS is 70 — use the higher for filtering)
@@ -143,20 +151,23 @@ def delete_all(dry_run: bool = False) -> int:
     return count
 
 
-def delete_from_date(start_date: str, dry_run: bool = False) -> int:
-    count = get_row_count_from_date(start_date)
-    if count == 0:
-        return 0
-    if dry_run:
-        print(f"  [DRY RUN] Would delete {count:,} rows from {start_date} onwards")
-        return count
-    delete_query = f"""
-        DELETE FROM {TABLE_NAME}
-        WHERE pcs_created::date >= '{start_date}'::date
+def from_date_scope(start_date: str) -> str:
+    """Merge scope: rows from a start date onwards."""
+    return f"pcs_created::date >= '{start_date}'::date"
+
+
+def merge_from_date(df: pl.DataFrame, start_date: str, batch_size: int) -> MergeCounts:
     """
-    execute_query(delete_query, commit=True)
-    print(f"  Deleted {count:,} rows from {start_date} onwards")
-    return count
+    Refresh rows from a start date onwards by merging on pcs_orderid.
+
+    Orders whose costs did not change are left as they are; orders from the
+    start date that are no longer in df are deleted.
+    """
+    return push_data(
+        df, TABLE_NAME, if_exists="merge", batch_size=batch_size,
+        keys=ORDER_KEYS, ignore_columns=MERGE_IGNORE_COLUMNS,
+        scope=from_date_scope(start_date),
+    )
 
 
 # =============================================================================
@@ -236,24 +247,38 @@ def run_pipeline(
     start_date: str,
     end_date: str | None = None,
     parquet_data: str | None = None,
+    partitions: int = 1,
 ) -> pl.DataFrame:
-    """Run the full calculation pipeline for a date range."""
+    """
+    Run the full calculation pipeline for a date range.
+
+    Partitions are concatenated before rating, so service selection still
+    sees the whole range.
+    """
     # Load ALL US shipments
     if parquet_data:
         print(f"  Loading ALL US shipments from parquet: {parquet_data}...")
-        df = pl.read_parquet(parquet_data)
-        if start_date:
-            df = df.filter(pl.col("pcs_created").cast(pl.Date) >= pl.lit(start_date).str.to_date("%Y-%m-%d"))
-        if end_date:
-            df = df.filter(pl.col("pcs_created").cast(pl.Date) <= pl.lit(end_date).str.to_date("%Y-%m-%d"))
+        # Date filter is pushed down into the parquet scan
+        df = scan_shipments(parquet_data, start_date, end_date).collect(engine="streaming")
     else:
         print(f"  Loading ALL US shipments from {start_date} to {end_date or 'today'}...")
         df = load_pcs_shipments_all_us(
             start_date=start_date,
             end_date=end_date,
+            partitions=partitions,
         )
     print(f"  Loaded {len(df):,} shipments")
 
+    return rate_shipments(df)
+
+
+def rate_shipments(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Rate loaded shipments: every pipeline step after loading.
+
+    Service selection compares costs across each (packagetype, weight
+    bracket) group, so the whole date range is rated at once.
+    """
     if len(df) == 0:
         return pl.DataFrame()
 
@@ -295,7 +320,8 @@ def run_pipeline(
 
     # Calculate costs (both PFA and PFS)
     print("  Calculating costs...")
-    df = calculate_costs(df)
+    df, stats = rate_unique(df, calculate_costs, RATING_KEY, RATING_DATE_FLAGS)
+    print(f"  Deduplicated rating: {stats}")
 
     # Restore original weight
     df = df.with_columns(original_weight.alias("weight_lbs"))
@@ -366,21 +392,24 @@ def run_pipeline(
 
 def _run_calculation_and_upload(
     start_date: str,
-    rows_deleted: int,
+    rows_before: int,
     batch_size: int,
     dry_run: bool,
     end_date: str | None = None,
     date_range_suffix: str = "",
-    show_net_change: bool = False,
+    merge: bool = False,
     calc_step_num: int = 2,
     upload_step_num: int = 3,
     parquet_data: str | None = None,
+    partitions: int = 1,
+    run_id: str | None = None,
 ) -> int:
     print(f"\nStep {calc_step_num}: Calculating expected costs from {start_date} to {end_date or 'today'}...")
     df = run_pipeline(
         start_date=start_date,
         end_date=end_date,
         parquet_data=parquet_data,
+        partitions=partitions,
     )
 
     if len(df) == 0:
@@ -390,10 +419,13 @@ def _run_calculation_and_upload(
     print("\n" + "=" * 60)
     print("UPLOAD SUMMARY")
     print("=" * 60)
-    print(f"Rows deleted: {rows_deleted:,}")
-    print(f"New rows to upload: {len(df):,}")
-    if show_net_change:
-        print(f"Net change: {len(df) - rows_deleted:+,}")
+    if merge:
+        print(f"Existing rows: {rows_before:,}")
+        print(f"Recalculated rows: {len(df):,}")
+        print(f"Net change: {len(df) - rows_before:+,}")
+    else:
+        print(f"Rows deleted: {rows_before:,}")
+        print(f"New rows to upload: {len(df):,}")
     print(f"Date range: {start_date} to {end_date or 'today'}{date_range_suffix}")
     cost_total_sum = df["cost_total"].sum()
     cost_total_mean = df["cost_total"].mean()
@@ -403,11 +435,16 @@ def _run_calculation_and_upload(
         print(f"Avg per shipment: ${cost_total_mean:,.2f}")
 
     if dry_run:
-        print(f"\n[DRY RUN] Would upload to: {TABLE_NAME}")
+        print(f"\n[DRY RUN] Would {'merge into' if merge else 'upload to'}: {TABLE_NAME}")
         return len(df)
 
-    print(f"\nStep {upload_step_num}: Uploading to {TABLE_NAME}...")
-    push_data(df, TABLE_NAME, batch_size=batch_size)
+    if merge:
+        # Merge: only new and changed orders are written
+        print(f"\nStep {upload_step_num}: Merging into {TABLE_NAME}...")
+        merge_from_date(df, start_date, batch_size)
+    else:
+        print(f"\nStep {upload_step_num}: Uploading to {TABLE_NAME}...")
+        push_data(df, TABLE_NAME, batch_size=batch_size, keys=ORDER_KEYS, run_id=run_id)
 
     return len(df)
 
@@ -418,6 +455,8 @@ def run_full_mode(
     start_date: str | None = None,
     end_date: str | None = None,
     parquet_data: str | None = None,
+    partitions: int = 1,
+    run_id: str | None = None,
 ) -> int:
     start = start_date or DEFAULT_START_DATE
 
@@ -430,20 +469,26 @@ def run_full_mode(
     if parquet_data:
         print(f"Data source: {parquet_data}")
 
-    print("\nStep 1: Deleting all existing rows...")
-    deleted = delete_all(dry_run=dry_run)
+    if run_id and UploadCheckpoint(TABLE_NAME, run_id).exists():
+        print(f"\nStep 1: Resuming upload {run_id!r}, keeping rows already uploaded...")
+        deleted = 0
+    else:
+        print("\nStep 1: Deleting all existing rows...")
+        deleted = delete_all(dry_run=dry_run)
 
     return _run_calculation_and_upload(
         start_date=start,
         end_date=end_date,
-        rows_deleted=deleted,
+        rows_before=deleted,
         batch_size=batch_size,
         dry_run=dry_run,
         parquet_data=parquet_data,
+        partitions=partitions,
+        run_id=run_id,
     )
 
 
-def run_incremental_mode(batch_size: int, dry_run: bool) -> int:
+def run_incremental_mode(batch_size: int, dry_run: bool, partitions: int = 1) -> int:
     print("=" * 60)
     print("INCREMENTAL MODE - P2P US2 EXPECTED COSTS (ALL US)")
     print("=" * 60)
@@ -454,43 +499,42 @@ def run_incremental_mode(batch_size: int, dry_run: bool) -> int:
     if max_pcs_created is None:
         print(f"  Table is empty or doesn't exist. Using default start date: {DEFAULT_START_DATE}")
         start_date = DEFAULT_START_DATE
-        rows_deleted = 0
+        rows_existing = 0
     else:
         start_date = max_pcs_created.strftime("%Y-%m-%d")
+        rows_existing = get_row_count_from_date(start_date)
         print(f"  Max pcs_created: {max_pcs_created}")
-        print(f"  Will process from: {start_date}")
-
-        print(f"\nStep 2: Deleting data from {start_date} onwards...")
-        rows_deleted = delete_from_date(start_date, dry_run=dry_run)
+        print(f"  Will process from: {start_date} ({rows_existing:,} existing rows)")
 
     return _run_calculation_and_upload(
         start_date=start_date,
-        rows_deleted=rows_deleted,
+        rows_before=rows_existing,
         batch_size=batch_size,
         dry_run=dry_run,
-        show_net_change=True,
-        calc_step_num=3,
-        upload_step_num=4,
+        merge=True,
+        partitions=partitions,
     )
 
 
-def run_days_mode(days: int, batch_size: int, dry_run: bool) -> int:
+def run_days_mode(days: int, batch_size: int, dry_run: bool, partitions: int = 1) -> int:
     print("=" * 60)
     print(f"DAYS MODE ({days} days) - P2P US2 EXPECTED COSTS (ALL US)")
     print("=" * 60)
 
     start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
 
-    print(f"\nStep 1: Deleting rows from {start_date} onwards...")
-    rows_deleted = delete_from_date(start_date, dry_run=dry_run)
+    print(f"\nStep 1: Counting rows from {start_date} onwards...")
+    rows_existing = get_row_count_from_date(start_date)
+    print(f"  {rows_existing:,} existing rows")
 
     return _run_calculation_and_upload(
         start_date=start_date,
-        rows_deleted=rows_deleted,
+        rows_before=rows_existing,
         batch_size=batch_size,
         dry_run=dry_run,
         date_range_suffix=f" ({days} days)",
-        show_net_change=True,
+        merge=True,
+        partitions=partitions,
     )
 
 
@@ -498,6 +542,7 @@ def run_parquet_mode(
     start_date: str | None = None,
     end_date: str | None = None,
     parquet_data: str | None = None,
+    partitions: int = 1,
 ) -> int:
     start = start_date or DEFAULT_START_DATE
 
@@ -513,6 +558,7 @@ def run_parquet_mode(
         start_date=start,
         end_date=end_date,
         parquet_data=parquet_data,
+        partitions=partitions,
     )
 
     if len(df) == 0:
@@ -571,13 +617,14 @@ def main():
         epilog="""
 Modes:
   --full          Full calculation since 2025-01-01, delete existing and reupload
-  --incremental   Find max date, delete that day's data, recalculate from there
-  --days N        Delete and recalculate last N days (by pcs_created)
+  --incremental   Find max date, recalculate from that day and merge changes
+  --days N        Recalculate last N days (by pcs_created) and merge changes
   --parquet       Save to parquet file instead of database
 
 Examples:
   python -m carriers.p2p_us2.scripts.upload_expected_all_us --parquet --start-date 2025-01-01 --end-date 2025-12-31
   python -m carriers.p2p_us2.scripts.upload_expected_all_us --full
+  python -m carriers.p2p_us2.scripts.upload_expected_all_us --full --run-id full-2025-06-01
   python -m carriers.p2p_us2.scripts.upload_expected_all_us --incremental
         """
     )
@@ -586,12 +633,15 @@ Examples:
     mode_group.add_argument("--full", action="store_true",
         help="Full calculation since 2025-01-01")
     mode_group.add_argument("--incremental", action="store_true",
-        help="Find max date, delete that day's data, recalculate from there")
+        help="Find max date, recalculate from that day and merge changes")
     mode_group.add_argument("--days", type=int, metavar="N",
-        help="Delete and recalculate last N days")
+        help="Recalculate last N days and merge changes")
 
     parser.add_argument("--batch-size", type=int, default=5000,
         help="Number of rows per INSERT batch (default: 5000)")
+    parser.add_argument("--run-id", type=str, default=None,
+        help="Full mode: commit in groups and checkpoint progress under this id; "
+             "rerun with the same id to resume a failed upload")
     parser.add_argument("--dry-run", action="store_true",
         help="Don't modify database, just show what would happen")
     parser.add_argument("--start-date", type=str,
@@ -602,6 +652,8 @@ Examples:
         help="Save to parquet file instead of uploading to database")
     parser.add_argument("--parquet-data", type=str, metavar="PATH",
         help="Load PCS shipments from parquet file instead of database")
+    parser.add_argument("--partitions", type=int, default=1, metavar="N",
+        help="Load PCS shipments as N date-range queries run concurrently (default: 1)")
 
     args = parser.parse_args()
 
@@ -611,6 +663,7 @@ Examples:
                 start_date=args.start_date,
                 end_date=args.end_date,
                 parquet_data=args.parquet_data,
+                partitions=args.partitions,
             )
             print("\n" + "=" * 60)
             print(f"Successfully saved {rows:,} rows to parquet")
@@ -622,6 +675,8 @@ Examples:
                 start_date=args.start_date,
                 end_date=args.end_date,
                 parquet_data=args.parquet_data,
+                partitions=args.partitions,
+                run_id=args.run_id,
             )
             print("\n" + "=" * 60)
             if args.dry_run:
@@ -633,6 +688,7 @@ Examples:
             rows = run_incremental_mode(
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                partitions=args.partitions,
             )
             print("\n" + "=" * 60)
             if args.dry_run:
@@ -645,6 +701,7 @@ Examples:
                 days=args.days,
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                partitions=args.partitions,
             )
             print("\n" + "=" * 60)
             if args.dry_run:
@@ -5,6 +5,10 @@ DataFrame in, DataFrame out. The input can come from any source (PCS database,
 CSV, manual creation) as long as it contains the required columns. The output
 is the same DataFrame with calculation columns and costs appended.
 
+A pl.LazyFrame is accepted as well and returns a LazyFrame: the calculation
+is then added to the caller's query plan (e.g. on top of pl.scan_parquet)
+and runs when collected, optionally with collect(engine="streaming").
+
 REQUIRED INPUT COLUMNS
 ----------------------
     ship_date           - Date for rate lookups
@@ -36,10 +40,15 @@ USAGE
 
 import polars as pl
 
+from shared.rating import Frame, add_dimensions, same_kind, require_not_null, lookup_brackets, canonical_zip, rate_unique
+from shared.reference import ZipIndex
+from shared.surcharges import apply_surcharges
+
 from .version import VERSION
 from .data import (
     load_rates,
-    load_zones,
+    load_zone_index,
+    build_zone_index,
     load_oversize_rates,
     DIM_FACTOR,
     DIM_THRESHOLD,
@@ -51,21 +60,33 @@ from .surcharges import (
     ALL,
     BASE,
     DEPENDENT,
-    get_exclusivity_group,
-    get_unique_exclusivity_groups,
     peak_season_condition,
     peak_surcharge_amount,
 )
 
 
+# Cost-determining inputs, canonicalized, for calculate_costs(dedup=True).
+# The ship date enters only through the seasonal windows the calculator checks.
+RATING_KEY = [
+    pl.col("production_site"),
+    canonical_zip(3),
+    pl.col("length_in"),
+    pl.col("width_in"),
+    pl.col("height_in"),
+    pl.col("weight_lbs"),
+]
+RATING_DATE_FLAGS = [peak_season_condition()]
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
 def calculate_costs(
-    df: pl.DataFrame,
-    zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+    df: Frame,
+    zones: pl.DataFrame | None = None,
+    dedup: bool = False,
+) -> Frame:
     """
     Calculate shipping costs for a shipment DataFrame.
 
@@ -73,12 +94,21 @@ def calculate_costs(
     the same DataFrame with all calculation columns and costs appended.
 
     Args:
-        df: Raw shipment DataFrame with required columns (see module docstring)
+        df: Raw shipment DataFrame or LazyFrame with required columns (see module docstring)
         zones: Zone mapping DataFrame (loaded from zones.csv if not provided)
+        dedup: Rate each unique RATING_KEY once and join the results back
+            (see shared.rating.dedup)
 
     Returns:
-        DataFrame with supplemented data, surcharge flags, and costs
+        DataFrame (LazyFrame for lazy input) with supplemented data,
+        surcharge flags, and costs
     """
+    if dedup:
+        df, _ = rate_unique(
+            df, lambda keys: calculate_costs(keys, zones), RATING_KEY, RATING_DATE_FLAGS
+        )
+        return df
+
     df = supplement_shipments(df, zones)
     df = calculate(df)
     return df
@@ -89,9 +119,9 @@ def calculate_costs(
 # =============================================================================
 
 def supplement_shipments(
-    df: pl.DataFrame,
+    df: Frame,
     zones: pl.DataFrame | None = None
-) -> pl.DataFrame:
+) -> Frame:
     """
     Supplement shipment data with zone and weight calculations.
 
@@ -105,52 +135,26 @@ def supplement_shipments(
             - shipping_zone, rate_zone
             - dim_weight_lbs, uses_dim_weight, billable_weight_lbs
     """
-    if zones is None:
-        zones = load_zones()
+    zone_index = load_zone_index() if zones is None else build_zone_index(zones)
 
     df = _add_calculated_dimensions(df)
-    df = _lookup_zones(df, zones)
+    df = _lookup_zones(df, zone_index)
     df = _add_billable_weight(df)
 
     return df
 
 
-def _add_calculated_dimensions(df: pl.DataFrame) -> pl.DataFrame:
-    """Add calculated dimensional columns.
+def _add_calculated_dimensions(df: Frame) -> Frame:
+    """
+    Add calculated dimensional columns.
 
-    Note: Dimensions are rounded to 1 decimal place to avoid floating point
-    precision issues when comparing against surcharge thresholds.
+    Uses the shared dimension stage (rounded to 1 decimal, see
+    shared.rating.dimensions); columns already present are kept as-is.
     """
-    return df.with_columns([
-        # Cubic inches (rounded to whole number)
-        (pl.col("length_in") * pl.col("width_in") * pl.col("height_in"))
-        .round(0)
-        .alias("cubic_in"),
-
-        # Longest dimension (rounded to 1 decimal)
-        pl.max_horizontal("length_in", "width_in", "height_in")
-        .round(1)
-        .alias("longest_side_in"),
-
-        # Second longest dimension (rounded to 1 decimal)
-        pl.concat_list(["length_in", "width_in", "height_in"])
-        .list.sort(descending=True)
-        .list.get(1)
-        .round(1)
-        .alias("second_longest_in"),
-
-        # Length + Girth (longest + 2 * sum of other two, rounded to 1 decimal)
-        (
-            pl.max_horizontal("length_in", "width_in", "height_in") +
-            2 * (
-                pl.col("length_in") + pl.col("width_in") + pl.col("height_in") -
-                pl.max_horizontal("length_in", "width_in", "height_in")
-            )
-        ).round(1).alias("length_plus_girth"),
-    ])
+    return add_dimensions(df, ["cubic_in", "longest_side_in", "second_longest_in", "length_plus_girth"])
 
 
-def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
+def _lookup_zones(df: Frame, zone_index: ZipIndex) -> Frame:
     """
     Add zone data to shipments based on 3-digit ZIP prefix.
 
@@ -169,60 +173,22 @@ def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
     THREE-TIER FALLBACK
     -------------------
     1. Exact 3-digit ZIP prefix match from zones.csv
-    2. State-level mode (most common zone for that state)
+    2. Overall mode (most common zone for the origin)
     3. Default zone 5 (mid-range, minimizes worst-case pricing error)
-    """
-    # Extract 3-digit ZIP prefix
-    df = df.with_columns(
-        pl.col("shipping_zip_code")
-        .cast(pl.Utf8)
-        .str.slice(0, 3)
-        .str.zfill(3)
-        .alias("_zip_prefix")
-    )
 
-    zones_subset = zones.select(["zip_prefix", "phx_zone", "cmh_zone"])
-
-    # State-level fallback (mode zone per state) - strip asterisks for mode calc
-    state_zones = (
-        zones
-        .with_columns([
-            pl.col("phx_zone").str.replace(r"\*", "").alias("_phx_base"),
-            pl.col("cmh_zone").str.replace(r"\*", "").alias("_cmh_base"),
-        ])
-        .filter(
-            (pl.col("_phx_base") != "") | (pl.col("_cmh_base") != "")
-        )
-    )
-
-    # For state mode, we need to derive state from ZIP prefix
-    # Since we don't have explicit state mapping, use zone mode across all valid entries
-    # For simplicity, just calculate overall mode for fallback
-    phx_mode = (
-        state_zones
-        .filter(pl.col("_phx_base") != "")
-        .select(pl.col("_phx_base").mode().first())
-        .item()
-    )
-    cmh_mode = (
-        state_zones
-        .filter(pl.col("_cmh_base") != "")
-        .select(pl.col("_cmh_base").mode().first())
-        .item()
-    )
-
-    # Join on ZIP prefix
-    df = df.join(zones_subset, left_on="_zip_prefix", right_on="zip_prefix", how="left")
+    Both fallbacks are precomputed in the ZIP index (see build_zone_index).
+    """
+    df = df.with_columns(zone_index.slot())
 
-    # Select zone based on production site, coalesce with fallback
-    df = df.with_columns([
+    # Select zone based on production site
+    df = df.with_columns(
         pl.when(pl.col("production_site") == "Phoenix")
-        .then(pl.coalesce([pl.col("phx_zone"), pl.lit(phx_mode), pl.lit("5")]))
+        .then(zone_index.lookup("phx_zone"))
         .when(pl.col("production_site") == "Columbus")
-        .then(pl.coalesce([pl.col("cmh_zone"), pl.lit(cmh_mode), pl.lit("5")]))
+        .then(zone_index.lookup("cmh_zone"))
         .otherwise(pl.lit("5"))
         .alias("shipping_zone")
-    ])
+    )
 
     # Create rate_zone by stripping asterisk
     df = df.with_columns(
@@ -232,13 +198,10 @@ def _lookup_zones(df: pl.DataFrame, zones: pl.DataFrame) -> pl.DataFrame:
         .alias("rate_zone")
     )
 
-    # Drop intermediate columns
-    df = df.drop(["_zip_prefix", "phx_zone", "cmh_zone"])
-
-    return df
+    return df.drop(zone_index.slot_column)
 
 
-def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
+def _add_billable_weight(df: Frame) -> Frame:
     """
     Calculate dimensional weight and billable weight.
 
@@ -270,7 +233,7 @@ def _add_billable_weight(df: pl.DataFrame) -> pl.DataFrame:
 # CALCULATE COSTS
 # =============================================================================
 
-def calculate(df: pl.DataFrame) -> pl.DataFrame:
+def calculate(df: Frame) -> Frame:
     """
     Calculate shipping costs for supplemented shipments.
 
@@ -286,11 +249,11 @@ def calculate(df: pl.DataFrame) -> pl.DataFrame:
         3. Peak surcharge       - date-based seasonal surcharge
     """
     # Phase 1: Apply base surcharges (don't reference other surcharge flags)
-    df = _apply_surcharges(df, BASE)
+    df = apply_surcharges(df, BASE)
 
     # Phase 2: Apply dependent surcharges (reference flags from phase 1)
     # Note: USPS has no dependent surcharges currently
-    df = _apply_surcharges(df, DEPENDENT)
+    df = apply_surcharges(df, DEPENDENT)
 
     # Phase 3: Look up base shipping rate
     df = _lookup_base_rate(df)
@@ -311,107 +274,31 @@ def calculate(df: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
-def _apply_surcharges(df: pl.DataFrame, surcharges: list) -> pl.DataFrame:
-    """
-    Apply surcharges, handling mutual exclusivity within exclusivity groups.
-
-    Surcharges with the same exclusivity_group compete - only highest priority wins.
-    Surcharges without exclusivity_group are applied independently.
-    """
-    # Separate standalone vs exclusive surcharges
-    standalone = [s for s in surcharges if s.exclusivity_group is None]
-    exclusive = [s for s in surcharges if s.exclusivity_group is not None]
-
-    # Apply standalone surcharges (no competition)
-    for s in standalone:
-        df = _apply_single_surcharge(df, s)
-
-    # Apply exclusive surcharges by group
-    for group_name in get_unique_exclusivity_groups(exclusive):
-        df = _apply_exclusive_group(df, group_name)
-
-    return df
-
-
-def _apply_single_surcharge(df: pl.DataFrame, surcharge) -> pl.DataFrame:
-    """Apply a single surcharge without competition."""
-    flag_col = f"surcharge_{surcharge.name.lower()}"
-    cost_col = f"cost_{surcharge.name.lower()}"
-
-    df = df.with_columns(surcharge.conditions().alias(flag_col))
-    df = df.with_columns(
-        pl.when(pl.col(flag_col))
-        .then(pl.lit(surcharge.cost()))
-        .otherwise(pl.lit(0.0))
-        .alias(cost_col)
-    )
-
-    return df
-
-
-def _apply_exclusive_group(df: pl.DataFrame, group_name: str) -> pl.DataFrame:
-    """
-    Apply mutually exclusive surcharges within a group.
-
-    Only the highest priority surcharge (lowest number) that matches wins.
-    """
-    group = get_exclusivity_group(group_name)
-    exclusion_mask = pl.lit(False)
-
-    for surcharge in group:
-        flag_col = f"surcharge_{surcharge.name.lower()}"
-        cost_col = f"cost_{surcharge.name.lower()}"
-
-        # Applies only if: conditions met AND no higher priority already matched
-        applies = surcharge.conditions() & ~exclusion_mask
-
-        df = df.with_columns(applies.alias(flag_col))
-        df = df.with_columns(
-            pl.when(pl.col(flag_col))
-            .then(pl.lit(surcharge.cost()))
-            .otherwise(pl.lit(0.0))
-            .alias(cost_col)
-        )
-
-        # Update exclusion mask: if this one matched, exclude the rest
-        exclusion_mask = exclusion_mask | pl.col(flag_col)
-
-    return df
-
-
-def _lookup_base_rate(df: pl.DataFrame) -> pl.DataFrame:
+def _lookup_base_rate(df: Frame) -> Frame:
     """Look up base shipping rate by zone and weight bracket."""
-    input_count = len(df)
     rates = load_rates()
 
-    df = df.with_row_index("_row_id")
-
-    df = (
-        df
-        .join(rates, left_on="rate_zone", right_on="zone", how="left")
-        .filter(
-            (pl.col("billable_weight_lbs") > pl.col("weight_lbs_lower")) &
-            (pl.col("billable_weight_lbs") <= pl.col("weight_lbs_upper"))
-        )
-        .rename({"rate": "cost_base"})
+    df = lookup_brackets(
+        df,
+        rates,
+        on=("rate_zone", "zone"),
+        value="billable_weight_lbs",
+        columns={"rate": "cost_base"},
     )
 
-    output_count = len(df)
-    if output_count < input_count:
-        missing_count = input_count - output_count
-        raise ValueError(
-            f"{missing_count} shipment(s) have no matching rate bracket. "
-            f"Check rate_zone and billable_weight_lbs values. "
-            f"USPS Ground Advantage max weight is 20 lbs."
-        )
-
-    df = df.drop(["weight_lbs_lower", "weight_lbs_upper"])
-    df = df.sort("_row_id").drop("_row_id")
+    df = require_not_null(
+        df,
+        "cost_base",
+        "{missing_count} row(s) have no matching rate bracket "
+        "(shipments, or unique rating keys under dedup). "
+        "Check rate_zone and billable_weight_lbs values. "
+        "USPS Ground Advantage max weight is 20 lbs.",
+    )
 
     return df
 
 
-def _apply_oversize_rate(df: pl.DataFrame) -> pl.DataFrame:
+def _apply_oversize_rate(df: Frame) -> Frame:
     """
     Apply oversize rate for packages exceeding girth threshold.
 
@@ -440,7 +327,13 @@ def _apply_oversize_rate(df: pl.DataFrame) -> pl.DataFrame:
         .select(["zone", "oversize_rate"])
     )
 
-    df = df.join(latest_rates, left_on="rate_zone", right_on="zone", how="left")
+    df = df.join(
+        same_kind(latest_rates, df),
+        left_on="rate_zone",
+        right_on="zone",
+        how="left",
+        maintain_order="left",
+    )
 
     # Replace cost_base with oversize_rate when applicable
     df = df.with_columns(
@@ -456,7 +349,7 @@ def _apply_oversize_rate(df: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
-def _apply_peak_surcharge(df: pl.DataFrame) -> pl.DataFrame:
+def _apply_peak_surcharge(df: Frame) -> Frame:
     """
     Apply peak season surcharge based on ship date, weight tier, and zone.
 
@@ -484,20 +377,20 @@ def _apply_peak_surcharge(df: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
-def _calculate_subtotal(df: pl.DataFrame) -> pl.DataFrame:
+def _calculate_subtotal(df: Frame) -> Frame:
     """Calculate cost_subtotal as sum of base rate, surcharges, and peak surcharge."""
     cost_cols = ["cost_base"] + [f"cost_{s.name.lower()}" for s in ALL] + ["cost_peak"]
     return df.with_columns(pl.sum_horizontal(cost_cols).alias("cost_subtotal"))
 
 
-def _calculate_total(df: pl.DataFrame) -> pl.DataFrame:
+def _calculate_total(df: Frame) -> Frame:
     """Calculate cost_total (same as subtotal for USPS - no fuel surcharge)."""
     return df.with_columns(
         pl.col("cost_subtotal").alias("cost_total")
     )
 
 
-def _stamp_version(df: pl.DataFrame) -> pl.DataFrame:
+def _stamp_version(df: Frame) -> Frame:
     """Stamp calculator version on output."""
     return df.with_columns(pl.lit(VERSION).alias("calculator_version"))
 
@@ -28,9 +28,8 @@ def main():
     # --- 1. Export comparison dataset ---
     print("Loading comparison data from Redshift...")
     query = (SQL_DIR / "comparison.sql").read_text()
-    # Use pandas for initial load to handle mixed types, then convert to polars
-    df_pd = pull_data(query, as_polars=False)
-    df = pl.from_pandas(df_pd)
+    # Column types come from the result schema, not the first rows
+    df = pull_data(query)
     print(f"  Loaded {len(df):,} rows, {len(df.columns)} columns")
 
     # Cast billing_date to Date (removes time component, avoids 22:00:00 boundary issues)
@@ -126,11 +125,8 @@ def main():
         WHERE e.pcs_orderid IS NULL
     """
 
-    # Use pandas for initial load to handle mixed types
-    unmatched_expected_pd = pull_data(unmatched_expected_query, as_polars=False)
-    unmatched_actual_pd = pull_data(unmatched_actual_query, as_polars=False)
-    unmatched_expected = pl.from_pandas(unmatched_expected_pd)
-    unmatched_actual = pl.from_pandas(unmatched_actual_pd)
+    unmatched_expected = pull_data(unmatched_expected_query)
+    unmatched_actual = pull_data(unmatched_actual_query)
 
     # Cast billing_date to Date (removes time component)
     if "billing_date" in unmatched_actual.columns:
@@ -6,11 +6,18 @@ Reference data and loaders for rates, zones, and configuration.
 Structure:
     - reference/: Static reference data (zones, rates, config)
     - loaders/: Dynamic data loaders (PCS database)
+
+Reference tables are served from the prebuilt reference bundle when it is
+current (see shared/reference/bundle.py), otherwise built from the CSVs.
 """
 
 import polars as pl
 from pathlib import Path
 
+from shared.reference import ReferenceBundle, ZipIndex, cached_zip_index, read_reference_csv
+
+from ..version import VERSION
+
 from .reference.billable_weight import (
     DIM_FACTOR,
     DIM_THRESHOLD,
@@ -23,6 +30,7 @@ from .reference.billable_weight import (
 from .loaders import (
     load_pcs_shipments,
     load_pcs_shipments_all_us,
+    stream_pcs_shipments_all_us,
     DEFAULT_CARRIER,
     DEFAULT_PRODUCTION_SITES,
     DEFAULT_START_DATE,
@@ -31,21 +39,11 @@ from .loaders import (
 
 REFERENCE_DIR = Path(__file__).parent / "reference"
 
+BUNDLE = ReferenceBundle(REFERENCE_DIR, VERSION)
 
-def load_rates() -> pl.DataFrame:
-    """
-    Load base rates in long format, ready for joining.
-
-    Transforms wide CSV format (zone_1, zone_2, ...) to long format.
 
-    Returns:
-        DataFrame with columns:
-            - weight_lbs_lower: Lower bound of weight bracket (exclusive)
-            - weight_lbs_upper: Upper bound of weight bracket (inclusive)
-            - zone: Shipping zone (1-8)
-            - rate: Base rate for this zone/weight combination
-    """
-    rates = pl.read_csv(REFERENCE_DIR / "base_rates.csv")
+def _rates_to_long(rates: pl.DataFrame) -> pl.DataFrame:
+    """Transform wide rate table (zone_1, zone_2, ...) to long format."""
     zone_cols = [c for c in rates.columns if c.startswith("zone_")]
 
     return (
@@ -63,6 +61,22 @@ def load_rates() -> pl.DataFrame:
     )
 
 
+def load_rates() -> pl.DataFrame:
+    """
+    Load base rates in long format, ready for joining.
+
+    Transforms wide CSV format (zone_1, zone_2, ...) to long format.
+
+    Returns:
+        DataFrame with columns:
+            - weight_lbs_lower: Lower bound of weight bracket (exclusive)
+            - weight_lbs_upper: Upper bound of weight bracket (inclusive)
+            - zone: Shipping zone (1-8)
+            - rate: Base rate for this zone/weight combination
+    """
+    return BUNDLE.load("rates")
+
+
 def load_zones() -> pl.DataFrame:
     """
     Load zone mappings from CSV.
@@ -73,14 +87,7 @@ def load_zones() -> pl.DataFrame:
     Returns:
         DataFrame with columns: zip_prefix, phx_zone, cmh_zone
     """
-    return pl.read_csv(
-        REFERENCE_DIR / "zones.csv",
-        schema_overrides={
-            "zip_prefix": pl.Utf8,  # Keep prefixes as strings (leading zeros)
-            "phx_zone": pl.Utf8,    # Zone can have asterisks (1*, 2*, 3*)
-            "cmh_zone": pl.Utf8,    # Zone can have asterisks (1*, 2*, 3*)
-        }
-    )
+    return BUNDLE.load("zones")
 
 
 def load_oversize_rates() -> pl.DataFrame:
@@ -96,25 +103,94 @@ def load_oversize_rates() -> pl.DataFrame:
             - zone: Shipping zone (1-9)
             - oversize_rate: Flat rate for oversize packages
     """
-    return pl.read_csv(
+    return BUNDLE.load("oversize_rates")
+
+
+def load_zone_index() -> ZipIndex:
+    """Dense ZIP prefix -> phx/cmh zone index over zones.csv (see build_zone_index)."""
+    return cached_zip_index("usps.zones", (load_zones(),), build_zone_index)
+
+
+def build_zone_index(zones: pl.DataFrame) -> ZipIndex:
+    """
+    Index phx_zone/cmh_zone by 3-digit ZIP prefix.
+
+    Unmatched prefixes fall back to the most common zone per origin (asterisk
+    stripped), then zone "5".
+    """
+    return ZipIndex.from_table(
+        zones,
+        "zip_prefix",
+        ["phx_zone", "cmh_zone"],
+        digits=3,
+        defaults={
+            "phx_zone": _mode_zone(zones, "phx_zone") or "5",
+            "cmh_zone": _mode_zone(zones, "cmh_zone") or "5",
+        },
+    )
+
+
+def _mode_zone(zones: pl.DataFrame, column: str) -> str | None:
+    """Most common zone of a column, ignoring asterisks and empty values."""
+    return (
+        zones
+        .select(pl.col(column).str.replace(r"\*", ""))
+        .filter(pl.col(column) != "")
+        .select(pl.col(column).mode().first())
+        .item()
+    )
+
+
+# =============================================================================
+# BUNDLE REGISTRATION
+# =============================================================================
+
+BUNDLE.register(
+    "rates",
+    lambda: read_reference_csv(REFERENCE_DIR / "base_rates.csv", transform=_rates_to_long),
+    sources=["base_rates.csv"],
+)
+
+BUNDLE.register(
+    "zones",
+    lambda: read_reference_csv(
+        REFERENCE_DIR / "zones.csv",
+        schema_overrides={
+            "zip_prefix": pl.Utf8,  # Keep prefixes as strings (leading zeros)
+            "phx_zone": pl.Utf8,    # Zone can have asterisks (1*, 2*, 3*)
+            "cmh_zone": pl.Utf8,    # Zone can have asterisks (1*, 2*, 3*)
+        }
+    ),
+    sources=["zones.csv"],
+)
+
+BUNDLE.register(
+    "oversize_rates",
+    lambda: read_reference_csv(
         REFERENCE_DIR / "oversize_rates.csv",
         schema_overrides={
             "date_from": pl.Date,
             "zone": pl.Int64,
             "oversize_rate": pl.Float64,
         }
-    )
+    ),
+    sources=["oversize_rates.csv"],
+)
 
 
 __all__ = [
     # Reference data loaders
     "load_rates",
     "load_zones",
+    "load_zone_index",
+    "build_zone_index",
     "load_oversize_rates",
     "REFERENCE_DIR",
+    "BUNDLE",
     # PCS data loaders
     "load_pcs_shipments",
     "load_pcs_shipments_all_us",
+    "stream_pcs_shipments_all_us",
     "DEFAULT_CARRIER",
     "DEFAULT_PRODUCTION_SITES",
     "DEFAULT_START_DATE",
@@ -16,7 +16,7 @@ from datetime import datetime
 
 import polars as pl
 
-from shared.database import pull_data
+from shared.database import pull_data, pull_many
 
 
 # =============================================================================
@@ -64,9 +64,8 @@ def load_comparison_data(
         date_to_filter=date_to_filter,
     )
 
-    # Use pandas first to avoid Polars schema inference issues with mixed types
-    pdf = pull_data(query, as_polars=False)
-    df = pl.from_pandas(pdf)
+    # Column types come from the result schema, not the first rows
+    df = pull_data(query)
 
     # Add combined base+peak column (USPS includes peak in base rate on invoices)
     df = df.with_columns(
@@ -118,9 +117,11 @@ def get_match_rate_data(
     # Total expected in same date range (use pcs_created if no date filters)
     total_expected_query = f"SELECT COUNT(*) as cnt FROM {EXPECTED_TABLE}"
 
-    actual_count = int(pull_data(actual_orderids_query)["cnt"][0])
-    matched_count = int(pull_data(matched_query)["cnt"][0])
-    total_expected = int(pull_data(total_expected_query)["cnt"][0])
+    # The three counts are independent: run them concurrently
+    actual_count, matched_count, total_expected = (
+        int(result["cnt"][0])
+        for result in pull_many([actual_orderids_query, matched_query, total_expected_query])
+    )
 
     return {
         "actual_orderids": actual_count,
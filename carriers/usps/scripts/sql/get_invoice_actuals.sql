@@ -1,5 +1,5 @@
 -- Get actual costs from USPS invoices
--- Parameter: {tracking_numbers} - comma-separated list of tracking numbers (quoted)
+-- Parameter: {keys} - key table with a trackingnumber column (see shared.database.pull_by_keys)
 -- Note: Uses 'pic' column for tracking number (impb is often NULL)
 --
 -- Records before Nov 2025 may have NULL base_postage (no manifest breakdown).
@@ -26,6 +26,6 @@ SELECT
     ca_reason::TEXT as adjustment_reason,
     COALESCE(ca_postage_variance, 0)::FLOAT as adjustment_amount
 FROM poc_staging.usps
-WHERE REPLACE(pic, '''', '') IN ({tracking_numbers})
-  AND transaction_type = 'PURCHASE'
+JOIN {keys} k ON REPLACE(pic, '''', '') = k.trackingnumber
+WHERE transaction_type = 'PURCHASE'
   AND final_postage_usd IS NOT NULL  -- Must have a total cost
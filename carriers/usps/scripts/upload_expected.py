@@ -6,14 +6,15 @@ Calculates expected USPS shipping costs and uploads them to the database.
 
 Modes:
     --full          Full calculation since 2025-01-01, delete existing and reupload
-    --incremental   Find max date, delete that day's data, recalculate from there
-    --days N        Delete and recalculate last N days (by pcs_created)
+    --incremental   Find max date, recalculate from that day and merge changes
+    --days N        Recalculate last N days (by pcs_created) and merge changes
 
 Usage:
     python -m carriers.usps.scripts.upload_expected --full
     python -m carriers.usps.scripts.upload_expected --incremental
     python -m carriers.usps.scripts.upload_expected --days 7
     python -m carriers.usps.scripts.upload_expected --full --dry-run
+    python -m carriers.usps.scripts.upload_expected --full --run-id full-2025-06-01
 """
 
 import argparse
@@ -22,7 +23,7 @@ from datetime import datetime, timedelta
 
 import polars as pl
 
-from shared.database import pull_data, execute_query, push_data
+from shared.database import MergeCounts, UploadCheckpoint, pull_data, execute_query, push_data
 from carriers.usps.data import load_pcs_shipments, DEFAULT_START_DATE, DEFAULT_PRODUCTION_SITES
 from carriers.usps.calculate_costs import calculate_costs
 
@@ -115,24 +116,22 @@ def delete_all(dry_run: bool = False) -> int:
     return count
 
 
-def delete_from_date(start_date: str, dry_run: bool = False) -> int:
-    """Delete all rows from a start date onwards."""
-    count = get_row_count_from_date(start_date)
-
-    if count == 0:
-        return 0
-
-    if dry_run:
-        print(f"  [DRY RUN] Would delete {count:,} rows from {start_date} onwards")
-        return count
+def merge_from_date(df: pl.DataFrame, start_date: str, batch_size: int) -> MergeCounts:
+    """
+    Refresh rows from a start date onwards by merging on pcs_orderid.
 
-    delete_query = f"""
-        DELETE FROM {TABLE_NAME}
-        WHERE pcs_created::date >= '{start_date}'::date
+    Orders whose costs did not change are left as they are; orders from the
+    start date that are no longer in df are deleted.
     """
-    execute_query(delete_query, commit=True)
-    print(f"  Deleted {count:,} rows from {start_date} onwards")
-    return count
+    return push_data(
+        df,
+        TABLE_NAME,
+        if_exists="merge",
+        batch_size=batch_size,
+        keys=["pcs_orderid"],
+        ignore_columns=["dw_timestamp"],
+        scope=f"pcs_created::date >= '{start_date}'::date",
+    )
 
 
 # =============================================================================
@@ -210,10 +209,12 @@ def run_pipeline(
 
 def _run_calculation_and_upload(
     start_date: str,
-    rows_deleted: int,
+    rows_before: int,
     production_sites: list[str],
     batch_size: int,
     dry_run: bool,
+    merge: bool = False,
+    run_id: str | None = None,
     date_range_suffix: str = "",
     show_net_change: bool = False,
     calc_step_num: int = 2,
@@ -224,10 +225,14 @@ def _run_calculation_and_upload(
 
     Args:
         start_date: Date to start calculation from (YYYY-MM-DD)
-        rows_deleted: Number of rows deleted in previous step (for summary)
+        rows_before: Rows deleted in the previous step, or when merging, rows
+            already in the table from start_date (for summary)
         production_sites: Production sites to include
         batch_size: Rows per INSERT batch
         dry_run: If True, don't upload
+        merge: If True, merge into the rows from start_date onwards instead
+            of appending (see merge_from_date)
+        run_id: Upload resumably under this id (see push_data)
         date_range_suffix: Extra text for date range line (e.g., " (7 days)")
         show_net_change: If True, show net change in summary
         calc_step_num: Step number for calculation step
@@ -251,21 +256,25 @@ def _run_calculation_and_upload(
     print("\n" + "=" * 60)
     print("UPLOAD SUMMARY")
     print("=" * 60)
-    print(f"Rows deleted: {rows_deleted:,}")
-    print(f"New rows to upload: {len(df):,}")
+    print(f"{'Existing rows' if merge else 'Rows deleted'}: {rows_before:,}")
+    print(f"{'Recalculated rows' if merge else 'New rows to upload'}: {len(df):,}")
     if show_net_change:
-        print(f"Net change: {len(df) - rows_deleted:+,}")
+        print(f"Net change: {len(df) - rows_before:+,}")
     print(f"Date range: {start_date} to today{date_range_suffix}")
     print(f"Total expected cost: ${df['cost_total'].sum():,.2f}")
     print(f"Avg per shipment: ${df['cost_total'].mean():,.2f}")
 
     if dry_run:
-        print(f"\n[DRY RUN] Would upload to: {TABLE_NAME}")
+        print(f"\n[DRY RUN] Would {'merge into' if merge else 'upload to'}: {TABLE_NAME}")
         return len(df)
 
-    # Upload
-    print(f"\nStep {upload_step_num}: Uploading to {TABLE_NAME}...")
-    push_data(df, TABLE_NAME, batch_size=batch_size)
+    if merge:
+        # Only new and changed orders are written
+        print(f"\nStep {upload_step_num}: Merging into {TABLE_NAME}...")
+        merge_from_date(df, start_date, batch_size)
+    else:
+        print(f"\nStep {upload_step_num}: Uploading to {TABLE_NAME}...")
+        push_data(df, TABLE_NAME, batch_size=batch_size, keys=["pcs_orderid"], run_id=run_id)
 
     return len(df)
 
@@ -274,21 +283,27 @@ def run_full_mode(
     production_sites: list[str],
     batch_size: int,
     dry_run: bool,
+    run_id: str | None = None,
 ) -> int:
     """Full mode: Delete all, recalculate from 2025-01-01."""
     print("=" * 60)
     print("FULL MODE - USPS EXPECTED COSTS")
     print("=" * 60)
 
-    print("\nStep 1: Deleting all existing rows...")
-    deleted = delete_all(dry_run=dry_run)
+    if run_id and UploadCheckpoint(TABLE_NAME, run_id).exists():
+        print(f"\nStep 1: Resuming upload {run_id!r}, keeping rows already uploaded...")
+        deleted = 0
+    else:
+        print("\nStep 1: Deleting all existing rows...")
+        deleted = delete_all(dry_run=dry_run)
 
     return _run_calculation_and_upload(
         start_date=DEFAULT_START_DATE,
-        rows_deleted=deleted,
+        rows_before=deleted,
         production_sites=production_sites,
         batch_size=batch_size,
         dry_run=dry_run,
+        run_id=run_id,
     )
 
 
@@ -297,7 +312,7 @@ def run_incremental_mode(
     batch_size: int,
     dry_run: bool,
 ) -> int:
-    """Incremental mode: Find max date, delete that day, recalculate from there."""
+    """Incremental mode: Find max date, recalculate from that day, merge changes."""
     print("=" * 60)
     print("INCREMENTAL MODE - USPS EXPECTED COSTS")
     print("=" * 60)
@@ -308,24 +323,21 @@ def run_incremental_mode(
     if max_pcs_created is None:
         print(f"  Table is empty or doesn't exist. Using default start date: {DEFAULT_START_DATE}")
         start_date = DEFAULT_START_DATE
-        rows_deleted = 0
+        rows_existing = 0
     else:
         start_date = max_pcs_created.strftime("%Y-%m-%d")
+        rows_existing = get_row_count_from_date(start_date)
         print(f"  Max pcs_created: {max_pcs_created}")
-        print(f"  Will process from: {start_date}")
-
-        print(f"\nStep 2: Deleting data from {start_date} onwards...")
-        rows_deleted = delete_from_date(start_date, dry_run=dry_run)
+        print(f"  Will process from: {start_date} ({rows_existing:,} existing rows)")
 
     return _run_calculation_and_upload(
         start_date=start_date,
-        rows_deleted=rows_deleted,
+        rows_before=rows_existing,
         production_sites=production_sites,
         batch_size=batch_size,
         dry_run=dry_run,
+        merge=True,
         show_net_change=True,
-        calc_step_num=3,
-        upload_step_num=4,
     )
 
 
@@ -335,22 +347,24 @@ def run_days_mode(
     batch_size: int,
     dry_run: bool,
 ) -> int:
-    """Days mode: Delete and recalculate last N days."""
+    """Days mode: Recalculate last N days, merge changes."""
     print("=" * 60)
     print(f"DAYS MODE ({days} days) - USPS EXPECTED COSTS")
     print("=" * 60)
 
     start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
 
-    print(f"\nStep 1: Deleting rows from {start_date} onwards...")
-    rows_deleted = delete_from_date(start_date, dry_run=dry_run)
+    print(f"\nStep 1: Counting rows from {start_date} onwards...")
+    rows_existing = get_row_count_from_date(start_date)
+    print(f"  {rows_existing:,} existing rows")
 
     return _run_calculation_and_upload(
         start_date=start_date,
-        rows_deleted=rows_deleted,
+        rows_before=rows_existing,
         production_sites=production_sites,
         batch_size=batch_size,
         dry_run=dry_run,
+        merge=True,
         date_range_suffix=f" ({days} days)",
         show_net_change=True,
     )
@@ -367,8 +381,8 @@ def main():
         epilog="""
 Modes:
   --full          Full calculation since 2025-01-01, delete existing and reupload
-  --incremental   Find max date, delete that day's data, recalculate from there
-  --days N        Delete and recalculate last N days (by pcs_created)
+  --incremental   Find max date, recalculate from that day and merge changes
+  --days N        Recalculate last N days (by pcs_created) and merge changes
 
 Examples:
   python -m carriers.usps.scripts.upload_expected --full
@@ -389,13 +403,13 @@ Examples:
     mode_group.add_argument(
         "--incremental",
         action="store_true",
-        help="Find max date, delete that day's data, recalculate from there"
+        help="Find max date, recalculate from that day and merge changes"
     )
     mode_group.add_argument(
         "--days",
         type=int,
         metavar="N",
-        help="Delete and recalculate last N days (by pcs_created)"
+        help="Recalculate last N days (by pcs_created) and merge changes"
     )
 
     # Common options
@@ -412,6 +426,13 @@ Examples:
         default=5000,
         help="Number of rows per INSERT batch (default: 5000)"
     )
+    parser.add_argument(
+        "--run-id",
+        type=str,
+        default=None,
+        help="Full mode: commit in groups and checkpoint progress under this id; "
+             "rerun with the same id to resume a failed upload"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -427,6 +448,7 @@ Examples:
                 production_sites=args.production_sites,
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                run_id=args.run_id,
             )
         elif args.incremental:
             rows = run_incremental_mode(
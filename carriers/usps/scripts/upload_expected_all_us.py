@@ -12,11 +12,14 @@ All shipments are calculated as if originating from Columbus (CMH zones).
 
 Modes:
     --full          Full calculation since 2025-01-01, delete existing and reupload
-    --incremental   Find max date, delete that day's data, recalculate from there
-    --days N        Delete and recalculate last N days (by pcs_created)
+    --incremental   Find max date, recalculate from that day and merge changes
+    --days N        Recalculate last N days (by pcs_created) and merge changes
 
 Usage:
     python -m carriers.usps.scripts.upload_expected_all_us --full
+    python -m carriers.usps.scripts.upload_expected_all_us --full --chunk-rows 250000
+    python -m carriers.usps.scripts.upload_expected_all_us --full --partitions 12
+    python -m carriers.usps.scripts.upload_expected_all_us --full --run-id full-2025-06-01
     python -m carriers.usps.scripts.upload_expected_all_us --incremental
     python -m carriers.usps.scripts.upload_expected_all_us --days 7
     python -m carriers.usps.scripts.upload_expected_all_us --full --dry-run
@@ -31,12 +34,15 @@ import argparse
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterator
 
 import polars as pl
 
-from shared.database import pull_data, execute_query, push_data, get_connection
-from carriers.usps.data import load_pcs_shipments_all_us
-from carriers.usps.calculate_costs import calculate_costs
+from shared.database import MergeCounts, UploadCheckpoint, pull_data, execute_query, push_data
+from shared.database.streaming import push_chunks, write_parquet_chunks
+from shared.rating import iter_chunks, scan_shipments, rate_unique
+from carriers.usps.data import load_pcs_shipments_all_us, stream_pcs_shipments_all_us
+from carriers.usps.calculate_costs import RATING_DATE_FLAGS, RATING_KEY, calculate_costs
 
 
 # =============================================================================
@@ -45,11 +51,19 @@ from carriers.usps.calculate_costs import calculate_costs
 
 TABLE_NAME = "shipping_costs.expected_shipping_costs_usps_all_us"
 
+# Rows are identified by order (merges, resumable uploads); dw_timestamp
+# changes on every run
+ORDER_KEYS = ["pcs_orderid"]
+MERGE_IGNORE_COLUMNS = ["dw_timestamp"]
+
 DEFAULT_START_DATE = "2025-01-01"
 
 # Output directory for parquet files
 PARQUET_OUTPUT_DIR = Path(__file__).parent / "output" / "all_us"
 
+# Shipments per chunk when streaming (--chunk-rows)
+STREAM_CHUNK_ROWS = 250_000
+
 # USPS Ground Advantage weight limit
 MAX_WEIGHT_LBS = 20
 
@@ -98,8 +112,6 @@ def get_max_pcs_created() -> datetime | None:
             return None
         return result["max_date"][0]
     except Exception:
-        # Rollback to clear aborted transaction state
-        get_connection().rollback()
         return None
 
 
@@ -110,8 +122,6 @@ def get_row_count() -> int:
         result = pull_data(query)
         return int(result["cnt"][0])
     except Exception:
-        # Rollback to clear aborted transaction state
-        get_connection().rollback()
         return 0
 
 
@@ -126,8 +136,6 @@ def get_row_count_from_date(start_date: str) -> int:
         result = pull_data(query)
         return int(result["cnt"][0])
     except Exception:
-        # Rollback to clear aborted transaction state
-        get_connection().rollback()
         return 0
 
 
@@ -147,24 +155,23 @@ def delete_all(dry_run: bool = False) -> int:
     return count
 
 
-def delete_from_date(start_date: str, dry_run: bool = False) -> int:
-    """Delete all rows from a start date onwards."""
-    count = get_row_count_from_date(start_date)
+def from_date_scope(start_date: str) -> str:
+    """Merge scope: rows from a start date onwards."""
+    return f"pcs_created::date >= '{start_date}'::date"
 
-    if count == 0:
-        return 0
 
-    if dry_run:
-        print(f"  [DRY RUN] Would delete {count:,} rows from {start_date} onwards")
-        return count
+def merge_from_date(df: pl.DataFrame, start_date: str, batch_size: int) -> MergeCounts:
+    """
+    Refresh rows from a start date onwards by merging on pcs_orderid.
 
-    delete_query = f"""
-        DELETE FROM {TABLE_NAME}
-        WHERE pcs_created::date >= '{start_date}'::date
+    Orders whose costs did not change are left as they are; orders from the
+    start date that are no longer in df are deleted.
     """
-    execute_query(delete_query, commit=True)
-    print(f"  Deleted {count:,} rows from {start_date} onwards")
-    return count
+    return push_data(
+        df, TABLE_NAME, if_exists="merge", batch_size=batch_size,
+        keys=ORDER_KEYS, ignore_columns=MERGE_IGNORE_COLUMNS,
+        scope=from_date_scope(start_date),
+    )
 
 
 # =============================================================================
@@ -175,6 +182,7 @@ def run_pipeline(
     start_date: str,
     end_date: str | None = None,
     parquet_data: str | None = None,
+    partitions: int = 1,
 ) -> pl.DataFrame:
     """
     Run the full calculation pipeline for a date range.
@@ -193,20 +201,27 @@ def run_pipeline(
     # 1. Load ALL US shipments (from parquet or database)
     if parquet_data:
         print(f"  Loading ALL US shipments from parquet: {parquet_data}...")
-        df = pl.read_parquet(parquet_data)
-        # Filter by date range
-        if start_date:
-            df = df.filter(pl.col("pcs_created").cast(pl.Date) >= pl.lit(start_date).str.to_date("%Y-%m-%d"))
-        if end_date:
-            df = df.filter(pl.col("pcs_created").cast(pl.Date) <= pl.lit(end_date).str.to_date("%Y-%m-%d"))
+        # Date filter is pushed down into the parquet scan
+        df = scan_shipments(parquet_data, start_date, end_date).collect(engine="streaming")
     else:
         print(f"  Loading ALL US shipments from {start_date} to {end_date or 'today'}...")
         df = load_pcs_shipments_all_us(
             start_date=start_date,
             end_date=end_date,
+            partitions=partitions,
         )
     print(f"  Loaded {len(df):,} shipments")
 
+    return rate_shipments(df)
+
+
+def rate_shipments(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Rate loaded shipments: every pipeline step after loading.
+
+    Each step works row by row, so rating a chunk of shipments gives the
+    same rows as rating the whole range (stream_pipeline relies on this).
+    """
     if len(df) == 0:
         return pl.DataFrame()
 
@@ -251,7 +266,8 @@ def run_pipeline(
     df = df.with_columns(pl.col("weight_lbs_calc").alias("weight_lbs"))
 
     print("  Calculating costs...")
-    df = calculate_costs(df)
+    df, stats = rate_unique(df, calculate_costs, RATING_KEY, RATING_DATE_FLAGS)
+    print(f"  Deduplicated rating: {stats}")
 
     # Restore original weight
     df = df.with_columns(original_weight.alias("weight_lbs"))
@@ -302,45 +318,134 @@ def run_pipeline(
     return df
 
 
+def stream_pipeline(
+    start_date: str,
+    end_date: str | None = None,
+    parquet_data: str | None = None,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    partitions: int = 1,
+) -> Iterator[pl.DataFrame]:
+    """
+    Run the calculation pipeline chunk by chunk, in bounded memory.
+
+    Shipments are read chunk_rows at a time (server-side cursor for the
+    database, streaming scan for parquet) and each chunk goes through
+    rate_shipments().
+
+    Yields non-empty DataFrames ready for upload with UPLOAD_COLUMNS.
+    """
+    if parquet_data:
+        print(f"  Streaming ALL US shipments from parquet: {parquet_data}...")
+        chunks = iter_chunks(scan_shipments(parquet_data, start_date, end_date), chunk_rows)
+    else:
+        print(f"  Streaming ALL US shipments from {start_date} to {end_date or 'today'}...")
+        chunks = stream_pcs_shipments_all_us(
+            start_date=start_date,
+            end_date=end_date,
+            chunk_rows=chunk_rows,
+            partitions=partitions,
+        )
+
+    for chunk in chunks:
+        print(f"  Loaded chunk of {len(chunk):,} shipments")
+        df = rate_shipments(chunk)
+        if len(df) > 0:
+            yield df
+
+
 # =============================================================================
 # MODE HANDLERS
 # =============================================================================
 
 def _run_calculation_and_upload(
     start_date: str,
-    rows_deleted: int,
+    rows_before: int,
     batch_size: int,
     dry_run: bool,
     end_date: str | None = None,
     date_range_suffix: str = "",
-    show_net_change: bool = False,
+    merge: bool = False,
     calc_step_num: int = 2,
     upload_step_num: int = 3,
     parquet_data: str | None = None,
+    chunk_rows: int | None = None,
+    partitions: int = 1,
+    run_id: str | None = None,
 ) -> int:
     """
     Common logic for calculating costs and uploading results.
 
     Args:
         start_date: Date to start calculation from (YYYY-MM-DD)
-        rows_deleted: Number of rows deleted in previous step (for summary)
+        rows_before: Rows deleted (full mode) or already in the date range
+            (merge), for the summary
         batch_size: Rows per INSERT batch
         dry_run: If True, don't upload
         end_date: Date to end calculation at (YYYY-MM-DD), optional
         date_range_suffix: Extra text for date range line (e.g., " (7 days)")
-        show_net_change: If True, show net change in summary
+        merge: If True, merge by order, deleting rows from start_date
+            onwards that were not recalculated, instead of appending
         calc_step_num: Step number for calculation step
         upload_step_num: Step number for upload step
         parquet_data: Path to parquet file with PCS data, optional
+        chunk_rows: Stream and upload this many shipments at a time, optional
+        partitions: Load shipments as this many concurrent date-range queries
+        run_id: Commit and checkpoint progress under this id, resuming an
+            earlier run with the same id (see --run-id)
 
     Returns:
         Number of rows uploaded (or would be uploaded if dry_run)
     """
     print(f"\nStep {calc_step_num}: Calculating expected costs from {start_date} to {end_date or 'today'}...")
+    if chunk_rows:
+        # Rate and upload chunk by chunk; each chunk is committed as it is pushed.
+        # When merging, rows no chunk held are deleted once the last is in.
+        totals = push_chunks(
+            stream_pipeline(start_date, end_date, parquet_data, chunk_rows, partitions),
+            TABLE_NAME,
+            batch_size=batch_size,
+            sum_columns=["usps_cost_total"],
+            dry_run=dry_run,
+            if_exists="merge" if merge else "append",
+            keys=ORDER_KEYS,
+            ignore_columns=MERGE_IGNORE_COLUMNS,
+            scope=from_date_scope(start_date) if merge else None,
+            run_id=run_id,
+        )
+
+        if totals.rows == 0:
+            print("\nNo shipments found.")
+            return 0
+
+        print("\n" + "=" * 60)
+        print("UPLOAD SUMMARY")
+        print("=" * 60)
+        if merge:
+            print(f"Existing rows: {rows_before:,}")
+            print(f"Recalculated rows: {totals.rows:,} ({totals.chunks} chunks)")
+            print(f"Net change: {totals.rows - rows_before:+,}")
+        else:
+            print(f"Rows deleted: {rows_before:,}")
+            print(f"New rows {'to upload' if dry_run else 'uploaded'}: {totals.rows:,} ({totals.chunks} chunks)")
+        print(f"Date range: {start_date} to {end_date or 'today'}{date_range_suffix}")
+        print(f"Total expected cost: ${totals.sums['usps_cost_total']:,.2f}")
+        print(f"Avg per shipment: ${totals.mean('usps_cost_total'):,.2f}")
+        if totals.merged:
+            counts = totals.merged
+            print(
+                f"Merged: {counts.inserted:,} inserted, {counts.updated:,} updated, "
+                f"{counts.unchanged:,} unchanged, {counts.deleted:,} deleted"
+            )
+
+        if dry_run:
+            print(f"\n[DRY RUN] Would {'merge into' if merge else 'upload to'}: {TABLE_NAME}")
+        return totals.rows
+
     df = run_pipeline(
         start_date=start_date,
         end_date=end_date,
         parquet_data=parquet_data,
+        partitions=partitions,
     )
 
     if len(df) == 0:
@@ -351,21 +456,28 @@ def _run_calculation_and_upload(
     print("\n" + "=" * 60)
     print("UPLOAD SUMMARY")
     print("=" * 60)
-    print(f"Rows deleted: {rows_deleted:,}")
-    print(f"New rows to upload: {len(df):,}")
-    if show_net_change:
-        print(f"Net change: {len(df) - rows_deleted:+,}")
+    if merge:
+        print(f"Existing rows: {rows_before:,}")
+        print(f"Recalculated rows: {len(df):,}")
+        print(f"Net change: {len(df) - rows_before:+,}")
+    else:
+        print(f"Rows deleted: {rows_before:,}")
+        print(f"New rows to upload: {len(df):,}")
     print(f"Date range: {start_date} to {end_date or 'today'}{date_range_suffix}")
     print(f"Total expected cost: ${df['usps_cost_total'].sum():,.2f}")
     print(f"Avg per shipment: ${df['usps_cost_total'].mean():,.2f}")
 
     if dry_run:
-        print(f"\n[DRY RUN] Would upload to: {TABLE_NAME}")
+        print(f"\n[DRY RUN] Would {'merge into' if merge else 'upload to'}: {TABLE_NAME}")
         return len(df)
 
-    # Upload
-    print(f"\nStep {upload_step_num}: Uploading to {TABLE_NAME}...")
-    push_data(df, TABLE_NAME, batch_size=batch_size)
+    if merge:
+        # Merge: only new and changed orders are written
+        print(f"\nStep {upload_step_num}: Merging into {TABLE_NAME}...")
+        merge_from_date(df, start_date, batch_size)
+    else:
+        print(f"\nStep {upload_step_num}: Uploading to {TABLE_NAME}...")
+        push_data(df, TABLE_NAME, batch_size=batch_size, keys=ORDER_KEYS, run_id=run_id)
 
     return len(df)
 
@@ -376,6 +488,9 @@ def run_full_mode(
     start_date: str | None = None,
     end_date: str | None = None,
     parquet_data: str | None = None,
+    chunk_rows: int | None = None,
+    partitions: int = 1,
+    run_id: str | None = None,
 ) -> int:
     """Full mode: Delete all, recalculate from start_date (default 2025-01-01)."""
     start = start_date or DEFAULT_START_DATE
@@ -389,24 +504,33 @@ def run_full_mode(
     if parquet_data:
         print(f"Data source: {parquet_data}")
 
-    print("\nStep 1: Deleting all existing rows...")
-    deleted = delete_all(dry_run=dry_run)
+    if run_id and UploadCheckpoint(TABLE_NAME, run_id).exists():
+        print(f"\nStep 1: Resuming upload {run_id!r}, keeping rows already uploaded...")
+        deleted = 0
+    else:
+        print("\nStep 1: Deleting all existing rows...")
+        deleted = delete_all(dry_run=dry_run)
 
     return _run_calculation_and_upload(
         start_date=start,
         end_date=end_date,
-        rows_deleted=deleted,
+        rows_before=deleted,
         batch_size=batch_size,
         dry_run=dry_run,
         parquet_data=parquet_data,
+        chunk_rows=chunk_rows,
+        partitions=partitions,
+        run_id=run_id,
     )
 
 
 def run_incremental_mode(
     batch_size: int,
     dry_run: bool,
+    chunk_rows: int | None = None,
+    partitions: int = 1,
 ) -> int:
-    """Incremental mode: Find max date, delete that day, recalculate from there."""
+    """Incremental mode: Find max date, recalculate from that day, merge changes."""
     print("=" * 60)
     print("INCREMENTAL MODE - ALL US EXPECTED COSTS (USPS)")
     print("=" * 60)
@@ -417,23 +541,21 @@ def run_incremental_mode(
     if max_pcs_created is None:
         print(f"  Table is empty or doesn't exist. Using default start date: {DEFAULT_START_DATE}")
         start_date = DEFAULT_START_DATE
-        rows_deleted = 0
+        rows_existing = 0
     else:
         start_date = max_pcs_created.strftime("%Y-%m-%d")
+        rows_existing = get_row_count_from_date(start_date)
         print(f"  Max pcs_created: {max_pcs_created}")
-        print(f"  Will process from: {start_date}")
-
-        print(f"\nStep 2: Deleting data from {start_date} onwards...")
-        rows_deleted = delete_from_date(start_date, dry_run=dry_run)
+        print(f"  Will process from: {start_date} ({rows_existing:,} existing rows)")
 
     return _run_calculation_and_upload(
         start_date=start_date,
-        rows_deleted=rows_deleted,
+        rows_before=rows_existing,
         batch_size=batch_size,
         dry_run=dry_run,
-        show_net_change=True,
-        calc_step_num=3,
-        upload_step_num=4,
+        merge=True,
+        chunk_rows=chunk_rows,
+        partitions=partitions,
     )
 
 
@@ -441,24 +563,29 @@ def run_days_mode(
     days: int,
     batch_size: int,
     dry_run: bool,
+    chunk_rows: int | None = None,
+    partitions: int = 1,
 ) -> int:
-    """Days mode: Delete and recalculate last N days."""
+    """Days mode: Recalculate last N days, merge changes."""
     print("=" * 60)
     print(f"DAYS MODE ({days} days) - ALL US EXPECTED COSTS (USPS)")
     print("=" * 60)
 
     start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
 
-    print(f"\nStep 1: Deleting rows from {start_date} onwards...")
-    rows_deleted = delete_from_date(start_date, dry_run=dry_run)
+    print(f"\nStep 1: Counting rows from {start_date} onwards...")
+    rows_existing = get_row_count_from_date(start_date)
+    print(f"  {rows_existing:,} existing rows")
 
     return _run_calculation_and_upload(
         start_date=start_date,
-        rows_deleted=rows_deleted,
+        rows_before=rows_existing,
         batch_size=batch_size,
         dry_run=dry_run,
         date_range_suffix=f" ({days} days)",
-        show_net_change=True,
+        merge=True,
+        chunk_rows=chunk_rows,
+        partitions=partitions,
     )
 
 
@@ -466,6 +593,8 @@ def run_parquet_mode(
     start_date: str | None = None,
     end_date: str | None = None,
     parquet_data: str | None = None,
+    chunk_rows: int | None = None,
+    partitions: int = 1,
 ) -> int:
     """Parquet mode: Calculate costs and save to parquet file instead of database."""
     start = start_date or DEFAULT_START_DATE
@@ -478,10 +607,37 @@ def run_parquet_mode(
         print(f"Data source: {parquet_data}")
 
     print("\nStep 1: Calculating expected costs...")
+    if chunk_rows:
+        # Rate chunk by chunk straight into the output file
+        PARQUET_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        end_str = end_date or datetime.now().strftime("%Y-%m-%d")
+        output_path = PARQUET_OUTPUT_DIR / f"usps_all_us_{start}_{end_str}.parquet"
+
+        totals = write_parquet_chunks(
+            stream_pipeline(start, end_date, parquet_data, chunk_rows, partitions),
+            output_path,
+            sum_columns=["usps_cost_total"],
+        )
+
+        if totals.rows == 0:
+            print("\nNo shipments found.")
+            return 0
+
+        print("\n" + "=" * 60)
+        print("CALCULATION SUMMARY")
+        print("=" * 60)
+        print(f"Rows calculated: {totals.rows:,} ({totals.chunks} chunks)")
+        print(f"Date range: {start} to {end_date or 'today'}")
+        print(f"Total expected cost: ${totals.sums['usps_cost_total']:,.2f}")
+        print(f"Avg per shipment: ${totals.mean('usps_cost_total'):,.2f}")
+        print(f"Saved {totals.rows:,} rows to {output_path}")
+        return totals.rows
+
     df = run_pipeline(
         start_date=start,
         end_date=end_date,
         parquet_data=parquet_data,
+        partitions=partitions,
     )
 
     if len(df) == 0:
@@ -523,14 +679,15 @@ def main():
         epilog="""
 Modes:
   --full          Full calculation since 2025-01-01, delete existing and reupload
-  --incremental   Find max date, delete that day's data, recalculate from there
-  --days N        Delete and recalculate last N days (by pcs_created)
+  --incremental   Find max date, recalculate from that day and merge changes
+  --days N        Recalculate last N days (by pcs_created) and merge changes
 
 Examples:
   python -m carriers.usps.scripts.upload_expected_all_us --full
   python -m carriers.usps.scripts.upload_expected_all_us --incremental
   python -m carriers.usps.scripts.upload_expected_all_us --days 7
   python -m carriers.usps.scripts.upload_expected_all_us --full --dry-run
+  python -m carriers.usps.scripts.upload_expected_all_us --full --run-id full-2025-06-01
         """
     )
 
@@ -544,13 +701,13 @@ Examples:
     mode_group.add_argument(
         "--incremental",
         action="store_true",
-        help="Find max date, delete that day's data, recalculate from there"
+        help="Find max date, recalculate from that day and merge changes"
     )
     mode_group.add_argument(
         "--days",
         type=int,
         metavar="N",
-        help="Delete and recalculate last N days (by pcs_created)"
+        help="Recalculate last N days (by pcs_created) and merge changes"
     )
 
     # Common options
@@ -560,6 +717,13 @@ Examples:
         default=5000,
         help="Number of rows per INSERT batch (default: 5000)"
     )
+    parser.add_argument(
+        "--run-id",
+        type=str,
+        default=None,
+        help="Full mode: commit and checkpoint progress under this id; "
+             "rerun with the same id to resume a failed upload"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -586,6 +750,19 @@ Examples:
         metavar="PATH",
         help="Load PCS shipments from parquet file instead of database"
     )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        metavar="N",
+        help="Stream shipments N rows at a time instead of loading the whole range"
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Load PCS shipments as N date-range queries run concurrently (default: 1)"
+    )
 
     args = parser.parse_args()
 
@@ -597,6 +774,8 @@ Examples:
                 start_date=args.start_date,
                 end_date=args.end_date,
                 parquet_data=args.parquet_data,
+                chunk_rows=args.chunk_rows,
+                partitions=args.partitions,
             )
             print("\n" + "=" * 60)
             print(f"Successfully saved {rows:,} rows to parquet")
@@ -608,6 +787,9 @@ Examples:
                 start_date=args.start_date,
                 end_date=args.end_date,
                 parquet_data=args.parquet_data,
+                chunk_rows=args.chunk_rows,
+                partitions=args.partitions,
+                run_id=args.run_id,
             )
             print("\n" + "=" * 60)
             if args.dry_run:
@@ -619,6 +801,8 @@ Examples:
             rows = run_incremental_mode(
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                chunk_rows=args.chunk_rows,
+                partitions=args.partitions,
             )
             print("\n" + "=" * 60)
             if args.dry_run:
@@ -631,6 +815,8 @@ Examples:
                 days=args.days,
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                chunk_rows=args.chunk_rows,
+                partitions=args.partitions,
             )
             print("\n" + "=" * 60)
             if args.dry_run:
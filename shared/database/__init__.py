@@ -3,13 +3,42 @@ Database Connection and Operations
 
 Handles connection to Redshift database and data operations.
 Shared across all carrier calculators.
+
+Every operation checks a connection out of a shared thread-safe pool (see
+shared.database.pool) and returns it when done, rolled back, so queries
+can run concurrently and a failed statement never leaves later ones on an
+aborted transaction.
+
+pull_data() results can be cached on disk (opt-in, see enable_cache and
+shared.database.cache). push_data() loads large frames with COPY through a
+staging area when one is configured (see configure_staging and
+shared.database.bulk), and can commit in groups and resume after a failure
+(see shared.database.checkpoint). pull_by_keys() and stream_by_keys()
+restrict a query to a set of keys through a temporary key table instead
+of IN (...) lists (see shared.database.keys).
 """
 
+import queue
+import threading
+import uuid
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import polars as pl
 import pandas as pd
 import redshift_connector
 from pathlib import Path
-from typing import Union, Literal, Optional
+from typing import Iterator, Union, Literal, Optional
+
+from .bulk import LocalStage, S3Stage, copy_frame, stage_from_env
+from .checkpoint import COMMIT_EVERY_BATCHES, UploadCheckpoint, after_key, check_key_types, commit_groups
+from .cache import QueryCache, cache_from_env, referenced_tables, DEFAULT_CACHE_DIR, DEFAULT_TTL_SECONDS, DEFAULT_MAX_BYTES
+from .columnar import FETCH_BATCH_ROWS, fetch_frame, iter_batches, stream_cursor
+from .keys import KEY_CHUNK_ROWS, create_key_table, inline_key_table, key_query
+from .literals import row_literals
+from .merge import MergeCounts, merge_frame, out_of_scope_statements
+from .partitions import date_range_filters
+from .pool import ConnectionPool, DEFAULT_POOL_SIZE, HEALTH_CHECK_AFTER_SECONDS
 
 
 # Database connection parameters
@@ -19,8 +48,26 @@ DBNAME = "bi_stage_dev"
 USER = "tcg_nfe"
 
 
-# Global connection object
-_connection: Optional[redshift_connector.Connection] = None
+# Chunks a stream_many() worker may read ahead of the consumer
+STREAM_PREFETCH_CHUNKS = 2
+
+
+# Shared connection pool (created on first use, see configure_pool)
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# Connection held by the deprecated get_connection(), with the pool it came from
+_held: Optional[tuple[ConnectionPool, redshift_connector.Connection]] = None
+_held_lock = threading.Lock()
+
+# Query result cache (None = disabled; enabled by enable_cache or the environment)
+_cache: Optional[QueryCache] = cache_from_env()
+
+# Staging area for bulk COPY loads (None = INSERT only; see configure_staging)
+_stage = stage_from_env()
+
+# Rows from which push_data() loads with COPY when a staging area is configured
+BULK_LOAD_MIN_ROWS = 100_000
 
 
 # ============================================================================
@@ -51,74 +98,234 @@ def _read_password() -> str:
     )
 
 
-def get_connection(force_new: bool = False) -> redshift_connector.Connection:
+def _connect() -> redshift_connector.Connection:
     """
-    Get or create a database connection.
-
-    By default, returns the existing connection if one exists.
-    Use force_new=True to create a fresh connection.
-
-    Args:
-        force_new: If True, closes existing connection and creates a new one
-
-    Returns:
-        redshift_connector.Connection: Active database connection
+    Open a new database connection.
 
     Raises:
         RuntimeError: If connection cannot be established
     """
-    global _connection
-
-    # If forcing new connection, close existing one first
-    if force_new and _connection is not None:
-        try:
-            _connection.close()
-        except Exception:
-            pass
-        _connection = None
-
-    # Return existing connection if available
-    if _connection is not None:
-        return _connection
-
-    # Create new connection
     try:
-        _connection = redshift_connector.connect(
+        return redshift_connector.connect(
             host=HOST,
             database=DBNAME,
             port=PORT,
             user=USER,
             password=_read_password()
         )
-        return _connection
     except Exception as e:
         raise RuntimeError(f"Failed to create database connection: {e}")
 
 
+def get_pool() -> ConnectionPool:
+    """Get the shared connection pool, creating it with the default size on first use."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(_connect)
+        return _pool
+
+
+def configure_pool(
+    size: int = DEFAULT_POOL_SIZE,
+    check_after: float = HEALTH_CHECK_AFTER_SECONDS,
+) -> ConnectionPool:
+    """
+    Replace the shared connection pool.
+
+    The previous pool is closed (connections in use are closed when returned).
+
+    Args:
+        size: Maximum number of open connections
+        check_after: Idle seconds after which a connection is health-checked
+
+    Returns:
+        ConnectionPool: The new shared pool
+    """
+    global _pool
+
+    with _pool_lock:
+        old, _pool = _pool, ConnectionPool(_connect, size=size, check_after=check_after)
+
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def connection(timeout: Optional[float] = None):
+    """
+    Check out a pooled connection for a with block.
+
+    For several statements in one transaction: commit before the block ends,
+    anything uncommitted is rolled back when the connection is returned.
+
+    Example:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM schema.table WHERE ...")
+            cursor.execute("INSERT INTO schema.table ...")
+            conn.commit()
+    """
+    return get_pool().connection(timeout)
+
+
+def close_pool() -> None:
+    """Close the shared pool's connections (a new pool is created on next use)."""
+    global _pool
+
+    with _pool_lock:
+        old, _pool = _pool, None
+
+    if old is not None:
+        old.close()
+
+
+def _release_held() -> None:
+    """Return the connection held by get_connection() to its pool."""
+    global _held
+
+    with _held_lock:
+        held, _held = _held, None
+
+    if held is not None:
+        pool, conn = held
+        pool.release(conn)
+
+
+def get_connection(force_new: bool = False) -> redshift_connector.Connection:
+    """
+    Deprecated: use `with connection() as conn` instead.
+
+    Checks a connection out of the shared pool and keeps it until
+    close_connection(), returning the same one on every call. Uncommitted
+    work is rolled back when it goes back to the pool.
+
+    Args:
+        force_new: If True, returns the held connection and checks out another
+    """
+    global _held
+
+    warnings.warn(
+        "get_connection() is deprecated, use 'with connection() as conn'",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    if force_new:
+        _release_held()
+
+    with _held_lock:
+        if _held is None:
+            pool = get_pool()
+            _held = (pool, pool.acquire())
+        return _held[1]
+
+
 def close_connection() -> None:
-    """Close the active database connection if one exists."""
-    global _connection
+    """Deprecated: use close_pool(). Returns get_connection()'s connection and closes the pool."""
+    warnings.warn(
+        "close_connection() is deprecated, use close_pool()",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    _release_held()
+    close_pool()
 
-    if _connection is not None:
-        try:
-            _connection.close()
-        except Exception:
-            pass
-        finally:
-            _connection = None
+
+# ============================================================================
+# QUERY CACHE
+# ============================================================================
+
+def enable_cache(
+    directory: Union[str, Path] = DEFAULT_CACHE_DIR,
+    ttl: float = DEFAULT_TTL_SECONDS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> QueryCache:
+    """
+    Cache pull_data() results on disk for this process.
+
+    To enable it for child processes too (e.g. scripts launched by
+    run_all_carriers), set SHIPPING_COSTS_QUERY_CACHE to the directory
+    (or "1" for the default) instead.
+
+    Args:
+        directory: Where results are stored
+        ttl: Seconds a result stays valid
+        max_bytes: Total size above which least recently used results are evicted
+
+    Returns:
+        QueryCache: The active cache
+    """
+    global _cache
+    _cache = QueryCache(directory, ttl=ttl, max_bytes=max_bytes)
+    return _cache
+
+
+def disable_cache() -> None:
+    """Stop reading and writing cached results (stored entries are kept)."""
+    global _cache
+    _cache = None
+
+
+def invalidate_cache(table: str) -> int:
+    """
+    Drop cached results of queries that read a table.
+
+    Args:
+        table: "schema.table", or a bare table name matching any schema
+
+    Returns:
+        int: Number of cached results removed (0 if the cache is disabled)
+    """
+    return _cache.invalidate(table) if _cache is not None else 0
+
+
+def _invalidate_written_tables(statement: str) -> None:
+    """Drop cached results for every table a write statement references."""
+    if _cache is not None:
+        for table in referenced_tables(statement):
+            _cache.invalidate(table)
+
+
+# ============================================================================
+# BULK LOADING
+# ============================================================================
+
+def configure_staging(stage) -> None:
+    """
+    Set the staging area push_data() uses for COPY loads.
+
+    Args:
+        stage: LocalStage, S3Stage or compatible object; None to always INSERT
+    """
+    global _stage
+    _stage = stage
 
 
 # ============================================================================
 # DATA OPERATIONS
 # ============================================================================
 
-def pull_data(query: str, as_polars: bool = True) -> Union[pl.DataFrame, pd.DataFrame]:
+def pull_data(
+    query: str,
+    as_polars: bool = True,
+    schema_overrides: Optional[dict[str, pl.DataType]] = None,
+    batch_rows: int = FETCH_BATCH_ROWS,
+    cache: bool = True,
+) -> Union[pl.DataFrame, pd.DataFrame]:
     """
     Execute a SQL query and return results as a DataFrame.
 
+    Rows are fetched in batches and built into typed columns (see
+    shared.database.columnar): NUMERIC comes back as Float64, timestamps as
+    Datetime, strings as Utf8, regardless of the values in the first rows.
+
     Args:
         query: SQL query string to execute
         as_polars: If True, return Polars DataFrame; if False, return Pandas DataFrame
+        schema_overrides: Column name -> Polars dtype, replacing the declared type
+        batch_rows: Rows fetched per round trip
+        cache: If False, bypass the query cache (only used when one is enabled)
 
     Returns:
         pl.DataFrame or pd.DataFrame: Query results
@@ -129,31 +336,342 @@ def pull_data(query: str, as_polars: bool = True) -> Union[pl.DataFrame, pd.Data
     Example:
         df = pull_data("SELECT * FROM schema.table WHERE date >= '2024-01-01'")
     """
-    conn = get_connection()
+    query_cache = _cache if cache else None
+    if query_cache is not None:
+        key = query_cache.key(query, host=HOST, dbname=DBNAME, schema_overrides=schema_overrides)
+        df = query_cache.get(key)
+        if df is not None:
+            return df if as_polars else df.to_pandas()
 
     try:
-        cursor = conn.cursor()
-        cursor.execute(query)
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            df = fetch_frame(cursor, batch_rows, schema_overrides)
+            cursor.close()
 
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        cursor.close()
+        if query_cache is not None:
+            query_cache.put(key, query, df)
 
-        if as_polars:
-            return pl.DataFrame(rows, schema=columns, orient="row")
-        else:
-            return pd.DataFrame(rows, columns=columns)
+        return df if as_polars else df.to_pandas()
     except Exception as e:
         raise RuntimeError(f"Error executing query: {e}")
 
 
+def pull_many(
+    queries: list[str],
+    max_workers: Optional[int] = None,
+    schema_overrides: Optional[dict[str, pl.DataType]] = None,
+) -> list[pl.DataFrame]:
+    """
+    Execute independent SQL queries concurrently, one pooled connection each.
+
+    Args:
+        queries: SQL query strings
+        max_workers: Queries in flight at once (default: the pool size)
+        schema_overrides: Column name -> Polars dtype, applied to every query
+
+    Returns:
+        list[pl.DataFrame]: One result per query, in query order
+
+    Raises:
+        RuntimeError: If any query fails
+
+    Example:
+        counts, totals = pull_many([count_query, totals_query])
+    """
+    if len(queries) <= 1:
+        return [pull_data(q, schema_overrides=schema_overrides) for q in queries]
+
+    workers = min(max_workers or get_pool().size, len(queries))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda q: pull_data(q, schema_overrides=schema_overrides), queries))
+
+
+def _load_key_table(conn, table: str, keys: pl.DataFrame) -> None:
+    """Create a temporary key table on conn and load the keys (not committed)."""
+    cursor = conn.cursor()
+    cursor.execute(create_key_table(table, keys))
+    if _stage is not None and keys.height >= BULK_LOAD_MIN_ROWS:
+        copy_frame(conn, keys, table, _stage, commit=False)
+    else:
+        _insert_batches(cursor, keys, table, batch_size=5000, verbose=False)
+    cursor.close()
+
+
+def pull_by_keys(
+    query_template: str,
+    keys: pl.DataFrame,
+    max_workers: Optional[int] = None,
+    schema_overrides: Optional[dict[str, pl.DataType]] = None,
+    temp_table: bool = True,
+) -> pl.DataFrame:
+    """
+    Execute a query restricted to a set of keys, joined as a table.
+
+    Collects stream_by_keys() into one frame; see there for how the keys
+    are joined.
+
+    Args:
+        query_template: SQL referring to the key set as {keys}, like a table
+            with an alias (see shared.database.keys)
+        keys: Key columns, named as the template refers to them (duplicates
+            are dropped)
+        max_workers: Chunks in flight at once when falling back to chunking
+        schema_overrides: Column name -> Polars dtype, replacing the declared type
+        temp_table: If False, skip the temporary table and query in chunks
+
+    Returns:
+        pl.DataFrame: Query results
+
+    Raises:
+        RuntimeError: If the query fails
+
+    Example:
+        parcels = pull_by_keys(
+            "SELECT s.orderid, s.trackingnumber FROM pcsu_sentparcels s "
+            "JOIN {keys} k ON s.orderid = k.pcs_orderid",
+            pl.DataFrame({"pcs_orderid": orderids}),
+        )
+    """
+    return pl.concat(stream_by_keys(
+        query_template, keys,
+        max_workers=max_workers, schema_overrides=schema_overrides, temp_table=temp_table,
+    ))
+
+
+def stream_by_keys(
+    query_template: str,
+    keys: pl.DataFrame,
+    chunk_rows: int = FETCH_BATCH_ROWS,
+    max_workers: Optional[int] = None,
+    schema_overrides: Optional[dict[str, pl.DataType]] = None,
+    temp_table: bool = True,
+) -> Iterator[pl.DataFrame]:
+    """
+    Execute a query restricted to a set of keys and yield its result in chunks.
+
+    The keys are loaded into a session temporary table (COPY when a staging
+    area is configured and the set is large, INSERT batches otherwise) and
+    the query runs once against it, its result yielded in batches of
+    chunk_rows rows as they are fetched. The key table is never committed,
+    so it is gone once the connection is rolled back on its return to the
+    pool.
+
+    If the temporary table cannot be created or loaded (or temp_table is
+    False), the keys are inlined in chunks of KEY_CHUNK_ROWS instead. Up to
+    max_workers chunks are queried at once, each with pull_data() on its
+    own pooled connection, and each chunk's result is yielded as soon as it
+    completes - so not necessarily in key order.
+
+    Args:
+        query_template: SQL referring to the key set as {keys}, like a table
+            with an alias (see shared.database.keys)
+        keys: Key columns, named as the template refers to them (duplicates
+            are dropped)
+        chunk_rows: Rows per yielded batch from the key table query
+        max_workers: Chunks in flight at once when falling back to chunking
+            (default: the pool size)
+        schema_overrides: Column name -> Polars dtype, replacing the declared type
+        temp_table: If False, skip the temporary table and query in chunks
+
+    Yields:
+        pl.DataFrame: Non-empty parts of the result; an empty result yields
+        one empty frame with the result's columns
+
+    Raises:
+        RuntimeError: If the query fails
+
+    Example:
+        for parcels in stream_by_keys(parcels_query, pl.DataFrame({"pcs_orderid": orderids})):
+            process(parcels)
+    """
+    keys = keys.unique(maintain_order=True)
+    key_query(query_template, "")  # Check the template before loading anything
+
+    if temp_table:
+        table = f"query_keys_{uuid.uuid4().hex[:12]}"
+        try:
+            with connection() as conn:
+                try:
+                    _load_key_table(conn, table, keys)
+                except Exception as e:
+                    warnings.warn(f"Temporary key table unavailable, querying in chunks: {e}")
+                else:
+                    cursor = conn.cursor()
+                    cursor.execute(key_query(query_template, table))
+                    empty = True
+                    for batch in iter_batches(cursor, chunk_rows, schema_overrides):
+                        empty = False
+                        yield batch
+                    if empty:
+                        yield fetch_frame(cursor, chunk_rows, schema_overrides)
+                    cursor.close()
+                    return
+        except Exception as e:
+            raise RuntimeError(f"Error executing query: {e}")
+
+    queries = iter([
+        key_query(query_template, inline_key_table(chunk))
+        for chunk in keys.iter_slices(KEY_CHUNK_ROWS)
+    ] or [key_query(query_template, inline_key_table(keys))])
+
+    workers = max_workers or get_pool().size
+    yielded, empty = False, None
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = set()
+        for query in queries:
+            pending.add(executor.submit(pull_data, query, schema_overrides=schema_overrides))
+            if len(pending) == workers:
+                break
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                df = future.result()
+                # Refill before yielding, so the next chunk runs while this one is consumed
+                query = next(queries, None)
+                if query is not None:
+                    pending.add(executor.submit(pull_data, query, schema_overrides=schema_overrides))
+                if df.height:
+                    yielded = True
+                    yield df
+                elif empty is None:
+                    empty = df
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    if not yielded:
+        yield empty
+
+
+def stream_data(
+    query: str,
+    chunk_rows: int = FETCH_BATCH_ROWS,
+    schema_overrides: Optional[dict[str, pl.DataType]] = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Execute a SQL query and yield its result in Polars chunks as they arrive.
+
+    Rows are read through a server-side cursor (see
+    shared.database.columnar.stream_cursor), so only one chunk is held in
+    memory at a time. The cursor holds one pooled connection until the
+    stream is exhausted or closed; other operations use other connections
+    meanwhile (e.g. to upload each rated chunk).
+
+    Args:
+        query: SQL query string to execute
+        chunk_rows: Rows per yielded chunk
+        schema_overrides: Column name -> Polars dtype, replacing the declared type
+
+    Yields:
+        pl.DataFrame: Up to chunk_rows rows, with the same columns and types
+        in every chunk (nothing is yielded for an empty result)
+
+    Raises:
+        RuntimeError: If query execution fails
+
+    Example:
+        for chunk in stream_data("SELECT * FROM schema.big_table", chunk_rows=100_000):
+            process(chunk)
+    """
+    try:
+        with connection() as conn:
+            yield from stream_cursor(conn, query, chunk_rows, schema_overrides)
+    except Exception as e:
+        raise RuntimeError(f"Error streaming query: {e}")
+
+
+def stream_many(
+    queries: list[str],
+    chunk_rows: int = FETCH_BATCH_ROWS,
+    max_workers: Optional[int] = None,
+    schema_overrides: Optional[dict[str, pl.DataType]] = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Stream independent SQL queries concurrently, yielding their chunks in query order.
+
+    Up to max_workers queries run at once, each through stream_data() on
+    its own pooled connection. Every query's chunks are yielded before the
+    next query's; a query that is not being consumed yet reads at most
+    STREAM_PREFETCH_CHUNKS chunks ahead and then waits, so memory stays
+    bounded by max_workers * STREAM_PREFETCH_CHUNKS chunks.
+
+    Args:
+        queries: SQL query strings (e.g., one per date partition)
+        chunk_rows: Rows per yielded chunk
+        max_workers: Queries in flight at once (default: the pool size)
+        schema_overrides: Column name -> Polars dtype, applied to every query
+
+    Yields:
+        pl.DataFrame: Up to chunk_rows rows
+
+    Raises:
+        RuntimeError: If any query fails
+
+    Example:
+        for chunk in stream_many(partition_queries, chunk_rows=100_000):
+            process(chunk)
+    """
+    if len(queries) <= 1:
+        for q in queries:
+            yield from stream_data(q, chunk_rows, schema_overrides)
+        return
+
+    done = object()
+    stop = threading.Event()
+    buffers = [queue.Queue(maxsize=STREAM_PREFETCH_CHUNKS) for _ in queries]
+
+    def put(buffer: queue.Queue, item) -> bool:
+        """Hand an item to the consumer; False once the consumer has gone."""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(query: str, buffer: queue.Queue) -> None:
+        if stop.is_set():
+            return
+        chunks = stream_data(query, chunk_rows, schema_overrides)
+        try:
+            for chunk in chunks:
+                if not put(buffer, chunk):
+                    return
+            put(buffer, done)
+        except Exception as e:
+            put(buffer, e)
+        finally:
+            chunks.close()  # Releases the connection if we stopped early
+
+    workers = min(max_workers or get_pool().size, len(queries))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for query, buffer in zip(queries, buffers):
+            executor.submit(produce, query, buffer)
+
+        for buffer in buffers:
+            while (item := buffer.get()) is not done:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def execute_query(query: str, commit: bool = True) -> None:
     """
     Execute a SQL query without returning results (for INSERT, UPDATE, DELETE, etc.).
 
     Args:
         query: SQL query string to execute
-        commit: If True, commit the transaction; if False, you must commit manually
+        commit: If True, commit the transaction; if False, the statement is rolled
+            back when its connection returns to the pool (use connection() to run
+            several statements in one transaction)
 
     Raises:
         RuntimeError: If query execution fails
@@ -161,43 +679,124 @@ def execute_query(query: str, commit: bool = True) -> None:
     Example:
         execute_query("DELETE FROM schema.table WHERE date < '2024-01-01'")
     """
-    conn = get_connection()
-
     try:
-        cursor = conn.cursor()
-        cursor.execute(query)
-        if commit:
-            conn.commit()
-        cursor.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            if commit:
+                conn.commit()
+            cursor.close()
     except Exception as e:
-        conn.rollback()
         raise RuntimeError(f"Error executing query: {e}")
 
+    if commit:
+        _invalidate_written_tables(query)
 
-def _format_value(value) -> str:
-    """Format a value for SQL insertion."""
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return "NULL"
-    elif isinstance(value, str):
-        return "'" + value.replace("'", "''") + "'"
-    elif isinstance(value, bool):
-        return "TRUE" if value else "FALSE"
-    elif hasattr(value, 'isoformat'):  # date/datetime
-        return "'" + str(value) + "'"
-    else:
-        return str(value)
+
+def _insert_batches(
+    cursor,
+    df: pl.DataFrame,
+    table_name: str,
+    batch_size: int,
+    verbose: bool,
+) -> None:
+    """INSERT a frame in multi-row batches (not committed)."""
+    total_rows = df.height
+    column_list = ", ".join(df.columns)
+    batches = (total_rows + batch_size - 1) // batch_size
+
+    if verbose:
+        print(f"Uploading {total_rows:,} rows to {table_name} in {batches} batch(es)...")
+
+    for batch_idx in range(batches):
+        start_idx = batch_idx * batch_size
+        end_idx = min(start_idx + batch_size, total_rows)
+
+        # Build VALUES clause from batch, column-wise (see shared.database.literals)
+        values_list = row_literals(df.slice(start_idx, batch_size))
+
+        insert_sql = f"INSERT INTO {table_name} ({column_list}) VALUES {', '.join(values_list)}"
+        cursor.execute(insert_sql)
+
+        if verbose:
+            print(f"  Batch {batch_idx + 1}/{batches}: rows {start_idx + 1:,}-{end_idx:,}")
+
+
+def _push_resumable(
+    df: pl.DataFrame,
+    table_name: str,
+    keys: list[str],
+    run_id: str,
+    commit_every: int,
+    batch_size: int,
+    load,
+    verbose: bool,
+) -> None:
+    """Append df in commit groups, checkpointing after each (see shared.database.checkpoint)."""
+    checkpoint = UploadCheckpoint(table_name, run_id)
+    state = checkpoint.load()
+    df = df.sort(keys, maintain_order=True)
+    batch, rows = 0, 0
+
+    if state is not None:
+        if state["keys"] != keys:
+            raise ValueError(f"Checkpoint for run {run_id!r} was keyed by {state['keys']}, not {keys}")
+        batch, rows = state["batch"], state["rows"]
+        df = df.filter(after_key(keys, state["last_key"]))
+        if verbose:
+            print(
+                f"Resuming run {run_id!r} after batch {batch:,} ({rows:,} rows committed, "
+                f"last key {state['last_key']}): {df.height:,} rows left"
+            )
+
+    groups = commit_groups(df, keys, batch_size * commit_every)
+    for i, (offset, length) in enumerate(groups):
+        group = df.slice(offset, length)
+
+        # Rolled back on return to the pool if anything fails before the commit
+        with connection() as conn:
+            if i == 0 and state is not None:
+                # May have been committed before the checkpoint was saved
+                compare = [c for c in group.columns if c not in keys]
+                merge_frame(conn, group.columns, table_name, keys, compare, lambda c, t: load(c, t, group))
+            else:
+                load(conn, table_name, group)
+                conn.commit()
+
+        batch += (length + batch_size - 1) // batch_size
+        rows += length
+        checkpoint.save(batch, rows, keys, list(group.select(keys).row(-1)))
+        if verbose:
+            print(f"  Committed group {i + 1}/{len(groups)}: batch {batch:,}, {rows:,} rows in total")
+
+    checkpoint.clear()
 
 
 def push_data(
     data: Union[pl.DataFrame, pd.DataFrame],
     table_name: str,
-    if_exists: Literal["append", "replace", "fail"] = "append",
+    if_exists: Literal["append", "replace", "fail", "merge"] = "append",
     batch_size: int = 5000,
-    verbose: bool = True
-) -> bool:
+    verbose: bool = True,
+    bulk: Optional[bool] = None,
+    keys: Optional[list[str]] = None,
+    ignore_columns: Optional[list[str]] = None,
+    scope: Optional[str] = None,
+    run_id: Optional[str] = None,
+    commit_every: int = COMMIT_EVERY_BATCHES,
+) -> Union[bool, MergeCounts]:
     """
     Upload a DataFrame to a Redshift table.
 
+    Frames of at least BULK_LOAD_MIN_ROWS rows are loaded with one COPY
+    through the configured staging area (see configure_staging); smaller
+    frames, or any frame when no staging area is set, with INSERT batches.
+
+    Everything is committed at once, unless a run_id is given: then rows are
+    committed in groups of commit_every batches and progress is checkpointed
+    locally, so a failed upload rerun with the same run_id continues where
+    it stopped (see shared.database.checkpoint).
+
     Args:
         data: Polars or Pandas DataFrame to upload
         table_name: Full table name (e.g., "schema.table_name")
@@ -205,40 +804,71 @@ def push_data(
             - "append": Insert data into existing table
             - "replace": Drop table and recreate (use with caution!)
             - "fail": Raise error if table exists
+            - "merge": Upsert by keys, touching only changed rows (see
+              shared.database.merge)
         batch_size: Number of rows per INSERT batch (default: 5000)
         verbose: If True, print progress messages
+        bulk: True to always COPY, False to always INSERT, None to decide by size
+        keys: Columns identifying rows - the rows to refresh when merging,
+            the resume position for resumable uploads
+        ignore_columns: Merge only - columns not compared when deciding
+            whether rows changed (e.g. dw_timestamp)
+        scope: Merge only - SQL condition on the table's columns; rows
+            matching it whose keys are not in data are deleted
+        run_id: Append resumably under this id (needs keys, if_exists="append")
+        commit_every: Resumable only - INSERT batches per commit
 
     Returns:
-        bool: True if successful
+        bool: True if successful (MergeCounts for if_exists="merge")
 
     Raises:
         ValueError: If table_name is invalid or if_exists option is invalid
         RuntimeError: If upload fails
+
+    Example:
+        counts = push_data(
+            df, "schema.expected_costs", if_exists="merge",
+            keys=["pcs_orderid"], ignore_columns=["dw_timestamp"],
+            scope="pcs_created::date >= '2025-06-01'",
+        )
+
+        # Rerun with the same run_id after a failure to resume
+        push_data(df, "schema.expected_costs", keys=["pcs_orderid"], run_id="full-2025-06-01")
     """
     if "." not in table_name:
         raise ValueError(
             f"table_name must include schema: 'schema.table_name', got '{table_name}'"
         )
 
-    if if_exists not in ("append", "replace", "fail"):
-        raise ValueError(f"if_exists must be 'append', 'replace', or 'fail', got '{if_exists}'")
+    if if_exists not in ("append", "replace", "fail", "merge"):
+        raise ValueError(
+            f"if_exists must be 'append', 'replace', 'fail', or 'merge', got '{if_exists}'"
+        )
 
-    # Extract rows and columns efficiently (avoid iterrows)
-    if isinstance(data, pl.DataFrame):
-        columns = data.columns
-        rows = data.rows()
-    else:
-        columns = list(data.columns)
-        rows = [tuple(row) for row in data.to_numpy()]
+    if bulk and _stage is None:
+        raise ValueError("bulk=True needs a staging area, see configure_staging()")
+
+    # Both upload paths work column-wise on a Polars frame
+    df = data if isinstance(data, pl.DataFrame) else pl.from_pandas(data)
+    total_rows = df.height
 
-    total_rows = len(rows)
+    if run_id is not None and if_exists != "append":
+        raise ValueError(f"Resumable uploads (run_id) only append, got if_exists='{if_exists}'")
 
-    if total_rows == 0:
+    if if_exists == "merge" or run_id is not None:
+        missing = [k for k in keys or [] if k not in df.columns]
+        if not keys or missing:
+            raise ValueError(f"Merging or resuming needs keys that are columns of data, got {keys}")
+        if df.select(pl.any_horizontal(pl.col(keys).is_null()).any()).item():
+            raise ValueError(f"Keys {keys} contain nulls")
+        if run_id is not None:
+            check_key_types(df, keys)
+
+    # A scoped merge of nothing still removes the rows in scope
+    if total_rows == 0 and not (if_exists == "merge" and scope):
         if verbose:
             print("Warning: DataFrame is empty, nothing to upload")
-        return True
-
-    conn = get_connection()
+        return MergeCounts() if if_exists == "merge" else True
 
     # Handle if_exists options
     if if_exists == "fail":
@@ -247,10 +877,11 @@ def push_data(
             SELECT COUNT(*) FROM information_schema.tables
             WHERE table_schema = '{schema}' AND table_name = '{table}'
         """
-        cursor = conn.cursor()
-        cursor.execute(check_query)
-        exists = cursor.fetchone()[0] > 0
-        cursor.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(check_query)
+            exists = cursor.fetchone()[0] > 0
+            cursor.close()
 
         if exists:
             raise RuntimeError(f"Table {table_name} already exists and if_exists='fail'")
@@ -263,40 +894,113 @@ def push_data(
         except Exception as e:
             raise RuntimeError(f"Failed to drop table: {e}")
 
-    column_list = ", ".join(columns)
-    batches = (total_rows + batch_size - 1) // batch_size
+    use_copy = _stage is not None and (bulk or (bulk is None and total_rows >= BULK_LOAD_MIN_ROWS))
 
-    if verbose:
-        print(f"Uploading {total_rows:,} rows to {table_name} in {batches} batch(es)...")
+    def load(conn, target: str, frame: pl.DataFrame = df) -> None:
+        """Load frame into target on conn, without committing."""
+        if use_copy:
+            if verbose:
+                print(f"Loading {frame.height:,} rows to {target} with COPY...")
+            copy_frame(conn, frame, target, _stage, commit=False)
+        else:
+            cursor = conn.cursor()
+            _insert_batches(cursor, frame, target, batch_size, verbose)
+            cursor.close()
+
+    if run_id is not None:
+        try:
+            _push_resumable(df, table_name, keys, run_id, commit_every, batch_size, load, verbose)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error uploading data (rerun with run_id={run_id!r} to resume): {e}")
+        finally:
+            invalidate_cache(table_name)  # Groups may have been committed
+
+        if verbose:
+            print(f"Successfully uploaded {total_rows:,} rows to {table_name}")
+        return True
 
     try:
-        cursor = conn.cursor()
+        # Rolled back on return to the pool if anything fails before the commit
+        with connection() as conn:
+            if if_exists == "merge":
+                compare = [c for c in df.columns if c not in keys and c not in (ignore_columns or [])]
+                counts = merge_frame(conn, df.columns, table_name, keys, compare, load, scope)
+            else:
+                load(conn, table_name)
+                conn.commit()  # Single commit at end
+    except Exception as e:
+        raise RuntimeError(f"Error uploading data: {e}")
 
-        for batch_idx in range(batches):
-            start_idx = batch_idx * batch_size
-            end_idx = min(start_idx + batch_size, total_rows)
-            batch = rows[start_idx:end_idx]
+    invalidate_cache(table_name)
 
-            # Build VALUES clause from batch
-            values_list = []
-            for row in batch:
-                row_values = ", ".join(_format_value(v) for v in row)
-                values_list.append(f"({row_values})")
+    if if_exists == "merge":
+        if verbose:
+            print(
+                f"Merged {total_rows:,} rows into {table_name}: {counts.inserted:,} inserted, "
+                f"{counts.updated:,} updated, {counts.unchanged:,} unchanged, {counts.deleted:,} deleted"
+            )
+        return counts
 
-            insert_sql = f"INSERT INTO {table_name} ({column_list}) VALUES {', '.join(values_list)}"
-            cursor.execute(insert_sql)
+    if verbose:
+        print(f"Successfully uploaded {total_rows:,} rows to {table_name}")
+    return True
 
-            if verbose:
-                print(f"  Batch {batch_idx + 1}/{batches}: rows {start_idx + 1:,}-{end_idx:,}")
 
-        conn.commit()  # Single commit at end
-        cursor.close()
+def delete_out_of_scope(table_name: str, keys: pl.DataFrame, scope: str) -> int:
+    """
+    Delete rows within a scope whose keys are not in a key frame, in one transaction.
 
-        if verbose:
-            print(f"Successfully uploaded {total_rows:,} rows to {table_name}")
+    The closing step of a scoped merge done in parts (see
+    shared.database.streaming.push_chunks): each part is merged without a
+    scope, then the rows in scope that no part held are removed here. The
+    keys are loaded into a session temporary table, as in pull_by_keys().
 
-        return True
+    Args:
+        table_name: Full table name (e.g., "schema.table_name")
+        keys: Key columns of the rows to keep, named as in the table
+            (duplicates are dropped; no rows deletes the whole scope)
+        scope: SQL condition on the table's columns
+
+    Returns:
+        int: Rows deleted
+
+    Raises:
+        RuntimeError: If the delete fails
 
+    Example:
+        delete_out_of_scope(
+            "schema.expected_costs", merged_keys,
+            scope="pcs_created::date >= '2025-06-01'",
+        )
+    """
+    keys = keys.unique()
+    table = f"scope_keys_{uuid.uuid4().hex[:12]}"
+
+    if keys.height:
+        sql = out_of_scope_statements(table_name, table, keys.columns, scope)
+    else:
+        sql = {
+            "count_out_of_scope": f"SELECT COUNT(*) FROM {table_name} WHERE ({scope})",
+            "delete_out_of_scope": f"DELETE FROM {table_name} WHERE ({scope})",
+        }
+
+    try:
+        # Rolled back on return to the pool if anything fails before the commit
+        with connection() as conn:
+            if keys.height:
+                _load_key_table(conn, table, keys)
+            cursor = conn.cursor()
+            cursor.execute(sql["count_out_of_scope"])
+            deleted = int(cursor.fetchone()[0])
+            cursor.execute(sql["delete_out_of_scope"])
+            if keys.height:
+                cursor.execute(f"DROP TABLE {table}")
+            conn.commit()
+            cursor.close()
     except Exception as e:
-        conn.rollback()
-        raise RuntimeError(f"Error uploading data: {e}")
+        raise RuntimeError(f"Error deleting rows out of scope: {e}")
+
+    invalidate_cache(table_name)
+    return deleted
@@ -0,0 +1,241 @@
+"""
+Bulk Loading
+
+Load a DataFrame into Redshift with COPY instead of INSERT statements.
+push_data() takes this path on its own for large frames once a staging
+area is configured:
+
+    configure_staging(S3Stage("my-bucket", "shipping_costs/staging", iam_role="arn:aws:iam::..."))
+    push_data(df, "schema.table")       # COPY from BULK_LOAD_MIN_ROWS rows
+
+1. The frame is written as compressed part files (gzip CSV or Parquet)
+2. The parts are uploaded to a staging area under a fresh prefix
+3. One COPY statement loads every part, committed as one transaction
+4. The staged parts are removed
+
+Staging is pluggable: S3Stage uploads to S3 for Redshift to read;
+LocalStage copies to a local directory (for tests, or a database that can
+read the local filesystem). Any object with put / copy_source / remove and
+a credentials attribute can be used. SHIPPING_COSTS_COPY_STAGE (an s3://
+URL or a directory, with SHIPPING_COSTS_COPY_IAM_ROLE for S3) configures
+one from the environment.
+
+CSV parts are written so COPY loads the same values as the INSERT path
+(see shared.database.literals): nulls as \\N, dates and timestamps as ISO text, booleans
+as true/false. Parquet parts are matched to the table's columns by position,
+so the frame's columns must be in table order.
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Literal, Optional
+
+import polars as pl
+
+
+# Rows per staged part file (Redshift loads parts in parallel across slices)
+PART_ROWS = 500_000
+
+# NULL marker in CSV parts
+CSV_NULL = r"\N"
+
+# Environment variables configuring the default staging area
+STAGE_ENV_VAR = "SHIPPING_COSTS_COPY_STAGE"
+IAM_ROLE_ENV_VAR = "SHIPPING_COSTS_COPY_IAM_ROLE"
+
+
+# =============================================================================
+# STAGING AREAS
+# =============================================================================
+
+class LocalStage:
+    """Staging area in a local directory."""
+
+    credentials = ""
+
+    def __init__(self, directory: str | Path):
+        """
+        Args:
+            directory: Directory to stage part files in (created if missing)
+        """
+        self.directory = Path(directory)
+
+    def put(self, files: list[Path], prefix: str) -> None:
+        """Copy part files under prefix."""
+        target = self.directory / prefix
+        target.mkdir(parents=True, exist_ok=True)
+        for path in files:
+            shutil.copy2(path, target / path.name)
+
+    def copy_source(self, prefix: str) -> str:
+        """COPY FROM location of everything staged under prefix."""
+        return str(self.directory / prefix) + "/"
+
+    def remove(self, prefix: str) -> None:
+        """Delete everything staged under prefix."""
+        shutil.rmtree(self.directory / prefix, ignore_errors=True)
+
+
+class S3Stage:
+    """Staging area in an S3 bucket, read by COPY with an IAM role."""
+
+    def __init__(self, bucket: str, prefix: str = "", iam_role: Optional[str] = None):
+        """
+        Args:
+            bucket: S3 bucket name
+            prefix: Key prefix for staged files
+            iam_role: ARN of the role Redshift assumes to read the bucket
+        """
+        import boto3  # Installed with redshift-connector
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.credentials = f"IAM_ROLE '{iam_role}'" if iam_role else ""
+        self._s3 = boto3.client("s3")
+
+    def _key(self, prefix: str, name: str = "") -> str:
+        return "/".join(p for p in (self.prefix, prefix, name) if p)
+
+    def put(self, files: list[Path], prefix: str) -> None:
+        """Upload part files under prefix."""
+        for path in files:
+            self._s3.upload_file(str(path), self.bucket, self._key(prefix, path.name))
+
+    def copy_source(self, prefix: str) -> str:
+        """COPY FROM location of everything staged under prefix."""
+        return f"s3://{self.bucket}/{self._key(prefix)}/"
+
+    def remove(self, prefix: str) -> None:
+        """Delete everything staged under prefix."""
+        paginator = self._s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix) + "/"):
+            objects = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if objects:
+                self._s3.delete_objects(Bucket=self.bucket, Delete={"Objects": objects})
+
+
+def stage_from_env():
+    """Staging area configured by SHIPPING_COSTS_COPY_STAGE, or None if unset."""
+    location = os.environ.get(STAGE_ENV_VAR, "").strip()
+    if not location:
+        return None
+
+    if location.startswith("s3://"):
+        bucket, _, prefix = location[len("s3://"):].partition("/")
+        return S3Stage(bucket, prefix, iam_role=os.environ.get(IAM_ROLE_ENV_VAR))
+    return LocalStage(location)
+
+
+# =============================================================================
+# PART FILES
+# =============================================================================
+
+def write_parts(
+    df: pl.DataFrame,
+    directory: Path,
+    file_format: Literal["csv", "parquet"] = "csv",
+    part_rows: int = PART_ROWS,
+) -> list[Path]:
+    """
+    Write a frame as compressed part files.
+
+    Args:
+        df: Frame to write
+        directory: Output directory
+        file_format: "csv" (gzip) or "parquet" (snappy)
+        part_rows: Rows per part file
+
+    Returns:
+        Paths of the written parts, in row order
+    """
+    parts = []
+    for i, part in enumerate(df.iter_slices(part_rows)):
+        if file_format == "parquet":
+            path = directory / f"part-{i:05d}.parquet"
+            part.write_parquet(path, compression="snappy")
+        else:
+            path = directory / f"part-{i:05d}.csv.gz"
+            csv = part.write_csv(
+                include_header=False,
+                null_value=CSV_NULL,
+                datetime_format="%Y-%m-%d %H:%M:%S%.f",
+                date_format="%Y-%m-%d",
+            )
+            path.write_bytes(gzip.compress(csv.encode()))
+        parts.append(path)
+    return parts
+
+
+def copy_statement(
+    table_name: str,
+    columns: list[str],
+    source: str,
+    credentials: str = "",
+    file_format: Literal["csv", "parquet"] = "csv",
+) -> str:
+    """COPY statement loading staged parts into table_name."""
+    credentials = [credentials] if credentials else []
+
+    if file_format == "parquet":
+        # Columnar formats are matched to the table's columns by position
+        clauses = [f"COPY {table_name}", f"FROM '{source}'", *credentials, "FORMAT AS PARQUET"]
+    else:
+        clauses = [
+            f"COPY {table_name} ({', '.join(columns)})",
+            f"FROM '{source}'",
+            *credentials,
+            f"FORMAT AS CSV GZIP NULL AS '{CSV_NULL}' TIMEFORMAT 'auto' DATEFORMAT 'auto'",
+        ]
+    return " ".join(clauses)
+
+
+# =============================================================================
+# LOAD
+# =============================================================================
+
+def copy_frame(
+    conn,
+    df: pl.DataFrame,
+    table_name: str,
+    stage,
+    file_format: Literal["csv", "parquet"] = "csv",
+    part_rows: int = PART_ROWS,
+    commit: bool = True,
+) -> int:
+    """
+    Load a frame into an existing table with one COPY.
+
+    Args:
+        conn: Open DB-API connection (rolled back by the caller on failure)
+        df: Frame with the table's columns
+        table_name: Full table name (e.g., "schema.table_name")
+        stage: Staging area (LocalStage, S3Stage, ...)
+        file_format: "csv" (gzip) or "parquet"
+        part_rows: Rows per staged part file
+        commit: If True, commit after the COPY (False to continue the transaction)
+
+    Returns:
+        Number of rows loaded
+    """
+    prefix = f"{table_name.replace('.', '_')}/{uuid.uuid4().hex}"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            parts = write_parts(df, Path(tmp), file_format, part_rows)
+            stage.put(parts, prefix)
+
+        cursor = conn.cursor()
+        cursor.execute(copy_statement(
+            table_name, df.columns, stage.copy_source(prefix), stage.credentials, file_format,
+        ))
+        if commit:
+            conn.commit()
+        cursor.close()
+    finally:
+        stage.remove(prefix)
+
+    return df.height
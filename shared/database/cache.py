@@ -0,0 +1,225 @@
+"""
+Query Result Cache
+
+Opt-in on-disk cache of query results, so reruns of the same heavy queries
+(PCS extracts, invoice tables, match-rate counts) skip the network:
+
+    enable_cache()                      # or set SHIPPING_COSTS_QUERY_CACHE
+    df = pull_data(query)               # first run: database, then stored
+    df = pull_data(query)               # later runs: read from disk
+
+Each entry is a parquet file plus a small JSON sidecar, named by a hash of
+the normalized SQL text (comments dropped, whitespace collapsed outside
+string literals) and any parameters that change the result (e.g.
+schema_overrides). Entries are shared between processes, so e.g. every
+carrier script started by run_all_carriers reads the same PCS range once.
+
+INVALIDATION
+------------
+- Entries older than ttl seconds are ignored and removed.
+- When the cache exceeds max_bytes, least recently used entries are evicted
+  (a hit refreshes the parquet file's mtime).
+- invalidate(table) drops every entry whose query reads that table; writes
+  through shared.database (push_data, execute_query) do this automatically.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+
+import polars as pl
+
+
+# Environment variable enabling the cache: a directory, or "1" for the default
+CACHE_ENV_VAR = "SHIPPING_COSTS_QUERY_CACHE"
+
+# Default cache directory
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "shipping_costs" / "queries"
+
+# Seconds an entry stays valid
+DEFAULT_TTL_SECONDS = 12 * 60 * 60
+
+# Total size of cached parquet files before LRU eviction
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+
+# String literals, line comments, block comments, whitespace runs
+_SQL_TOKENS = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/|\s+", re.S)
+
+# Table names after FROM / JOIN / INTO / UPDATE / TRUNCATE / TABLE [IF [NOT] EXISTS]
+_TABLE_REFERENCE = re.compile(
+    r"\b(?:from|join|into|update|truncate|table)\s+(?:if\s+(?:not\s+)?exists\s+)?"
+    r"([\w\"]+(?:\.[\w\"]+)?)",
+    re.I,
+)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def normalize_sql(query: str) -> str:
+    """Drop comments and collapse whitespace outside string literals."""
+    def replace(match: re.Match) -> str:
+        token = match.group(0)
+        return token if token.startswith("'") else " "
+
+    # A second pass merges the spaces left where comments and whitespace met
+    text = _SQL_TOKENS.sub(replace, _SQL_TOKENS.sub(replace, query))
+    return text.strip().rstrip(";").strip()
+
+
+def referenced_tables(query: str) -> set[str]:
+    """Lower-cased, unquoted names of the tables a statement reads or writes."""
+    # Literals could contain words like "from"; comments are gone after normalizing
+    text = re.sub(r"'(?:[^']|'')*'", "''", normalize_sql(query))
+    return {name.replace('"', "").lower() for name in _TABLE_REFERENCE.findall(text)}
+
+
+def _table_matches(table: str, referenced: Iterable[str]) -> bool:
+    """True if table ("schema.table" or "table") is one of the referenced names."""
+    table = table.replace('"', "").lower()
+    return any(
+        name == table or name.split(".")[-1] == table or table.split(".")[-1] == name
+        for name in referenced
+    )
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class QueryCache:
+    """Parquet files of query results in a directory, with TTL and LRU size cap."""
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CACHE_DIR,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Args:
+            directory: Where entries are stored (created if missing)
+            ttl: Seconds an entry stays valid
+            max_bytes: Total parquet size above which LRU entries are evicted
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, query: str, **params) -> str:
+        """Cache key for a query and the parameters that change its result."""
+        payload = json.dumps(
+            {"sql": normalize_sql(query), "params": {k: repr(v) for k, v in sorted(params.items())}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[pl.DataFrame]:
+        """Cached result for key, or None if missing or expired."""
+        data, meta = self._paths(key)
+        try:
+            created = json.loads(meta.read_text())["created"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if time.time() - created > self.ttl:
+            self._remove(key)
+            return None
+
+        try:
+            df = pl.read_parquet(data)
+            os.utime(data)  # Most recently used
+        except OSError:
+            return None
+        return df
+
+    def put(self, key: str, query: str, df: pl.DataFrame) -> None:
+        """Store a result, then evict least recently used entries over max_bytes."""
+        data, meta = self._paths(key)
+
+        # Write under temporary names and rename, so readers never see a partial file
+        tmp = f".{uuid.uuid4().hex}.tmp"
+        df.write_parquet(data.with_name(data.name + tmp))
+        meta.with_name(meta.name + tmp).write_text(json.dumps({
+            "created": time.time(),
+            "tables": sorted(referenced_tables(query)),
+            "query": normalize_sql(query),
+        }))
+        os.replace(meta.with_name(meta.name + tmp), meta)
+        os.replace(data.with_name(data.name + tmp), data)
+
+        self._evict()
+
+    def invalidate(self, table: str) -> int:
+        """
+        Drop every entry whose query references table.
+
+        Args:
+            table: "schema.table", or a bare table name matching any schema
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for meta in self.directory.glob("*.json"):
+            try:
+                tables = json.loads(meta.read_text())["tables"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if _table_matches(table, tables):
+                self._remove(meta.stem)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        for meta in self.directory.glob("*.json"):
+            self._remove(meta.stem)
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        """(parquet file, metadata file) for a key."""
+        return self.directory / f"{key}.parquet", self.directory / f"{key}.json"
+
+    def _remove(self, key: str) -> None:
+        """Delete an entry's files, ignoring ones already gone."""
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for data in self.directory.glob("*.parquet"):
+            try:
+                stat = data.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, data.stem))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+
+def cache_from_env() -> Optional[QueryCache]:
+    """QueryCache configured by SHIPPING_COSTS_QUERY_CACHE, or None if unset."""
+    value = os.environ.get(CACHE_ENV_VAR, "").strip()
+    if not value or value == "0":
+        return None
+    return QueryCache(DEFAULT_CACHE_DIR if value == "1" else value)
@@ -0,0 +1,134 @@
+"""
+Upload Checkpoints
+
+Resumable uploads for push_data(..., keys=[...], run_id="..."):
+
+1. The frame is sorted by its key columns and cut into commit groups of
+   about commit_every INSERT batches, never splitting the rows of one key
+2. Each group is committed on its own; after the commit, a local JSON
+   checkpoint records the batch index, the rows committed so far and the
+   last committed key, under (table, run id)
+3. A rerun with the same run id skips the rows up to the last committed
+   key. The first group after a restart is merged by keys instead of
+   appended, so a group that was committed before the checkpoint could be
+   written is not uploaded twice
+4. The checkpoint is removed once the last group is committed
+
+Resuming compares keys rather than counting rows, so a frame that gained
+or lost rows since the failed run (e.g. new shipments) still resumes
+correctly. Key columns must be integers or strings.
+"""
+
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import polars as pl
+
+
+# Default directory for checkpoint files
+DEFAULT_CHECKPOINT_DIR = Path.home() / ".cache" / "shipping_costs" / "checkpoints"
+
+# INSERT batches per commit in resumable uploads
+COMMIT_EVERY_BATCHES = 20
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def check_key_types(df: pl.DataFrame, keys: list[str]) -> None:
+    """Raise ValueError unless every key column is an integer or string."""
+    for key in keys:
+        dtype = df.schema[key]
+        if not (dtype.is_integer() or dtype == pl.Utf8):
+            raise ValueError(f"Resumable upload keys must be integers or strings, got {key} ({dtype})")
+
+
+def commit_groups(df: pl.DataFrame, keys: list[str], group_rows: int) -> list[tuple[int, int]]:
+    """
+    (offset, length) of each commit group of a frame sorted by keys.
+
+    Groups hold at least group_rows rows (except the last) and end where a
+    key ends, so each key's rows are committed together.
+    """
+    if df.height == 0:
+        return []
+
+    # First row of each key
+    run_ids = df.select(pl.struct(keys).rle_id()).to_series()
+    key_starts = pl.arg_where(run_ids.diff().fill_null(1) != 0, eager=True)
+
+    groups = []
+    start = 0
+    while start < df.height:
+        position = key_starts.search_sorted(start + group_rows, side="left")
+        end = key_starts[position] if position < len(key_starts) else df.height
+        groups.append((start, end - start))
+        start = end
+    return groups
+
+
+def after_key(keys: list[str], last_key: list) -> pl.Expr:
+    """Rows whose key tuple sorts after last_key."""
+    condition = pl.lit(False)
+    for i in reversed(range(len(keys))):
+        greater = pl.col(keys[i]) > pl.lit(last_key[i])
+        equal_so_far = [pl.col(k) == pl.lit(v) for k, v in zip(keys[:i], last_key[:i])]
+        condition = pl.all_horizontal(equal_so_far + [greater]) | condition
+    return condition
+
+
+# =============================================================================
+# CHECKPOINT
+# =============================================================================
+
+class UploadCheckpoint:
+    """
+    Progress of one resumable upload, stored as a JSON file.
+
+    Args:
+        table_name: Target table (e.g., "schema.table_name")
+        run_id: Identifies the upload; reruns with the same id resume it
+        directory: Where checkpoint files are kept
+    """
+
+    def __init__(self, table_name: str, run_id: str, directory: Path = DEFAULT_CHECKPOINT_DIR):
+        self.table_name = table_name
+        self.run_id = run_id
+        safe_id = re.sub(r"[^\w.-]", "_", f"{table_name}.{run_id}")
+        self.path = Path(directory) / f"{safe_id}.json"
+
+    def exists(self) -> bool:
+        """True if an earlier run with this id left uncommitted work."""
+        return self.path.exists()
+
+    def load(self) -> Optional[dict]:
+        """Saved progress (batch, rows, last_key, keys, updated), or None."""
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def save(self, batch: int, rows: int, keys: list[str], last_key: list) -> None:
+        """Record progress after a commit (written atomically)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + f".{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps({
+            "table": self.table_name,
+            "run_id": self.run_id,
+            "batch": batch,
+            "rows": rows,
+            "keys": keys,
+            "last_key": last_key,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        """Remove the checkpoint (the upload is complete)."""
+        self.path.unlink(missing_ok=True)
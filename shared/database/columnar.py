@@ -0,0 +1,193 @@
+"""
+Columnar Fetch
+
+Builds Polars frames from a DB-API cursor column by column instead of from
+one big list of row tuples.
+
+Rows are fetched in batches with cursor.fetchmany(). Each batch is
+transposed into typed pl.Series using a schema declared from the cursor
+description (Redshift type OIDs -> Polars dtypes), so only one batch of
+Python row objects is alive at a time and no column type is inferred from
+its first values:
+
+    NUMERIC / DECIMAL       -> Float64
+    SMALLINT / INT / BIGINT -> Int64
+    REAL / DOUBLE           -> Float64
+    CHAR / VARCHAR / TEXT   -> Utf8
+    DATE                    -> Date
+    TIMESTAMP               -> Datetime("us")
+    TIMESTAMPTZ             -> Datetime("us", "UTC")
+    BOOLEAN                 -> Boolean
+
+Types not listed (SUPER, VARBYTE, ...) are inferred per batch. Individual
+columns can be overridden by name with schema_overrides. A batch whose
+values do not fit the declared type (out of range, unparseable) is never
+nulled: that column falls back to its inferred type, with a warning.
+
+stream_cursor() yields the same typed frames from a server-side cursor
+(DECLARE ... CURSOR / FETCH FORWARD), so a result larger than memory is
+never held by the client - neither as rows nor as one frame.
+"""
+
+import warnings
+from typing import Iterator, Sequence
+
+import polars as pl
+from redshift_connector.utils.oids import RedshiftOID
+
+
+# Rows fetched per fetchmany() call
+FETCH_BATCH_ROWS = 50_000
+
+REDSHIFT_TYPES: dict[int, pl.DataType] = {
+    RedshiftOID.NUMERIC: pl.Float64,
+    RedshiftOID.SMALLINT: pl.Int64,
+    RedshiftOID.INTEGER: pl.Int64,
+    RedshiftOID.BIGINT: pl.Int64,
+    RedshiftOID.REAL: pl.Float64,
+    RedshiftOID.FLOAT: pl.Float64,
+    RedshiftOID.CHAR: pl.Utf8,
+    RedshiftOID.BPCHAR: pl.Utf8,
+    RedshiftOID.VARCHAR: pl.Utf8,
+    RedshiftOID.TEXT: pl.Utf8,
+    RedshiftOID.NAME: pl.Utf8,
+    RedshiftOID.DATE: pl.Date,
+    RedshiftOID.TIMESTAMP: pl.Datetime("us"),
+    RedshiftOID.TIMESTAMPTZ: pl.Datetime("us", "UTC"),
+    RedshiftOID.BOOLEAN: pl.Boolean,
+}
+
+
+def result_schema(
+    description: Sequence[Sequence],
+    schema_overrides: dict[str, pl.DataType] | None = None,
+) -> dict[str, pl.DataType | None]:
+    """
+    Declared Polars dtype per result column (None = infer).
+
+    Args:
+        description: cursor.description (name, type_code, ...) per column
+        schema_overrides: Column name -> dtype, replacing the declared type
+    """
+    overrides = schema_overrides or {}
+    return {
+        desc[0]: overrides.get(desc[0], REDSHIFT_TYPES.get(desc[1]))
+        for desc in description
+    }
+
+
+def _typed_series(name: str, values: Sequence, dtype: pl.DataType | None) -> pl.Series:
+    """
+    One column as its declared dtype, or inferred if any value does not fit it.
+
+    The non-strict build converts driver values (Decimal -> Float64, ...) but
+    turns values it cannot cast into nulls; those are detected by comparing
+    against the input's Nones.
+    """
+    series = pl.Series(name, values, dtype=dtype, strict=False)
+    if dtype is None or series.null_count() == sum(v is None for v in values):
+        return series
+
+    warnings.warn(
+        f"Column {name!r}: values do not fit the declared type {dtype}, "
+        f"using the inferred type for this batch"
+    )
+    return pl.Series(name, values)
+
+
+def batch_frame(rows: Sequence[Sequence], schema: dict[str, pl.DataType | None]) -> pl.DataFrame:
+    """Build one typed frame from a batch of row tuples, column by column."""
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pl.DataFrame([
+        _typed_series(name, values, dtype)
+        for (name, dtype), values in zip(schema.items(), columns)
+    ])
+
+
+def iter_batches(
+    cursor,
+    batch_rows: int = FETCH_BATCH_ROWS,
+    schema_overrides: dict[str, pl.DataType] | None = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Yield the cursor's remaining result as typed frames of up to batch_rows rows.
+
+    Args:
+        cursor: DB-API cursor with an executed query
+        batch_rows: Rows per fetchmany() call
+        schema_overrides: Column name -> dtype (see result_schema)
+    """
+    schema = result_schema(cursor.description, schema_overrides)
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            return
+        yield batch_frame(rows, schema)
+
+
+def fetch_frame(
+    cursor,
+    batch_rows: int = FETCH_BATCH_ROWS,
+    schema_overrides: dict[str, pl.DataType] | None = None,
+) -> pl.DataFrame:
+    """
+    Fetch the cursor's whole remaining result as one typed frame.
+
+    Args:
+        cursor: DB-API cursor with an executed query
+        batch_rows: Rows per fetchmany() call
+        schema_overrides: Column name -> dtype (see result_schema)
+
+    Returns:
+        pl.DataFrame with the declared schema (empty, with columns, if no rows)
+    """
+    frames = list(iter_batches(cursor, batch_rows, schema_overrides))
+    if not frames:
+        return batch_frame([], result_schema(cursor.description, schema_overrides))
+    # Relaxed: inferred (undeclared) columns may widen between batches
+    return pl.concat(frames, how="vertical_relaxed", rechunk=True)
+
+
+def stream_cursor(
+    conn,
+    query: str,
+    chunk_rows: int = FETCH_BATCH_ROWS,
+    schema_overrides: dict[str, pl.DataType] | None = None,
+    cursor_name: str = "stream_cursor",
+) -> Iterator[pl.DataFrame]:
+    """
+    Yield a query's result as typed frames of up to chunk_rows rows.
+
+    The query runs behind a server-side cursor; each chunk is one
+    FETCH FORWARD round trip. The cursor lives in the connection's open
+    transaction, so the connection must not be used (committed) by anything
+    else until the generator is exhausted or closed. The transaction is
+    committed at the end and rolled back on error or early close.
+
+    Args:
+        conn: DB-API connection, used only by this generator
+        query: SQL query (a trailing ';' is ignored)
+        chunk_rows: Rows per chunk
+        schema_overrides: Column name -> dtype (see result_schema)
+        cursor_name: Name of the server-side cursor
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DECLARE {cursor_name} CURSOR FOR {query.strip().rstrip(';')}")
+        schema = None
+        while True:
+            cursor.execute(f"FETCH FORWARD {chunk_rows} FROM {cursor_name}")
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            if schema is None:
+                schema = result_schema(cursor.description, schema_overrides)
+            yield batch_frame(rows, schema)
+        cursor.execute(f"CLOSE {cursor_name}")
+        conn.commit()
+    except BaseException:
+        # Also on GeneratorExit: an abandoned cursor must not keep the transaction open
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
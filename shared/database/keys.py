@@ -0,0 +1,90 @@
+"""
+Key Tables
+
+SQL for queries restricted to a set of keys (orderids, tracking numbers)
+by joining a key table instead of filtering with IN (...) literals.
+
+A key query template refers to the key set as {keys}, used like a table
+with an alias:
+
+    SELECT s.orderid AS pcs_orderid, s.trackingnumber
+    FROM bi_stage_dev_dbo.pcsu_sentparcels s
+    JOIN {keys} k ON s.orderid = k.pcs_orderid
+
+pull_by_keys() and stream_by_keys() (shared.database) load the keys into a
+session temporary table (create_key_table) and run the query once. Where
+temporary tables cannot be created, the keys are inlined instead, chunk by
+chunk, as a derived table (inline_key_table) and the chunks are queried
+concurrently.
+"""
+
+import polars as pl
+
+from .literals import row_literals
+
+
+# Placeholder for the key table in a key query template
+KEYS_PLACEHOLDER = "{keys}"
+
+# Keys per inlined chunk when no temporary table can be used
+KEY_CHUNK_ROWS = 5000
+
+
+def _sql_type(series: pl.Series) -> str:
+    """Redshift column type holding a key column's values."""
+    dtype = series.dtype
+    if dtype.is_integer():
+        return "BIGINT"
+    if dtype.is_float():
+        return "DOUBLE PRECISION"
+    if dtype == pl.Boolean:
+        return "BOOLEAN"
+    if dtype == pl.Date:
+        return "DATE"
+    if isinstance(dtype, pl.Datetime):
+        return "TIMESTAMP"
+    if dtype == pl.Utf8:
+        # VARCHAR lengths are in bytes
+        longest = series.str.len_bytes().max() or 0
+        return f"VARCHAR({max(longest, 1)})"
+    raise ValueError(f"Unsupported key column type: {series.name} ({dtype})")
+
+
+def key_columns(keys: pl.DataFrame) -> dict[str, str]:
+    """Column name -> Redshift type for a key frame."""
+    if keys.width == 0:
+        raise ValueError("Key frame has no columns")
+    return {name: _sql_type(keys[name]) for name in keys.columns}
+
+
+def create_key_table(table: str, keys: pl.DataFrame) -> str:
+    """CREATE TEMP TABLE statement for a key frame (rows are loaded separately)."""
+    columns = ", ".join(f"{name} {sql_type}" for name, sql_type in key_columns(keys).items())
+    return f"CREATE TEMP TABLE {table} ({columns})"
+
+
+def inline_key_table(keys: pl.DataFrame) -> str:
+    """
+    Derived table holding a key frame's rows, for use in place of {keys}.
+
+    Example:
+        (SELECT pcs_orderid::BIGINT AS pcs_orderid
+         FROM (SELECT 1 UNION ALL SELECT 2) AS key_values (pcs_orderid))
+    """
+    types = key_columns(keys)
+    casts = ", ".join(f"{name}::{sql_type} AS {name}" for name, sql_type in types.items())
+
+    if keys.height == 0:
+        nulls = ", ".join(f"NULL::{sql_type} AS {name}" for name, sql_type in types.items())
+        return f"(SELECT {nulls} WHERE FALSE)"
+
+    # row_literals gives "(v1, v2)"; strip the parentheses for a SELECT list
+    rows = " UNION ALL ".join(f"SELECT {row[1:-1]}" for row in row_literals(keys))
+    return f"(SELECT {casts} FROM ({rows}) AS key_values ({', '.join(types)}))"
+
+
+def key_query(query_template: str, source: str) -> str:
+    """Substitute a key table name or derived table for {keys}."""
+    if KEYS_PLACEHOLDER not in query_template:
+        raise ValueError(f"Key query template must refer to the key set as {KEYS_PLACEHOLDER}")
+    return query_template.replace(KEYS_PLACEHOLDER, source)
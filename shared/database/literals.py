@@ -0,0 +1,97 @@
+"""
+SQL Literals
+
+Render DataFrame rows as SQL VALUES tuples for INSERT statements.
+
+row_literals() works column by column with Polars expressions instead of
+formatting every cell in Python, producing the same SQL as format_value()
+applied cell by cell:
+
+    NULL / NaN          -> NULL
+    strings             -> 'text' (quotes doubled)
+    booleans            -> TRUE / FALSE
+    dates / datetimes   -> '2025-03-01' / '2025-03-01 08:30:00[.ffffff]'
+    numbers             -> as text (floats as their shortest round-trip
+                           digits, possibly in a different exponent notation)
+
+Columns of other types (decimals, times, time zone aware timestamps, nested
+types) fall back to format_value().
+"""
+
+import pandas as pd
+import polars as pl
+
+
+def format_value(value) -> str:
+    """Format a value for SQL insertion."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return "NULL"
+    elif isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    elif isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    elif hasattr(value, 'isoformat'):  # date/datetime
+        return "'" + str(value) + "'"
+    else:
+        return str(value)
+
+
+def _quoted(expr: pl.Expr) -> pl.Expr:
+    """Wrap string values in single quotes."""
+    return pl.lit("'") + expr + pl.lit("'")
+
+
+def _column_literal(name: str, dtype: pl.DataType) -> pl.Expr | None:
+    """Expression rendering a column as SQL literals, or None if unsupported."""
+    col = pl.col(name)
+
+    if dtype == pl.Utf8:
+        literal = _quoted(col.str.replace_all("'", "''", literal=True))
+    elif dtype == pl.Boolean:
+        literal = pl.when(col).then(pl.lit("TRUE")).when(col.not_()).then(pl.lit("FALSE"))
+    elif dtype.is_integer():
+        literal = col.cast(pl.Utf8)
+    elif dtype.is_float():
+        # Float32 values are written as the float64 they become in Python
+        col = col.cast(pl.Float64)
+        literal = pl.when(col.is_nan()).then(None).otherwise(col.cast(pl.Utf8))
+    elif dtype == pl.Date:
+        literal = _quoted(col.dt.strftime("%Y-%m-%d"))
+    elif isinstance(dtype, pl.Datetime) and dtype.time_zone is None:
+        # str(datetime) only shows microseconds when there are any
+        micros = col.dt.microsecond()
+        literal = _quoted(
+            col.dt.strftime("%Y-%m-%d %H:%M:%S")
+            + pl.when(micros != 0)
+            .then(pl.lit(".") + micros.cast(pl.Utf8).str.zfill(6))
+            .otherwise(pl.lit(""))
+        )
+    elif dtype == pl.Null:
+        literal = pl.lit(None, dtype=pl.Utf8)
+    else:
+        return None
+
+    return literal.fill_null("NULL").alias(name)
+
+
+def row_literals(df: pl.DataFrame) -> list[str]:
+    """
+    Render each row as a "(v1, v2, ...)" VALUES tuple.
+
+    Args:
+        df: Rows to render
+
+    Returns:
+        One string per row, in row order
+    """
+    columns = []
+    for name, dtype in df.schema.items():
+        literal = _column_literal(name, dtype)
+        if literal is None:
+            literal = pl.Series(name, [format_value(v) for v in df[name].to_list()], dtype=pl.Utf8)
+        columns.append(literal)
+
+    rendered = df.select(columns)
+    return rendered.select(
+        (pl.lit("(") + pl.concat_str(rendered.columns, separator=", ") + pl.lit(")")).alias("row")
+    )["row"].to_list()
@@ -0,0 +1,241 @@
+"""
+Merge (Upsert)
+
+Refresh rows of a table from a frame in one transaction, touching only
+what changed (push_data(..., if_exists="merge", keys=[...])):
+
+1. The frame is loaded into a temporary staging table
+2. Staged and existing rows are compared per key:
+   - new:        no rows with the key in the table       -> inserted
+   - unchanged:  the same rows (on the compared columns)  -> left alone
+   - changed:    anything else                            -> rows replaced
+3. Changed keys are deleted from the table (DELETE USING), then the staged
+   rows for new and changed keys are inserted
+4. Optionally, table rows within a scope whose keys were not staged are
+   deleted (e.g. orders that dropped out of a refreshed date range), so a
+   scoped merge leaves the table as delete-then-insert would
+
+Everything runs in one transaction: a failure leaves the table as it was.
+Rows for one key are compared as multisets: the key is unchanged when every
+distinct row (on the compared columns) occurs as often among the staged rows
+as among the existing ones.
+"""
+
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class MergeCounts:
+    """Rows affected by a merge."""
+
+    inserted: int = 0   # Staged rows for keys not yet in the table
+    updated: int = 0    # Staged rows replacing different rows
+    unchanged: int = 0  # Staged rows identical to the table's
+    deleted: int = 0    # Table rows removed (replaced, or out of scope)
+
+    @property
+    def written(self) -> int:
+        """Rows inserted into the table."""
+        return self.inserted + self.updated
+
+    def __add__(self, other: "MergeCounts") -> "MergeCounts":
+        """Counts of two merges together (e.g. over streamed chunks)."""
+        return MergeCounts(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+            deleted=self.deleted + other.deleted,
+        )
+
+
+def _equal(left: str, right: str, column: str) -> str:
+    """Null-safe equality of a column between two aliases."""
+    return (
+        f"({left}.{column} = {right}.{column} "
+        f"OR ({left}.{column} IS NULL AND {right}.{column} IS NULL))"
+    )
+
+
+def _keys_equal(left: str, right: str, keys: list[str]) -> str:
+    """Equality of all key columns between two aliases."""
+    return " AND ".join(f"{left}.{k} = {right}.{k}" for k in keys)
+
+
+def merge_statements(
+    table_name: str,
+    staging: str,
+    key_table: str,
+    columns: list[str],
+    keys: list[str],
+    compare: list[str],
+    scope: Optional[str] = None,
+) -> dict[str, str]:
+    """
+    SQL for each merge step, by name (see merge_frame for the order).
+
+    Args:
+        table_name: Target table
+        staging: Temporary table holding the frame
+        key_table: Temporary table for per-key comparison results
+        columns: Frame columns, inserted by name
+        keys: Columns identifying a group of rows
+        compare: Columns compared to detect changes
+        scope: Condition on the target's columns; target rows matching it
+            whose keys were not staged are deleted
+    """
+    key_list = ", ".join(keys)
+    target = table_name.split(".")[-1]  # DELETE takes no alias; qualify by bare name
+    group_cols = keys + compare
+    same_group = " AND ".join(
+        [_keys_equal("s", "t", keys)] + [_equal("s", "t", c) for c in compare] + ["s.n = t.n"]
+    )
+    unchanged = "existing = staged AND matched = staged_groups AND matched = existing_groups"
+
+    def row_groups(source: str) -> str:
+        """Distinct (key, compared values) rows of a source, with their counts."""
+        columns = ", ".join(f"r.{c}" for c in group_cols)
+        return f"(SELECT {columns}, COUNT(*) AS n FROM {source} GROUP BY {columns})"
+
+    staged_groups = row_groups(f"{staging} r")
+    existing_groups = row_groups(
+        f"{table_name} r JOIN (SELECT DISTINCT {key_list} FROM {staging}) d ON {_keys_equal('d', 'r', keys)}"
+    )
+
+    def per_key(groups: str) -> str:
+        """Rows and distinct row groups per key."""
+        return f"(SELECT {key_list}, SUM(n) AS n, COUNT(*) AS g FROM {groups} rg GROUP BY {key_list})"
+
+    statements = {
+        "create_staging": f"CREATE TEMP TABLE {staging} (LIKE {table_name})",
+        "compare": f"""
+            CREATE TEMP TABLE {key_table} AS
+            SELECT {", ".join(f"s.{k}" for k in keys)},
+                   s.n AS staged,
+                   s.g AS staged_groups,
+                   COALESCE(t.n, 0) AS existing,
+                   COALESCE(t.g, 0) AS existing_groups,
+                   COALESCE(m.g, 0) AS matched
+            FROM {per_key(staged_groups)} s
+            LEFT JOIN {per_key(existing_groups)} t ON {_keys_equal("s", "t", keys)}
+            LEFT JOIN (
+                SELECT {", ".join(f"s.{k}" for k in keys)}, COUNT(*) AS g
+                FROM {staged_groups} s
+                JOIN {existing_groups} t ON {same_group}
+                GROUP BY {", ".join(f"s.{k}" for k in keys)}
+            ) m ON {_keys_equal("s", "m", keys)}
+        """,
+        "counts": f"""
+            SELECT
+                COALESCE(SUM(CASE WHEN existing = 0 THEN staged ELSE 0 END), 0) AS inserted,
+                COALESCE(SUM(CASE WHEN existing > 0 AND NOT ({unchanged}) THEN staged ELSE 0 END), 0) AS updated,
+                COALESCE(SUM(CASE WHEN existing > 0 AND {unchanged} THEN staged ELSE 0 END), 0) AS unchanged,
+                COALESCE(SUM(CASE WHEN existing > 0 AND NOT ({unchanged}) THEN existing ELSE 0 END), 0) AS replaced
+            FROM {key_table}
+        """,
+        "drop_unchanged": f"DELETE FROM {key_table} WHERE {unchanged}",
+        "delete_changed": f"DELETE FROM {table_name} USING {key_table} k WHERE {_keys_equal(target, 'k', keys)}",
+        "insert": f"""
+            INSERT INTO {table_name} ({", ".join(columns)})
+            SELECT {", ".join(f"s.{c}" for c in columns)}
+            FROM {staging} s
+            JOIN {key_table} k ON {_keys_equal("s", "k", keys)}
+        """,
+        "drop_key_table": f"DROP TABLE {key_table}",
+        "drop_staging": f"DROP TABLE {staging}",
+    }
+
+    if scope:
+        statements.update(out_of_scope_statements(table_name, staging, keys, scope))
+
+    return statements
+
+
+def out_of_scope_statements(
+    table_name: str,
+    key_table: str,
+    keys: list[str],
+    scope: str,
+) -> dict[str, str]:
+    """
+    SQL counting and deleting rows within a scope whose keys are not in a table.
+
+    Args:
+        table_name: Target table
+        key_table: Table holding the keys to keep (e.g. the staging table)
+        keys: Key columns, named alike in both tables
+        scope: Condition on the target's columns
+    """
+    target = table_name.split(".")[-1]  # DELETE takes no alias; qualify by bare name
+    out_of_scope = f"""
+        FROM {table_name}
+        WHERE ({scope})
+          AND NOT EXISTS (
+              SELECT 1 FROM {key_table} s WHERE {_keys_equal("s", target, keys)}
+          )
+    """
+    return {
+        "count_out_of_scope": f"SELECT COUNT(*) {out_of_scope}",
+        "delete_out_of_scope": f"DELETE {out_of_scope}",
+    }
+
+
+def merge_frame(
+    conn,
+    columns: list[str],
+    table_name: str,
+    keys: list[str],
+    compare: list[str],
+    load: Callable[[object, str], None],
+    scope: Optional[str] = None,
+) -> MergeCounts:
+    """
+    Merge staged rows into a table in one transaction, committed on success.
+
+    Args:
+        conn: Open DB-API connection (rolled back by the caller on failure)
+        columns: Frame columns
+        table_name: Full table name (e.g., "schema.table_name")
+        keys: Columns identifying a group of rows
+        compare: Columns compared to detect changes
+        load: load(conn, staging_table) fills the staging table, without committing
+        scope: Condition on the target's columns; rows matching it whose keys
+            were not staged are deleted
+
+    Returns:
+        MergeCounts
+    """
+    suffix = uuid.uuid4().hex[:12]
+    staging, key_table = f"merge_staging_{suffix}", f"merge_keys_{suffix}"
+    sql = merge_statements(table_name, staging, key_table, columns, keys, compare, scope)
+
+    cursor = conn.cursor()
+    cursor.execute(sql["create_staging"])
+    load(conn, staging)
+
+    cursor.execute(sql["compare"])
+    cursor.execute(sql["counts"])
+    inserted, updated, unchanged, replaced = (int(v) for v in cursor.fetchone())
+
+    out_of_scope = 0
+    if scope:
+        cursor.execute(sql["count_out_of_scope"])
+        out_of_scope = int(cursor.fetchone()[0])
+        cursor.execute(sql["delete_out_of_scope"])
+
+    cursor.execute(sql["drop_unchanged"])
+    cursor.execute(sql["delete_changed"])
+    cursor.execute(sql["insert"])
+    cursor.execute(sql["drop_key_table"])
+    cursor.execute(sql["drop_staging"])
+
+    conn.commit()
+    cursor.close()
+
+    return MergeCounts(
+        inserted=inserted,
+        updated=updated,
+        unchanged=unchanged,
+        deleted=replaced + out_of_scope,
+    )
@@ -0,0 +1,70 @@
+"""
+Range Partitions
+
+Split a date-filtered query into contiguous date ranges that can run
+concurrently, each on its own pooled connection (see pull_many and
+stream_many in shared.database):
+
+    filters = date_range_filters("po.createddate", "2025-01-01", "2025-12-31", 12)
+    queries = [template.format(start_date_filter=s, end_date_filter=e) for s, e in filters]
+
+The ranges never overlap and together select exactly the rows of the
+unpartitioned filter (column >= start_date and column <= end_date), so the
+partition results concatenated in order hold the same rows as one query.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+
+
+def date_range_filters(
+    column: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    partitions: int = 1,
+    today: Optional[date] = None,
+) -> list[tuple[str, str]]:
+    """
+    Build (start_filter, end_filter) clause pairs, one per partition.
+
+    The range is cut at whole days into at most `partitions` spans of
+    near-equal length (never more than one per day). The first partition
+    keeps the original start filter and the last the original end filter;
+    inner boundaries are half-open (>= boundary on one side, < boundary on
+    the other). An open-ended range (no end_date) is split up to today and
+    its last partition stays open.
+
+    Args:
+        column: Column to filter (e.g., "po.createddate")
+        start_date: Start date (YYYY-MM-DD), or None for no lower bound
+        end_date: End date (YYYY-MM-DD), or None for no upper bound
+        partitions: Maximum number of partitions
+        today: Upper bound used when end_date is None (default: date.today())
+
+    Returns:
+        list of ("and column >= '...'", "and column < '...'") pairs, with ""
+        for a missing bound. A single pair if the range cannot be split
+        (no start_date, fewer than two days, or partitions <= 1).
+    """
+    start_filter = f"and {column} >= '{start_date}'" if start_date else ""
+    end_filter = f"and {column} <= '{end_date}'" if end_date else ""
+
+    if partitions <= 1 or not start_date:
+        return [(start_filter, end_filter)]
+
+    start = date.fromisoformat(start_date)
+    stop = date.fromisoformat(end_date) if end_date else (today or date.today())
+    days = (stop - start).days
+    partitions = min(partitions, days)
+
+    if partitions <= 1:
+        return [(start_filter, end_filter)]
+
+    boundaries = [
+        (start + timedelta(days=days * i // partitions)).isoformat()
+        for i in range(1, partitions)
+    ]
+
+    starts = [start_filter] + [f"and {column} >= '{b}'" for b in boundaries]
+    ends = [f"and {column} < '{b}'" for b in boundaries] + [end_filter]
+    return list(zip(starts, ends))
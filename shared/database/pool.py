@@ -0,0 +1,186 @@
+"""
+Connection Pool
+
+A small thread-safe pool of database connections, so independent queries
+can run concurrently and a failed query never leaves a shared connection
+on an aborted transaction.
+
+    pool = ConnectionPool(connect, size=4)
+    with pool.connection() as conn:
+        ...
+
+- Checkout hands out an idle connection, opens a new one while fewer than
+  size exist, or waits until one is returned.
+- Connections idle for longer than check_after seconds are health-checked
+  (SELECT 1) on checkout; a dead one is closed and replaced.
+- Release always rolls back, ending whatever transaction the borrower left
+  open (committed work is unaffected). A connection that cannot roll back
+  is closed instead of being returned.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+# Default number of connections
+DEFAULT_POOL_SIZE = 4
+
+# Idle seconds after which a connection is health-checked on checkout
+HEALTH_CHECK_AFTER_SECONDS = 60.0
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections created by connect()."""
+
+    def __init__(
+        self,
+        connect: Callable,
+        size: int = DEFAULT_POOL_SIZE,
+        check_after: float = HEALTH_CHECK_AFTER_SECONDS,
+    ):
+        """
+        Args:
+            connect: Opens a new connection
+            size: Maximum number of open connections
+            check_after: Idle seconds after which a connection is health-checked
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+
+        self._connect = connect
+        self.size = size
+        self.check_after = check_after
+        self._idle: list[tuple[object, float]] = []  # (connection, returned at)
+        self._open = 0
+        self._closed = False
+        self._available = threading.Condition()
+
+    # -------------------------------------------------------------------------
+    # Checkout / return
+    # -------------------------------------------------------------------------
+
+    def acquire(self, timeout: float | None = None):
+        """
+        Check out a healthy connection.
+
+        Args:
+            timeout: Seconds to wait for a free connection (None = forever)
+
+        Raises:
+            RuntimeError: If the pool is closed or no connection frees up in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._available:
+                conn, idle_since = self._checkout(deadline)
+
+            if conn is None:
+                # A slot was reserved: open the connection outside the lock
+                try:
+                    return self._connect()
+                except BaseException:
+                    self._forget()
+                    raise
+
+            if time.monotonic() - idle_since < self.check_after or self._healthy(conn):
+                return conn
+
+            self._discard(conn)
+
+    def release(self, conn) -> None:
+        """Return a connection, rolling back any open transaction."""
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        with self._available:
+            if self._closed:
+                self._open -= 1
+                _close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._available.notify()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Iterator:
+        """Check out a connection for the duration of a with block."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close idle connections; connections in use are closed when returned."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._available.notify_all()
+
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+    @property
+    def in_use(self) -> int:
+        """Number of connections currently checked out."""
+        with self._available:
+            return self._open - len(self._idle)
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _checkout(self, deadline: float | None) -> tuple[object | None, float]:
+        """Pop an idle connection or reserve a slot for a new one (lock held)."""
+        while True:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            if self._open < self.size:
+                self._open += 1
+                return None, 0.0
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise RuntimeError(
+                    f"Timed out waiting for a database connection (pool size {self.size})"
+                )
+            self._available.wait(remaining)
+
+    def _healthy(self, conn) -> bool:
+        """Run a trivial query; False if the connection is unusable."""
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn) -> None:
+        """Close a broken connection and free its slot."""
+        _close_quietly(conn)
+        self._forget()
+
+    def _forget(self) -> None:
+        """Free one slot."""
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+
+def _close_quietly(conn) -> None:
+    """Close a connection, ignoring errors from an already-dead one."""
+    try:
+        conn.close()
+    except Exception:
+        pass
@@ -0,0 +1,203 @@
+"""
+Streaming Sinks
+
+Consume an iterator of result chunks (e.g. stream_data() chunks passed
+through a calculator) without ever holding the whole result:
+
+    chunks = (rate(chunk) for chunk in stream_data(query))
+    totals = push_chunks(chunks, "schema.table", sum_columns=["cost_total"])
+
+Each sink returns StreamTotals - row count, chunk count and running sums of
+the requested columns - so callers can still print a summary at the end.
+
+push_chunks can also merge (upsert) the chunks by keys instead of
+appending them, so a refresh never leaves the table half-loaded: each
+chunk is merged on its own, and rows within the scope that no chunk held
+are deleted once the last chunk is in. Appends can be made resumable
+with a run id: progress is checkpointed after each chunk (see
+shared.database.checkpoint), and a rerun merges its chunks instead of
+appending them, since any of them may already be in the table.
+"""
+
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Literal, Optional
+
+import polars as pl
+
+from . import MergeCounts, delete_out_of_scope, push_data
+from .checkpoint import UploadCheckpoint, check_key_types
+
+
+@dataclass
+class StreamTotals:
+    """Running totals over the chunks a sink has consumed."""
+
+    rows: int = 0
+    chunks: int = 0
+    sums: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+    merged: Optional[MergeCounts] = None  # Rows affected, when merging
+
+    @classmethod
+    def over(cls, columns: Iterable[str]) -> "StreamTotals":
+        """Empty totals summing the given columns."""
+        columns = list(columns)
+        return cls(sums={c: 0.0 for c in columns}, counts={c: 0 for c in columns})
+
+    def add(self, chunk: pl.DataFrame) -> None:
+        """Count a chunk and add its column sums."""
+        self.rows += chunk.height
+        self.chunks += 1
+        for column in self.sums:
+            self.sums[column] += chunk[column].sum() or 0.0
+            self.counts[column] += chunk[column].count()
+
+    def mean(self, column: str) -> float | None:
+        """Mean of a summed column over its non-null values, as Series.mean()."""
+        return self.sums[column] / self.counts[column] if self.counts[column] else None
+
+
+def write_parquet_chunks(
+    chunks: Iterable[pl.DataFrame],
+    path: str | Path,
+    sum_columns: Iterable[str] = (),
+) -> StreamTotals:
+    """
+    Write chunks to one parquet file, holding only one chunk at a time.
+
+    Chunks are spilled to part files in a temporary directory and merged
+    into path with a streaming sink, so the output is a single file in
+    chunk order. Nothing is written if there are no non-empty chunks.
+
+    Args:
+        chunks: Frames with identical schemas
+        path: Output parquet file
+        sum_columns: Columns to total (see StreamTotals)
+
+    Returns:
+        StreamTotals over the written rows
+    """
+    totals = StreamTotals.over(sum_columns)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        parts = []
+        for chunk in chunks:
+            if chunk.height == 0:
+                continue
+            part = Path(tmp) / f"part-{len(parts):05d}.parquet"
+            chunk.write_parquet(part)
+            parts.append(part)
+            totals.add(chunk)
+
+        if parts:
+            pl.scan_parquet(parts).sink_parquet(path)
+
+    return totals
+
+
+def push_chunks(
+    chunks: Iterable[pl.DataFrame],
+    table_name: str,
+    batch_size: int = 5000,
+    sum_columns: Iterable[str] = (),
+    dry_run: bool = False,
+    if_exists: Literal["append", "merge"] = "append",
+    keys: Optional[list[str]] = None,
+    ignore_columns: Optional[list[str]] = None,
+    scope: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> StreamTotals:
+    """
+    Upload chunks to a Redshift table as they arrive.
+
+    Each chunk is one push_data() call (committed on its own), so a failure
+    part-way leaves the earlier chunks in the table.
+
+    When merging, each chunk is merged by keys instead of appended (see
+    shared.database.merge); a key's rows must all be in one chunk. With a
+    scope as well, rows matching it whose keys were in no chunk are deleted
+    once every chunk is merged, so until then the table holds each key's
+    old or new rows, never neither.
+
+    With a run_id, the number of chunks and rows committed and the last
+    key are checkpointed after each chunk. A rerun with the same run_id
+    merges every chunk by keys rather than appending it - the chunks may
+    not arrive in the same order, so none can be skipped - and the
+    checkpoint is removed once the last chunk is in.
+
+    Args:
+        chunks: Frames with the table's columns
+        table_name: Full table name (e.g., "schema.table_name")
+        batch_size: Rows per INSERT batch within a chunk
+        sum_columns: Columns to total (see StreamTotals)
+        dry_run: If True, consume and total the chunks without uploading
+        if_exists: "append" to insert the chunks, "merge" to upsert them by keys
+        keys: Columns identifying rows - the rows to refresh when merging,
+            the checkpointed position for resumable uploads
+        ignore_columns: Merge only - columns not compared (e.g. dw_timestamp)
+        scope: Merge only - SQL condition on the table's columns; rows
+            matching it whose keys were in no chunk are deleted at the end
+        run_id: Append resumably under this id (needs keys, if_exists="append")
+
+    Returns:
+        StreamTotals over the uploaded (or would-be uploaded) rows, with
+        merged counts when merging or resuming
+    """
+    if if_exists not in ("append", "merge"):
+        raise ValueError(f"if_exists must be 'append' or 'merge', got '{if_exists}'")
+    if scope and if_exists != "merge":
+        raise ValueError("A scope only applies when merging")
+    if run_id is not None and if_exists != "append":
+        raise ValueError(f"Resumable uploads (run_id) only append, got if_exists='{if_exists}'")
+    if (if_exists == "merge" or run_id is not None) and not keys:
+        raise ValueError(f"Merging or resuming needs keys, got {keys}")
+
+    totals = StreamTotals.over(sum_columns)
+    checkpoint = UploadCheckpoint(table_name, run_id) if run_id is not None and not dry_run else None
+    state = checkpoint.load() if checkpoint is not None else None
+    if state is not None:
+        if state["keys"] != keys:
+            raise ValueError(f"Checkpoint for run {run_id!r} was keyed by {state['keys']}, not {keys}")
+        print(
+            f"  Resuming run {run_id!r} ({state['rows']:,} rows in {state['batch']:,} chunks committed): "
+            f"merging chunks instead of appending"
+        )
+
+    merging = not dry_run and (if_exists == "merge" or state is not None)
+    if merging:
+        totals.merged = MergeCounts()
+    seen = []
+
+    for chunk in chunks:
+        if chunk.height == 0:
+            continue
+        progress = ""
+        if merging:
+            counts = push_data(
+                chunk, table_name, if_exists="merge", batch_size=batch_size, verbose=False,
+                keys=keys, ignore_columns=ignore_columns,
+            )
+            totals.merged += counts
+            if scope:
+                seen.append(chunk.select(keys).unique())
+            progress = f", {counts.written:,} written"
+        elif not dry_run:
+            if checkpoint is not None:
+                check_key_types(chunk, keys)
+            push_data(chunk, table_name, batch_size=batch_size, verbose=False)
+        totals.add(chunk)
+        if checkpoint is not None:
+            checkpoint.save(totals.chunks, totals.rows, keys, list(chunk.select(keys).row(-1)))
+        print(f"  Chunk {totals.chunks}: {chunk.height:,} rows ({totals.rows:,} total){progress}")
+
+    if merging and scope:
+        deleted = delete_out_of_scope(table_name, pl.concat(seen) if seen else pl.DataFrame(), scope)
+        totals.merged += MergeCounts(deleted=deleted)
+        print(f"  Deleted {deleted:,} rows in scope that no chunk held")
+
+    if checkpoint is not None:
+        checkpoint.clear()
+
+    return totals
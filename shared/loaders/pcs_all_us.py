@@ -0,0 +1,154 @@
+"""
+Load All US Shipments from PCS
+
+Pulls US shipment data from all production sites for US domestic carriers
+(FedEx, OnTrac, USPS, DHL eCommerce). Used for carrier cost optimization
+analysis - calculating what shipments would cost with each carrier
+regardless of which carrier was actually used.
+
+Every carrier's data.loaders.pcs_all_us re-exports these loaders.
+"""
+
+import polars as pl
+from pathlib import Path
+from typing import Iterator, Optional
+
+import shared
+from shared.database import FETCH_BATCH_ROWS, date_range_filters, pull_many, stream_many
+
+
+SQL_FILE = Path(shared.__file__).parent / "sql" / "pcs_shipments_country.sql"
+
+# Defaults for all-US analysis
+DEFAULT_COUNTRY = "United States of America"
+DEFAULT_PRODUCTION_SITES = None  # All sites - costs calculated using CMH zones
+DEFAULT_START_DATE = "2025-01-01"
+
+# Carrier filter: only US domestic carriers we have calculators for
+DEFAULT_CARRIER_FILTER = "and (ps.extkey like '%FX%' or ps.extkey = 'ONTRAC' or ps.extkey = 'USPS' or ps.extkey = 'DHL ECOMMERCE AMERICA')"
+
+
+def load_pcs_shipments_all_us(
+    start_date: str = DEFAULT_START_DATE,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+    country: str = DEFAULT_COUNTRY,
+    production_sites: Optional[list[str]] = None,
+    partitions: int = 1,
+    parallelism: Optional[int] = None,
+) -> pl.DataFrame:
+    """
+    Load ALL US shipment data from PCS database.
+
+    Loads shipments from all production sites for US domestic carriers
+    (FedEx, OnTrac, USPS, DHL eCommerce). Used for carrier cost optimization
+    analysis - calculating what shipments would cost with different carriers.
+
+    Args:
+        start_date: Start date (YYYY-MM-DD), defaults to 2025-01-01
+        end_date: End date (YYYY-MM-DD), optional
+        limit: Max rows to return, optional (for testing)
+        country: Country name filter, defaults to 'United States of America'
+        production_sites: List of production sites, defaults to None (all sites)
+        partitions: Split the createddate range into this many queries, run
+            concurrently on separate connections (ignored with limit)
+        parallelism: Partition queries in flight at once (default: the pool size)
+
+    Returns:
+        DataFrame with shipment data ready for supplement_shipments()
+    """
+    queries = _build_queries(start_date, end_date, limit, country, production_sites, partitions)
+
+    return pl.concat(pull_many(queries, max_workers=parallelism), how="vertical_relaxed")
+
+
+def stream_pcs_shipments_all_us(
+    start_date: str = DEFAULT_START_DATE,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+    country: str = DEFAULT_COUNTRY,
+    production_sites: Optional[list[str]] = None,
+    chunk_rows: int = FETCH_BATCH_ROWS,
+    partitions: int = 1,
+    parallelism: Optional[int] = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Stream ALL US shipment data from PCS in chunks.
+
+    Same query and columns as load_pcs_shipments_all_us(), yielded
+    chunk_rows at a time (see shared.database.stream_many), so a long date
+    range can be rated and written without loading it whole. Partitions
+    are streamed concurrently and yielded in date order.
+
+    Args:
+        start_date: Start date (YYYY-MM-DD), defaults to 2025-01-01
+        end_date: End date (YYYY-MM-DD), optional
+        limit: Max rows to return, optional (for testing)
+        country: Country name filter, defaults to 'United States of America'
+        production_sites: List of production sites, defaults to None (all sites)
+        chunk_rows: Rows per chunk
+        partitions: Split the createddate range into this many queries, run
+            concurrently on separate connections (ignored with limit)
+        parallelism: Partition queries in flight at once (default: the pool size)
+
+    Yields:
+        DataFrame chunks of shipment data
+    """
+    queries = _build_queries(start_date, end_date, limit, country, production_sites, partitions)
+
+    yield from stream_many(queries, chunk_rows=chunk_rows, max_workers=parallelism)
+
+
+def _build_queries(
+    start_date: Optional[str],
+    end_date: Optional[str],
+    limit: Optional[int],
+    country: str,
+    production_sites: Optional[list[str]],
+    partitions: int,
+) -> list[str]:
+    """Build one all-US shipments query per createddate partition."""
+    # A limit applies per query, so a limited load is never split
+    date_filters = date_range_filters(
+        "po.createddate", start_date, end_date, 1 if limit else partitions
+    )
+
+    return [
+        _build_query(start_filter, end_filter, limit, country, production_sites)
+        for start_filter, end_filter in date_filters
+    ]
+
+
+def _build_query(
+    start_date_filter: str,
+    end_date_filter: str,
+    limit: Optional[int],
+    country: str,
+    production_sites: Optional[list[str]],
+) -> str:
+    """Build the all-US shipments query from the shared SQL template."""
+    # Carrier filter: only US domestic carriers we have calculators for
+    carrier_filter = DEFAULT_CARRIER_FILTER
+
+    # Country filter
+    country_filter = ""
+    if country:
+        country_filter = f"and pc.\"name\" = '{country}'"
+
+    production_sites_filter = ""
+    if production_sites:
+        sites_list = ", ".join(f"'{site}'" for site in production_sites)
+        production_sites_filter = f'and pp."name" in ({sites_list})'
+
+    limit_clause = ""
+    if limit:
+        limit_clause = f"limit {limit}"
+
+    return SQL_FILE.read_text().format(
+        carrier_filter=carrier_filter,
+        production_sites_filter=production_sites_filter,
+        country_filter=country_filter,
+        start_date_filter=start_date_filter,
+        end_date_filter=end_date_filter,
+        limit_clause=limit_clause,
+    )
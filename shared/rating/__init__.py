@@ -0,0 +1,32 @@
+"""
+Shared Rating Utilities
+
+Vectorized building blocks used by every carrier calculator.
+"""
+
+from .frames import Frame, same_kind, column_names, require_not_null, scan_shipments, iter_chunks
+from .intervals import bracket_index, lookup_brackets
+from .dimensions import DIMENSION_COLUMNS, dimension_exprs, add_dimensions
+from .dedup import DedupStats, canonical_zip, date_bucket, rate_unique
+from .services import rate_services, cheapest_service, selected_columns
+
+__all__ = [
+    "Frame",
+    "same_kind",
+    "column_names",
+    "require_not_null",
+    "scan_shipments",
+    "iter_chunks",
+    "bracket_index",
+    "lookup_brackets",
+    "DIMENSION_COLUMNS",
+    "dimension_exprs",
+    "add_dimensions",
+    "DedupStats",
+    "canonical_zip",
+    "date_bucket",
+    "rate_unique",
+    "rate_services",
+    "cheapest_service",
+    "selected_columns",
+]
@@ -0,0 +1,138 @@
+"""
+Deduplicated Rating
+
+Many shipments share every input that determines their cost: same package
+dimensions and weight, same destination, same origin, and a ship date in
+the same surcharge period. Rating each of them individually repeats the
+whole pipeline for identical inputs.
+
+rate_unique() instead:
+    1. canonicalizes the cost-determining inputs into a rating key
+    2. rates one representative shipment per unique key
+    3. joins the results back to every shipment by key
+
+RATING KEY
+----------
+Each calculator declares its key as expressions over the input columns,
+e.g. dimensions as-is and ZIP codes normalized to the digits its zone
+lookup uses (canonical_zip). The ship date enters the key only through
+date_bucket(): a bitmask of the seasonal windows the calculator checks
+(demand periods, peak seasons). Dates with equal masks get identical costs,
+so a year of ship dates collapses into a handful of buckets.
+
+Results are identical to rating every shipment: the representative of a key
+differs from the other shipments only in inputs the calculator does not
+read, or reads only through the key.
+"""
+
+from typing import Callable, NamedTuple
+
+import polars as pl
+
+from .frames import Frame, column_names
+
+
+BUCKET_COLUMN = "_date_bucket"
+KEY_PREFIX = "_key_"
+
+
+class DedupStats(NamedTuple):
+    """Shipment and unique rating key counts of one deduplicated run."""
+    rows: int
+    unique_keys: int
+
+    @property
+    def ratio(self) -> float:
+        """Shipments per unique key (how many times less rating work)."""
+        return self.rows / self.unique_keys if self.unique_keys else 1.0
+
+    def __str__(self) -> str:
+        return f"{self.rows:,} shipments -> {self.unique_keys:,} unique keys ({self.ratio:.1f}x)"
+
+
+def canonical_zip(digits: int, column: str = "shipping_zip_code") -> pl.Expr:
+    """ZIP code normalized the way zone lookups read it (first digits, zero-padded)."""
+    return (
+        pl.col(column)
+        .cast(pl.Utf8)
+        .str.slice(0, digits)
+        .str.zfill(digits)
+        .alias(column)
+    )
+
+
+def date_bucket(flags: list[pl.Expr]) -> pl.Expr:
+    """
+    Bitmask of seasonal window flags (bit i set = date inside window i).
+
+    Null dates give a null bucket. With no flags every date is bucket 0.
+    """
+    bucket = pl.lit(0, dtype=pl.Int64)
+    for i, flag in enumerate(flags):
+        # Plain addition (not sum_horizontal) so a null flag nulls the bucket
+        bucket = bucket + flag.cast(pl.Int64) * (1 << i)
+    return bucket.alias(BUCKET_COLUMN)
+
+
+def rate_unique(
+    df: Frame,
+    rate: Callable[[pl.DataFrame], pl.DataFrame],
+    key: list[pl.Expr],
+    date_flags: list[pl.Expr],
+    date_column: str = "ship_date",
+) -> tuple[Frame, DedupStats]:
+    """
+    Rate each unique key once and broadcast the results to all shipments.
+
+    Args:
+        df: Shipments (a LazyFrame is collected first)
+        rate: Calculator applied to the unique keys, e.g. calculate_costs
+        key: Canonicalized cost-determining inputs, each aliased to the
+            input column it replaces
+        date_flags: Seasonal window flags the calculator checks (see date_bucket)
+        date_column: Ship date column, used for the representative's date
+
+    Returns:
+        (df with the calculator's output columns, DedupStats). Same rows,
+        row order and column order as rating df directly.
+    """
+    is_lazy = isinstance(df, pl.LazyFrame)
+    if is_lazy:
+        df = df.collect()
+
+    names = [expr.meta.output_name() for expr in key]
+    key_cols = [KEY_PREFIX + name for name in names] + [BUCKET_COLUMN]
+    has_date = date_column in column_names(df)
+
+    keyed = df.with_columns(
+        [expr.alias(KEY_PREFIX + name) for expr, name in zip(key, names)]
+        + [date_bucket(date_flags).alias(BUCKET_COLUMN)]
+    )
+
+    # One representative per key, carrying the canonical inputs under their
+    # original names (and its own ship date, which lies in the key's bucket)
+    uniques = (
+        keyed
+        .select(key_cols + ([date_column] if has_date else []))
+        .unique(subset=key_cols, keep="first", maintain_order=True)
+        .with_columns([pl.col(KEY_PREFIX + name).alias(name) for name in names])
+    )
+
+    rated = rate(uniques)
+    outputs = [c for c in rated.columns if c not in uniques.columns]
+
+    result = (
+        keyed
+        .drop([c for c in outputs if c in df.columns])
+        .join(
+            rated.select(key_cols + outputs),
+            on=key_cols,
+            how="left",
+            nulls_equal=True,
+            maintain_order="left",
+        )
+        .drop(key_cols)
+    )
+
+    stats = DedupStats(rows=df.height, unique_keys=uniques.height)
+    return (result.lazy() if is_lazy else result), stats
@@ -0,0 +1,79 @@
+"""
+Package Dimensions
+
+The dimensional columns every carrier calculator reads, computed from
+length_in, width_in and height_in:
+
+    cubic_in            - L x W x H, rounded to a whole number
+    longest_side_in     - rounded to 1 decimal
+    second_longest_in   - rounded to 1 decimal
+    shortest_side_in    - rounded to 1 decimal
+    length_plus_girth   - longest + 2 x (other two), rounded to 1 decimal
+
+Dimensions are rounded to avoid floating point precision issues when
+comparing against surcharge thresholds (762mm converts to 30.0000001980",
+which would otherwise trigger a >30" threshold).
+
+The sides are ordered with min/max only: the second longest of three is
+max(min(a, b), min(max(a, b), c)), which is exact, where a per-row list
+sort is slow and sum - max - min can round differently.
+
+add_dimensions() skips columns that are already present, so a multi-carrier
+run can add them once up front and every calculator reuses them.
+"""
+
+import polars as pl
+
+from .frames import Frame, column_names
+
+
+DIMENSION_COLUMNS = [
+    "cubic_in",
+    "longest_side_in",
+    "second_longest_in",
+    "shortest_side_in",
+    "length_plus_girth",
+]
+
+
+def dimension_exprs(
+    length: str = "length_in",
+    width: str = "width_in",
+    height: str = "height_in",
+) -> dict[str, pl.Expr]:
+    """Expression for each of DIMENSION_COLUMNS."""
+    a, b, c = pl.col(length), pl.col(width), pl.col(height)
+    longest = pl.max_horizontal(a, b, c)
+    middle = pl.max_horizontal(pl.min_horizontal(a, b), pl.min_horizontal(pl.max_horizontal(a, b), c))
+
+    # With missing sides: the largest known side if one is missing (as a
+    # nulls-first descending sort gives), null if two or more are
+    n_missing = pl.sum_horizontal(a.is_null(), b.is_null(), c.is_null())
+    second = pl.when(n_missing == 0).then(middle).when(n_missing == 1).then(longest)
+
+    return {
+        "cubic_in": (a * b * c).round(0),
+        "longest_side_in": longest.round(1),
+        "second_longest_in": second.round(1),
+        "shortest_side_in": pl.min_horizontal(a, b, c).round(1),
+        "length_plus_girth": (longest + 2 * (a + b + c - longest)).round(1),
+    }
+
+
+def add_dimensions(df: Frame, columns: list[str] | None = None) -> Frame:
+    """
+    Add dimensional columns that are not already present.
+
+    Args:
+        df: Shipments with length_in, width_in, height_in
+        columns: Subset of DIMENSION_COLUMNS to add (default: all)
+
+    Returns:
+        df with the missing columns appended (in the order given)
+    """
+    exprs = dimension_exprs()
+    existing = column_names(df)
+    missing = [c for c in (columns or DIMENSION_COLUMNS) if c not in existing]
+    if not missing:
+        return df
+    return df.with_columns([exprs[c].alias(c) for c in missing])
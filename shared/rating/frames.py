@@ -0,0 +1,98 @@
+"""
+Frame Helpers
+
+Calculators accept either a pl.DataFrame (evaluated step by step) or a
+pl.LazyFrame (built into one query plan and evaluated on collect). These
+helpers let the same pipeline code serve both.
+"""
+
+from typing import Iterator, TypeAlias
+
+import polars as pl
+
+
+Frame: TypeAlias = pl.DataFrame | pl.LazyFrame
+
+
+def same_kind(other: pl.DataFrame, df: Frame) -> Frame:
+    """Return other as a LazyFrame if df is lazy, so the two can be joined."""
+    if isinstance(df, pl.LazyFrame) and isinstance(other, pl.DataFrame):
+        return other.lazy()
+    return other
+
+
+def column_names(df: Frame) -> list[str]:
+    """Column names of a DataFrame or LazyFrame (without collecting)."""
+    return df.collect_schema().names()
+
+
+def require_not_null(df: Frame, column: str, message: str) -> Frame:
+    """
+    Raise ValueError if column contains nulls.
+
+    DataFrames are checked immediately. For LazyFrames the check is part of
+    the plan and raises when the frame is collected (counts are then per
+    batch if the streaming engine is used).
+
+    Args:
+        df: Frame to check
+        column: Column that must be fully populated
+        message: Error message; "{missing_count}" is replaced by the null count
+
+    Returns:
+        df, unchanged
+    """
+    def check(series: pl.Series) -> pl.Series:
+        missing_count = series.null_count()
+        if missing_count > 0:
+            raise ValueError(message.format(missing_count=missing_count))
+        return series
+
+    if isinstance(df, pl.LazyFrame):
+        dtype = df.collect_schema()[column]
+        return df.with_columns(
+            pl.col(column).map_batches(check, return_dtype=dtype, is_elementwise=True)
+        )
+
+    check(df[column])
+    return df
+
+
+def scan_shipments(
+    path: str,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    date_column: str = "pcs_created",
+) -> pl.LazyFrame:
+    """
+    Lazily scan a shipment parquet export, limited to a date range.
+
+    The date filter is part of the scan, so only matching row groups (and
+    only the columns a downstream plan uses) are read from disk.
+
+    Args:
+        path: Parquet file (or glob) of PCS shipments
+        start_date: Inclusive start date (YYYY-MM-DD), optional
+        end_date: Inclusive end date (YYYY-MM-DD), optional
+        date_column: Timestamp column to filter on
+
+    Returns:
+        LazyFrame of shipments in the date range
+    """
+    lf = pl.scan_parquet(path)
+    ship_day = pl.col(date_column).cast(pl.Date)
+    if start_date:
+        lf = lf.filter(ship_day >= pl.lit(start_date).str.to_date("%Y-%m-%d"))
+    if end_date:
+        lf = lf.filter(ship_day <= pl.lit(end_date).str.to_date("%Y-%m-%d"))
+    return lf
+
+
+def iter_chunks(lf: pl.LazyFrame, chunk_rows: int) -> Iterator[pl.DataFrame]:
+    """
+    Evaluate a LazyFrame with the streaming engine, chunk_rows rows at a time.
+
+    Chunks come in row order; only the chunk being consumed (plus the
+    engine's buffers) is held in memory.
+    """
+    yield from lf.collect_batches(chunk_size=chunk_rows, engine="streaming")
@@ -0,0 +1,130 @@
+"""
+Interval Lookup
+
+Bracket lookups for rate tables keyed by (zone, weight bracket), where each
+bracket covers weight_lbs_lower < weight <= weight_lbs_upper.
+
+Joining every shipment to every bracket of its zone and then filtering
+materializes rows x brackets (150-660 bracket rows per table) before the
+filter throws nearly all of it away. Instead, brackets are sorted by
+(key, upper bound) once, and each shipment's bracket is found by binary
+search over the upper bounds of its key group - memory and time stay linear
+in the number of shipments, and row order is never disturbed.
+
+The search runs batch-wise inside the query, so it works on DataFrames and
+LazyFrames (including the streaming engine) alike.
+
+Brackets within a key group must not overlap (gaps are fine: values falling
+into a gap get no match).
+"""
+
+import numpy as np
+import polars as pl
+
+from .frames import Frame
+
+
+def bracket_index(
+    brackets: pl.DataFrame,
+    on: tuple[str, str],
+    value: str,
+    lower: str = "weight_lbs_lower",
+    upper: str = "weight_lbs_upper",
+) -> tuple[pl.Expr, pl.DataFrame]:
+    """
+    Expression giving each row's position in the sorted bracket table.
+
+    Args:
+        brackets: Bracket table with key, lower and upper columns
+        on: (row key column, brackets key column), e.g. ("shipping_zone", "zone")
+        value: Row column located in (lower, upper], e.g. "billable_weight_lbs"
+        lower: Exclusive lower bound column in brackets
+        upper: Inclusive upper bound column in brackets
+
+    Returns:
+        (index expression, brackets sorted to match the index). The index is
+        null where no bracket matches.
+    """
+    left_key, right_key = on
+    brackets = brackets.sort([right_key, upper])
+
+    # Contiguous [start, end) slice of the sorted brackets for each key
+    groups = (
+        brackets
+        .with_row_index("_pos")
+        .group_by(right_key, maintain_order=True)
+        .agg(pl.col("_pos").first().alias("_start"), pl.col("_pos").last().alias("_end"))
+        .filter(pl.col(right_key).is_not_null())
+    )
+    group_keys = groups[right_key].to_list()
+    starts = groups["_start"].to_numpy()
+    ends = groups["_end"].to_numpy() + 1
+    uppers = brackets[upper].cast(pl.Float64).to_numpy()
+    lowers = brackets[lower].cast(pl.Float64).to_numpy()
+
+    def search(rows: pl.Series) -> pl.Series:
+        group_idx = (
+            rows.struct.field(left_key)
+            .replace_strict(
+                group_keys, list(range(len(group_keys))),
+                default=None, return_dtype=pl.Int64,
+            )
+            .fill_null(-1)
+            .to_numpy()
+        )
+        values = rows.struct.field(value).cast(pl.Float64).fill_null(np.nan).to_numpy()
+
+        # First bracket whose upper bound >= value, then check the lower bound
+        match = np.full(len(rows), -1, dtype=np.int64)
+        for g, (start, end) in enumerate(zip(starts, ends)):
+            sel = np.flatnonzero(group_idx == g)
+            if sel.size == 0:
+                continue
+            pos = start + np.searchsorted(uppers[start:end], values[sel], side="left")
+            in_range = pos < end
+            sel, pos = sel[in_range], pos[in_range]
+            above_lower = lowers[pos] < values[sel]
+            match[sel[above_lower]] = pos[above_lower]
+
+        return pl.Series(match).replace(-1, None)
+
+    index = pl.struct(left_key, value).map_batches(
+        search, return_dtype=pl.Int64, is_elementwise=True
+    )
+    return index, brackets
+
+
+def lookup_brackets(
+    df: Frame,
+    brackets: pl.DataFrame,
+    on: tuple[str, str],
+    value: str,
+    columns: dict[str, str],
+    lower: str = "weight_lbs_lower",
+    upper: str = "weight_lbs_upper",
+) -> Frame:
+    """
+    Append columns from the bracket matching each row's key and value.
+
+    Args:
+        df: Rows to look up (e.g. shipments), DataFrame or LazyFrame
+        brackets: Bracket table with key, lower, upper and value columns
+        on: (df key column, brackets key column), e.g. ("shipping_zone", "zone")
+        value: df column located in (lower, upper], e.g. "billable_weight_lbs"
+        columns: Bracket columns to append, mapped to their output names
+        lower: Exclusive lower bound column in brackets
+        upper: Inclusive upper bound column in brackets
+
+    Returns:
+        df with the requested columns appended, in the same row order.
+        Rows with no matching bracket (unknown key, null value, value outside
+        every bracket) get nulls.
+    """
+    index, brackets = bracket_index(brackets, on, value, lower, upper)
+
+    df = df.with_columns(index.alias("_bracket_idx"))
+    df = df.with_columns([
+        pl.lit(brackets[column]).gather(pl.col("_bracket_idx")).alias(alias)
+        for column, alias in columns.items()
+    ])
+    return df.drop("_bracket_idx")
@@ -0,0 +1,104 @@
+"""
+Multi-Service Rating
+
+Some carriers offer more than one service for the same shipment (FedEx Home
+Delivery and SmartPost, P2P US2 PFA and PFS) and the question asked of the
+calculator is what each service would cost and which one is cheaper.
+
+Rating the shipments once per service repeats every stage that does not
+depend on the service: dimensions, zone lookups, seasonal flags. Instead
+rate_services() takes a frame with the shared stages already applied and
+branches only for the service-dependent ones:
+
+    shared = supplement(df)                     # once
+    result = shared + service_1(shared) + ...   # one branch per service
+
+Each branch names its own output columns (e.g. hd_*, sp_*). For a lazy
+input all branches read the same shared plan, which Polars evaluates once.
+
+cheapest_service() and selected_columns() then turn the per-service totals
+into a per-shipment selection.
+"""
+
+from typing import Callable
+
+import polars as pl
+
+from .frames import Frame, column_names
+
+
+def rate_services(df: Frame, services: list[Callable[[Frame], Frame]]) -> Frame:
+    """
+    Rate df under each service and append every service's new columns.
+
+    Args:
+        df: Shipments with the service-independent stages applied
+        services: One function per service, each called with df. Columns a
+            service returns that already exist in df are ignored; the new
+            ones must be named uniquely across services.
+
+    Returns:
+        df with the new columns of each service appended, in service order
+    """
+    existing = column_names(df)
+    seen = set(existing)
+    branches = []
+
+    for service in services:
+        out = service(df)
+        new = [c for c in column_names(out) if c not in existing]
+        overlap = seen.intersection(new)
+        if overlap:
+            raise ValueError(f"Services produce overlapping columns: {sorted(overlap)}")
+        seen.update(new)
+        branches.append(out.select(new))
+
+    # Every branch has df's rows in df's order
+    return pl.concat([df, *branches], how="horizontal")
+
+
+def cheapest_service(totals: dict[str, pl.Expr]) -> pl.Expr:
+    """
+    Name of the cheapest service per shipment.
+
+    The first service is the default. A later service is selected only if
+    its total is strictly lower than the best so far, so a null total (not
+    eligible, no rate) never wins over the default.
+
+    Args:
+        totals: Service name -> its cost_total expression, default first
+    """
+    (name, best), *others = totals.items()
+    selected = pl.lit(name)
+    for name, total in others:
+        cheaper = total < best
+        selected = pl.when(cheaper).then(pl.lit(name)).otherwise(selected)
+        best = pl.when(cheaper).then(total).otherwise(best)
+    return selected
+
+
+def selected_columns(
+    selection: str,
+    prefixes: dict[str, str],
+    columns: list[str],
+) -> list[pl.Expr]:
+    """
+    Unprefixed columns taken from the selected service's prefixed columns.
+
+    Args:
+        selection: Column holding the selected service name
+        prefixes: Service name -> its column prefix (e.g. {"FXSP": "sp"})
+        columns: Unprefixed column names to emit
+    """
+    (_, default), *others = prefixes.items()
+    exprs = []
+    for column in columns:
+        expr = pl.col(f"{default}_{column}")
+        for name, prefix in others:
+            expr = (
+                pl.when(pl.col(selection) == name)
+                .then(pl.col(f"{prefix}_{column}"))
+                .otherwise(expr)
+            )
+        exprs.append(expr.alias(column))
+    return exprs
@@ -0,0 +1,27 @@
+"""
+Shared Reference Data
+
+Caching, bundling and lookup utilities for carrier reference data.
+"""
+
+from .cache import (
+    ReferenceCache,
+    REFERENCE_CACHE,
+    read_reference_csv,
+    cache_stats,
+    clear_reference_cache,
+)
+from .bundle import ReferenceBundle
+from .zip_index import ZipIndex, zip_slot, cached_zip_index
+
+__all__ = [
+    "ReferenceCache",
+    "REFERENCE_CACHE",
+    "read_reference_csv",
+    "cache_stats",
+    "clear_reference_cache",
+    "ReferenceBundle",
+    "ZipIndex",
+    "zip_slot",
+    "cached_zip_index",
+]
@@ -0,0 +1,241 @@
+"""
+Reference Data Bundle
+
+Precompiled, memory-mapped copy of a carrier's reference data.
+
+Every cold start otherwise re-parses the reference CSVs and re-applies the
+same normalization (unpivoting rate tables, zfilling ZIPs, typing zones,
+computing state-mode fallbacks). A bundle does that work once, at build time,
+and stores the results as uncompressed Arrow IPC files that are
+memory-mapped on load.
+
+LAYOUT
+------
+    <carrier>/data/reference/bundle/
+        manifest.json   - calculator version, checksum, source file hashes
+        <table>.arrow   - one Arrow IPC file per registered table
+
+VALIDATION
+----------
+The manifest records the carrier's calculator VERSION and a SHA-256 hash of
+every source CSV the tables were built from. The bundle is used only if the
+version matches version.py and every source still hashes the same. Sources
+are compared by (mtime_ns, size) first; content is only re-hashed when those
+differ (e.g. after a fresh checkout).
+
+If the bundle is missing or stale, loaders fall back to building the table
+from the CSVs (through the reference cache), so results are identical either
+way - the bundle only makes cold starts faster. Validation runs once per
+process, on first use.
+
+BUILDING
+--------
+    python -m shared.scripts.build_reference_bundles
+    python -m shared.scripts.build_reference_bundles --carrier fedex
+"""
+
+import hashlib
+import json
+import shutil
+import threading
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+from .cache import _content_hash, _stat_fingerprint
+
+
+BUNDLE_DIRNAME = "bundle"
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+
+# =============================================================================
+# BUNDLE
+# =============================================================================
+
+class ReferenceBundle:
+    """
+    Registry of a carrier's reference tables, backed by a prebuilt bundle.
+
+    Each carrier's data module creates one bundle and registers a builder per
+    table. Builders are zero-argument functions returning the normalized
+    DataFrame from the CSVs; they are used both to build the bundle and as the
+    fallback when no valid bundle exists.
+
+    Usage:
+        BUNDLE = ReferenceBundle(REFERENCE_DIR, VERSION)
+        BUNDLE.register("zones", _build_zones, sources=["zones.csv"])
+
+        def load_zones() -> pl.DataFrame:
+            return BUNDLE.load("zones")
+    """
+
+    def __init__(self, reference_dir: Path, version: str):
+        self.reference_dir = Path(reference_dir)
+        self.version = version
+        self.path = self.reference_dir / BUNDLE_DIRNAME
+        self._builders: dict[str, Callable[[], pl.DataFrame]] = {}
+        self._sources: dict[str, list[str]] = {}
+        self._tables: dict[str, pl.DataFrame] = {}
+        self._valid: bool | None = None
+        self._lock = threading.RLock()
+
+    def register(
+        self,
+        name: str,
+        builder: Callable[[], pl.DataFrame],
+        sources: list[str],
+    ) -> None:
+        """
+        Register a table.
+
+        Args:
+            name: Table name (also the .arrow file name in the bundle)
+            builder: Zero-argument callable building the table from the CSVs
+            sources: CSV paths the table depends on, relative to reference_dir
+        """
+        self._builders[name] = builder
+        self._sources[name] = list(sources)
+
+    def load(self, name: str) -> pl.DataFrame:
+        """Return a table from the bundle, or build it if the bundle is unusable."""
+        with self._lock:
+            if name in self._tables:
+                return self._tables[name]
+
+            if self.is_valid():
+                # Uncompressed IPC files are memory-mapped by default; the
+                # memory_map keyword is gone in newer polars releases
+                df = pl.read_ipc(self.path / f"{name}.arrow")
+                self._tables[name] = df
+                return df
+
+        # Fallback builders go through the reference cache, so they are
+        # cheap after the first call and still notice CSV edits.
+        return self._builders[name]()
+
+    def is_valid(self) -> bool:
+        """Check (once per process) whether the bundle on disk is current."""
+        with self._lock:
+            if self._valid is None:
+                self._valid = self._check_manifest()
+            return self._valid
+
+    def build(self) -> dict:
+        """
+        Build every registered table from the CSVs and write the bundle.
+
+        The bundle is written to a temporary directory and swapped in, so a
+        failed build never leaves a half-written bundle behind.
+
+        Returns:
+            The written manifest
+        """
+        with self._lock:
+            tmp_path = self.path.with_name(BUNDLE_DIRNAME + ".tmp")
+            if tmp_path.exists():
+                shutil.rmtree(tmp_path)
+            tmp_path.mkdir(parents=True)
+
+            tables = {}
+            for name, builder in self._builders.items():
+                df = builder()
+                df.write_ipc(tmp_path / f"{name}.arrow", compression="uncompressed")
+                tables[name] = {"rows": df.height, "columns": df.columns}
+
+            sources = {}
+            for rel in sorted({s for srcs in self._sources.values() for s in srcs}):
+                path = self.reference_dir / rel
+                mtime_ns, size = _stat_fingerprint(path)
+                sources[rel] = {
+                    "sha256": _content_hash(path),
+                    "mtime_ns": mtime_ns,
+                    "size": size,
+                }
+
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "version": self.version,
+                "checksum": _bundle_checksum(self.version, sources),
+                "built_at": datetime.now().isoformat(timespec="seconds"),
+                "sources": sources,
+                "tables": tables,
+            }
+            with open(tmp_path / MANIFEST_NAME, "w") as f:
+                json.dump(manifest, f, indent=2)
+
+            # Release memory maps before replacing the files they point at
+            self._tables.clear()
+            if self.path.exists():
+                shutil.rmtree(self.path)
+            tmp_path.rename(self.path)
+            self._valid = None
+
+            return manifest
+
+    def _check_manifest(self) -> bool:
+        """Compare the manifest against version.py and the source CSVs."""
+        manifest_path = self.path / MANIFEST_NAME
+        if not manifest_path.exists():
+            return False
+
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return self._stale("unreadable manifest")
+
+        if manifest.get("format_version") != FORMAT_VERSION:
+            return self._stale("bundle format changed")
+        if manifest.get("version") != self.version:
+            return self._stale(
+                f"built for calculator {manifest.get('version')}, current is {self.version}"
+            )
+
+        sources = manifest.get("sources", {})
+        if manifest.get("checksum") != _bundle_checksum(manifest["version"], sources):
+            return self._stale("checksum mismatch")
+
+        missing_tables = set(self._builders) - set(manifest.get("tables", {}))
+        if missing_tables:
+            return self._stale(f"missing tables: {sorted(missing_tables)}")
+
+        required = {s for srcs in self._sources.values() for s in srcs}
+        if required - set(sources):
+            return self._stale("source list changed")
+
+        for rel in required:
+            path = self.reference_dir / rel
+            if not path.exists():
+                return self._stale(f"{rel} no longer exists")
+            recorded = sources[rel]
+            if list(_stat_fingerprint(path)) == [recorded["mtime_ns"], recorded["size"]]:
+                continue
+            if _content_hash(path) != recorded["sha256"]:
+                return self._stale(f"{rel} changed since bundle was built")
+
+        return True
+
+    def _stale(self, reason: str) -> bool:
+        warnings.warn(
+            f"Ignoring stale reference bundle at {self.path} ({reason}). "
+            f"Rebuild with: python -m shared.scripts.build_reference_bundles",
+            stacklevel=4,
+        )
+        return False
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _bundle_checksum(version: str, sources: dict) -> str:
+    """Checksum tying the bundle to a calculator version and source contents."""
+    digest = hashlib.sha256(version.encode())
+    for rel in sorted(sources):
+        digest.update(f"\n{rel}:{sources[rel]['sha256']}".encode())
+    return digest.hexdigest()
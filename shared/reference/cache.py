@@ -0,0 +1,197 @@
+"""
+Reference Data Cache
+
+Process-wide cache for parsed carrier reference data (zones, DAS, rate tables).
+
+Every carrier's data/reference loaders go through read_reference_csv(), which
+parses the CSV once, applies the loader's normalization (unpivot, zfill, cast)
+and keeps the resulting frame in memory for the rest of the process.
+
+INVALIDATION
+------------
+Each entry stores a fingerprint of its source file:
+    1. (mtime_ns, size) - checked on every access (one stat() call)
+    2. SHA-256 of file contents - checked only when (1) changes
+
+If the stat fingerprint changes but the content hash is identical (e.g. the
+file was touched or re-checked-out), the cached frame is kept. If the content
+changed, the entry is reloaded.
+
+Cached frames are shared between callers. Polars operations return new frames,
+so this is safe as long as callers don't use in-place methods on them.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+import polars as pl
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _stat_fingerprint(path: Path) -> tuple[int, int]:
+    """Cheap fingerprint: (mtime in ns, size in bytes)."""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _content_hash(path: Path) -> str:
+    """SHA-256 of file contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _kwargs_key(kwargs: dict) -> str:
+    """Stable identifier for read_csv keyword arguments."""
+    return repr(sorted((k, repr(v)) for k, v in kwargs.items()))
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class _Entry:
+    """A cached value with the fingerprint of the file it was built from."""
+
+    __slots__ = ("value", "stat", "content_hash")
+
+    def __init__(self, value: Any, stat: tuple[int, int], content_hash: str):
+        self.value = value
+        self.stat = stat
+        self.content_hash = content_hash
+
+
+class ReferenceCache:
+    """
+    In-memory cache of parsed reference files, keyed by path and loader.
+
+    Counters:
+        hits          - served from memory
+        misses        - file parsed (first load or content changed)
+        invalidations - entry dropped because the file content changed
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple, _Entry] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, path: Path, loader: Callable[[], Any], key: tuple = ()) -> Any:
+        """
+        Return the cached value for path, calling loader() on a miss.
+
+        Args:
+            path: Source file the value is built from
+            loader: Zero-argument callable that parses the file
+            key: Extra key parts distinguishing loaders of the same file
+
+        Returns:
+            The (possibly cached) loader result
+        """
+        path = Path(path).resolve()
+        cache_key = (str(path),) + tuple(key)
+
+        with self._lock:
+            stat = _stat_fingerprint(path)
+            entry = self._entries.get(cache_key)
+
+            if entry is not None:
+                if entry.stat == stat:
+                    self.hits += 1
+                    return entry.value
+
+                # File metadata changed - only reload if content changed
+                content_hash = _content_hash(path)
+                if content_hash == entry.content_hash:
+                    entry.stat = stat
+                    self.hits += 1
+                    return entry.value
+
+                del self._entries[cache_key]
+                self.invalidations += 1
+
+            self.misses += 1
+            content_hash = _content_hash(path)
+            value = loader()
+            self._entries[cache_key] = _Entry(value, stat, content_hash)
+            return value
+
+    def read_csv(
+        self,
+        path: Path,
+        transform: Callable[[pl.DataFrame], pl.DataFrame] | None = None,
+        **read_kwargs,
+    ) -> pl.DataFrame:
+        """
+        Read a CSV through the cache, applying an optional normalization.
+
+        Args:
+            path: CSV file to read
+            transform: Function applied to the parsed frame before caching
+            **read_kwargs: Passed through to pl.read_csv
+
+        Returns:
+            Parsed (and transformed) DataFrame
+        """
+        def loader() -> pl.DataFrame:
+            df = pl.read_csv(path, **read_kwargs)
+            return transform(df) if transform is not None else df
+
+        # The function itself, not its name: lambdas and closures defined in the
+        # same scope share a qualname. Holding it in the key keeps it alive, so
+        # its identity cannot be reused by another function.
+        key = ("csv", transform, _kwargs_key(read_kwargs))
+        return self.get(path, loader, key=key)
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and the number of cached entries."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Drop all cached entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+
+# =============================================================================
+# PROCESS-WIDE INSTANCE
+# =============================================================================
+
+REFERENCE_CACHE = ReferenceCache()
+
+
+def read_reference_csv(
+    path: Path,
+    transform: Callable[[pl.DataFrame], pl.DataFrame] | None = None,
+    **read_kwargs,
+) -> pl.DataFrame:
+    """Read a reference CSV through the process-wide cache."""
+    return REFERENCE_CACHE.read_csv(path, transform=transform, **read_kwargs)
+
+
+def cache_stats() -> dict[str, int]:
+    """Hit/miss counters of the process-wide reference cache."""
+    return REFERENCE_CACHE.stats()
+
+
+def clear_reference_cache() -> None:
+    """Clear the process-wide reference cache."""
+    REFERENCE_CACHE.clear()
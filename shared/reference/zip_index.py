@@ -0,0 +1,190 @@
+"""
+ZIP Index
+
+Direct-indexed ZIP -> zone (or DAS tier) lookup.
+
+Every carrier maps a destination ZIP (or its 3-digit prefix) to zones with
+the same fallback chain:
+
+    1. Exact ZIP match in the zones table
+    2. Fallback by state (mode zone per state), or the overall mode zone
+    3. A default zone
+
+A ZipIndex holds each value column of the zones table as a dense array with
+one slot per possible ZIP (100,000 for 5-digit ZIPs, 1,000 for 3-digit
+prefixes), null where the table has no entry. The fallbacks are resolved at
+build time into a state -> value mapping and a single default. A lookup is
+then one integer gather per column: no joins against the zones frame, and
+the shipment's ZIP is normalized only once (to its slot number).
+
+USAGE
+-----
+    index = ZipIndex.from_table(zones, "zip_code", ["phx_zone", "cmh_zone"])
+
+    df = df.with_columns(index.slot())
+    df = df.with_columns(index.lookup("phx_zone").alias("shipping_zone"))
+    df = df.drop(index.slot_column)
+"""
+
+import threading
+from typing import Any, Callable
+
+import polars as pl
+
+
+SLOT_COLUMN = "_zip_slot"
+
+
+def zip_slot(digits: int = 5, column: str = "shipping_zip_code") -> pl.Expr:
+    """
+    Slot number of a ZIP: its first `digits` digits (zero-padded) as an integer.
+
+    Matches exactly the ZIPs that the string normalization
+    cast(Utf8).str.slice(0, digits).str.zfill(digits) maps to a table key.
+    Null for null or non-numeric ZIPs.
+    """
+    normalized = pl.col(column).cast(pl.Utf8).str.slice(0, digits).str.zfill(digits)
+    return (
+        pl.when(normalized.str.contains(f"^[0-9]{{{digits}}}$"))
+        .then(normalized.str.to_integer(strict=False))
+    )
+
+
+class ZipIndex:
+    """
+    Dense ZIP -> value arrays with precomputed state and default fallbacks.
+
+    Attributes:
+        digits          - ZIP digits indexed (5 = full ZIP, 3 = prefix)
+        arrays          - value column -> Series of 10**digits slots
+        state_values    - value column -> {state: value} fallback
+        defaults        - value column -> value used when all else is null
+    """
+
+    def __init__(
+        self,
+        digits: int,
+        arrays: dict[str, pl.Series],
+        state_values: dict[str, dict[str, Any]] | None = None,
+        defaults: dict[str, Any] | None = None,
+    ):
+        self.digits = digits
+        self.arrays = arrays
+        self.state_values = state_values or {}
+        self.defaults = defaults or {}
+        self.slot_column = f"{SLOT_COLUMN}_{digits}"
+
+    @classmethod
+    def from_table(
+        cls,
+        table: pl.DataFrame,
+        zip_column: str,
+        columns: list[str],
+        digits: int = 5,
+        states: pl.DataFrame | None = None,
+        state_column: str | None = None,
+        state_columns: dict[str, str] | None = None,
+        defaults: dict[str, Any] | None = None,
+    ) -> "ZipIndex":
+        """
+        Build an index from a zones table.
+
+        Args:
+            table: Zones table with one row per ZIP (or prefix)
+            zip_column: Key column holding the zero-padded ZIP strings
+            columns: Value columns to index
+            digits: Length of the keys in zip_column
+            states: Optional state fallback table
+            state_column: Key column of states (state name)
+            state_columns: Value column -> its fallback column in states
+            defaults: Value column -> final default (None = no default)
+
+        Returns:
+            ZipIndex over the given columns
+        """
+        slots = _key_slots(table[zip_column], digits)
+        size = 10 ** digits
+
+        arrays = {}
+        for column in columns:
+            array = pl.repeat(None, size, dtype=table[column].dtype, eager=True).alias(column)
+            arrays[column] = array.scatter(slots, table[column])
+
+        state_values = {}
+        if states is not None:
+            states = states.filter(pl.col(state_column).is_not_null())
+            for column, state_value_column in (state_columns or {}).items():
+                state_values[column] = dict(zip(
+                    states[state_column].to_list(), states[state_value_column].to_list()
+                ))
+
+        defaults = {k: v for k, v in (defaults or {}).items() if v is not None}
+        return cls(digits, arrays, state_values, defaults)
+
+    def slot(self, column: str = "shipping_zip_code") -> pl.Expr:
+        """Expression adding the slot column that lookup() reads."""
+        return zip_slot(self.digits, column).alias(self.slot_column)
+
+    def get(self, column: str) -> pl.Expr:
+        """Value for the exact ZIP only (null when the table has no entry)."""
+        return pl.lit(self.arrays[column]).gather(pl.col(self.slot_column))
+
+    def lookup(self, column: str, state: str = "shipping_region") -> pl.Expr:
+        """
+        Value with fallbacks: exact ZIP, then state fallback, then default.
+
+        Args:
+            column: Indexed value column
+            state: Shipment column holding the state name
+        """
+        parts = [self.get(column)]
+        if column in self.state_values:
+            mapping = self.state_values[column]
+            parts.append(
+                pl.col(state).replace_strict(
+                    list(mapping), list(mapping.values()),
+                    default=None, return_dtype=self.arrays[column].dtype,
+                )
+            )
+        if column in self.defaults:
+            parts.append(pl.lit(self.defaults[column]))
+        return pl.coalesce(parts) if len(parts) > 1 else parts[0]
+
+
+def _key_slots(keys: pl.Series, digits: int) -> pl.Series:
+    """Slot numbers of a zones table's ZIP keys (unique, zero-padded digits)."""
+    keys = keys.cast(pl.Utf8)
+    if not keys.str.contains(f"^[0-9]{{{digits}}}$").fill_null(False).all():
+        raise ValueError(f"ZIP index keys must be {digits}-digit strings")
+    if keys.n_unique() != len(keys):
+        raise ValueError("ZIP index keys must be unique")
+    return keys.str.to_integer()
+
+
+# =============================================================================
+# PROCESS-WIDE CACHE
+# =============================================================================
+
+_INDEXES: dict[str, tuple[tuple[pl.DataFrame, ...], ZipIndex]] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def cached_zip_index(
+    name: str,
+    tables: tuple[pl.DataFrame, ...],
+    build: Callable[..., ZipIndex],
+) -> ZipIndex:
+    """
+    Return build(*tables), rebuilt only when one of the tables is reloaded.
+
+    Args:
+        name: Cache key (e.g. "fedex.zones")
+        tables: Source tables, compared by identity
+        build: Builder called with the tables
+    """
+    with _INDEXES_LOCK:
+        entry = _INDEXES.get(name)
+        if entry is None or any(a is not b for a, b in zip(entry[0], tables)):
+            entry = (tables, build(*tables))
+            _INDEXES[name] = entry
+        return entry[1]
@@ -0,0 +1 @@
+"""Shared scripts that operate across carriers."""
@@ -0,0 +1,52 @@
+"""
+Build Reference Bundles
+=======================
+
+Compiles each carrier's reference CSVs into a memory-mappable Arrow bundle
+(see shared/reference/bundle.py). Re-run after editing any reference CSV or
+bumping a carrier's version.py - until then the calculators ignore the stale
+bundle and fall back to parsing the CSVs.
+
+Usage:
+    python -m shared.scripts.build_reference_bundles
+    python -m shared.scripts.build_reference_bundles --carrier fedex --carrier usps
+"""
+
+import argparse
+import importlib
+
+
+# Carrier data packages that define a reference BUNDLE
+CARRIERS = ["fedex", "ontrac", "usps", "maersk_us", "p2p_us", "p2p_us2"]
+
+
+def build_bundle(carrier: str) -> dict:
+    """Build the reference bundle for one carrier and return its manifest."""
+    data = importlib.import_module(f"carriers.{carrier}.data")
+    return data.BUNDLE.build()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build memory-mapped reference data bundles for carrier calculators",
+    )
+    parser.add_argument(
+        "--carrier",
+        action="append",
+        choices=CARRIERS,
+        help="Carrier to build (repeatable, default: all)"
+    )
+    args = parser.parse_args()
+
+    for carrier in args.carrier or CARRIERS:
+        manifest = build_bundle(carrier)
+        rows = sum(t["rows"] for t in manifest["tables"].values())
+        print(
+            f"{carrier:<10} version {manifest['version']:<14} "
+            f"{len(manifest['tables'])} tables, {rows:,} rows  "
+            f"checksum {manifest['checksum'][:12]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 -- Get tracking numbers for given orderids
--- Parameter: {pcs_orderids} - comma-separated list of orderids
+-- Parameter: {keys} - key table with a pcs_orderid column (see shared.database.pull_by_keys)
 
 SELECT
-    orderid as pcs_orderid,
-    trackingnumber
-FROM bi_stage_dev_dbo.pcsu_sentparcels
-WHERE orderid IN ({pcs_orderids})
-  AND trackingnumber IS NOT NULL
+    s.orderid as pcs_orderid,
+    s.trackingnumber
+FROM bi_stage_dev_dbo.pcsu_sentparcels s
+JOIN {keys} k ON s.orderid = k.pcs_orderid
+WHERE s.trackingnumber IS NOT NULL
@@ -7,6 +7,10 @@
 --   {start_date_filter} - Start date filter clause
 --   {end_date_filter} - End date filter clause
 --   {limit_clause} - Optional limit clause
+--
+-- The date filters also restrict the tracking number window to orders in the
+-- date range (windows are per order, so results are unchanged), so a query
+-- over one date partition only scans that partition's parcels.
 
 with trackingnumbers as (
     select
@@ -15,6 +19,13 @@ with trackingnumbers as (
         count(*) over (partition by orderid) as trackingnumber_count,
         row_number() over (partition by orderid order by id desc) as row_nr
     from bi_stage_dev_dbo.pcsu_sentparcels
+    where orderid in (
+        select po.id
+        from bi_stage_dev_dbo.pcsu_orders po
+        where 1=1
+          {start_date_filter}
+          {end_date_filter}
+    )
 )
 
 select
@@ -1,12 +1,18 @@
 """
 Shared Surcharges
 
-Base class and utilities for carrier surcharges.
+Base class, utilities and expression compiler for carrier surcharges.
 """
 
-from .base import Surcharge, in_period
+from .base import Surcharge, in_period, period_flags
+from .compiler import apply_surcharges, compile_surcharges, flag_column, cost_column
 
 __all__ = [
     "Surcharge",
     "in_period",
+    "period_flags",
+    "apply_surcharges",
+    "compile_surcharges",
+    "flag_column",
+    "cost_column",
 ]
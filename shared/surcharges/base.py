@@ -82,6 +82,8 @@ class Surcharge(ABC):
             depends_on      - Name of surcharge this depends on (e.g., "AHS")
             period_start    - (month, day) tuple for seasonal start
             period_end      - (month, day) tuple for seasonal end
+            billing_lag_days - Days between ship date and billing date used
+                               when checking the period
 
         SIDE EFFECTS
             min_billable_weight - Minimum billable weight when triggered
@@ -112,6 +114,7 @@ class Surcharge(ABC):
     depends_on: str | None = None
     period_start: tuple[int, int] | None = None
     period_end: tuple[int, int] | None = None
+    billing_lag_days: int = 0
 
     # -------------------------------------------------------------------------
     # SIDE EFFECTS
@@ -143,3 +146,29 @@ class Surcharge(ABC):
         Override for deterministic surcharges with specific conditions.
         """
         return pl.lit(True)
+
+    @classmethod
+    def periods(cls) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Seasonal (start, end) windows read by conditions() or cost().
+
+        Default is the demand period, if any. Override when cost() checks
+        further windows (e.g. a higher-priced phase within the period).
+        """
+        if cls.period_start is None:
+            return []
+        return [(cls.period_start, cls.period_end)]
+
+
+def period_flags(surcharges: list[type[Surcharge]]) -> list[pl.Expr]:
+    """
+    One in_period() expression per seasonal window of the given surcharges.
+
+    Two ship dates with equal flags get identical surcharges, so the flags
+    form the ship-date bucket for deduplicated rating.
+    """
+    return [
+        in_period(start, end, billing_lag_days=s.billing_lag_days)
+        for s in surcharges
+        for start, end in s.periods()
+    ]
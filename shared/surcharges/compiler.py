@@ -0,0 +1,137 @@
+"""
+Surcharge Compiler
+
+Turns a processing phase (a carrier's BASE or DEPENDENT list) into two
+batches of Polars expressions:
+
+    1. flags - one surcharge_<name> expression per surcharge
+    2. costs - one cost_<name> expression per surcharge, reading the flags
+
+Each batch is applied with a single with_columns, so Polars evaluates every
+surcharge of the phase in parallel in one pass instead of two sequential
+materializations per surcharge.
+
+EXCLUSIVITY
+-----------
+Surcharges sharing an exclusivity_group compete - only the highest priority
+(lowest number) match wins. This is resolved inside the flag expressions:
+
+    flag_k = conditions_k & ~(flag_1 | ... | flag_{k-1})
+
+with earlier flags inlined as expressions, which is exactly what applying
+the group one surcharge at a time computes (including null propagation).
+
+Surcharges within a phase must not reference each other's flags - that is
+what the BASE / DEPENDENT split is for.
+"""
+
+import polars as pl
+
+from .base import Surcharge
+
+
+def flag_column(surcharge: type[Surcharge]) -> str:
+    """Name of the boolean flag column for a surcharge."""
+    return f"surcharge_{surcharge.name.lower()}"
+
+
+def cost_column(surcharge: type[Surcharge]) -> str:
+    """Name of the cost column for a surcharge."""
+    return f"cost_{surcharge.name.lower()}"
+
+
+def _ordered(surcharges: list[type[Surcharge]]) -> list[type[Surcharge]]:
+    """
+    Processing order: standalone surcharges in list order, then each
+    exclusivity group (in order of first appearance) sorted by priority.
+    """
+    standalone = [s for s in surcharges if s.exclusivity_group is None]
+    groups = list(dict.fromkeys(
+        s.exclusivity_group for s in surcharges if s.exclusivity_group is not None
+    ))
+    ordered = list(standalone)
+    for group in groups:
+        ordered += sorted(
+            [s for s in surcharges if s.exclusivity_group == group],
+            key=lambda s: s.priority,
+        )
+    return ordered
+
+
+def compile_surcharges(
+    surcharges: list[type[Surcharge]],
+) -> tuple[list[pl.Expr], list[pl.Expr]]:
+    """
+    Compile a phase of surcharges into flag and cost expression batches.
+
+    Args:
+        surcharges: Surcharge classes of one phase (e.g. BASE)
+
+    Returns:
+        (flag_exprs, cost_exprs), both in processing order. cost_exprs read
+        the flag columns, so the flag batch must be applied first.
+    """
+    flag_exprs = []
+    cost_exprs = []
+    exclusion_masks: dict[str, pl.Expr] = {}
+
+    for surcharge in _ordered(surcharges):
+        flag_col = flag_column(surcharge)
+        group = surcharge.exclusivity_group
+
+        if group is None:
+            applies = surcharge.conditions()
+        else:
+            # Applies only if: conditions met AND no higher priority already matched
+            mask = exclusion_masks.get(group, pl.lit(False))
+            applies = surcharge.conditions() & ~mask
+            exclusion_masks[group] = mask | applies
+
+        # cost() may return float or pl.Expr (for conditional costs)
+        cost_value = surcharge.cost()
+        cost_expr = cost_value if isinstance(cost_value, pl.Expr) else pl.lit(cost_value)
+
+        flag_exprs.append(applies.alias(flag_col))
+        cost_exprs.append(
+            pl.when(pl.col(flag_col))
+            .then(cost_expr)
+            .otherwise(pl.lit(0.0))
+            .alias(cost_column(surcharge))
+        )
+
+    return flag_exprs, cost_exprs
+
+
+def apply_surcharges(
+    df: pl.DataFrame,
+    surcharges: list[type[Surcharge]],
+) -> pl.DataFrame:
+    """
+    Apply one phase of surcharges: one flag batch, then one cost batch.
+
+    New columns are appended as flag/cost pairs in processing order, the same
+    layout as applying the surcharges one at a time.
+
+    Args:
+        df: Shipment DataFrame (LazyFrame also accepted)
+        surcharges: Surcharge classes of one phase (e.g. BASE)
+
+    Returns:
+        df with surcharge_<name> and cost_<name> columns added
+    """
+    if not surcharges:
+        return df
+
+    flag_exprs, cost_exprs = compile_surcharges(surcharges)
+
+    existing = df.collect_schema().names()
+    new_cols = [
+        col
+        for s in _ordered(surcharges)
+        for col in (flag_column(s), cost_column(s))
+        if col not in existing
+    ]
+
+    df = df.with_columns(flag_exprs)
+    df = df.with_columns(cost_exprs)
+    return df.select(existing + new_cols)
@@ -0,0 +1,111 @@
+"""
+Tests for bulk COPY loading.
+
+Run with: pytest shared/tests/ -v
+"""
+
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+import shared.database as database
+from shared.database.bulk import CSV_NULL, LocalStage, copy_frame
+
+
+class CopyConnection:
+    """DB-API connection that reads the staged parts a COPY statement points at."""
+
+    def __init__(self):
+        self.statements = []
+        self.loaded = None
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.statements.append(sql)
+        if sql.startswith("COPY"):
+            source = sql.split("FROM '")[1].split("'")[0]
+            parts = sorted(Path(source).iterdir())
+            self.loaded = pl.concat([
+                pl.read_csv(p, has_header=False, null_values=CSV_NULL, infer_schema=False)
+                for p in parts
+            ])
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def df():
+    """Upload-like frame with nulls, dates, timestamps, booleans and awkward strings."""
+    return pl.DataFrame({
+        "pcs_orderid": [1, 2, 3],
+        "service": ['Home, "Delivery"', "", None],
+        "ship_date": [date(2025, 3, 1), None, date(2025, 3, 3)],
+        "dw_timestamp": [datetime(2025, 3, 4, 8, 30), datetime(2025, 3, 4, 8, 30, 0, 500), None],
+        "is_return": [True, False, None],
+        "cost_total": [12.5, None, 7.0],
+    })
+
+
+class TestCopyFrame:
+    """Tests for copy_frame."""
+
+    def test_staged_parts_and_cleanup(self, df, tmp_path):
+        """All parts are loaded by one committed COPY, then removed from the stage."""
+        stage = LocalStage(tmp_path / "stage")
+        conn = CopyConnection()
+
+        loaded = copy_frame(conn, df, "schema.table", stage, part_rows=2)
+
+        (copy,) = conn.statements
+        assert copy.startswith("COPY schema.table (pcs_orderid, service, ship_date, dw_timestamp, is_return, cost_total) FROM ")
+        assert "CSV GZIP NULL AS '\\N'" in copy
+        assert loaded == 3 and conn.commits == 1
+        assert conn.loaded.rows() == [
+            ("1", 'Home, "Delivery"', "2025-03-01", "2025-03-04 08:30:00", "true", "12.5"),
+            ("2", "", None, "2025-03-04 08:30:00.000500", "false", None),
+            ("3", None, "2025-03-03", None, None, "7.0"),
+        ]
+        assert not list((tmp_path / "stage").rglob("*.gz"))
+
+
+class TestPushDataBulk:
+    """Tests for push_data choosing COPY."""
+
+    def test_copy_above_threshold(self, df, tmp_path, monkeypatch):
+        """Frames from BULK_LOAD_MIN_ROWS rows use COPY; smaller ones INSERT."""
+        conn = CopyConnection()
+
+        @contextmanager
+        def fake_connection(timeout=None):
+            yield conn
+
+        monkeypatch.setattr(database, "connection", fake_connection)
+        monkeypatch.setattr(database, "_cache", None)
+        monkeypatch.setattr(database, "BULK_LOAD_MIN_ROWS", 3)
+        database.configure_staging(LocalStage(tmp_path))
+        try:
+            database.push_data(df, "schema.table", verbose=False)
+            database.push_data(df.head(2), "schema.table", verbose=False)
+        finally:
+            database.configure_staging(None)
+
+        assert conn.statements[0].startswith("COPY schema.table")
+        assert conn.statements[1].startswith("INSERT INTO schema.table")
+
+    def test_bulk_needs_stage(self, df):
+        """Forcing COPY without a staging area is an error."""
+        with pytest.raises(ValueError, match="staging area"):
+            database.push_data(df, "schema.table", bulk=True)
@@ -0,0 +1,144 @@
+"""
+Tests for resumable, checkpointed uploads.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+import polars as pl
+import pytest
+
+import shared.database as database
+from shared.database.checkpoint import UploadCheckpoint, after_key, commit_groups
+from shared.tests.test_merge import SQLiteConnection
+
+
+TABLE = "main.actuals"
+
+
+@pytest.fixture
+def db():
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE actuals (pcs_orderid INT, trackingnumber TEXT, cost REAL)")
+    return db
+
+
+@pytest.fixture
+def checkpoints(tmp_path, monkeypatch):
+    """Keep checkpoint files in a temporary directory."""
+    monkeypatch.setattr(
+        database, "UploadCheckpoint",
+        lambda table, run_id: UploadCheckpoint(table, run_id, directory=tmp_path),
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def use_db(db, monkeypatch):
+    """Point shared.database at SQLite; fail_after=N breaks the connection after N commits."""
+    def use(fail_after=None):
+        commits = []
+
+        class FlakyConnection(SQLiteConnection):
+            def commit(self):
+                if fail_after is not None and len(commits) >= fail_after:
+                    raise ConnectionError("connection dropped")
+                commits.append(1)
+                super().commit()
+
+        @contextmanager
+        def fake_connection(timeout=None):
+            try:
+                yield FlakyConnection(db)
+            finally:
+                db.rollback()
+
+        monkeypatch.setattr(database, "connection", fake_connection)
+        monkeypatch.setattr(database, "_stage", None)
+        monkeypatch.setattr(database, "_cache", None)
+    return use
+
+
+@pytest.fixture
+def df():
+    """Ten orders, order 3 with three tracking numbers, out of key order."""
+    orderids = [5, 3, 1, 2, 3, 4, 6, 3, 7, 8, 9, 10]
+    return pl.DataFrame({
+        "pcs_orderid": orderids,
+        "trackingnumber": [f"T{i}" for i in range(len(orderids))],
+        "cost": [float(i) for i in range(len(orderids))],
+    })
+
+
+def upload(df, run_id="full"):
+    return database.push_data(
+        df, TABLE, batch_size=2, commit_every=1, keys=["pcs_orderid"], run_id=run_id, verbose=False
+    )
+
+
+def table_rows(db):
+    return db.execute("SELECT * FROM actuals ORDER BY pcs_orderid, trackingnumber").fetchall()
+
+
+class TestCommitGroups:
+    """Tests for commit group boundaries."""
+
+    def test_keys_are_not_split(self):
+        """Groups grow past their size to keep each key's rows together."""
+        df = pl.DataFrame({"k": [1, 2, 2, 2, 3, 4, 5]})
+
+        assert commit_groups(df, ["k"], 2) == [(0, 4), (4, 2), (6, 1)]
+
+    def test_after_key(self):
+        """Rows sorting after a composite key."""
+        df = pl.DataFrame({"a": [1, 1, 2, 2], "b": ["x", "y", "a", "y"]})
+
+        assert df.filter(after_key(["a", "b"], [1, "x"])).rows() == [(1, "y"), (2, "a"), (2, "y")]
+
+
+class TestResumableUpload:
+    """Tests for push_data(..., run_id=...)."""
+
+    def test_resumes_after_failure(self, db, df, use_db, checkpoints):
+        """A failed upload keeps its committed groups; the rerun adds only the rest."""
+        use_db(fail_after=2)
+        with pytest.raises(RuntimeError, match="rerun with run_id='full'"):
+            upload(df)
+
+        state = UploadCheckpoint(TABLE, "full", directory=checkpoints).load()
+        assert state["rows"] == len(table_rows(db)) == 5 and state["last_key"] == [3]
+
+        use_db()
+        upload(df)
+
+        assert table_rows(db) == sorted(df.rows())
+        assert not list(checkpoints.iterdir())
+
+    def test_commit_without_checkpoint_is_not_duplicated(self, db, df, use_db, checkpoints, monkeypatch):
+        """A group committed before its checkpoint was saved is merged, not appended again."""
+        use_db()
+        save = UploadCheckpoint.save
+
+        def save_then_crash(self, batch, rows, keys, last_key):
+            if rows > 5:
+                raise OSError("disk full")
+            save(self, batch, rows, keys, last_key)
+
+        monkeypatch.setattr(UploadCheckpoint, "save", save_then_crash)
+        with pytest.raises(RuntimeError):
+            upload(df)
+        assert len(table_rows(db)) == 7  # Third group committed, checkpoint still at the second
+
+        monkeypatch.setattr(UploadCheckpoint, "save", save)
+        upload(df)
+
+        assert table_rows(db) == sorted(df.rows())
+
+    def test_needs_append_and_keys(self, df):
+        """Resumable uploads append and are keyed."""
+        with pytest.raises(ValueError, match="only append"):
+            database.push_data(df, TABLE, if_exists="replace", keys=["pcs_orderid"], run_id="x")
+        with pytest.raises(ValueError, match="needs keys"):
+            database.push_data(df, TABLE, run_id="x")
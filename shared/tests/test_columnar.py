@@ -0,0 +1,149 @@
+"""
+Tests for the columnar fetch path.
+
+Run with: pytest shared/tests/ -v
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import polars as pl
+import pytest
+from redshift_connector.utils.oids import RedshiftOID
+
+from shared.database.columnar import fetch_frame, iter_batches, stream_cursor
+
+
+class ListCursor:
+    """DB-API cursor over in-memory rows, recording fetchmany sizes."""
+
+    def __init__(self, description, rows):
+        self.description = description
+        self._rows = list(rows)
+        self.fetch_sizes = []
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+
+class CursorConnection:
+    """DB-API connection serving DECLARE / FETCH FORWARD over in-memory rows."""
+
+    def __init__(self, description, rows):
+        self.description = description
+        self._rows = list(rows)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.statements.append(sql)
+        self._result = []
+        if sql.startswith("FETCH FORWARD"):
+            size = int(sql.split()[2])
+            self._result, self._rows = self._rows[:size], self._rows[size:]
+
+    def fetchall(self):
+        return self._result
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cursor():
+    """Invoice-like result: NUMERIC, VARCHAR, DATE, TIMESTAMP, BOOLEAN."""
+    description = [
+        ("net_charge", RedshiftOID.NUMERIC),
+        ("trackingnumber", RedshiftOID.VARCHAR),
+        ("invoice_date", RedshiftOID.DATE),
+        ("pcs_created", RedshiftOID.TIMESTAMP),
+        ("is_return", RedshiftOID.BOOLEAN),
+    ]
+    rows = [
+        (None, None, None, None, None),
+        (Decimal("12.34"), "1Z999", date(2025, 3, 1), datetime(2025, 2, 27, 8, 30), False),
+        (Decimal("7"), "1Z998", date(2025, 3, 2), datetime(2025, 2, 28, 9, 0), True),
+    ]
+    return ListCursor(description, rows)
+
+
+class TestColumnarFetch:
+    """Tests for fetch_frame / iter_batches."""
+
+    def test_declared_schema(self, cursor):
+        """Types come from the description, even when the first batch is all null."""
+        df = fetch_frame(cursor, batch_rows=1)
+
+        assert df.schema == pl.Schema({
+            "net_charge": pl.Float64,
+            "trackingnumber": pl.Utf8,
+            "invoice_date": pl.Date,
+            "pcs_created": pl.Datetime("us"),
+            "is_return": pl.Boolean,
+        })
+        assert df["net_charge"].to_list() == [None, 12.34, 7.0]
+        assert cursor.fetch_sizes == [1, 1, 1, 1]
+
+    def test_batches_and_overrides(self, cursor):
+        """Batches hold at most batch_rows rows; overrides replace declared types."""
+        batches = list(iter_batches(cursor, batch_rows=2, schema_overrides={"net_charge": pl.Utf8}))
+
+        assert [b.height for b in batches] == [2, 1]
+        assert batches[1]["net_charge"].to_list() == ["7"]
+
+    def test_value_outside_declared_type_is_kept(self):
+        """A value the declared type cannot hold is not nulled: the column is inferred, with a warning."""
+        overflow = ListCursor([("qty", RedshiftOID.SMALLINT)], [(1,), (None,), (300,)])
+
+        with pytest.warns(UserWarning, match="qty"):
+            df = fetch_frame(overflow, schema_overrides={"qty": pl.Int8})
+
+        assert df["qty"].to_list() == [1, None, 300]
+
+    def test_empty_result_keeps_columns(self):
+        """A query returning no rows still has its typed columns."""
+        empty = ListCursor([("cnt", RedshiftOID.BIGINT)], [])
+
+        df = fetch_frame(empty)
+
+        assert df.height == 0
+        assert df.schema == pl.Schema({"cnt": pl.Int64})
+
+
+class TestStreamCursor:
+    """Tests for stream_cursor."""
+
+    def test_chunks_from_server_cursor(self, cursor):
+        """Chunks are typed FETCH FORWARD results; the cursor is closed and committed."""
+        conn = CursorConnection(cursor.description, cursor._rows)
+
+        chunks = list(stream_cursor(conn, "SELECT * FROM invoices;\n", chunk_rows=2))
+
+        assert [c.height for c in chunks] == [2, 1]
+        assert chunks[0].schema == chunks[1].schema
+        assert chunks[0]["net_charge"].dtype == pl.Float64
+        assert conn.statements[0] == "DECLARE stream_cursor CURSOR FOR SELECT * FROM invoices"
+        assert conn.statements[-1] == "CLOSE stream_cursor"
+        assert (conn.commits, conn.rollbacks) == (1, 0)
+
+    def test_early_close_rolls_back(self, cursor):
+        """Abandoning the stream rolls the cursor's transaction back."""
+        conn = CursorConnection(cursor.description, cursor._rows)
+
+        stream = stream_cursor(conn, "SELECT * FROM invoices", chunk_rows=1)
+        next(stream)
+        stream.close()
+
+        assert (conn.commits, conn.rollbacks) == (0, 1)
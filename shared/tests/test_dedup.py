@@ -0,0 +1,67 @@
+"""
+Tests for deduplicated rating.
+
+Run with: pytest shared/tests/ -v
+"""
+
+from datetime import date
+
+import polars as pl
+import pytest
+
+from shared.rating import canonical_zip, date_bucket, rate_unique
+from shared.surcharges import in_period
+
+
+def _rate(df: pl.DataFrame) -> pl.DataFrame:
+    """Toy calculator: weight-based cost plus a December surcharge."""
+    return df.with_columns(
+        (
+            pl.col("weight_lbs") * 2
+            + pl.when(in_period((12, 1), (12, 31))).then(1.0).otherwise(0.0)
+        ).alias("cost_total")
+    )
+
+
+@pytest.fixture
+def shipments() -> pl.DataFrame:
+    return pl.DataFrame({
+        "pcs_orderid": [1, 2, 3, 4, 5],
+        "ship_date": [
+            date(2025, 6, 1), date(2025, 6, 20), date(2025, 12, 5),
+            date(2025, 6, 3), None,
+        ],
+        "shipping_zip_code": ["01002", "01002-1234", "01002", "90210", "01002"],
+        "weight_lbs": [1.0, 1.0, 1.0, 1.0, 1.0],
+    })
+
+
+class TestRateUnique:
+    """Tests for rate_unique."""
+
+    def test_matches_direct_rating(self, shipments):
+        """Same rows, order, columns and values as rating every shipment."""
+        result, _ = rate_unique(
+            shipments, _rate, [canonical_zip(5), pl.col("weight_lbs")],
+            [in_period((12, 1), (12, 31))],
+        )
+
+        assert result.equals(_rate(shipments))
+
+    def test_dates_collapse_within_bucket(self, shipments):
+        """June dates share a key; December and null dates get their own."""
+        _, stats = rate_unique(
+            shipments, _rate, [canonical_zip(5), pl.col("weight_lbs")],
+            [in_period((12, 1), (12, 31))],
+        )
+
+        assert stats.rows == 5
+        assert stats.unique_keys == 4
+        assert stats.ratio == pytest.approx(1.25)
+
+    def test_date_bucket_bitmask(self):
+        """Each window sets its own bit."""
+        df = pl.DataFrame({"ship_date": [date(2025, 1, 5), date(2025, 6, 5), date(2025, 12, 5)]})
+        flags = [in_period((12, 1), (1, 31)), in_period((1, 1), (1, 31))]
+
+        assert df.select(date_bucket(flags))["_date_bucket"].to_list() == [3, 0, 1]
@@ -0,0 +1,50 @@
+"""
+Tests for the shared dimension stage.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import polars as pl
+import pytest
+
+from shared.rating import DIMENSION_COLUMNS, add_dimensions
+
+
+@pytest.fixture
+def packages():
+    """Packages with ties, half-tenths and missing sides."""
+    return pl.DataFrame({
+        "length_in": [10.0, 12.25, 7.0, None, 30.0000001980],
+        "width_in": [8.0, 12.25, 7.05, 4.0, 20.0],
+        "height_in": [6.0, 3.0, 9.15, 5.0, None],
+    })
+
+
+class TestAddDimensions:
+    """Tests for add_dimensions."""
+
+    def test_matches_list_sort(self, packages):
+        """Second longest equals the per-row list sort, including rows with nulls."""
+        sides = pl.concat_list(["length_in", "width_in", "height_in"]).list.sort(descending=True)
+        expected = packages.select(sides.list.get(1).round(1).alias("second_longest_in"))
+
+        result = add_dimensions(packages)
+
+        assert result.columns == packages.columns + DIMENSION_COLUMNS
+        assert result.select(expected.columns).equals(expected)
+        assert result["length_plus_girth"].to_list()[:3] == [38.0, 42.8, 37.3]
+
+    def test_subset_in_given_order(self, packages):
+        """Only the requested columns are added."""
+        result = add_dimensions(packages, ["second_longest_in", "cubic_in"])
+
+        assert result.columns == packages.columns + ["second_longest_in", "cubic_in"]
+
+    def test_existing_columns_are_kept(self, packages):
+        """Columns already present (e.g. from an earlier shared stage) are not recomputed."""
+        precomputed = packages.with_columns(pl.lit(1.0).alias("cubic_in"))
+
+        result = add_dimensions(precomputed.lazy()).collect()
+
+        assert result["cubic_in"].to_list() == [1.0] * 5
+        assert result.columns == precomputed.columns + [c for c in DIMENSION_COLUMNS if c != "cubic_in"]
@@ -0,0 +1,94 @@
+"""
+Tests for the shared bracket (interval) lookup.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import polars as pl
+import pytest
+
+from shared.rating import lookup_brackets, require_not_null
+
+
+@pytest.fixture
+def brackets() -> pl.DataFrame:
+    """Two zones, unsorted, with a gap between 2 and 5 lbs in zone 2."""
+    return pl.DataFrame({
+        "weight_lbs_lower": [1.0, 0.0, 0.0, 5.0, 1.0],
+        "weight_lbs_upper": [2.0, 1.0, 1.0, 10.0, 5.0],
+        "zone": [2, 2, 3, 2, 3],
+        "rate": [4.0, 3.0, 6.0, 9.0, 7.0],
+    })
+
+
+def _lookup(shipments: pl.DataFrame, brackets: pl.DataFrame) -> list:
+    result = lookup_brackets(
+        shipments,
+        brackets,
+        on=("zone", "zone"),
+        value="weight",
+        columns={"rate": "cost_base"},
+    )
+    return result["cost_base"].to_list()
+
+
+class TestLookupBrackets:
+    """Tests for lookup_brackets."""
+
+    def test_bounds_are_lower_exclusive_upper_inclusive(self, brackets):
+        """A value equal to a bracket's upper bound belongs to that bracket."""
+        shipments = pl.DataFrame({"zone": [2, 2, 2, 3], "weight": [1.0, 1.01, 2.0, 1.0]})
+
+        assert _lookup(shipments, brackets) == [3.0, 4.0, 4.0, 6.0]
+
+    def test_no_match_is_null(self, brackets):
+        """Gaps, out-of-range values, unknown zones and nulls get no rate."""
+        shipments = pl.DataFrame({
+            "zone": [2, 2, 2, 9, None, 3],
+            "weight": [3.0, 0.0, 11.0, 1.0, 1.0, None],
+        })
+
+        assert _lookup(shipments, brackets) == [None] * 6
+
+    def test_matches_join_and_filter(self, brackets):
+        """Same result and row order as the join + filter it replaces."""
+        shipments = pl.DataFrame({
+            "zone": [3, 2, 2, 3, 2, 2],
+            "weight": [4.5, 7.25, 0.5, 0.1, 1.5, 10.0],
+        })
+        expected = (
+            shipments
+            .with_row_index("_row_id")
+            .join(brackets, on="zone", how="left")
+            .filter(
+                (pl.col("weight") > pl.col("weight_lbs_lower")) &
+                (pl.col("weight") <= pl.col("weight_lbs_upper"))
+            )
+            .sort("_row_id")["rate"]
+            .to_list()
+        )
+
+        assert _lookup(shipments, brackets) == expected
+
+    def test_lazy_input(self, brackets):
+        """LazyFrames get the same lookup, evaluated on collect."""
+        shipments = pl.DataFrame({"zone": [3, 2, 9], "weight": [4.5, 7.25, 1.0]})
+
+        result = lookup_brackets(
+            shipments.lazy(),
+            brackets,
+            on=("zone", "zone"),
+            value="weight",
+            columns={"rate": "cost_base"},
+        )
+
+        assert isinstance(result, pl.LazyFrame)
+        assert result.collect()["cost_base"].to_list() == _lookup(shipments, brackets)
+
+    def test_lazy_missing_bracket_raises_on_collect(self, brackets):
+        """require_not_null defers the check for LazyFrames until collect."""
+        lf = pl.LazyFrame({"cost_base": [1.0, None]})
+        lf = require_not_null(lf, "cost_base", "{missing_count} missing")
+
+        with pytest.raises(ValueError, match="1 missing"):
+            lf.collect()
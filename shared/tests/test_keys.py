@@ -0,0 +1,161 @@
+"""
+Tests for key-table queries.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+import polars as pl
+import pytest
+
+import shared.database as database
+from shared.database.keys import create_key_table, inline_key_table, key_query
+
+
+class SQLiteConnection:
+    """DB-API connection over SQLite; can refuse temporary tables."""
+
+    def __init__(self, db, temp_tables=True):
+        self.db = db
+        self.temp_tables = temp_tables
+        self.description = None
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        if sql.startswith("CREATE TEMP TABLE") and not self.temp_tables:
+            raise RuntimeError("permission denied to create temporary tables")
+        self._result = self.db.execute(sql)
+        self.description = [(d[0], None) for d in self._result.description or []]
+
+    def fetchmany(self, size):
+        return self._result.fetchmany(size)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    """Sent parcels: order 1 has two tracking numbers, order 3 none."""
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE sentparcels (orderid INT, trackingnumber TEXT)")
+    db.executemany("INSERT INTO sentparcels VALUES (?, ?)", [(1, "A"), (1, "B"), (2, "C"), (4, "D")])
+    return db
+
+
+@pytest.fixture
+def use_db(db, monkeypatch):
+    """Point shared.database at the SQLite database."""
+    def use(temp_tables=True):
+        @contextmanager
+        def fake_connection(timeout=None):
+            yield SQLiteConnection(db, temp_tables)
+
+        monkeypatch.setattr(database, "connection", fake_connection)
+        monkeypatch.setattr(database, "_stage", None)
+    return use
+
+
+QUERY = """
+    SELECT s.orderid AS pcs_orderid, s.trackingnumber
+    FROM sentparcels s
+    JOIN {keys} k ON s.orderid = k.pcs_orderid
+    ORDER BY s.trackingnumber
+"""
+
+
+class TestKeySQL:
+    """Tests for the key table SQL."""
+
+    def test_key_table_types(self):
+        """Key columns map to Redshift types; VARCHAR fits the longest value in bytes."""
+        keys = pl.DataFrame({"pcs_orderid": [1, 2], "trackingnumber": ["1Z", "ÄÖ9"]})
+
+        assert create_key_table("k", keys) == "CREATE TEMP TABLE k (pcs_orderid BIGINT, trackingnumber VARCHAR(5))"
+
+    def test_inline_key_table(self):
+        """Inlined keys are a typed derived table; an empty set selects no rows."""
+        keys = pl.DataFrame({"trackingnumber": ["A'1", "B"]})
+
+        assert inline_key_table(keys) == (
+            "(SELECT trackingnumber::VARCHAR(3) AS trackingnumber FROM "
+            "(SELECT 'A''1' UNION ALL SELECT 'B') AS key_values (trackingnumber))"
+        )
+        assert inline_key_table(keys.clear()) == "(SELECT NULL::VARCHAR(1) AS trackingnumber WHERE FALSE)"
+
+    def test_template_needs_placeholder(self):
+        """A template without {keys} is rejected."""
+        with pytest.raises(ValueError, match="{keys}"):
+            key_query("SELECT 1", "k")
+
+
+class TestPullByKeys:
+    """Tests for pull_by_keys."""
+
+    def test_joins_temp_table(self, use_db):
+        """Keys are loaded once (duplicates dropped) and joined by one query."""
+        use_db()
+
+        df = database.pull_by_keys(QUERY, pl.DataFrame({"pcs_orderid": [1, 2, 3, 1]}))
+
+        assert df.rows() == [(1, "A"), (1, "B"), (2, "C")]
+
+    def test_falls_back_to_chunks(self, use_db, monkeypatch):
+        """Without temporary tables, inlined key chunks are queried concurrently."""
+        use_db(temp_tables=False)
+        captured = []
+
+        def fake_pull_data(query, schema_overrides=None):
+            captured.append(query)
+            return pl.DataFrame({"pcs_orderid": [len(captured)]})
+
+        monkeypatch.setattr(database, "pull_data", fake_pull_data)
+        monkeypatch.setattr(database, "KEY_CHUNK_ROWS", 2)
+
+        with pytest.warns(UserWarning, match="querying in chunks"):
+            df = database.pull_by_keys(QUERY, pl.DataFrame({"pcs_orderid": [1, 2, 3]}), max_workers=1)
+
+        assert len(captured) == 2 and df.height == 2
+        assert "SELECT 1 UNION ALL SELECT 2" in captured[0]
+        assert "(SELECT 3) AS key_values (pcs_orderid)" in captured[1]
+
+
+class TestStreamByKeys:
+    """Tests for stream_by_keys."""
+
+    def test_batches_from_temp_table(self, use_db):
+        """The key table query is yielded chunk_rows rows at a time."""
+        use_db()
+
+        chunks = list(database.stream_by_keys(QUERY, pl.DataFrame({"pcs_orderid": [1, 2, 4]}), chunk_rows=2))
+
+        assert [c.rows() for c in chunks] == [[(1, "A"), (1, "B")], [(2, "C"), (4, "D")]]
+
+    def test_empty_result_keeps_columns(self, use_db):
+        """No matching rows still yields one frame with the result's columns."""
+        use_db()
+
+        chunks = list(database.stream_by_keys(QUERY, pl.DataFrame({"pcs_orderid": [3]})))
+
+        assert len(chunks) == 1 and chunks[0].height == 0
+        assert chunks[0].columns == ["pcs_orderid", "trackingnumber"]
+
+    def test_chunks_yielded_as_they_complete(self, use_db, monkeypatch):
+        """In the fallback, empty chunk results are skipped and the rest yielded as they finish."""
+        use_db(temp_tables=False)
+
+        def fake_pull_data(query, schema_overrides=None):
+            found = [k for k in (1, 2, 4) if f"SELECT {k}" in query]
+            return pl.DataFrame({"pcs_orderid": found}, schema={"pcs_orderid": pl.Int64})
+
+        monkeypatch.setattr(database, "pull_data", fake_pull_data)
+        monkeypatch.setattr(database, "KEY_CHUNK_ROWS", 1)
+
+        with pytest.warns(UserWarning, match="querying in chunks"):
+            chunks = list(database.stream_by_keys(QUERY, pl.DataFrame({"pcs_orderid": [1, 3, 4]}), max_workers=2))
+
+        assert sorted(c.item() for c in chunks) == [1, 4]
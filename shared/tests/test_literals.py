@@ -0,0 +1,49 @@
+"""
+Tests for column-wise SQL literal rendering.
+
+Run with: pytest shared/tests/ -v
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import polars as pl
+
+from shared.database.literals import format_value, row_literals
+
+
+def cell_by_cell(df: pl.DataFrame) -> list[str]:
+    """Reference rendering: format_value() on every cell."""
+    return ["(" + ", ".join(format_value(v) for v in row) + ")" for row in df.rows()]
+
+
+class TestRowLiterals:
+    """Tests for row_literals."""
+
+    def test_matches_format_value(self):
+        """Column-wise rendering gives the same SQL as formatting each cell."""
+        df = pl.DataFrame({
+            "pcs_orderid": [1, None, 3],
+            "trackingnumber": ["1Z'99", "", None],
+            "is_return": [True, None, False],
+            "ship_date": [date(2025, 3, 1), None, date(2025, 12, 31)],
+            "dw_timestamp": [datetime(2025, 3, 4, 8, 30), datetime(2025, 3, 4, 8, 30, 0, 500), None],
+            "cost_total": [12.5, float("nan"), None],
+            "weight_lbs": pl.Series([1.5, 0.1, None], dtype=pl.Float32),
+            "rate": [Decimal("1.25"), None, Decimal("0")],
+            "empty": [None, None, None],
+        })
+
+        assert row_literals(df) == cell_by_cell(df)
+        assert row_literals(df)[0] == (
+            "(1, '1Z''99', TRUE, '2025-03-01', '2025-03-04 08:30:00', 12.5, 1.5, 1.25, NULL)"
+        )
+
+    def test_floats_keep_their_value(self):
+        """Floats may use another exponent notation, but parse to the same value."""
+        values = [1e-05, 2.5e-07, 1e20, 1 / 3, -0.0]
+        df = pl.DataFrame({"x": values})
+
+        rendered = [float(row[1:-1]) for row in row_literals(df)]
+
+        assert rendered == values
@@ -0,0 +1,171 @@
+"""
+Tests for merge (upsert) uploads.
+
+The merge statements run against SQLite, with the two Redshift-only forms
+(CREATE TABLE ... LIKE, DELETE ... USING) rewritten to SQLite equivalents.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import sqlite3
+
+import polars as pl
+import pytest
+
+import shared.database as database
+
+from shared.database.literals import row_literals
+from shared.database.merge import MergeCounts, merge_frame
+
+
+class SQLiteConnection:
+    """DB-API connection over SQLite, translating the Redshift-only statements."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        sql = sql.strip()
+        if "(LIKE " in sql:
+            name, like = sql.split()[3], sql.split("(LIKE ")[1].rstrip(")")
+            sql = f"CREATE TEMP TABLE {name} AS SELECT * FROM {like} WHERE 0"
+        elif " USING " in sql:
+            head, condition = sql.split(" WHERE ", 1)
+            target, key_table = head.split()[2], head.split(" USING ")[1].split()[0]
+            sql = f"DELETE FROM {target} WHERE EXISTS (SELECT 1 FROM {key_table} k WHERE {condition})"
+        self._result = self.db.execute(sql)
+
+    def fetchone(self):
+        return self._result.fetchone()
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    """Expected-costs table: order 2 has two rows, order 5 is outside the refresh."""
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE expected (pcs_orderid INT, trackingnumber TEXT, cost_total REAL, pcs_created TEXT, dw_timestamp TEXT)")
+    db.executemany("INSERT INTO expected VALUES (?, ?, ?, ?, 'old')", [
+        (1, "A", 1.0, "2025-06-01"),
+        (2, "B", 2.0, "2025-06-01"),
+        (2, "B2", 3.0, "2025-06-01"),
+        (3, "C", None, "2025-06-02"),
+        (4, "D", 4.0, "2025-06-03"),
+        (5, "E", 5.0, "2025-05-01"),
+    ])
+    return db
+
+
+def merge(db, df, scope=None):
+    """Merge df into the expected table, staging it with one INSERT."""
+    def load(conn, staging):
+        if df.height:
+            conn.execute(f"INSERT INTO {staging} ({', '.join(df.columns)}) VALUES {', '.join(row_literals(df))}")
+
+    compare = ["trackingnumber", "cost_total", "pcs_created"]
+    return merge_frame(SQLiteConnection(db), df.columns, "main.expected", ["pcs_orderid"], compare, load, scope)
+
+
+class TestMerge:
+    """Tests for merge_frame."""
+
+    def test_only_changed_keys_are_rewritten(self, db):
+        """New keys are inserted, changed keys replaced, identical keys left alone."""
+        df = pl.DataFrame({
+            "pcs_orderid": [1, 2, 2, 3, 6],
+            "trackingnumber": ["A", "B", "B2-NEW", "C", "F"],
+            "cost_total": [1.0, 2.0, 3.0, None, 6.0],
+            "pcs_created": ["2025-06-01"] * 4 + ["2025-06-04"],
+            "dw_timestamp": ["new"] * 5,
+        })
+
+        counts = merge(db, df)
+
+        assert counts == MergeCounts(inserted=1, updated=3, unchanged=1, deleted=3)
+        assert db.execute("SELECT * FROM expected ORDER BY pcs_orderid, trackingnumber").fetchall() == [
+            (1, "A", 1.0, "2025-06-01", "old"),
+            (2, "B", 2.0, "2025-06-01", "new"),
+            (2, "B2-NEW", 3.0, "2025-06-01", "new"),
+            (3, "C", None, "2025-06-01", "new"),
+            (4, "D", 4.0, "2025-06-03", "old"),
+            (5, "E", 5.0, "2025-05-01", "old"),
+            (6, "F", 6.0, "2025-06-04", "new"),
+        ]
+        assert not db.execute("SELECT name FROM sqlite_temp_master").fetchall()
+
+    def test_duplicate_rows_compared_as_multisets(self, db):
+        """A key's rows are unchanged only if each row occurs equally often on both sides."""
+        df = pl.DataFrame({
+            "pcs_orderid": [2, 2, 4, 4],
+            "trackingnumber": ["B", "B", "D", "D"],
+            "cost_total": [2.0, 2.0, 4.0, 4.0],
+            "pcs_created": ["2025-06-01", "2025-06-01", "2025-06-03", "2025-06-03"],
+            "dw_timestamp": ["new"] * 4,
+        })
+        db.execute("INSERT INTO expected VALUES (4, 'D', 4.0, '2025-06-03', 'old')")
+
+        counts = merge(db, df)
+
+        assert counts == MergeCounts(updated=2, unchanged=2, deleted=2)
+        assert db.execute("SELECT * FROM expected WHERE pcs_orderid IN (2, 4) ORDER BY 1, 2, 5").fetchall() == [
+            (2, "B", 2.0, "2025-06-01", "new"),
+            (2, "B", 2.0, "2025-06-01", "new"),
+            (4, "D", 4.0, "2025-06-03", "old"),
+            (4, "D", 4.0, "2025-06-03", "old"),
+        ]
+
+    def test_scope_removes_unstaged_keys(self, db):
+        """Rows in scope whose keys were not staged are deleted, as delete-then-insert would."""
+        df = pl.DataFrame({
+            "pcs_orderid": [1],
+            "trackingnumber": ["A"],
+            "cost_total": [1.0],
+            "pcs_created": ["2025-06-01"],
+            "dw_timestamp": ["new"],
+        })
+
+        counts = merge(db, df, scope="pcs_created >= '2025-06-01'")
+
+        assert counts == MergeCounts(inserted=0, updated=0, unchanged=1, deleted=4)
+        assert db.execute("SELECT pcs_orderid FROM expected ORDER BY 1").fetchall() == [(1,), (5,)]
+
+    def test_scoped_merge_of_nothing(self, db):
+        """An empty frame with a scope still clears the rows in scope."""
+        df = pl.DataFrame(schema={
+            "pcs_orderid": pl.Int64, "trackingnumber": pl.Utf8, "cost_total": pl.Float64,
+            "pcs_created": pl.Utf8, "dw_timestamp": pl.Utf8,
+        })
+
+        counts = merge(db, df, scope="pcs_created >= '2025-06-02'")
+
+        assert counts == MergeCounts(deleted=2)
+        assert db.execute("SELECT COUNT(*) FROM expected").fetchone() == (4,)
+
+
+class TestPushDataMerge:
+    """Tests for push_data(..., if_exists="merge") argument checks."""
+
+    def test_needs_keys(self):
+        """Merging without keys, or with keys missing from the frame, is an error."""
+        df = pl.DataFrame({"pcs_orderid": [1]})
+        with pytest.raises(ValueError, match="needs keys"):
+            database.push_data(df, "schema.table", if_exists="merge")
+        with pytest.raises(ValueError, match="needs keys"):
+            database.push_data(df, "schema.table", if_exists="merge", keys=["trackingnumber"])
+
+    def test_null_keys_rejected(self):
+        """A null key would never match an existing row, so it is refused."""
+        df = pl.DataFrame({"pcs_orderid": [1, None]})
+        with pytest.raises(ValueError, match="nulls"):
+            database.push_data(df, "schema.table", if_exists="merge", keys=["pcs_orderid"])
@@ -0,0 +1,74 @@
+"""
+Tests for range-partitioned queries.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import threading
+import time
+from datetime import date
+
+import polars as pl
+
+import shared.database as database
+from shared.database.partitions import date_range_filters
+
+
+class TestDateRangeFilters:
+    """Tests for date_range_filters."""
+
+    def test_single_partition_is_original_filter(self):
+        """One partition gives the unpartitioned filter clauses."""
+        assert date_range_filters("po.createddate", "2025-01-01", "2025-12-31") == [
+            ("and po.createddate >= '2025-01-01'", "and po.createddate <= '2025-12-31'"),
+        ]
+        assert date_range_filters("po.createddate", None, None, partitions=4) == [("", "")]
+
+    def test_partitions_are_contiguous(self):
+        """Inner boundaries are half-open; the outer bounds are the original ones."""
+        filters = date_range_filters("d", "2025-01-01", "2025-01-10", partitions=3)
+
+        assert filters == [
+            ("and d >= '2025-01-01'", "and d < '2025-01-04'"),
+            ("and d >= '2025-01-04'", "and d < '2025-01-07'"),
+            ("and d >= '2025-01-07'", "and d <= '2025-01-10'"),
+        ]
+
+    def test_open_end_and_short_ranges(self):
+        """An open range splits up to today and stays open; never more than one per day."""
+        open_ended = date_range_filters("d", "2025-01-01", None, partitions=2, today=date(2025, 1, 5))
+        assert open_ended == [
+            ("and d >= '2025-01-01'", "and d < '2025-01-03'"),
+            ("and d >= '2025-01-03'", ""),
+        ]
+
+        assert len(date_range_filters("d", "2025-01-01", "2025-01-03", partitions=10)) == 2
+        assert len(date_range_filters("d", "2025-01-01", "2025-01-01", partitions=10)) == 1
+
+
+class TestStreamMany:
+    """Tests for stream_many."""
+
+    def test_chunks_in_query_order(self, monkeypatch):
+        """Queries run concurrently, but chunks come out grouped in query order."""
+        running, peak = [], []
+        lock = threading.Lock()
+
+        def fake_stream(query, chunk_rows, schema_overrides=None):
+            with lock:
+                running.append(query)
+                peak.append(len(running))
+            time.sleep(0.02 * (3 - int(query)))  # Later queries finish first
+            for i in range(2):
+                yield pl.DataFrame({"query": [query], "chunk": [i]})
+            with lock:
+                running.remove(query)
+
+        monkeypatch.setattr(database, "stream_data", fake_stream)
+
+        chunks = list(database.stream_many(["0", "1", "2"], chunk_rows=1, max_workers=3))
+
+        assert [(c["query"][0], c["chunk"][0]) for c in chunks] == [
+            ("0", 0), ("0", 1), ("1", 0), ("1", 1), ("2", 0), ("2", 1),
+        ]
+        assert max(peak) > 1
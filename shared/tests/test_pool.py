@@ -0,0 +1,142 @@
+"""
+Tests for the database connection pool.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import threading
+import time
+
+import pytest
+
+import shared.database as database
+from shared.database.pool import ConnectionPool
+
+
+class FakeConnection:
+    """DB-API connection recording rollbacks; can be made to fail."""
+
+    def __init__(self):
+        self.rollbacks = 0
+        self.closed = False
+        self.broken = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        if self.broken:
+            raise ConnectionError("server closed the connection")
+
+    def fetchall(self):
+        return [(1,)]
+
+    def rollback(self):
+        if self.broken:
+            raise ConnectionError("server closed the connection")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened():
+    """Connections opened by the pool under test, in order."""
+    return []
+
+
+@pytest.fixture
+def pool(opened):
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+    return ConnectionPool(connect, size=2)
+
+
+class TestConnectionPool:
+    """Tests for ConnectionPool."""
+
+    def test_reuses_and_rolls_back(self, pool, opened):
+        """A returned connection is rolled back and handed out again."""
+        with pool.connection() as first:
+            assert pool.in_use == 1
+        with pool.connection() as second:
+            pass
+
+        assert second is first
+        assert len(opened) == 1
+        assert first.rollbacks == 2
+        assert pool.in_use == 0
+
+    def test_size_limit_and_timeout(self, pool):
+        """At most size connections are out; a further checkout waits, then times out."""
+        a = pool.acquire()
+        b = pool.acquire()
+        assert a is not b
+
+        with pytest.raises(RuntimeError, match="Timed out"):
+            pool.acquire(timeout=0.05)
+
+        threading.Timer(0.05, pool.release, args=[a]).start()
+        assert pool.acquire(timeout=2) is a
+
+    def test_broken_connections_are_replaced(self, pool, opened):
+        """A connection that cannot roll back, or fails its health check, is closed."""
+        with pool.connection() as conn:
+            conn.broken = True
+        assert conn.closed and pool.in_use == 0
+
+        pool.check_after = 0.0
+        with pool.connection() as healthy:
+            pass
+        healthy.broken = True
+        replacement = pool.acquire()
+
+        assert healthy.closed
+        assert replacement is not healthy
+        assert len(opened) == 3
+
+    def test_concurrent_checkouts(self, pool, opened):
+        """Many threads share the pool without exceeding its size."""
+        peak = []
+
+        def work():
+            with pool.connection():
+                peak.append(pool.in_use)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(peak) == 8
+        assert max(peak) <= 2
+        assert len(opened) <= 2
+
+
+class TestDeprecatedConnection:
+    """Tests for the deprecated get_connection / close_connection wrappers."""
+
+    def test_held_until_closed(self, pool, opened, monkeypatch):
+        """get_connection() holds one pooled connection until close_connection()."""
+        monkeypatch.setattr(database, "_pool", pool)
+        monkeypatch.setattr(database, "_held", None)
+
+        with pytest.warns(DeprecationWarning):
+            first = database.get_connection()
+        with pytest.warns(DeprecationWarning):
+            again = database.get_connection()
+
+        assert again is first
+        assert pool.in_use == 1
+
+        with pytest.warns(DeprecationWarning):
+            database.close_connection()
+
+        assert first.closed
+        assert pool.in_use == 0
+        assert database._pool is None
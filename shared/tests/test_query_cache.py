@@ -0,0 +1,137 @@
+"""
+Tests for the on-disk query result cache.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+import polars as pl
+import pytest
+from redshift_connector.utils.oids import RedshiftOID
+
+import shared.database as database
+from shared.database.cache import QueryCache, normalize_sql, referenced_tables
+
+
+QUERY = """
+    select pcs_orderid, cost_total   -- expected costs
+    from shipping_costs.expected_fedex e
+    join bi_stage_dev_dbo.pcsu_orders po on po.id = e.pcs_orderid
+    where po.createddate >= '2025-01-01'
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return QueryCache(tmp_path, ttl=60, max_bytes=10 ** 9)
+
+
+@pytest.fixture
+def df():
+    return pl.DataFrame({"pcs_orderid": [1, 2], "cost_total": [4.5, None]})
+
+
+class TestNormalize:
+    """Tests for normalize_sql / referenced_tables."""
+
+    def test_whitespace_and_comments(self):
+        """Formatting does not change the key; string literals do."""
+        assert normalize_sql("select  a\n  from t -- note\n;") == "select a from t"
+        assert normalize_sql("select 'a  b'") == "select 'a  b'"
+
+    def test_tables(self):
+        """Tables come from FROM / JOIN clauses, not from string literals."""
+        assert referenced_tables(QUERY) == {"shipping_costs.expected_fedex", "bi_stage_dev_dbo.pcsu_orders"}
+        assert referenced_tables("select 'from x' from t") == {"t"}
+
+
+class TestQueryCache:
+    """Tests for QueryCache."""
+
+    def test_round_trip(self, cache, df):
+        """A stored result is read back for the same normalized query and parameters."""
+        key = cache.key(QUERY, schema_overrides=None)
+        assert cache.get(key) is None
+
+        cache.put(key, QUERY, df)
+
+        assert cache.get(cache.key(QUERY.replace("    ", "  "), schema_overrides=None)).equals(df)
+        assert cache.get(cache.key(QUERY, schema_overrides={"cost_total": pl.Utf8})) is None
+
+    def test_ttl(self, cache, df):
+        """Expired entries are ignored and removed."""
+        key = cache.key(QUERY)
+        cache.put(key, QUERY, df)
+        cache.ttl = 0
+
+        time.sleep(0.01)
+
+        assert cache.get(key) is None
+        assert not list(cache.directory.iterdir())
+
+    def test_lru_eviction(self, cache, df):
+        """Over max_bytes, the least recently used entry goes first."""
+        keys = [cache.key(f"select {i}") for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, f"select {i}", df)
+            os.utime(cache.directory / f"{key}.parquet", (i, i))
+        cache.get(keys[0])  # Now the most recently used
+
+        size = (cache.directory / f"{keys[0]}.parquet").stat().st_size
+        cache.max_bytes = 2 * size
+        cache.put(keys[2], "select 2", df)
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
+
+    def test_invalidate_by_table(self, cache, df):
+        """Invalidation drops entries reading the table, with or without schema."""
+        cache.put(cache.key(QUERY), QUERY, df)
+        cache.put(cache.key("select 1 from other.t"), "select 1 from other.t", df)
+
+        assert cache.invalidate("shipping_costs.unrelated") == 0
+        assert cache.invalidate("PCSU_ORDERS") == 1
+        assert cache.get(cache.key(QUERY)) is None
+        assert cache.get(cache.key("select 1 from other.t")) is not None
+
+
+class TestPullDataCache:
+    """Tests for the cache behind pull_data."""
+
+    def test_second_pull_skips_database(self, tmp_path, monkeypatch):
+        """With the cache enabled, a repeated query is not executed again."""
+        executed = []
+
+        class Cursor:
+            description = [("cnt", RedshiftOID.BIGINT)]
+
+            def execute(self, sql):
+                executed.append(sql)
+                self._rows = [(3,)]
+
+            def fetchmany(self, size):
+                rows, self._rows = self._rows, []
+                return rows
+
+            def close(self):
+                pass
+
+        @contextmanager
+        def fake_connection(timeout=None):
+            yield type("Conn", (), {"cursor": lambda self: Cursor()})()
+
+        monkeypatch.setattr(database, "connection", fake_connection)
+        monkeypatch.setattr(database, "_cache", None)
+        database.enable_cache(tmp_path)
+
+        first = database.pull_data("select count(*) as cnt from s.t")
+        second = database.pull_data("select count(*)  as cnt\nfrom s.t")
+        database.pull_data("select count(*) as cnt from s.t", cache=False)
+
+        assert first.equals(second)
+        assert len(executed) == 2
+        assert database.invalidate_cache("s.t") == 1
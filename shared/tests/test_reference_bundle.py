@@ -0,0 +1,80 @@
+"""
+Tests for the precompiled reference data bundle.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import os
+import warnings
+
+import polars as pl
+import pytest
+
+from shared.reference import ReferenceBundle
+
+
+@pytest.fixture
+def reference_dir(tmp_path):
+    """Reference directory with a single zones CSV."""
+    (tmp_path / "zones.csv").write_text("zip_code,zone\n01002,5\n90210,8\n")
+    return tmp_path
+
+
+def _make_bundle(reference_dir, version="2026.01.01"):
+    bundle = ReferenceBundle(reference_dir, version)
+    bundle.register(
+        "zones",
+        lambda: pl.read_csv(reference_dir / "zones.csv", schema_overrides={"zip_code": pl.Utf8}),
+        sources=["zones.csv"],
+    )
+    return bundle
+
+
+class TestReferenceBundle:
+    """Tests for ReferenceBundle."""
+
+    def test_missing_bundle_falls_back_silently(self, reference_dir):
+        """Without a build, tables come from the builder and no warning is raised."""
+        bundle = _make_bundle(reference_dir)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            df = bundle.load("zones")
+
+        assert not bundle.is_valid()
+        assert df["zip_code"].to_list() == ["01002", "90210"]
+
+    def test_built_bundle_matches_builder(self, reference_dir):
+        """A built bundle is used and returns the same frame as the CSV path."""
+        _make_bundle(reference_dir).build()
+
+        bundle = _make_bundle(reference_dir)
+        assert bundle.is_valid()
+        assert bundle.load("zones").equals(bundle._builders["zones"]())
+
+    def test_version_bump_invalidates(self, reference_dir):
+        """A bundle built for another calculator version is ignored."""
+        _make_bundle(reference_dir, version="2026.01.01").build()
+
+        bundle = _make_bundle(reference_dir, version="2026.02.01")
+        with pytest.warns(UserWarning, match="stale reference bundle"):
+            assert not bundle.is_valid()
+
+    def test_touch_without_change_keeps_bundle(self, reference_dir):
+        """A new mtime with identical content still uses the bundle."""
+        _make_bundle(reference_dir).build()
+
+        path = reference_dir / "zones.csv"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert _make_bundle(reference_dir).is_valid()
+
+    def test_content_change_invalidates(self, reference_dir):
+        """Edited source CSVs make the bundle stale until rebuilt."""
+        _make_bundle(reference_dir).build()
+        (reference_dir / "zones.csv").write_text("zip_code,zone\n01002,5\n90210,8\n85001,2\n")
+
+        bundle = _make_bundle(reference_dir)
+        with pytest.warns(UserWarning, match="changed since bundle was built"):
+            df = bundle.load("zones")
+        assert len(df) == 3
@@ -0,0 +1,84 @@
+"""
+Tests for the shared reference data cache.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import os
+
+import polars as pl
+import pytest
+
+from shared.reference import ReferenceCache
+
+
+@pytest.fixture
+def zones_csv(tmp_path):
+    """Small zones CSV with a leading-zero ZIP."""
+    path = tmp_path / "zones.csv"
+    path.write_text("zip_code,zone\n01002,5\n90210,8\n")
+    return path
+
+
+class TestReferenceCache:
+    """Tests for ReferenceCache."""
+
+    def test_second_read_is_a_hit(self, zones_csv):
+        """Repeated reads parse the file once."""
+        cache = ReferenceCache()
+        first = cache.read_csv(zones_csv, schema_overrides={"zip_code": pl.Utf8})
+        second = cache.read_csv(zones_csv, schema_overrides={"zip_code": pl.Utf8})
+
+        assert first is second
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_transform_is_part_of_key(self, zones_csv):
+        """Different normalizations of the same file are cached separately."""
+        cache = ReferenceCache()
+        raw = cache.read_csv(zones_csv)
+        doubled = cache.read_csv(
+            zones_csv, transform=lambda df: df.with_columns(pl.col("zone") * 2)
+        )
+
+        assert raw["zone"].to_list() == [5, 8]
+        assert doubled["zone"].to_list() == [10, 16]
+        assert cache.stats()["entries"] == 2
+
+    def test_same_named_transforms_are_distinct(self, zones_csv):
+        """Closures sharing a qualname do not serve each other's results."""
+        cache = ReferenceCache()
+
+        def scaled(factor):
+            return lambda df: df.with_columns(pl.col("zone") * factor)
+
+        doubled = cache.read_csv(zones_csv, transform=scaled(2))
+        tripled = cache.read_csv(zones_csv, transform=scaled(3))
+
+        assert doubled["zone"].to_list() == [10, 16]
+        assert tripled["zone"].to_list() == [15, 24]
+        assert cache.stats()["misses"] == 2
+
+    def test_touch_without_change_keeps_entry(self, zones_csv):
+        """A new mtime with identical content does not reload."""
+        cache = ReferenceCache()
+        cache.read_csv(zones_csv)
+
+        stat = zones_csv.stat()
+        os.utime(zones_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache.read_csv(zones_csv)
+
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["invalidations"] == 0
+
+    def test_content_change_invalidates(self, zones_csv):
+        """Changed file content is re-parsed."""
+        cache = ReferenceCache()
+        cache.read_csv(zones_csv)
+
+        zones_csv.write_text("zip_code,zone\n01002,5\n90210,8\n85001,2\n")
+        df = cache.read_csv(zones_csv)
+
+        assert len(df) == 3
+        assert cache.stats()["invalidations"] == 1
+        assert cache.stats()["misses"] == 2
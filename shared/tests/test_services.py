@@ -0,0 +1,66 @@
+"""
+Tests for multi-service rating helpers.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import polars as pl
+import pytest
+
+from shared.rating import rate_services, cheapest_service, selected_columns
+
+
+@pytest.fixture
+def shipments():
+    """Shipments with a shared column already computed."""
+    return pl.DataFrame({"weight_lbs": [1.0, 5.0, 40.0], "zone": [2, 5, 8]})
+
+
+def _service(prefix: str, rate: float):
+    """Toy service: weight * rate, null over 30 lbs for the "b" service."""
+    def rate_service(df):
+        cost = pl.col("weight_lbs") * rate
+        if prefix == "b":
+            cost = pl.when(pl.col("weight_lbs") <= 30).then(cost)
+        return df.with_columns(cost.alias(f"{prefix}_cost_total"))
+    return rate_service
+
+
+class TestRateServices:
+    """Tests for rate_services and service selection."""
+
+    def test_appends_each_service(self, shipments):
+        """Each service's new columns are appended once, in service order."""
+        result = rate_services(shipments, [_service("a", 2.0), _service("b", 1.5)])
+
+        assert result.columns == ["weight_lbs", "zone", "a_cost_total", "b_cost_total"]
+        assert result["b_cost_total"].to_list() == [1.5, 7.5, None]
+
+    def test_lazy_input(self, shipments):
+        """A LazyFrame input gives the same result once collected."""
+        services = [_service("a", 2.0), _service("b", 1.5)]
+
+        result = rate_services(shipments.lazy(), services)
+
+        assert result.collect().equals(rate_services(shipments, services))
+
+    def test_overlapping_columns_raise(self, shipments):
+        """Two services writing the same new column is an error."""
+        with pytest.raises(ValueError, match="overlapping"):
+            rate_services(shipments, [_service("a", 2.0), _service("a", 1.0)])
+
+    def test_cheapest_with_null_totals(self, shipments):
+        """The default wins ties and null totals; selected columns follow it."""
+        df = rate_services(shipments, [_service("a", 1.5), _service("b", 1.5)])
+        df = df.with_columns(
+            pl.when(pl.col("zone") == 2).then(pl.lit(1.0)).otherwise(pl.col("b_cost_total"))
+            .alias("b_cost_total")
+        )
+
+        result = df.with_columns(
+            cheapest_service({"A": pl.col("a_cost_total"), "B": pl.col("b_cost_total")})
+            .alias("service")
+        ).with_columns(selected_columns("service", {"A": "a", "B": "b"}, ["cost_total"]))
+
+        assert result["service"].to_list() == ["B", "A", "A"]
+        assert result["cost_total"].to_list() == [1.0, 7.5, 60.0]
@@ -0,0 +1,167 @@
+"""
+Tests for the streaming sinks.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+import polars as pl
+import pytest
+
+import shared.database as database
+import shared.database.streaming as streaming
+from shared.database.checkpoint import UploadCheckpoint
+from shared.database.merge import MergeCounts
+from shared.database.streaming import push_chunks, write_parquet_chunks
+from shared.tests.test_merge import SQLiteConnection
+
+
+@pytest.fixture
+def chunks():
+    """Rated chunks, one empty and one with a null cost."""
+    return [
+        pl.DataFrame({"pcs_orderid": [1, 2], "cost_total": [4.0, 6.0]}),
+        pl.DataFrame({"pcs_orderid": [], "cost_total": []}, schema={"pcs_orderid": pl.Int64, "cost_total": pl.Float64}),
+        pl.DataFrame({"pcs_orderid": [3, 4], "cost_total": [None, 11.0]}),
+    ]
+
+
+class TestStreamingSinks:
+    """Tests for write_parquet_chunks / push_chunks."""
+
+    def test_parquet_is_chunks_in_order(self, chunks, tmp_path):
+        """The output file holds every chunk's rows in order; totals match the frame."""
+        path = tmp_path / "out.parquet"
+
+        totals = write_parquet_chunks(iter(chunks), path, sum_columns=["cost_total"])
+
+        written = pl.read_parquet(path)
+        assert written.equals(pl.concat(chunks))
+        assert (totals.rows, totals.chunks) == (4, 2)
+        assert totals.sums["cost_total"] == written["cost_total"].sum()
+        assert totals.mean("cost_total") == written["cost_total"].mean()
+
+    def test_dry_run_push_only_totals(self, chunks):
+        """A dry run consumes the chunks without touching the database."""
+        totals = push_chunks(iter(chunks), "schema.table", sum_columns=["cost_total"], dry_run=True)
+
+        assert (totals.rows, totals.chunks) == (4, 2)
+        assert totals.mean("cost_total") == 7.0
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Expected costs for orders 1-5 from June, order 9 from May; shared.database pointed at it."""
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE expected (pcs_orderid INT, cost_total REAL, pcs_created TEXT, dw_timestamp TEXT)")
+    db.executemany("INSERT INTO expected VALUES (?, ?, ?, 'old')", [
+        (1, 1.0, "2025-06-01"), (2, 2.0, "2025-06-01"), (3, 3.0, "2025-06-02"),
+        (4, 4.0, "2025-06-02"), (5, 5.0, "2025-06-03"), (9, 9.0, "2025-05-01"),
+    ])
+
+    @contextmanager
+    def fake_connection(timeout=None):
+        try:
+            yield SQLiteConnection(db)
+        finally:
+            db.rollback()
+
+    monkeypatch.setattr(database, "connection", fake_connection)
+    monkeypatch.setattr(database, "_stage", None)
+    monkeypatch.setattr(database, "_cache", None)
+    return db
+
+
+class TestPushChunksMerge:
+    """Tests for push_chunks(..., if_exists="merge", keys=[...], scope=...)."""
+
+    def test_scope_delete_after_last_chunk(self, db):
+        """Chunks are merged as they arrive; orders no chunk held go only once all are in."""
+        seen_between = []
+
+        def orders():
+            return [r[0] for r in db.execute("SELECT pcs_orderid FROM expected ORDER BY 1")]
+
+        def chunks():
+            yield pl.DataFrame({
+                "pcs_orderid": [1, 2], "cost_total": [1.0, 2.5],
+                "pcs_created": ["2025-06-01"] * 2, "dw_timestamp": ["new"] * 2,
+            })
+            seen_between.append(orders())
+            yield pl.DataFrame({
+                "pcs_orderid": [6], "cost_total": [6.0],
+                "pcs_created": ["2025-06-04"], "dw_timestamp": ["new"],
+            })
+
+        totals = push_chunks(
+            chunks(), "main.expected", sum_columns=["cost_total"], if_exists="merge",
+            keys=["pcs_orderid"], ignore_columns=["dw_timestamp"], scope="pcs_created >= '2025-06-01'",
+        )
+
+        assert seen_between == [[1, 2, 3, 4, 5, 9]]
+        assert (totals.rows, totals.chunks) == (3, 2)
+        assert totals.merged == MergeCounts(inserted=1, updated=1, unchanged=1, deleted=4)
+        assert db.execute("SELECT pcs_orderid, cost_total, dw_timestamp FROM expected ORDER BY 1").fetchall() == [
+            (1, 1.0, "old"), (2, 2.5, "new"), (6, 6.0, "new"), (9, 9.0, "old"),
+        ]
+        assert not db.execute("SELECT name FROM sqlite_temp_master").fetchall()
+
+    def test_no_chunks_clears_scope(self, db):
+        """A scoped merge of nothing still removes the rows in scope, as push_data does."""
+        totals = push_chunks(
+            iter([]), "main.expected", if_exists="merge", keys=["pcs_orderid"], scope="pcs_created >= '2025-06-02'",
+        )
+
+        assert totals.merged == MergeCounts(deleted=3)
+        assert db.execute("SELECT COUNT(*) FROM expected").fetchone() == (3,)
+
+
+class TestPushChunksResume:
+    """Tests for push_chunks(..., keys=[...], run_id=...)."""
+
+    @pytest.fixture
+    def checkpoints(self, tmp_path, monkeypatch):
+        """Keep checkpoint files in a temporary directory."""
+        monkeypatch.setattr(
+            streaming, "UploadCheckpoint",
+            lambda table, run_id: UploadCheckpoint(table, run_id, directory=tmp_path),
+        )
+        return tmp_path
+
+    @staticmethod
+    def chunk(orderids):
+        return pl.DataFrame({
+            "pcs_orderid": orderids, "cost_total": [float(o) for o in orderids],
+            "pcs_created": ["2025-06-01"] * len(orderids), "dw_timestamp": ["new"] * len(orderids),
+        })
+
+    def test_rerun_merges_chunks_in_any_order(self, db, checkpoints):
+        """After a failure, a rerun merges its chunks, so committed ones are not duplicated."""
+        db.execute("DELETE FROM expected")
+
+        def failing():
+            yield self.chunk([1, 2])
+            raise RuntimeError("connection dropped")
+
+        with pytest.raises(RuntimeError):
+            push_chunks(failing(), "main.expected", keys=["pcs_orderid"], run_id="full")
+
+        state = UploadCheckpoint("main.expected", "full", directory=checkpoints).load()
+        assert (state["batch"], state["rows"], state["last_key"]) == (1, 2, [2])
+
+        totals = push_chunks(
+            iter([self.chunk([3]), self.chunk([1, 2])]), "main.expected", keys=["pcs_orderid"], run_id="full",
+        )
+
+        assert totals.merged == MergeCounts(inserted=1, unchanged=2)
+        assert db.execute("SELECT pcs_orderid FROM expected ORDER BY 1").fetchall() == [(1,), (2,), (3,)]
+        assert not list(checkpoints.iterdir())
+
+    def test_run_id_only_appends(self):
+        """A resumable upload cannot also merge, and needs keys."""
+        with pytest.raises(ValueError, match="only append"):
+            push_chunks(iter([]), "main.expected", if_exists="merge", keys=["pcs_orderid"], run_id="full")
+        with pytest.raises(ValueError, match="needs keys"):
+            push_chunks(iter([]), "main.expected", run_id="full")
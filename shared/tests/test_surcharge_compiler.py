@@ -0,0 +1,86 @@
+"""
+Tests for the shared surcharge compiler.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import polars as pl
+import pytest
+
+from shared.surcharges import Surcharge, apply_surcharges
+
+
+class BIG(Surcharge):
+    name = "BIG"
+    list_price = 10.0
+    discount = 0.0
+    exclusivity_group = "size"
+    priority = 1
+
+    @classmethod
+    def conditions(cls) -> pl.Expr:
+        return pl.col("length_in") > 40
+
+
+class MEDIUM(Surcharge):
+    name = "MEDIUM"
+    list_price = 5.0
+    discount = 0.5
+    exclusivity_group = "size"
+    priority = 2
+
+    @classmethod
+    def conditions(cls) -> pl.Expr:
+        return pl.col("length_in") > 20
+
+
+class HEAVY(Surcharge):
+    name = "HEAVY"
+    list_price = 0.0
+    discount = 0.0
+
+    @classmethod
+    def conditions(cls) -> pl.Expr:
+        return pl.col("weight_lbs") > 50
+
+    @classmethod
+    def cost(cls) -> pl.Expr:
+        return pl.col("weight_lbs") * 0.1
+
+
+@pytest.fixture
+def shipments() -> pl.DataFrame:
+    return pl.DataFrame({
+        "length_in": [10.0, 30.0, 50.0, None],
+        "weight_lbs": [60.0, 5.0, 70.0, 1.0],
+    })
+
+
+class TestApplySurcharges:
+    """Tests for apply_surcharges."""
+
+    def test_highest_priority_wins(self, shipments):
+        """Only the highest priority match in an exclusivity group applies."""
+        df = apply_surcharges(shipments, [MEDIUM, BIG, HEAVY])
+
+        assert df["surcharge_big"].to_list() == [False, False, True, None]
+        assert df["surcharge_medium"].to_list() == [False, True, False, None]
+        assert df["cost_big"].to_list() == [0.0, 0.0, 10.0, 0.0]
+        assert df["cost_medium"].to_list() == [0.0, 2.5, 0.0, 0.0]
+
+    def test_expression_costs(self, shipments):
+        """cost() returning an expression is evaluated per row."""
+        df = apply_surcharges(shipments, [HEAVY])
+
+        assert df["cost_heavy"].to_list() == pytest.approx([6.0, 0.0, 7.0, 0.0])
+
+    def test_column_layout(self, shipments):
+        """Standalone first, then groups by priority, as flag/cost pairs."""
+        df = apply_surcharges(shipments, [MEDIUM, BIG, HEAVY])
+
+        assert df.columns == [
+            "length_in", "weight_lbs",
+            "surcharge_heavy", "cost_heavy",
+            "surcharge_big", "cost_big",
+            "surcharge_medium", "cost_medium",
+        ]
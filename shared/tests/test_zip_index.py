@@ -0,0 +1,56 @@
+"""
+Tests for the dense ZIP index.
+
+Run with: pytest shared/tests/ -v
+"""
+
+import polars as pl
+import pytest
+
+from shared.reference import ZipIndex
+
+
+@pytest.fixture
+def zones():
+    """Small 5-digit zones table."""
+    return pl.DataFrame({
+        "zip_code": ["01002", "85001", "90210"],
+        "zone": [5, 2, 8],
+    })
+
+
+class TestZipIndex:
+    """Tests for ZipIndex."""
+
+    def test_slot_matches_string_normalization(self, zones):
+        """Integer, short, ZIP+4 and non-numeric inputs resolve like the string join."""
+        index = ZipIndex.from_table(zones, "zip_code", ["zone"])
+        df = pl.DataFrame({"shipping_zip_code": ["1002", "85001-1234", "9021O", None, "90210"]})
+
+        result = df.with_columns(index.slot()).select(index.get("zone").alias("zone"))
+
+        assert result["zone"].to_list() == [5, 2, None, None, 8]
+
+    def test_fallback_order(self, zones):
+        """Exact match first, then the state value, then the default."""
+        states = pl.DataFrame({"state": ["AZ", None], "zone": [3, 7]})
+        index = ZipIndex.from_table(
+            zones, "zip_code", ["zone"],
+            states=states, state_column="state", state_columns={"zone": "zone"},
+            defaults={"zone": 4},
+        )
+        df = pl.DataFrame({
+            "shipping_zip_code": ["85001", "85999", "12345"],
+            "shipping_region": ["CA", "AZ", "TX"],
+        })
+
+        result = df.with_columns(index.slot()).select(index.lookup("zone").alias("zone"))
+
+        assert result["zone"].to_list() == [2, 3, 4]
+
+    def test_invalid_keys_raise(self):
+        """Keys must be unique digit strings of the indexed length."""
+        with pytest.raises(ValueError, match="5-digit"):
+            ZipIndex.from_table(pl.DataFrame({"zip": ["0100", "85001"], "zone": [1, 2]}), "zip", ["zone"])
+        with pytest.raises(ValueError, match="unique"):
+            ZipIndex.from_table(pl.DataFrame({"zip": ["85001", "85001"], "zone": [1, 2]}), "zip", ["zone"])